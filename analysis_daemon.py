@@ -0,0 +1,646 @@
+#!/usr/bin/env python3
+"""
+Analysis Daemon
+===============
+Keeps the Dart source index (query chains, providers, call sites per file)
+and the SaaS schema model in memory and answers queries over a Unix socket,
+so editors and pre-commit hooks skip the interpreter start-up, imports and
+full rescan that every analyzer run pays.
+
+The index is built once at start-up and then kept current by the same
+watcher as the --watch modes (inotify, or polling): a saved Dart file is
+re-parsed on its own, a changed migration reloads the schema. Queries also
+re-check the mtime of the file they name, so an answer never predates the
+file on disk.
+
+Protocol: JSON-RPC 2.0, one request or response object per line, on
+.dart_tool/analysis_daemon.sock. Methods:
+
+  tenant_scope      {"path"}                  Queries on tenant tables that bypass organization_id
+  callers           {"name"}                  Call sites of a method/function, watchers/readers of a provider
+  covering_indexes  {"path", "line"}          Indexes serving the query chain at that line (or the
+                                              first chain of the method around it)
+                    {"table", "eq", "ranges", "order"}
+  status            {}                        Index size, uptime, request count
+  shutdown          {}
+
+The query flags below are a client for those methods; without a running
+daemon they index in-process and answer once (slow, but hooks still work).
+
+Usage:
+    python analysis_daemon.py --serve                                  # Run the daemon (foreground)
+    python analysis_daemon.py --tenant-scope lib/providers/orders_provider.dart
+    python analysis_daemon.py --callers countOrdersInSlot
+    python analysis_daemon.py --covering-indexes lib/core/services/database_service.dart:826
+    python analysis_daemon.py --check $(git diff --cached --name-only -- '*.dart')   # pre-commit
+    python analysis_daemon.py --status
+    python analysis_daemon.py --stop
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import socketserver
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from dart_index import (
+    CONSTANTS_FILE, CONTROL_KEYWORDS, REF_CALL, DartFile, Provider, QueryChain, dart_files, find_providers,
+    find_query_chains, table_constants,
+)
+from file_watch import file_watcher
+from saas_schema import MIGRATIONS_DIR, SchemaModel, load_schema
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent
+LIB_DIR = PROJECT_ROOT / "lib"
+DEFAULT_SOCKET = PROJECT_ROOT / ".dart_tool" / "analysis_daemon.sock"
+
+CALL_SITE = re.compile(r'(\.\s*)?\b([A-Za-z_$][\w$]*)\s*(?:<[^<>()]*(?:<[^<>()]*>)?[^<>()]*>)?\s*\(')
+EQUALITY_FILTERS = {'eq', 'is_', 'isFilter', 'inFilter', 'in_', 'match'}
+RANGE_FILTERS = {'gt', 'gte', 'lt', 'lte', 'like', 'ilike'}
+TENANT_COLUMN = 'organization_id'
+ORG_PARAMETER = 'p_organization_id'
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def display_path(path: Path) -> str:
+    try:
+        return path.relative_to(PROJECT_ROOT.resolve()).as_posix()
+    except ValueError:
+        return str(path)
+
+
+# ---------------------------------------------------------------------------
+# In-memory index
+# ---------------------------------------------------------------------------
+
+def index_candidates(schema: SchemaModel, table: str, eq: List[str], ranges: List[str],
+                     order: Optional[str]) -> List[dict]:
+    """Indexes on `table` whose leading columns serve the equality filters, then a range or the sort;
+    best first"""
+    candidates = []
+    for index in schema.indexes_on(table):
+        columns = [c.split()[0] for c in index.columns]
+        matched = 0
+        while matched < len(columns) and columns[matched] in eq:
+            matched += 1
+        next_column = columns[matched] if matched < len(columns) else None
+        serves_order = bool(order) and next_column == order and set(eq) <= set(columns[:matched])
+        serves_range = next_column in ranges
+        if not matched and not serves_order and not serves_range:
+            continue
+        candidates.append({
+            'name': index.name,
+            'definition': index.definition,
+            'migration': index.source,
+            'equality_columns': matched,
+            'covers_all_equality': set(eq) <= set(columns[:matched]),
+            'serves_range': serves_range,
+            'serves_order': serves_order,
+            'partial': index.predicate,
+        })
+    candidates.sort(key=lambda c: (-c['covers_all_equality'], -c['equality_columns'],
+                                   -(c['serves_order'] or c['serves_range'])))
+    return candidates
+
+
+class FileIndex:
+    """What the daemon keeps for one Dart file"""
+
+    def __init__(self, path: Path, constants: Dict[str, str]):
+        self.path = path
+        self.mtime = path.stat().st_mtime_ns
+        self.source = DartFile(path)
+        self.chains: List[QueryChain] = find_query_chains(self.source, constants)
+        self.providers: List[Provider] = find_providers(self.source)
+        self.calls: Dict[str, List[Tuple[int, bool]]] = {}     # name -> (offset, member call)
+        masked = self.source.masked
+        declarations = set()
+        for block in self.source.blocks:
+            if block.name:
+                found = re.search(r'\b%s\b' % re.escape(block.name), masked[block.header_start:block.body_start])
+                if found:
+                    declarations.add(block.header_start + found.start())
+        for match in CALL_SITE.finditer(masked):
+            name = match.group(2)
+            if name not in CONTROL_KEYWORDS and match.start(2) not in declarations:
+                self.calls.setdefault(name, []).append((match.start(2), bool(match.group(1))))
+        self.refs: Dict[str, List[Tuple[int, str]]] = {}       # provider -> (offset, watch/read/...)
+        for match in REF_CALL.finditer(masked):
+            kind, target = match.groups()
+            if target:
+                self.refs.setdefault(target, []).append((match.start(), kind))
+
+
+class AnalysisIndex:
+    """Schema model and per-file Dart index, refreshed file by file"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.constants = table_constants()
+        self.schema: SchemaModel = load_schema()
+        self.files: Dict[Path, FileIndex] = {}
+        self.call_files: Dict[str, Set[Path]] = {}              # name -> files calling it
+        self.ref_files: Dict[str, Set[Path]] = {}               # provider -> files with ref.watch/read of it
+        self.provider_files: Dict[str, Path] = {}               # provider -> declaring file
+        self.started = time.time()
+        self.watcher: Optional[str] = None
+        self.requests = 0
+        self.refreshes = 0
+        self.last_refresh_ms = 0.0
+        start = time.perf_counter()
+        for path in dart_files():
+            self._index(path.resolve())
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+    # -- maintenance -----------------------------------------------------------
+
+    def _forget(self, path: Path):
+        old = self.files.pop(path, None)
+        if old is None:
+            return
+        for names, inverted in ((old.calls, self.call_files), (old.refs, self.ref_files)):
+            for name in names:
+                files = inverted.get(name)
+                if files:
+                    files.discard(path)
+                    if not files:
+                        del inverted[name]
+        for provider in old.providers:
+            if self.provider_files.get(provider.name) == path:
+                del self.provider_files[provider.name]
+
+    def _index(self, path: Path):
+        self._forget(path)
+        if not path.exists() or not dart_files([path]):
+            return
+        entry = FileIndex(path, self.constants)
+        self.files[path] = entry
+        for name in entry.calls:
+            self.call_files.setdefault(name, set()).add(path)
+        for name in entry.refs:
+            self.ref_files.setdefault(name, set()).add(path)
+        for provider in entry.providers:
+            self.provider_files[provider.name] = path
+
+    def refresh(self, paths: Set[Path]):
+        """Re-index changed Dart files; reload the schema if a migration changed"""
+        start = time.perf_counter()
+        with self.lock:
+            migrations = MIGRATIONS_DIR.resolve()
+            if any(p.suffix == '.sql' and migrations in p.resolve().parents for p in paths):
+                self.schema = load_schema()
+            if any(p.resolve() == CONSTANTS_FILE.resolve() for p in paths):
+                self.constants = table_constants()
+            for path in paths:
+                if path.suffix == '.dart':
+                    self._index(path.resolve())
+            self.refreshes += 1
+            self.last_refresh_ms = (time.perf_counter() - start) * 1000
+
+    def file(self, raw: str) -> FileIndex:
+        """Index entry for a path argument, re-parsed if the file changed on disk"""
+        path = Path(raw)
+        path = (path if path.is_absolute() else PROJECT_ROOT / path).resolve()
+        entry = self.files.get(path)
+        if entry is None or not path.exists() or path.stat().st_mtime_ns != entry.mtime:
+            self._index(path)
+            entry = self.files.get(path)
+        if entry is None:
+            raise RpcError(INVALID_PARAMS, f"not an indexed Dart file under lib/: {raw}")
+        return entry
+
+    # -- queries ---------------------------------------------------------------
+
+    def tenant_scope(self, path: str) -> dict:
+        """Queries on tables with organization_id that do not scope by it"""
+        entry = self.file(path)
+        findings = []
+        for chain in entry.chains:
+            message = self._tenant_finding(chain)
+            if message is None:
+                continue
+            provider = next((p for p in entry.providers if p.owns(chain.root_offset)), None)
+            findings.append({
+                'line': chain.line,
+                'target': chain.target,
+                'operation': chain.operation,
+                'function': chain.function.qualified_name if chain.function else None,
+                'provider': provider.name if provider else None,
+                'message': message,
+            })
+        return {'path': display_path(entry.path), 'queries': len(entry.chains), 'findings': findings}
+
+    def _tenant_finding(self, chain: QueryChain) -> Optional[str]:
+        if chain.root == 'rpc':
+            function = self.schema.functions.get((chain.target or '').lower())
+            if function and ORG_PARAMETER in function.arguments and ORG_PARAMETER not in chain.calls[0].args:
+                return f"{chain.target}() takes {ORG_PARAMETER} but the call does not pass it"
+            return None
+        table = self.schema.table(chain.table or '')
+        if table is None or not table.has_column(TENANT_COLUMN):
+            return None
+        if chain.operation in ('insert', 'upsert'):
+            payload = chain.calls_named(chain.operation)[0].args.strip()
+            if payload[:1] in '{[' and TENANT_COLUMN not in payload:
+                return f"{chain.operation} into {table.name} without {TENANT_COLUMN}"
+            return None
+        if chain.org_filtered or 'id' in chain.filter_columns('eq'):
+            return None
+        return f"{chain.operation} on {table.name} without an {TENANT_COLUMN} filter (RLS only)"
+
+    def callers(self, name: str) -> dict:
+        """Call sites of `name`; for a provider, the providers and code watching or reading it"""
+        sites = []
+        for path in sorted(self.call_files.get(name, ())):
+            entry = self.files[path]
+            for offset, member in entry.calls[name]:
+                function = entry.source.enclosing(offset)
+                sites.append({
+                    'path': display_path(path),
+                    'line': entry.source.line_of(offset),
+                    'function': function.qualified_name if function else None,
+                    'member': member,
+                })
+
+        edges = []
+        for path in sorted(self.ref_files.get(name, ())):
+            entry = self.files[path]
+            for offset, kind in entry.refs[name]:
+                provider = next((p for p in entry.providers if p.owns(offset)), None)
+                function = entry.source.enclosing(offset)
+                edges.append({
+                    'path': display_path(path),
+                    'line': entry.source.line_of(offset),
+                    'kind': kind,
+                    'provider': provider.name if provider else None,
+                    'function': function.qualified_name if function else None,
+                })
+
+        declared = self.provider_files.get(name)
+        return {
+            'name': name,
+            'declared_in': display_path(declared) if declared else None,
+            'calls': sites,
+            'ref_edges': edges,
+        }
+
+    def covering_indexes(self, path: Optional[str] = None, line: Optional[int] = None,
+                         table: Optional[str] = None, eq: Optional[List[str]] = None,
+                         ranges: Optional[List[str]] = None, order: Optional[str] = None) -> dict:
+        """Indexes whose leading columns serve a query's equality filters, then its range or sort"""
+        query = None
+        if path is not None:
+            if line is None:
+                raise RpcError(INVALID_PARAMS, "covering_indexes needs `line` with `path`")
+            entry = self.file(path)
+            source = entry.source
+            chains = [c for c in entry.chains if c.table and
+                      source.line_of(c.start) <= line <= source.line_of(max(c.end - 1, c.start))]
+            if chains:
+                chain = min(chains, key=lambda c: c.end - c.start)
+            else:
+                # A line elsewhere in a method (signature, later statements): its first chain
+                enclosing = [c for c in entry.chains if c.table and c.function and
+                             source.line_of(c.function.header_start) <= line <= source.line_of(c.function.body_end)]
+                if not enclosing:
+                    raise RpcError(INVALID_PARAMS, f"no .from() chain at {path}:{line}")
+                innermost = min(enclosing, key=lambda c: c.function.body_end - c.function.header_start).function
+                chain = min((c for c in enclosing if c.function is innermost), key=lambda c: c.start)
+            table = chain.table
+            eq = [col for name, col, _ in chain.filters if col and name in EQUALITY_FILTERS]
+            ranges = [col for name, col, _ in chain.filters if col and name in RANGE_FILTERS]
+            orders = chain.calls_named('order')
+            order = orders[0].first_string if orders else None
+            query = {'path': display_path(entry.path), 'line': chain.line, 'operation': chain.operation}
+        if not table:
+            raise RpcError(INVALID_PARAMS, "covering_indexes needs `path` and `line`, or `table`")
+        if self.schema.table(table) is None:
+            raise RpcError(INVALID_PARAMS, f"unknown table: {table}")
+
+        eq, ranges = list(dict.fromkeys(eq or [])), list(dict.fromkeys(ranges or []))
+        candidates = index_candidates(self.schema, table, eq, ranges, order)
+
+        suggestion = None
+        # Tenant column first, as in the existing idx_<table>_org_* indexes
+        wanted = sorted(eq, key=lambda c: c != TENANT_COLUMN) + [c for c in [order] + ranges if c and c not in eq][:1]
+        complete = [c for c in candidates if c['covers_all_equality'] and
+                    (not wanted[len(eq):] or c['serves_order'] or c['serves_range'])]
+        if wanted and not complete:
+            direction = ' DESC' if order and wanted[-1] == order else ''
+            name = '_'.join('org' if c == TENANT_COLUMN else re.sub(r'_id$', '', c) for c in wanted)
+            suggestion = (f"CREATE INDEX IF NOT EXISTS idx_{table}_{name} ON {table} "
+                          f"({', '.join(wanted[:-1] + [wanted[-1] + direction])});")
+        return {
+            'query': query, 'table': table, 'eq': eq, 'ranges': ranges, 'order': order,
+            'indexes': candidates, 'suggestion': suggestion,
+        }
+
+    def status(self) -> dict:
+        return {
+            'pid': os.getpid(),
+            'uptime_s': round(time.time() - self.started, 1),
+            'files': len(self.files),
+            'query_chains': sum(len(f.chains) for f in self.files.values()),
+            'providers': len(self.provider_files),
+            'call_names': len(self.call_files),
+            'tables': len(self.schema.tables),
+            'indexes': len(self.schema.indexes),
+            'build_ms': round(self.build_ms, 1),
+            'watcher': self.watcher,
+            'refreshes': self.refreshes,
+            'last_refresh_ms': round(self.last_refresh_ms, 2),
+            'requests': self.requests,
+        }
+
+    def dispatch(self, method: str, params: dict):
+        handlers = {
+            'tenant_scope': self.tenant_scope,
+            'callers': self.callers,
+            'covering_indexes': self.covering_indexes,
+            'status': self.status,
+        }
+        if method not in handlers:
+            raise RpcError(METHOD_NOT_FOUND, f"unknown method: {method}")
+        with self.lock:
+            self.requests += 1
+            try:
+                return handlers[method](**params)
+            except TypeError as e:
+                raise RpcError(INVALID_PARAMS, str(e))
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+def handle_line(index: AnalysisIndex, line: bytes, shutdown) -> Optional[dict]:
+    """JSON-RPC response for one request line (None for notifications); a shutdown request only calls `shutdown`"""
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        return {'jsonrpc': '2.0', 'id': None, 'error': {'code': PARSE_ERROR, 'message': str(e)}}
+    request_id = request.get('id') if isinstance(request, dict) else None
+    try:
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            raise RpcError(INVALID_REQUEST, "expected an object with a `method`")
+        params = request.get('params') or {}
+        if not isinstance(params, dict):
+            raise RpcError(INVALID_PARAMS, "params must be an object")
+        if request['method'] == 'shutdown':
+            shutdown()
+            result = {'stopping': True}
+        else:
+            result = index.dispatch(request['method'], params)
+        response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+    except RpcError as e:
+        response = {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': e.code, 'message': e.message}}
+    return response if not isinstance(request, dict) or 'id' in request else None
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        stopping = []
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = handle_line(self.server.index, line, lambda: stopping.append(True))
+            if response is not None:
+                self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+                self.wfile.flush()
+            if stopping:
+                # Only once the reply is out: the process exits when serve_forever returns
+                self.server.stop()
+                return
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, index: AnalysisIndex):
+        self.index = index
+        super().__init__(str(socket_path), RequestHandler)
+
+    def stop(self):
+        # shutdown() blocks until serve_forever returns, so not from a handler thread
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+
+def watch(index: AnalysisIndex):
+    """Re-index files as the watcher reports them (daemon thread)"""
+    watcher = file_watcher([LIB_DIR, MIGRATIONS_DIR], ('.dart', '.sql'))
+    index.watcher = watcher.name
+    while True:
+        changed = watcher.wait(None)
+        if changed:
+            index.refresh(changed)
+
+
+def serve(socket_path: Path):
+    if not hasattr(socket, 'AF_UNIX'):
+        print("❌ Error: Unix sockets are not available on this platform")
+        sys.exit(1)
+    if socket_path.exists():
+        if request(socket_path, 'status') is not None:
+            print(f"⚠️  A daemon is already listening on {display_path(socket_path)}")
+            sys.exit(1)
+        socket_path.unlink()               # stale socket from a daemon that died
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+    print("🛰️  Analysis Daemon")
+    print("="*60)
+    index = AnalysisIndex()
+    status = index.status()
+    print(f"📇 Indexed {status['files']} Dart files ({status['query_chains']} query chains, "
+          f"{status['providers']} providers) and {status['tables']} tables in {status['build_ms']:.0f} ms")
+
+    threading.Thread(target=watch, args=(index,), daemon=True).start()
+    server = DaemonServer(socket_path, index)
+    print(f"🔌 Listening on {display_path(socket_path)} (pid {os.getpid()}), Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path.exists():
+            socket_path.unlink()
+        print(f"\n👋 Stopped after {index.requests} requests")
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+def request(socket_path: Path, method: str, params: Optional[dict] = None, timeout: float = 30):
+    """Send one request to a running daemon; None if none is listening"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(str(socket_path))
+            client.sendall(json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': method,
+                                       'params': params or {}}).encode('utf-8') + b'\n')
+            data = b''
+            while not data.endswith(b'\n'):
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+    except (OSError, AttributeError):        # AttributeError: no AF_UNIX on this platform
+        return None
+    return json.loads(data) if data else None
+
+
+def query(socket_path: Path, method: str, params: dict, index: List[AnalysisIndex]):
+    """Result of a method from the daemon, or from an in-process index when none runs"""
+    start = time.perf_counter()
+    response = request(socket_path, method, params)
+    if response is None:
+        if not index:
+            print("⚠️  No daemon running (start one with --serve), indexing in-process...")
+            index.append(AnalysisIndex())
+        try:
+            response = {'result': index[0].dispatch(method, params)}
+        except RpcError as e:
+            response = {'error': {'code': e.code, 'message': e.message}}
+    elapsed = (time.perf_counter() - start) * 1000
+    if 'error' in response:
+        print(f"❌ Error: {response['error']['message']}")
+        sys.exit(1)
+    return response['result'], elapsed
+
+
+def print_tenant_scope(result: dict, elapsed: float):
+    findings = result['findings']
+    icon = '⚠️ ' if findings else '✅'
+    print(f"{icon} {result['path']}: {len(findings)} of {result['queries']} queries bypass "
+          f"{TENANT_COLUMN} ({elapsed:.1f} ms)")
+    for finding in findings:
+        where = finding['provider'] or finding['function'] or ''
+        print(f"  {result['path']}:{finding['line']}  {finding['message']}" + (f"  [{where}]" if where else ''))
+
+
+def print_callers(result: dict, elapsed: float):
+    declared = f" (declared in {result['declared_in']})" if result['declared_in'] else ''
+    print(f"📞 {result['name']}{declared}: {len(result['calls'])} call sites, "
+          f"{len(result['ref_edges'])} ref edges ({elapsed:.1f} ms)")
+    for site in result['calls']:
+        print(f"  {site['path']}:{site['line']}  {site['function'] or '<top level>'}")
+    for edge in result['ref_edges']:
+        print(f"  {edge['path']}:{edge['line']}  ref.{edge['kind']} in {edge['provider'] or edge['function']}")
+
+
+def print_covering_indexes(result: dict, elapsed: float):
+    where = f"{result['query']['path']}:{result['query']['line']} " if result['query'] else ''
+    filters = ', '.join([f"{c} =" for c in result['eq']] + [f"{c} <>" for c in result['ranges']]
+                        + ([f"order by {result['order']}"] if result['order'] else []))
+    print(f"📇 {where}{result['table']} ({filters or 'no filters'}) ({elapsed:.1f} ms)")
+    for index in result['indexes']:
+        serves = [f"{index['equality_columns']} equality column(s)"]
+        if index['serves_order']:
+            serves.append('sort')
+        if index['serves_range']:
+            serves.append('range')
+        mark = '✅' if index['covers_all_equality'] else '  '
+        print(f"  {mark} {index['name']}: {', '.join(serves)} [{index['migration']}]"
+              + (f" WHERE {index['partial']}" if index['partial'] else ''))
+    if not result['indexes']:
+        print("  No index starts with these columns")
+    if result['suggestion']:
+        print(f"  💡 {result['suggestion']}")
+
+
+def location(raw: str) -> Tuple[str, int]:
+    path, _, line = raw.rpartition(':')
+    if not path or not line.isdigit():
+        raise argparse.ArgumentTypeError(f"expected FILE:LINE, got {raw}")
+    return path, int(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analysis Daemon')
+    parser.add_argument('--serve', action='store_true', help='Run the daemon in the foreground')
+    parser.add_argument('--tenant-scope', metavar='FILE', help='Queries in FILE that bypass organization_id')
+    parser.add_argument('--callers', metavar='NAME', help='Call sites of a method or provider')
+    parser.add_argument('--covering-indexes', metavar='FILE:LINE', type=location,
+                        help='Indexes serving the query at FILE:LINE')
+    parser.add_argument('--check', nargs='+', metavar='FILE',
+                        help='Tenant-scope check of several files, exit 1 on findings (pre-commit)')
+    parser.add_argument('--status', action='store_true', help='Show the running daemon')
+    parser.add_argument('--stop', action='store_true', help='Stop the running daemon')
+    parser.add_argument('--socket', type=Path, default=DEFAULT_SOCKET, help='Socket path')
+    parser.add_argument('--json', action='store_true', help='Print raw JSON results')
+
+    args = parser.parse_args()
+
+    if not any([args.serve, args.tenant_scope, args.callers, args.covering_indexes,
+                args.check, args.status, args.stop]):
+        parser.print_help()
+        print("\n⚠️  Please specify --serve or a query")
+        sys.exit(1)
+
+    if args.serve:
+        serve(args.socket)
+        return
+
+    if args.stop or args.status:
+        response = request(args.socket, 'shutdown' if args.stop else 'status')
+        if response is None:
+            print("⚠️  No daemon running")
+            sys.exit(1)
+        if args.stop:
+            print("👋 Daemon stopping")
+        else:
+            print(json.dumps(response['result'], indent=2))
+        return
+
+    index: List[AnalysisIndex] = []
+    calls = []
+    if args.tenant_scope:
+        calls.append(('tenant_scope', {'path': args.tenant_scope}, print_tenant_scope))
+    for path in args.check or []:
+        if path.endswith('.dart') and not path.endswith(('.g.dart', '.freezed.dart')):
+            calls.append(('tenant_scope', {'path': path}, print_tenant_scope))
+    if args.callers:
+        calls.append(('callers', {'name': args.callers}, print_callers))
+    if args.covering_indexes:
+        path, line = args.covering_indexes
+        calls.append(('covering_indexes', {'path': path, 'line': line}, print_covering_indexes))
+
+    findings = 0
+    for method, params, printer in calls:
+        result, elapsed = query(args.socket, method, params, index)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            printer(result, elapsed)
+        if method == 'tenant_scope':
+            findings += len(result['findings'])
+
+    if args.check and findings:
+        print(f"\n❌ {findings} queries bypass {TENANT_COLUMN}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,680 @@
+#!/usr/bin/env python3
+"""
+Index Redundancy Analyzer
+=========================
+Finds indexes in the SaaS schema (database_migrations/saas/) that add
+write cost to every insert and non-HOT update without serving any read.
+
+  duplicate   Same table, method, columns, INCLUDE and predicate as another
+              index. The constraint or unique one is kept.
+  prefix      Its columns lead a wider btree index whose predicate is no
+              narrower, and that index serves every lookup it does.
+  unused      No catalogued query can use its leading column. The
+              catalogue covers:
+                - the query chains under lib/
+                - the edge function and printer bridge round trips
+                - the bodies of the SQL functions and triggers
+                - the RLS policies (their organization_id = ... predicate
+                  applies to every tenant query)
+
+Unique and constraint indexes are never candidates. An index whose leading
+columns match a foreign key is not reported as unused, because an ON DELETE
+of the parent row looks up children through it. It is still reported when
+a wider index covers it.
+
+Indexes added by the migrations the analyzers generate (their header says
+"Generated by ...") have no idx_scan history in production yet. They are
+never candidates, and they never make an older index a duplicate or a
+prefix: an older index that overlaps only with them is left alone.
+
+--bench measures what each candidate adds to writes, on generated data in a
+local Postgres (see local_postgres.py). For every table with candidates it
+builds a copy with the live index set and seeds --base-rows rows. It then
+times --rows inserts and --updates updates of an indexed column. That update
+cannot be HOT, so every index is touched. It does this once with every
+index and once with each candidate dropped. The difference is the cost per
+row of that index.
+
+--apply writes a DROP INDEX CONCURRENTLY migration with the reason and the
+measured cost of each drop. Each unused drop is preceded by a guard that
+reads idx_scan from pg_stat_user_indexes and raises, which stops the
+migration, if the index has been scanned since the last stats reset.
+Duplicate and prefix drops get no guard: the planner scans them in place of
+the index that covers them (the narrower one wins org-only filters and RLS
+checks), so their idx_scan is expected to be non-zero and the covering index
+takes those scans over. The migration has no BEGIN/COMMIT, since
+CONCURRENTLY cannot run inside a transaction block.
+--keep leaves an index out after review.
+
+Usage:
+    python analyze_indexes.py                                  # Report
+    python analyze_indexes.py --table ordini ordini_items
+    python analyze_indexes.py --bench                          # + write cost on generated data
+    python analyze_indexes.py --bench --apply                  # Write the migration
+    python analyze_indexes.py --apply --keep idx_ordini_tipo
+    python analyze_indexes.py --bench --json indexes.json
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from statistics import median
+from typing import Dict, List, Optional, Set, Tuple
+
+from analysis_daemon import index_candidates
+from dart_index import DartFile, dart_files, find_query_chains, first_string, table_constants
+from edge_index import TsFile, edge_function_files, find_round_trips
+from local_postgres import (
+    DEFAULT_DSN, require_psycopg, connect, prepare_bench_database, drop_scratch_database,
+)
+from saas_schema import (
+    Index, SchemaModel, load_schema, migration_files, migration_statements, migration_target, migration_header,
+)
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent
+PRINTER_SERVER = PROJECT_ROOT / "printer" / "server.js"
+
+EQUALITY_METHODS = {'eq', 'is_', 'isFilter', 'inFilter', 'in_', 'match', 'in', 'is', 'filter', 'contains'}
+RANGE_METHODS = {'gt', 'gte', 'lt', 'lte', 'like', 'ilike', 'textSearch', 'rangeGt', 'rangeLt', 'overlaps'}
+# `or('stato.eq.ready,printed.is.false')` / PostgREST filter strings
+OR_FILTER = re.compile(r'(\w+)\.(?:not\.)?(eq|neq|gt|gte|lt|lte|like|ilike|is|in|cs|cd|fts)\.')
+
+SQL_TABLE_REF = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO|ON)\s+(?:ONLY\s+)?(?:public\.)?([a-z_]\w*)', re.IGNORECASE)
+SQL_OPERATOR = r'(?:=|<>|!=|<=|>=|<|>|@@|%|\bIN\b|\bBETWEEN\b|\bIS\b|\bLIKE\b|\bILIKE\b|\bANY\b)'
+SQL_LEFT = re.compile(r'(?:\b[a-z_]\w*\.)?\b([a-z_]\w*)\s*' + SQL_OPERATOR, re.IGNORECASE)
+SQL_RIGHT = re.compile(r'(?:=|<>|!=|<=|>=|<|>)\s*(?:\b[a-z_]\w*\.)?\b([a-z_]\w*)\b(?!\s*\()', re.IGNORECASE)
+SQL_ORDER = re.compile(r'\bORDER\s+BY\s+(?:[a-z_]\w*\.)?([a-z_]\w*)', re.IGNORECASE)
+CREATE_POLICY = re.compile(r'^CREATE\s+POLICY\s+.*?\bON\s+(?:public\.)?(\w+)', re.IGNORECASE | re.DOTALL)
+EQUALITY_SQL = {'=', 'IN', 'IS', 'ANY'}
+
+# Column updated by --bench per table: the status change the app makes most
+UPDATE_COLUMNS = {'ordini': 'stato', 'ordini_items': 'quantita', 'notifiche': 'letto',
+                  'organization_members': 'is_active', 'organizations': 'is_active'}
+GENERATED_CARDINALITY = 1000
+GENERATED_MIGRATION = re.compile(r'^-- Generated by \w+\.py', re.MULTILINE)
+# Stops the migration before an unused drop if anything scanned the index since the last stats reset
+INDEX_SCAN_GUARD = """DO $$
+DECLARE
+    v_scans BIGINT;
+BEGIN
+    SELECT idx_scan INTO v_scans FROM pg_stat_user_indexes WHERE indexrelname = '{name}';
+    IF v_scans > 0 THEN
+        RAISE EXCEPTION '{name} was scanned % times since the last stats reset (%): keep it or pass --keep',
+            v_scans, (SELECT stats_reset FROM pg_stat_database WHERE datname = current_database());
+    END IF;
+END $$;"""
+
+
+# ---------------------------------------------------------------------------
+# Query catalogue
+# ---------------------------------------------------------------------------
+
+class CataloguedQuery:
+    """Columns one query can look up by, on one table"""
+
+    def __init__(self, table: str, source: str, eq: List[str], ranges: List[str], order: Optional[str],
+                 text: str = ''):
+        self.table = table
+        self.source = source
+        self.eq = list(dict.fromkeys(eq))
+        self.ranges = list(dict.fromkeys(c for c in ranges if c not in eq))
+        self.order = order
+        self.text = text                  # SQL text, for expression indexes
+
+
+def chain_query(table: str, source: str, filters, orders) -> CataloguedQuery:
+    """(method, column, args) filters of a supabase chain"""
+    eq, ranges = [], []
+    for method, column, args in filters:
+        if method == 'or':
+            for name, operator in OR_FILTER.findall(first_string(args) or ''):
+                (eq if operator in ('eq', 'is', 'in') else ranges).append(name)
+        elif column and method in EQUALITY_METHODS:
+            eq.append(column)
+        elif column and method in RANGE_METHODS:
+            ranges.append(column)
+    order = orders[0].first_string if orders else None
+    return CataloguedQuery(table, source, eq, ranges, order)
+
+
+def sql_queries(schema: SchemaModel, text: str, source: str, tables: Optional[List[str]] = None) -> List[CataloguedQuery]:
+    """Lookups in a SQL body, attributed to every table it mentions (over-approximates use)"""
+    names = set(tables or []) | {t.lower() for t in SQL_TABLE_REF.findall(text)}
+    eq: Set[str] = set()
+    ranges: Set[str] = set()
+    for match in SQL_LEFT.finditer(text):
+        tail = match.group(0)[match.end(1) - match.start(0):].strip().upper()
+        (eq if tail in EQUALITY_SQL else ranges).add(match.group(1).lower())
+    for match in SQL_RIGHT.finditer(text):
+        eq.add(match.group(1).lower())
+    orders = [o.lower() for o in SQL_ORDER.findall(text)]
+
+    queries = []
+    for name in sorted(names):
+        table = schema.table(name)
+        if table is None:
+            continue
+        queries.append(CataloguedQuery(
+            name, source,
+            [c for c in eq if table.has_column(c)],
+            [c for c in ranges if table.has_column(c)],
+            next((o for o in orders if table.has_column(o)), None),
+            text=text,
+        ))
+    return queries
+
+
+def build_catalogue(schema: SchemaModel) -> Tuple[List[CataloguedQuery], Dict[str, int]]:
+    queries: List[CataloguedQuery] = []
+    counts = {'dart': 0, 'edge': 0, 'functions': 0, 'policies': 0}
+
+    constants = table_constants()
+    for path in dart_files():
+        source = DartFile(path)
+        for chain in find_query_chains(source, constants):
+            if chain.table:
+                queries.append(chain_query(chain.table, f"{source.rel}:{chain.line}", chain.filters,
+                                           chain.calls_named('order')))
+                counts['dart'] += 1
+
+    ts_files = edge_function_files() + ([PRINTER_SERVER] if PRINTER_SERVER.exists() else [])
+    for path in ts_files:
+        source = TsFile(path)
+        for trips in find_round_trips(source).values():
+            for trip in trips:
+                if trip.kind == 'from' and trip.target:
+                    queries.append(chain_query(trip.target, f"{source.rel}:{trip.line}", trip.filters,
+                                               [c for c in trip.calls if c.name == 'order']))
+                    counts['edge'] += 1
+
+    for function in schema.functions.values():
+        queries += sql_queries(schema, function.body, f"{function.name}() [{function.source}]")
+        counts['functions'] += 1
+
+    for path in migration_files():
+        for statement in migration_statements(path):
+            match = CREATE_POLICY.match(statement)
+            if match:
+                queries += sql_queries(schema, statement, f"policy on {match.group(1)} [{path.name}]",
+                                       [match.group(1).lower()])
+                counts['policies'] += 1
+
+    return queries, counts
+
+
+# ---------------------------------------------------------------------------
+# Findings
+# ---------------------------------------------------------------------------
+
+def column_key(column: str) -> Tuple[str, bool]:
+    """(normalized column or expression, descending); operator classes dropped"""
+    text = re.sub(r'\s+', ' ', column.strip())
+    descending = bool(re.search(r'\bDESC\b', text, re.IGNORECASE))
+    text = re.sub(r'\s+(ASC|DESC)\b|\s+NULLS\s+(FIRST|LAST)\b', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s+\w+_ops\b', '', text)          # operator class
+    return text.lower(), descending
+
+
+def normalized_predicate(index: Index) -> str:
+    return re.sub(r'\s+', ' ', index.predicate or '').strip().lower()
+
+
+def is_prefix(short: List[str], wide: List[str]) -> bool:
+    """`short` leads `wide`, with every direction equal or every direction reversed"""
+    if len(short) >= len(wide):
+        return False
+    a = [column_key(c) for c in short]
+    b = [column_key(c) for c in wide[:len(short)]]
+    if [n for n, _ in a] != [n for n, _ in b]:
+        return False
+    flips = {x[1] != y[1] for x, y in zip(a, b)}
+    return len(flips) == 1
+
+
+def protected(index: Index) -> bool:
+    return index.unique or index.constraint
+
+
+def keep_rank(index: Index) -> Tuple[int, int, str]:
+    """Lower is kept first among duplicates"""
+    return (0 if index.constraint else 1, 0 if index.unique else 1, index.source)
+
+
+class Finding:
+    def __init__(self, index: Index, kind: str, reason: str, covered_by: Optional[Index] = None):
+        self.index = index
+        self.kind = kind                  # 'duplicate' | 'prefix' | 'unused'
+        self.reason = reason
+        self.covered_by = covered_by
+        self.cost: Optional[Dict] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'index': self.index.name,
+            'table': self.index.table,
+            'kind': self.kind,
+            'definition': self.index.definition,
+            'migration': self.index.source,
+            'reason': self.reason,
+            'covered_by': self.covered_by.name if self.covered_by else None,
+            'cost': self.cost,
+        }
+
+
+def foreign_key_index(schema: SchemaModel, index: Index) -> bool:
+    """Leading columns are a foreign key of the table (parent deletes look children up by it)"""
+    names = [column_key(c)[0] for c in index.columns]
+    return any(names[:len(fk.columns)] == fk.columns for fk in schema.table(index.table).foreign_keys)
+
+
+def used_by(schema: SchemaModel, index: Index, queries: List[CataloguedQuery]) -> List[CataloguedQuery]:
+    leading = column_key(index.columns[0])[0]
+    users = []
+    for query in queries:
+        if query.table != index.table:
+            continue
+        if not re.fullmatch(r'\w+', leading):
+            # Expression index: used when the expression appears in the SQL
+            if query.text and re.sub(r'\s+', '', leading) in re.sub(r'\s+', '', query.text.lower()):
+                users.append(query)
+            continue
+        candidates = index_candidates(schema, index.table, query.eq, query.ranges, query.order)
+        if any(c['name'] == index.name for c in candidates):
+            users.append(query)
+    return users
+
+
+def generated_migrations() -> Set[str]:
+    """Migrations written by the analyzers: their indexes have no production idx_scan history yet"""
+    return {path.name for path in migration_files()
+            if GENERATED_MIGRATION.search(path.read_text(encoding='utf-8')[:1000])}
+
+
+def find_redundant(schema: SchemaModel, queries: List[CataloguedQuery],
+                   tables: Optional[List[str]] = None) -> Tuple[List[Finding], Dict[str, int]]:
+    fresh = generated_migrations()
+    findings: List[Finding] = []
+    flagged: Set[str] = set()
+    index_counts: Dict[str, int] = {}
+
+    for table in sorted(tables or schema.tables):
+        indexes = schema.indexes_on(table)
+        index_counts[table] = len(indexes)
+
+        groups: Dict[Tuple, List[Index]] = {}
+        for index in indexes:
+            key = (index.method, tuple(column_key(c) for c in index.columns), tuple(index.include),
+                   normalized_predicate(index))
+            groups.setdefault(key, []).append(index)
+        for group in groups.values():
+            kept, *others = sorted(group, key=keep_rank)
+            if kept.source in fresh:
+                continue
+            for index in others:
+                if protected(index) or index.source in fresh:
+                    continue
+                findings.append(Finding(index, 'duplicate', f"same definition as {kept.name}", kept))
+                flagged.add(index.name)
+
+        for index in indexes:
+            if index.name in flagged or protected(index) or index.method != 'btree' or index.source in fresh:
+                continue
+            for wider in sorted(indexes, key=lambda i: (len(i.columns), keep_rank(i))):
+                if wider is index or wider.name in flagged or wider.method != 'btree' or wider.source in fresh:
+                    continue
+                if wider.predicate and normalized_predicate(wider) != normalized_predicate(index):
+                    continue
+                covered = {column_key(c)[0] for c in wider.columns + wider.include}
+                if not is_prefix(index.columns, wider.columns) or \
+                        not {column_key(c)[0] for c in index.include} <= covered:
+                    continue
+                findings.append(Finding(index, 'prefix', f"leads {wider.name} ({', '.join(wider.columns)})", wider))
+                flagged.add(index.name)
+                break
+
+        for index in indexes:
+            if index.name in flagged or protected(index) or foreign_key_index(schema, index) or \
+                    index.source in fresh:
+                continue
+            if not used_by(schema, index, queries):
+                leading = column_key(index.columns[0])[0]
+                findings.append(Finding(index, 'unused', f"no catalogued query looks up {table} by {leading}"))
+                flagged.add(index.name)
+
+    return findings, index_counts
+
+
+# ---------------------------------------------------------------------------
+# Write-cost benchmark
+# ---------------------------------------------------------------------------
+
+COLUMNS_SQL = """
+SELECT column_name, data_type, is_nullable = 'YES', column_default
+FROM information_schema.columns
+WHERE table_schema = 'public' AND table_name = %s AND is_generated = 'NEVER'
+ORDER BY ordinal_position
+"""
+
+INDEXES_SQL = "SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = 'public' AND tablename = %s"
+
+
+def value_expression(data_type: str, cardinality: int, unique: bool) -> Optional[str]:
+    """Generated value for a column; `n` is the row number from generate_series"""
+    data_type = data_type.lower()
+    if data_type == 'uuid':
+        return "gen_random_uuid()" if unique else f"md5(((random() * {cardinality})::int)::text)::uuid"
+    if data_type in ('text', 'character varying', 'character'):
+        return "'u' || n" if unique else f"'v' || (random() * {cardinality})::int"
+    if data_type == 'boolean':
+        return "random() < 0.5"
+    if data_type in ('integer', 'bigint', 'smallint'):
+        return "n" if unique else f"(random() * {cardinality})::int"
+    if data_type in ('numeric', 'real', 'double precision'):
+        return "round((random() * 100)::numeric, 2)"
+    if data_type.startswith('timestamp'):
+        return ("timestamptz '2000-01-01' + n * interval '1 second'" if unique
+                else "now() - random() * interval '365 days'")
+    if data_type == 'date':
+        return "date '2000-01-01' + n" if unique else "current_date - (random() * 365)::int"
+    if data_type.startswith('time'):
+        return "time '11:00' + random() * interval '11 hours'"
+    if data_type in ('jsonb', 'json'):
+        return "'{}'::jsonb"
+    if data_type == 'array':
+        return "'{}'"
+    return None
+
+
+class BenchTable:
+    """A copy of one table with its live indexes, filled with generated rows"""
+
+    def __init__(self, conn, table: str, schema: SchemaModel, args):
+        self.conn = conn
+        self.table = table
+        self.copy = f"index_bench_{table}"
+        self.args = args
+        self.indexes: Dict[str, str] = {name: definition for name, definition in
+                                        conn.execute(INDEXES_SQL, (table,)).fetchall()}
+        self.aliases = {name: f"ib_{i}" for i, name in enumerate(sorted(self.indexes))}
+
+        indexed: Set[str] = set()
+        unique: Set[str] = set()
+        for index in schema.indexes_on(table):
+            names = {column_key(c)[0] for c in index.columns + index.include}
+            indexed |= names
+            if index.unique or index.constraint:
+                unique |= names
+        primary_key = schema.table(table).primary_key
+        unique |= set(primary_key)
+        self.primary_key = primary_key[0] if primary_key else None
+
+        self.columns: List[str] = []
+        self.values: List[str] = []
+        self.types: Dict[str, str] = {}
+        for name, data_type, nullable, default in conn.execute(COLUMNS_SQL, (table,)).fetchall():
+            self.types[name] = data_type
+            if name not in indexed and (nullable or default is not None):
+                continue
+            cardinality = args.orgs if name == 'organization_id' else GENERATED_CARDINALITY
+            expression = value_expression(data_type, cardinality, name in unique)
+            if expression:
+                self.columns.append(name)
+                self.values.append(expression)
+
+        self.update_column = UPDATE_COLUMNS.get(table)
+        if self.update_column not in self.types:
+            self.update_column = next((c for c in self.columns if c in indexed and c not in unique), None)
+
+    def insert(self, start: int, count: int):
+        self.conn.execute(
+            f"INSERT INTO {self.copy} ({', '.join(self.columns)}) "
+            f"SELECT {', '.join(self.values)} FROM generate_series(%s::int, %s::int) AS n",
+            (start, start + count - 1),
+        )
+
+    def build(self, dropped: Set[str]):
+        """Recreate the copy with every live index except `dropped`, then seed the base rows"""
+        self.conn.execute(f"DROP TABLE IF EXISTS {self.copy}")
+        self.conn.execute(f"CREATE TABLE {self.copy} (LIKE {self.table} INCLUDING DEFAULTS)")
+        for name, definition in self.indexes.items():
+            if name in dropped:
+                continue
+            sql = re.sub(r'\bINDEX\s+\S+\s+ON\s+(?:ONLY\s+)?(?:public\.)?\S+',
+                         f"INDEX {self.aliases[name]} ON {self.copy}", definition, count=1)
+            self.conn.execute(sql)
+        for start in range(1, self.args.base_rows + 1, self.args.seed_batch):
+            self.insert(start, min(self.args.seed_batch, self.args.base_rows - start + 1))
+        self.conn.execute(f"VACUUM ANALYZE {self.copy}")
+
+    def index_sizes(self) -> Dict[str, int]:
+        sizes = {}
+        for name, alias in self.aliases.items():
+            row = self.conn.execute("SELECT pg_relation_size(to_regclass(%s))", (alias,)).fetchone()
+            if row and row[0] is not None:
+                sizes[name] = row[0]
+        return sizes
+
+    def timed_writes(self) -> Tuple[float, float]:
+        """Seconds for --rows inserts and --updates updates, in --batch statements"""
+        batch = self.args.batch
+        started = time.perf_counter()
+        for start in range(self.args.base_rows + 1, self.args.base_rows + self.args.rows + 1, batch):
+            self.insert(start, min(batch, self.args.base_rows + self.args.rows - start + 1))
+        insert_seconds = time.perf_counter() - started
+
+        if not self.update_column or not self.primary_key:
+            return insert_seconds, 0.0
+        keys = [r[0] for r in self.conn.execute(
+            f"SELECT {self.primary_key} FROM {self.copy} ORDER BY random() LIMIT %s", (self.args.updates,)
+        ).fetchall()]
+        value = value_expression(self.types[self.update_column], GENERATED_CARDINALITY, False)
+        started = time.perf_counter()
+        for i in range(0, len(keys), batch):
+            self.conn.execute(
+                f"UPDATE {self.copy} SET {self.update_column} = {value} WHERE {self.primary_key} = ANY(%s)",
+                (keys[i:i + batch],),
+            )
+        return insert_seconds, time.perf_counter() - started
+
+    def measure(self, dropped: Set[str]) -> Dict:
+        inserts, updates, sizes = [], [], {}
+        for _ in range(self.args.repeat):
+            self.build(dropped)
+            sizes = self.index_sizes()
+            insert_seconds, update_seconds = self.timed_writes()
+            inserts.append(insert_seconds)
+            updates.append(update_seconds)
+        return {'insert_s': median(inserts), 'update_s': median(updates), 'sizes': sizes}
+
+    def drop(self):
+        self.conn.execute(f"DROP TABLE IF EXISTS {self.copy}")
+
+
+def bench_costs(findings: List[Finding], schema: SchemaModel, args):
+    """Fill Finding.cost with the measured write cost of each candidate"""
+    by_table: Dict[str, List[Finding]] = {}
+    for finding in findings:
+        by_table.setdefault(finding.index.table, []).append(finding)
+
+    dsn = prepare_bench_database(args.dsn, args.database)
+    try:
+        with connect(dsn) as conn:
+            for table, table_findings in sorted(by_table.items()):
+                bench = BenchTable(conn, table, schema, args)
+                present = [f for f in table_findings if f.index.name in bench.indexes]
+                for finding in table_findings:
+                    if finding not in present:
+                        print(f"  ⚠️ {finding.index.name}: not created in the scratch database, not measured")
+                if not present:
+                    continue
+                print(f"\n⏱️  {table}: {args.base_rows:,} base rows, {args.rows:,} inserts, {args.updates:,} "
+                      f"updates of {bench.update_column or '-'} x{args.repeat}")
+                baseline = bench.measure(set())
+                for finding in present:
+                    without = bench.measure({finding.index.name})
+                    finding.cost = {
+                        'insert_us_per_row': round((baseline['insert_s'] - without['insert_s']) / args.rows * 1e6, 2),
+                        'update_us_per_row': round((baseline['update_s'] - without['update_s'])
+                                                   / max(args.updates, 1) * 1e6, 2) if bench.update_column else None,
+                        'insert_pct': round((baseline['insert_s'] / without['insert_s'] - 1) * 100, 1)
+                        if without['insert_s'] else None,
+                        'size_bytes': baseline['sizes'].get(finding.index.name),
+                        'update_column': bench.update_column,
+                    }
+                    print_cost(finding)
+                if len(present) > 1:
+                    together = bench.measure({f.index.name for f in present})
+                    print(f"  All {len(present)} dropped: inserts "
+                          f"{(baseline['insert_s'] / together['insert_s'] - 1) * 100 if together['insert_s'] else 0:+.1f}%"
+                          f" slower with them, updates "
+                          f"{(baseline['update_s'] / together['update_s'] - 1) * 100 if together['update_s'] else 0:+.1f}%")
+                bench.drop()
+    finally:
+        if not args.keep_database:
+            drop_scratch_database(args.dsn, args.database)
+
+
+# ---------------------------------------------------------------------------
+# Report / migration
+# ---------------------------------------------------------------------------
+
+KIND_ICONS = {'duplicate': '♊', 'prefix': '🔁', 'unused': '💤'}
+
+
+def print_cost(finding: Finding):
+    cost = finding.cost
+    update = f", +{cost['update_us_per_row']} µs/update" if cost['update_us_per_row'] is not None else ''
+    size = f", {cost['size_bytes'] / 1024 / 1024:.1f} MB" if cost['size_bytes'] else ''
+    print(f"  {finding.index.name:<44} +{cost['insert_us_per_row']} µs/insert ({cost['insert_pct']:+}%)"
+          f"{update}{size}")
+
+
+def print_findings(findings: List[Finding], index_counts: Dict[str, int]):
+    by_table: Dict[str, List[Finding]] = {}
+    for finding in findings:
+        by_table.setdefault(finding.index.table, []).append(finding)
+    for table, table_findings in sorted(by_table.items(), key=lambda kv: -index_counts[kv[0]]):
+        print(f"\n📋 {table} ({index_counts[table]} indexes, {len(table_findings)} candidate(s))")
+        for finding in table_findings:
+            index = finding.index
+            print(f"  {KIND_ICONS[finding.kind]} {index.name} ({', '.join(index.columns)})"
+                  f"{' WHERE ' + index.predicate if index.predicate else ''} [{index.source}]")
+            print(f"     {finding.kind}: {finding.reason}")
+
+
+def migration_sql(migration: Path, findings: List[Finding]) -> str:
+    sql = [
+        migration_header(
+            f"{migration.name.split('_')[0]}: DROP REDUNDANT INDEXES",
+            'Generated by analyze_indexes.py --apply: duplicate, prefix-covered and unused indexes',
+        ),
+        "-- DROP INDEX CONCURRENTLY cannot run inside a transaction block: no BEGIN/COMMIT.",
+        "-- The guard before each unused drop raises when idx_scan is non-zero since the last",
+        "-- stats reset: some query outside the catalogue still uses the index. Stats reset on",
+        "-- a restore or failover, so check pg_stat_database.stats_reset is not recent.",
+        "-- Duplicate and prefix drops are not guarded: their scans are expected and move to",
+        "-- the covering index.\n",
+    ]
+    for finding in findings:
+        index = finding.index
+        sql.append(f"-- {index.name} ({index.table}, {index.source}): {finding.kind}, {finding.reason}")
+        if finding.cost:
+            cost = finding.cost
+            update = f", +{cost['update_us_per_row']} us/update" if cost['update_us_per_row'] is not None else ''
+            sql.append(f"-- Measured write cost: +{cost['insert_us_per_row']} us/insert{update}")
+        if finding.kind == 'unused':
+            sql.append(INDEX_SCAN_GUARD.format(name=index.name))
+        else:
+            sql.append(f"-- No idx_scan guard: {finding.covered_by.name} takes over the scans of this index")
+        sql.append(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name};\n")
+    return '\n'.join(sql)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index Redundancy Analyzer')
+    parser.add_argument('--table', nargs='+', help='Only these tables')
+    parser.add_argument('--keep', nargs='+', default=[], metavar='INDEX', help='Leave these indexes out (reviewed)')
+    parser.add_argument('--apply', action='store_true', help='Write the DROP INDEX CONCURRENTLY migration')
+    parser.add_argument('--json', metavar='PATH', help='Write findings as JSON')
+
+    bench = parser.add_argument_group('benchmark')
+    bench.add_argument('--bench', action='store_true', help='Measure write cost on generated data (local Postgres)')
+    bench.add_argument('--base-rows', type=int, default=50_000, help='Rows in the table before timing')
+    bench.add_argument('--rows', type=int, default=20_000, help='Timed inserts')
+    bench.add_argument('--updates', type=int, default=20_000, help='Timed updates')
+    bench.add_argument('--batch', type=int, default=100, help='Rows per timed statement')
+    bench.add_argument('--seed-batch', type=int, default=10_000, help='Rows per seeding statement')
+    bench.add_argument('--orgs', type=int, default=50, help='Distinct organization_id values in generated rows')
+    bench.add_argument('--repeat', type=int, default=3, help='Runs per configuration (median)')
+    bench.add_argument('--dsn', default=DEFAULT_DSN, help='Admin DSN (default: $LOCAL_DATABASE_URL)')
+    bench.add_argument('--database', default='rotante_bench_indexes', help='Scratch database name')
+    bench.add_argument('--keep-database', action='store_true', help='Do not drop the scratch database')
+
+    args = parser.parse_args()
+
+    print("🗂️  Index Redundancy Analyzer")
+    print("="*60)
+
+    schema = load_schema()
+    unknown = [t for t in args.table or [] if schema.table(t) is None]
+    if unknown:
+        print(f"❌ Unknown table(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    queries, counts = build_catalogue(schema)
+    print(f"📚 Catalogued queries: {counts['dart']} Dart chains, {counts['edge']} edge/printer round trips, "
+          f"{counts['functions']} SQL functions, {counts['policies']} RLS policies")
+
+    findings, index_counts = find_redundant(schema, queries, args.table)
+    kept = [f for f in findings if f.index.name in args.keep]
+    findings = [f for f in findings if f.index.name not in args.keep]
+    print_findings(findings, index_counts)
+
+    if args.bench and findings:
+        require_psycopg()
+        bench_costs(findings, schema, args)
+
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    for kind in ('duplicate', 'prefix', 'unused'):
+        print(f"  {kind.capitalize():<10} {sum(1 for f in findings if f.kind == kind)}")
+    if kept:
+        print(f"  Kept after review: {', '.join(f.index.name for f in kept)}")
+    measured = [f for f in findings if f.cost]
+    if measured:
+        total = sum(max(f.cost['insert_us_per_row'], 0) for f in measured)
+        print(f"  Measured: ~{total:.1f} µs per insert across {len(measured)} index(es) "
+              f"(summed per table, generated data)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'catalogue': counts, 'index_counts': index_counts,
+                       'findings': [x.to_dict() for x in findings],
+                       'kept': [x.index.name for x in kept]}, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+    if not findings:
+        print("\n✅ No redundant indexes")
+        return
+
+    migration, sql = migration_target('drop_redundant_indexes', lambda m: migration_sql(m, findings))
+    if migration.exists():
+        print(f"\n✅ {migration.relative_to(PROJECT_ROOT)} is up to date")
+    elif args.apply:
+        migration.write_text(sql, encoding='utf-8')
+        print(f"\n✅ Wrote {migration.relative_to(PROJECT_ROOT)}")
+    else:
+        print(f"\n⚠️  DRY RUN - would write {migration.relative_to(PROJECT_ROOT)}")
+        print("   Review the candidates (--keep NAME to leave one out), then run with --apply")
+
+
+if __name__ == '__main__':
+    main()
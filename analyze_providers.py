@@ -0,0 +1,1260 @@
+#!/usr/bin/env python3
+"""
+Riverpod Provider Analyzer
+==========================
+Static analysis of the Riverpod provider graph in lib/providers.
+
+--invalidation follows the ref.watch edges downstream of an invalidated
+provider (by default currentOrganizationProvider, which switchOrganization()
+and refresh() invalidate) and reports the transitive rebuild set, the
+Supabase queries each rebuild re-issues (following calls into
+lib/core/services) and where `select`, org-keyed `family` providers or
+keepAlive caching points would cut the cascade.
+
+--startup follows the awaits of main() up to runApp and of
+appStartupProvider into the providers and services they wait on, builds
+the await DAG (Future.wait branches run in parallel, providers are shared)
+and estimates the critical path to first paint in network round trips. It
+lists sequential awaits that do not use each other's results and could run
+in one Future.wait, and awaits that nothing before first paint depends on.
+
+--since REF (see change_scope.py) skips a report when none of its inputs
+(the analyzed providers and lib/core/services, plus main.dart and
+lib/core/config for --startup) changed since REF. Otherwise it reads the
+provider graph from the cached per-file summaries and parses only the files
+the report can reach: the providers in the cascade and the files naming the
+root for --invalidation, and the providers and types named from main(),
+the services, the config and the startup provider for --startup.
+
+Usage:
+    python analyze_providers.py --invalidation                        # Org switch cascade
+    python analyze_providers.py --invalidation --root authProvider    # Cascade of another provider
+    python analyze_providers.py --startup                             # Startup critical path
+    python analyze_providers.py --startup --rtt-ms 40                 # ... on a faster network
+    python analyze_providers.py --invalidation --startup --since origin/main
+"""
+
+import re
+import sys
+import argparse
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from change_scope import ChangeScope, FileSummaries
+from dart_index import (
+    Block, DartFile, Provider, QueryChain, REF_CALL, FILTER_METHODS, CONTROL_KEYWORDS,
+    dart_files, find_providers, find_query_chains, statement_start, expression_end, split_commas,
+)
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent
+LIB_DIR = PROJECT_ROOT / "lib"
+PROVIDERS_DIR = LIB_DIR / "providers"
+SERVICES_DIR = LIB_DIR / "core" / "services"
+CONFIG_DIR = LIB_DIR / "core" / "config"
+MAIN_FILE = LIB_DIR / "main.dart"
+
+DEFAULT_ROOT = 'currentOrganizationProvider'
+STARTUP_PROVIDER = 'appStartupProvider'
+DEFAULT_RTT_MS = 100
+
+# Query builder methods; a call with one of these names is never resolved to
+# a service method of the same name
+BUILDER_METHODS = {
+    'from', 'rpc', 'select', 'insert', 'update', 'upsert', 'delete', 'stream',
+    'order', 'limit', 'range', 'single', 'maybeSingle', 'count',
+} | FILTER_METHODS
+
+ASYNC_VALUE_MEMBERS = {
+    'value', 'valueOrNull', 'requireValue', 'hasValue', 'hasError', 'isLoading',
+    'isRefreshing', 'isReloading', 'error', 'stackTrace', 'when', 'maybeWhen',
+    'whenOrNull', 'whenData', 'map', 'maybeMap', 'asData', 'toString',
+}
+UNWRAP_MEMBERS = ('value', 'valueOrNull', 'requireValue')
+
+NARROWING_ADVICE = {
+    'rebuild-only': "Watches whose value is never read: use ref.read, or drop them if the rebuild is not wanted",
+    'select': "Watchers that read only a field: select it so they rebuild only when it changes",
+    'family': "Fetch on every {root} change: key them by its value (family + keepAlive) so returning "
+              "to a previous value reuses the cached instance",
+    'cache': "Shared upstreams: caching points whose watchers should select the parts they need",
+}
+
+CALL_NAME = re.compile(r'(?<![\w$])(_?[a-z]\w*)\s*(?:<[^<>()]*>)?\s*\(')
+FUNCTIONS_INVOKE = re.compile(r'\.\s*functions\s*\.\s*invoke\s*\(')
+
+
+def provider_files(paths: Optional[List[Path]]) -> List[Path]:
+    """Dart files under the given files/directories (default: lib/providers)"""
+    expanded = []
+    for path in paths or [PROVIDERS_DIR]:
+        expanded.extend(path.rglob("*.dart") if path.is_dir() else [path])
+    return dart_files(expanded)
+
+
+def cascade_files(summaries: FileSummaries, candidates: List[Path], root: str) -> List[Path]:
+    """Candidate files declaring `root` or a provider watching it, transitively (from the cached summaries)"""
+    declared = {name: path for path in candidates for name in summaries.providers(path)}
+    watchers: Dict[str, List[str]] = {}
+    for path in candidates:
+        for name, watched in summaries.providers(path).items():
+            for target in watched:
+                watchers.setdefault(target, []).append(name)
+    seen, queue = {root}, [root]
+    while queue:
+        for watcher in watchers.get(queue.pop(), []):
+            if watcher not in seen:
+                seen.add(watcher)
+                queue.append(watcher)
+    unknown = {path for path in candidates if path not in summaries.files}
+    return sorted({declared[name] for name in seen if name in declared} | unknown)
+
+
+def referenced_files(summaries: FileSummaries, candidates: List[Path], entries: List[Path]) -> List[Path]:
+    """Candidate files declaring a provider or type the entry files name, transitively"""
+    declared_in: Dict[str, List[Path]] = {}
+    for path in candidates:
+        if path in summaries.files:
+            for name in list(summaries.providers(path)) + summaries.files[path]['types'].split():
+                declared_in.setdefault(name, []).append(path)
+    reached = {path for path in candidates if path not in summaries.files} | set(entries)
+    queue = list(entries)
+    while queue:
+        words = set(summaries.files.get(queue.pop(), {}).get('words', '').split())
+        for name in words & declared_in.keys():
+            for path in declared_in[name]:
+                if path not in reached:
+                    reached.add(path)
+                    queue.append(path)
+    return sorted(reached & set(candidates))
+
+
+# ---------------------------------------------------------------------------
+# Watch edges
+# ---------------------------------------------------------------------------
+
+class WatchEdge:
+    """`watcher` does ref.watch(target...) at `offset`"""
+
+    def __init__(self, watcher: Provider, target: str, offset: int):
+        self.watcher = watcher
+        self.target = target
+        self.offset = offset
+        source = watcher.source
+        masked = source.masked
+
+        match = REF_CALL.match(masked, offset)
+        i = match.end()
+        while i < len(masked) and masked[i].isspace():
+            i += 1
+        if i < len(masked) and masked[i] == '(':        # family argument
+            i = source.close_of(i) + 1
+        member = re.match(r'\s*\.\s*(future|notifier|select|selectAsync)\b', masked[i:i + 40])
+        self.modifier = member.group(1) if member else ''
+        self.call_end = source.close_of(masked.index('(', offset)) + 1
+
+        unwrap = re.match(r'\s*\.\s*(%s)\b' % '|'.join(UNWRAP_MEMBERS), masked[self.call_end:self.call_end + 40])
+        self.unwrapped = bool(unwrap) or self.modifier == 'future'
+        value_end = self.call_end + (unwrap.end() if unwrap else 0)
+
+        start = statement_start(source, offset)
+        prefix = masked[start:offset]
+        binding = re.search(r'\b(?:final|var|late)\s+(?:[\w<>?,\s]+?\s+)?(\w+)\s*=\s*(?:await\s+)?$', prefix)
+        self.binding = binding.group(1) if binding else None
+        self.bare = (not prefix.strip() or prefix.strip() == 'await') and masked[value_end:].lstrip().startswith(';')
+        self.function = source.enclosing(offset)
+
+    @property
+    def line(self) -> int:
+        return self.watcher.source.line_of(self.offset)
+
+    @property
+    def rebuilds(self) -> bool:
+        """Whether a new value of the target rebuilds the watcher"""
+        return self.modifier != 'notifier'
+
+    def uses(self) -> Tuple[Set[str], bool, bool]:
+        """(fields read off the watched value, used as a whole, used at all)"""
+        if self.bare:
+            return set(), False, False
+        if not self.binding or not self.function:
+            return set(), True, True
+        masked = self.watcher.source.masked
+        scope = masked[self.call_end:self.function.body_end]
+        fields: Set[str] = set()
+        whole = False
+        used = False
+        for match in re.finditer(r'(?<![\w.$])%s\b' % re.escape(self.binding), scope):
+            used = True
+            rest = scope[match.end():match.end() + 80]
+            member = re.match(r'\s*[?!]?\s*\.\s*(\w+)', rest)
+            if member and not self.unwrapped and member.group(1) in UNWRAP_MEMBERS:
+                member = re.match(r'\s*[?!]?\s*\.\s*\w+\s*[?!]?\s*\.\s*(\w+)', rest)
+                if not member:
+                    continue
+            if member and re.match(r'\s*\(', rest[member.end():]):
+                whole = True                # a method call needs the whole value
+            elif member and (self.unwrapped or member.group(1) not in ASYNC_VALUE_MEMBERS):
+                fields.add(member.group(1))
+            elif member:
+                continue
+            elif re.match(r'\s*[!=]=\s*null\b', rest) or re.search(r'\bnull\s*[!=]=\s*$', scope[:match.start()]):
+                continue
+            else:
+                whole = True
+        return fields, whole, used
+
+
+class ProviderGraph:
+    """Providers and the ref.watch edges between them"""
+
+    def __init__(self, providers: Dict[str, Provider]):
+        self.providers = providers
+        self.dependents: Dict[str, List[WatchEdge]] = {}
+        for provider in providers.values():
+            for kind, target, offset in provider.edges:
+                if kind == 'watch' and target != provider.name:
+                    self.dependents.setdefault(target, []).append(WatchEdge(provider, target, offset))
+
+    def cascade(self, root: str, dropped: Set[Tuple[str, int]] = frozenset()) -> Dict[str, Tuple[int, Optional[WatchEdge]]]:
+        """Providers rebuilt when `root` is invalidated: name -> (depth, edge it was reached through)"""
+        rebuilt = {root: (0, None)}
+        queue = deque([root])
+        while queue:
+            name = queue.popleft()
+            depth = rebuilt[name][0]
+            for edge in self.dependents.get(name, []):
+                if not edge.rebuilds or (edge.watcher.name, edge.offset) in dropped:
+                    continue
+                if edge.watcher.name not in rebuilt:
+                    rebuilt[edge.watcher.name] = (depth + 1, edge)
+                    queue.append(edge.watcher.name)
+        return rebuilt
+
+
+# ---------------------------------------------------------------------------
+# Rebuild cost
+# ---------------------------------------------------------------------------
+
+class RebuildCost:
+    """The functions one rebuild of a provider runs and the queries they issue"""
+
+    def __init__(self, provider: Provider):
+        self.provider = provider
+        self.functions: List[Tuple[DartFile, Block]] = []
+        self.queries: List[QueryChain] = []
+        self.invokes = 0
+
+    @property
+    def network_calls(self) -> int:
+        return len(self.queries) + self.invokes
+
+    @property
+    def streams(self) -> List[QueryChain]:
+        return [q for q in self.queries if q.has('stream')]
+
+    @property
+    def tables(self) -> Set[str]:
+        return {q.table for q in self.queries if q.is_read and q.root == 'from' and q.table}
+
+
+class FunctionIndex:
+    """Named functions in the provider and service files, with the query chains each issues"""
+
+    def __init__(self, provider_sources: List[DartFile], service_sources: List[DartFile]):
+        self.service_paths = {s.path for s in service_sources}
+        self.by_name: Dict[str, List[Tuple[DartFile, Block]]] = {}
+        self.chains: Dict[Tuple[Path, int], List[QueryChain]] = {}
+        self.loose: Dict[Path, List[QueryChain]] = {}
+        self.all_chains: Dict[Path, List[QueryChain]] = {}
+        for source in provider_sources + service_sources:
+            self.all_chains[source.path] = find_query_chains(source)
+            for chain in self.all_chains[source.path]:
+                if chain.function:
+                    self.chains.setdefault((source.path, chain.function.body_start), []).append(chain)
+                else:
+                    self.loose.setdefault(source.path, []).append(chain)
+            for block in source.blocks:
+                if block.kind == 'function' and block.name:
+                    self.by_name.setdefault(block.name, []).append((source, block))
+
+    def queries_in(self, source: DartFile, block: Block) -> List[QueryChain]:
+        return self.chains.get((source.path, block.body_start), [])
+
+    def resolve(self, name: str, source: DartFile, owner: Optional[str]) -> Optional[Tuple[DartFile, Block]]:
+        """Function a call to `name` from `owner` in `source` lands in"""
+        if name in BUILDER_METHODS or name in CONTROL_KEYWORDS:
+            return None
+        candidates = self.by_name.get(name, [])
+        local = [c for c in candidates if c[0].path == source.path]
+        for wanted in (owner, None):
+            for candidate in local:
+                if candidate[1].owner == wanted:
+                    return candidate
+        services = [c for c in candidates if c[0].path in self.service_paths]
+        if not services:
+            return None
+        # Same-named methods in several services: take the costliest (upper bound)
+        return max(services, key=lambda c: len(self.queries_in(*c)))
+
+    def resolve_static(self, owner: str, name: str) -> Optional[Tuple[DartFile, Block]]:
+        """`Owner.name(...)`: a static method of a known class"""
+        return next((c for c in self.by_name.get(name, []) if c[1].owner == owner), None)
+
+
+def constructor_span(source: DartFile, class_block: Block) -> Optional[Tuple[int, int]]:
+    """Span of the generative constructor of a class (initializer list and body)"""
+    masked = source.masked
+    pattern = re.compile(r'(?<![\w.$])%s\s*\(' % re.escape(class_block.name))
+    for match in pattern.finditer(masked, class_block.body_start, class_block.body_end):
+        before = masked[class_block.body_start:match.start()].rstrip()
+        if before and before[-1] not in ';{}':
+            continue
+        i = source.close_of(match.end() - 1) + 1
+        while i < class_block.body_end:
+            ch = masked[i]
+            if ch in '([':
+                i = source.close_of(i) + 1
+                continue
+            if ch == '{':
+                return match.start(), source.close_of(i)
+            if ch == ';':
+                return match.start(), i
+            i += 1
+    return None
+
+
+def build_block(provider: Provider) -> Optional[Block]:
+    """Block holding the code a provider runs when it builds"""
+    source = provider.source
+    start, end = provider.spans[0]
+    if provider.notifier_class:
+        return next((b for b in source.blocks if b.kind == 'function' and b.name == 'build'
+                     and b.owner == provider.notifier_class), None)
+    kind = 'closure' if provider.kind == 'final' else 'function'
+    return next((b for b in source.blocks if b.kind == kind and start <= b.header_start
+                 and b.body_start <= end), None)
+
+
+def rebuild_cost(provider: Provider, index: FunctionIndex) -> RebuildCost:
+    """Follow a provider's build (or constructor) into the functions it calls"""
+    cost = RebuildCost(provider)
+    source = provider.source
+    classes = {b.name: b for b in source.blocks if b.kind == 'class'}
+    regions: List[Tuple[DartFile, int, int, Optional[str]]] = []
+    queue: deque = deque()
+
+    if provider.kind == 'final':
+        start, end = provider.spans[0]
+        regions.append((source, start, end, None))
+    if provider.notifier_class in classes:
+        class_block = classes[provider.notifier_class]
+        for block in source.blocks:
+            if block.kind == 'function' and block.owner == class_block.name and \
+                    block.name in ('build', class_block.name):
+                queue.append((source, block))
+        span = constructor_span(source, class_block)
+        if span:
+            regions.append((source, span[0], span[1], class_block.name))
+    elif provider.kind == 'riverpod-function':
+        block = build_block(provider)
+        if block:
+            queue.append((source, block))
+
+    def scan_calls(region_source: DartFile, start: int, end: int, owner: Optional[str]):
+        text = region_source.masked[start:end]
+        cost.invokes += len(FUNCTIONS_INVOKE.findall(text))
+        for call in CALL_NAME.finditer(text):
+            target = index.resolve(call.group(1), region_source, owner)
+            if target:
+                queue.append(target)
+
+    for region_source, start, end, owner in regions:
+        cost.queries.extend(
+            q for q in index.loose.get(region_source.path, []) if start <= q.root_offset <= end
+        )
+        scan_calls(region_source, start, end, owner)
+
+    seen: Set[Tuple[Path, int]] = set()
+    while queue:
+        block_source, block = queue.popleft()
+        key = (block_source.path, block.body_start)
+        if key in seen:
+            continue
+        seen.add(key)
+        cost.functions.append((block_source, block))
+        cost.queries.extend(index.queries_in(block_source, block))
+        scan_calls(block_source, block.body_start, block.body_end, block.owner)
+
+    return cost
+
+
+# ---------------------------------------------------------------------------
+# Invalidation cascade
+# ---------------------------------------------------------------------------
+
+class Trigger:
+    """A ref.invalidate/refresh/invalidateSelf of the cascade root"""
+
+    def __init__(self, source: DartFile, offset: int, kind: str):
+        self.source = source
+        self.offset = offset
+        self.kind = kind
+        function = source.enclosing(offset)
+        self.function = function.qualified_name if function else '<top level>'
+
+    @property
+    def line(self) -> int:
+        return self.source.line_of(self.offset)
+
+
+class Narrowing:
+    """A recommended change and the network calls per invalidation it saves"""
+
+    def __init__(self, kind: str, provider: Provider, line: int, advice: str, saved: int,
+                 edge: Optional[WatchEdge] = None):
+        self.kind = kind
+        self.edge = edge                # watch edge the change removes from the cascade
+        self.provider = provider
+        self.line = line
+        self.advice = advice
+        self.saved = saved
+
+
+class Cascade:
+    def __init__(self, graph: ProviderGraph, costs: Dict[str, RebuildCost], root: str):
+        self.graph = graph
+        self.costs = costs
+        self.root = root
+        self.rebuilt = graph.cascade(root)
+        self.total_calls = self.calls(self.rebuilt)
+        self._edge_savings: Optional[Dict[Tuple[str, int], int]] = None
+
+    def calls(self, rebuilt: Dict[str, Tuple[int, Optional[WatchEdge]]]) -> int:
+        return sum(self.costs[name].network_calls for name in rebuilt if name in self.costs)
+
+    @property
+    def resident_calls(self) -> int:
+        """Calls from providers that are rebuilt even when no screen listens (keepAlive)"""
+        return sum(self.costs[name].network_calls for name in self.rebuilt
+                   if name in self.costs and not self.graph.providers[name].auto_dispose)
+
+    def edges(self) -> List[WatchEdge]:
+        """Rebuilding watch edges inside the cascade"""
+        return [edge for name in self.rebuilt for edge in self.graph.dependents.get(name, [])
+                if edge.rebuilds and edge.watcher.name in self.rebuilt]
+
+    def saved_without(self, edges: List[WatchEdge]) -> int:
+        dropped = {(e.watcher.name, e.offset) for e in edges}
+        if len(dropped) == 1:
+            return self.edge_savings().get(next(iter(dropped)), 0)
+        return self.total_calls - self.calls(self.graph.cascade(self.root, dropped))
+
+    def edge_savings(self) -> Dict[Tuple[str, int], int]:
+        """Calls saved by dropping each single watch edge, from one dominator tree
+
+        Every edge becomes a node between its target and its watcher; dropping
+        the edge removes exactly the providers that node dominates.
+        """
+        if self._edge_savings is not None:
+            return self._edge_savings
+        successors: Dict[object, List[object]] = {self.root: []}
+        for edge in self.edges():
+            key = (edge.watcher.name, edge.offset)
+            successors.setdefault(edge.target, []).append(key)
+            successors[key] = [edge.watcher.name]
+            successors.setdefault(edge.watcher.name, [])
+
+        # Reverse postorder from the root (iterative DFS)
+        order, seen, stack = [], {self.root}, [(self.root, iter(successors[self.root]))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                order.append(node)
+                stack.pop()
+            elif child not in seen:
+                seen.add(child)
+                stack.append((child, iter(successors[child])))
+        order.reverse()
+        position = {node: i for i, node in enumerate(order)}
+        predecessors: Dict[object, List[object]] = {node: [] for node in order}
+        for node in order:
+            for child in successors[node]:
+                predecessors[child].append(node)
+
+        # Cooper, Harvey & Kennedy: iterate to the immediate dominators
+        idom = {self.root: self.root}
+        changed = True
+        while changed:
+            changed = False
+            for node in order[1:]:
+                new = None
+                for pred in predecessors[node]:
+                    if pred not in idom:
+                        continue
+                    if new is None:
+                        new = pred
+                        continue
+                    a, b = pred, new
+                    while a != b:
+                        while position[a] > position[b]:
+                            a = idom[a]
+                        while position[b] > position[a]:
+                            b = idom[b]
+                    new = a
+                if idom.get(node) != new:
+                    idom[node] = new
+                    changed = True
+
+        # Children before parents: add each subtree's calls to its dominator
+        subtree = {node: self.costs[node].network_calls if node in self.costs else 0 for node in order}
+        for node in reversed(order[1:]):
+            subtree[idom[node]] += subtree[node]
+        self._edge_savings = {node: subtree[node] for node in order if isinstance(node, tuple)}
+        return self._edge_savings
+
+    def downstream(self, name: str) -> Set[str]:
+        return set(self.graph.cascade(name)) - {name}
+
+    def narrowings(self) -> List[Narrowing]:
+        results = []
+        edges = self.edges()
+        for edge in edges:
+            fields, whole, used = edge.uses()
+            watcher = edge.watcher
+            if not used:
+                results.append(Narrowing(
+                    'rebuild-only', watcher, edge.line,
+                    f"ref.watch({edge.target}) is only there to rebuild",
+                    self.saved_without([edge]), edge,
+                ))
+            elif fields and not whole and len(fields) <= 2:
+                field = sorted(fields)[0]
+                select = 'selectAsync' if edge.modifier == 'future' else 'select'
+                value = 'v' if edge.unwrapped else 'v.valueOrNull?'
+                results.append(Narrowing(
+                    'select', watcher, edge.line,
+                    f"ref.watch({edge.target}.{select}((v) => {value}.{field}))"
+                    + (f" (also reads {', '.join(sorted(fields - {field}))})" if len(fields) > 1 else ''),
+                    self.saved_without([edge]), edge,
+                ))
+
+        # Direct watchers of the root that fetch: keyed by the root value and
+        # kept alive, switching back to a value seen this session is a cache hit
+        for edge in self.graph.dependents.get(self.root, []):
+            watcher = edge.watcher
+            cost = self.costs.get(watcher.name)
+            if not edge.rebuilds or watcher.family or not cost or not cost.network_calls:
+                continue
+            subtree = {watcher.name} | self.downstream(watcher.name)
+            results.append(Narrowing(
+                'family', watcher, edge.line,
+                '',
+                sum(self.costs[n].network_calls for n in subtree if n in self.costs),
+            ))
+
+        # Shared upstreams that several rebuilt providers watch
+        watchers: Dict[str, Set[str]] = {}
+        for edge in edges:
+            if edge.target != self.root:
+                watchers.setdefault(edge.target, set()).add(edge.watcher.name)
+        for name, dependents in watchers.items():
+            provider = self.graph.providers.get(name)
+            if len(dependents) < 2 or not provider:
+                continue
+            keep = 'make it keepAlive; ' if provider.auto_dispose else ''
+            results.append(Narrowing(
+                'cache', provider, provider.line,
+                f"{keep}{len(dependents)} rebuilt watchers: {', '.join(sorted(dependents))}",
+                0,
+            ))
+        return results
+
+    def duplicate_reads(self) -> Dict[str, List[str]]:
+        """Tables read by more than one rebuilt provider"""
+        readers: Dict[str, List[str]] = {}
+        for name in sorted(self.rebuilt):
+            cost = self.costs.get(name)
+            for table in sorted(cost.tables if cost else ()):
+                readers.setdefault(table, []).append(name)
+        return {t: names for t, names in readers.items() if len(names) > 1}
+
+
+def find_triggers(root: Optional[Provider], root_name: str, sources: List[DartFile]) -> List[Trigger]:
+    """Sites under lib/ that invalidate or refresh `root_name`"""
+    triggers = []
+    for source in sources:
+        for match in REF_CALL.finditer(source.masked):
+            kind, target = match.groups()
+            if kind == 'invalidateSelf':
+                if root and root.source.path == source.path and root.owns(match.start()):
+                    triggers.append(Trigger(source, match.start(), kind))
+            elif kind in ('invalidate', 'refresh') and target == root_name:
+                triggers.append(Trigger(source, match.start(), kind))
+    return triggers
+
+
+def provider_flags(provider: Provider) -> str:
+    flags = ['autoDispose' if provider.auto_dispose else 'keepAlive']
+    if provider.family:
+        flags.append('family: per live instance')
+    return ', '.join(flags)
+
+
+def print_cascade(cascade: Cascade, triggers: List[Trigger], narrowings: List[Narrowing]):
+    print(f"\n🎯 Triggers invalidating {cascade.root}: {len(triggers)}")
+    for trigger in triggers:
+        print(f"  {trigger.source.rel}:{trigger.line} {trigger.function} ({trigger.kind})")
+
+    print(f"\n🔁 Rebuild set: {len(cascade.rebuilt)} providers")
+    for name, (depth, edge) in sorted(cascade.rebuilt.items(), key=lambda item: (item[1][0], item[0])):
+        provider = cascade.graph.providers.get(name)
+        cost = cascade.costs.get(name)
+        if not provider or not cost:
+            print(f"  [{depth}] {name} (outside the analyzed files)")
+            continue
+        streams = f", {len(cost.streams)} realtime" if cost.streams else ''
+        invokes = f", {cost.invokes} edge function" if cost.invokes else ''
+        print(f"  [{depth}] {name} ({provider_flags(provider)}) {provider.source.rel}:{provider.line}")
+        print(f"      {len(cost.queries)} queries{streams}{invokes}"
+              + (f" — via ref.watch({edge.target}{'.' + edge.modifier if edge.modifier else ''}) "
+                 f"line {edge.line}" if edge else ''))
+        for query in cost.queries:
+            print(f"        {query.source.rel}:{query.line} {query.root}({query.target or '?'}).{query.operation}")
+
+    duplicates = cascade.duplicate_reads()
+    if duplicates:
+        print(f"\n📑 Tables re-read by more than one rebuilt provider")
+        for table, names in sorted(duplicates.items()):
+            print(f"  {table}: {', '.join(names)}")
+
+    print(f"\n💡 Narrowing and caching points")
+    if not narrowings:
+        print("  (none found)")
+    for kind, advice in NARROWING_ADVICE.items():
+        group = sorted((n for n in narrowings if n.kind == kind), key=lambda n: (-n.saved, n.provider.name))
+        if not group:
+            continue
+        print(f"\n  {advice.format(root=cascade.root)}")
+        for narrowing in group:
+            saved = f" [-{narrowing.saved} calls]" if narrowing.saved else ''
+            print(f"    {narrowing.provider.name} {narrowing.provider.source.rel}:{narrowing.line}{saved}")
+            if narrowing.advice:
+                print(f"        {narrowing.advice}")
+
+
+def run_invalidation(args, paths: Optional[List[Path]], summaries: Optional[FileSummaries] = None):
+    candidates = [p.resolve() for p in provider_files(paths)]
+    if summaries:
+        # Costs resolve calls into the provider's own file or a service only,
+        # so the files outside the cascade do not change the report
+        candidates = cascade_files(summaries, candidates, args.root)
+    provider_sources = [DartFile(p) for p in candidates]
+    service_sources = [DartFile(p) for p in provider_files([SERVICES_DIR])]
+    providers: Dict[str, Provider] = {}
+    for source in provider_sources:
+        for provider in find_providers(source):
+            providers[provider.name] = provider
+
+    if args.root not in providers:
+        print(f"❌ {args.root} is not declared in the analyzed files")
+        sys.exit(1)
+
+    index = FunctionIndex(provider_sources, service_sources)
+    graph = ProviderGraph(providers)
+    costs = {name: rebuild_cost(provider, index) for name, provider in providers.items()}
+    cascade = Cascade(graph, costs, args.root)
+    if summaries:
+        trigger_files = sorted(set(summaries.files_with('words', args.root)) | {providers[args.root].source.path})
+    else:
+        trigger_files = dart_files()
+    triggers = find_triggers(providers[args.root], args.root, [DartFile(p) for p in trigger_files])
+    narrowings = cascade.narrowings()
+    print_cascade(cascade, triggers, narrowings)
+
+    rebuilt = [graph.providers[n] for n in cascade.rebuilt if n in graph.providers]
+    streams = sum(len(costs[n].streams) for n in cascade.rebuilt if n in costs)
+    cut = [n.edge for n in narrowings if n.edge]
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"  Triggers: {len(triggers)}")
+    print(f"  Providers rebuilt: {len(rebuilt)} "
+          f"({sum(1 for p in rebuilt if not p.auto_dispose)} keepAlive, "
+          f"{sum(1 for p in rebuilt if p.family)} family)")
+    print(f"  Network calls per invalidation: {cascade.total_calls} with every provider listened, "
+          f"{cascade.resident_calls} from keepAlive providers alone")
+    print(f"  Realtime resubscriptions: {streams}")
+    narrowed = graph.cascade(args.root, {(e.watcher.name, e.offset) for e in cut})
+    keyed: Set[str] = set()
+    for narrowing in narrowings:
+        if narrowing.kind == 'family':
+            keyed |= {narrowing.provider.name} | cascade.downstream(narrowing.provider.name)
+    print(f"  Cut by select/read narrowing: {len(cascade.rebuilt) - len(narrowed)} rebuilds, "
+          f"{cascade.saved_without(cut)} calls ({len(cut)} watch edges)")
+    print(f"  Cacheable by keyed families: "
+          f"{sum(costs[n].network_calls for n in keyed if n in costs)} calls on switching back")
+    print("\n   Counts are static call sites reached from each build(); autoDispose")
+    print("   providers only rebuild while something listens to them")
+
+
+# ---------------------------------------------------------------------------
+# Startup critical path
+# ---------------------------------------------------------------------------
+
+# Awaited SDK calls that cost a network round trip; other awaits that resolve
+# to nothing under lib/ count as local work
+SDK_ROUND_TRIPS = {'getToken': 1, 'checkForUpdates': 1, 'invoke': 1, 'refreshSession': 1, 'getUser': 1}
+# Awaited SDK calls that wait on the user
+SDK_PROMPTS = {'requestPermission'}
+
+AWAIT = re.compile(r'\bawait\b')
+RECEIVER_CALL = re.compile(r'\s*((?:[\w$]+\s*(?:\(\s*\))?\s*\.\s*)*)(_?[a-zA-Z]\w*)\s*(?:<[^<>()]*>)?\s*\(')
+DURATION = re.compile(r'Duration\s*\(\s*(milliseconds|seconds)\s*:\s*(\d+)\s*\)')
+DECLARATION = re.compile(r'\b(?:final|var|late)\s+(?:[\w<>?,\s]+?\s+)?(\w+)\s*=(?!=)')
+
+
+class AwaitStep:
+    """One awaited expression on the startup path"""
+
+    def __init__(self, kind: str, label: str, source: DartFile, offset: int):
+        self.kind = kind            # query | sdk | prompt | local | call | provider | parallel | delay | pad
+        self.label = label
+        self.source = source
+        self.offset = offset
+        self.end = offset
+        self.statement = offset
+        self.binding: Optional[str] = None
+        self.branch: Optional[str] = None   # 'if' | 'loop' when only some paths run it
+        self.owner_class: Optional[str] = None
+        self.provider: Optional[str] = None
+        self.round_trips = 0
+        self.ms = 0
+        self.children: List['AwaitStep'] = []
+
+    @property
+    def line(self) -> int:
+        return self.source.line_of(self.offset)
+
+    @property
+    def conditional(self) -> bool:
+        return self.branch is not None
+
+    def subtree_round_trips(self, seen: Optional[Set[int]] = None) -> int:
+        seen = seen if seen is not None else set()
+        if id(self) in seen:
+            return 0
+        seen.add(id(self))
+        return self.round_trips + sum(c.subtree_round_trips(seen) for c in self.children)
+
+    def relevant(self) -> bool:
+        """Worth printing: reaches the network, waits, or prompts"""
+        return self.kind in ('delay', 'pad', 'prompt', 'provider') or self.subtree_round_trips() > 0
+
+
+def enclosing_open_brace(masked: str, outer: int, offset: int) -> int:
+    depth = 0
+    for i in range(offset - 1, outer, -1):
+        if masked[i] == '}':
+            depth += 1
+        elif masked[i] == '{':
+            if depth == 0:
+                return i
+            depth -= 1
+    return outer
+
+
+def branch_of(source: DartFile, block: Block, offset: int) -> Optional[str]:
+    """'catch', 'loop' or 'if' when `offset` only runs on some paths through `block`"""
+    masked = source.masked
+    kinds = set()
+    brace = enclosing_open_brace(masked, block.body_start, offset)
+    while brace > block.body_start:
+        head = masked[:brace].rstrip()
+        if head.endswith(')'):
+            before = masked[:source.open_of(len(head) - 1)].rstrip()
+            word = re.search(r'\w*$', before).group(0)
+        elif re.search(r'\bon\s+\w+$', head):
+            word = 'catch'
+        else:
+            word = re.search(r'\w*$', head).group(0)
+        if word == 'catch':
+            return 'catch'
+        if word in ('for', 'while', 'do'):
+            kinds.add('loop')
+        elif word in ('if', 'else', 'switch'):
+            kinds.add('if')
+        brace = enclosing_open_brace(masked, block.body_start, brace)
+    return 'loop' if 'loop' in kinds else ('if' if kinds else None)
+
+
+def body_of(source: DartFile, offset: int) -> Optional[Block]:
+    """Innermost function or closure whose body runs `offset` (try/else blocks are not closures)"""
+    best = None
+    for block in source.blocks:
+        if block.kind not in ('function', 'closure') or not block.contains(offset):
+            continue
+        header = source.masked[block.header_start:block.body_start].strip()
+        if block.kind == 'closure' and re.fullmatch(r'(?:\}\s*)?(?:try|else|finally|do|on\s+\w+)', header):
+            continue
+        if best is None or block.body_start >= best.body_start:
+            best = block
+    return best
+
+
+class StartupGraph:
+    """Await steps of the functions and providers reached from startup"""
+
+    def __init__(self, index: FunctionIndex, providers: Dict[str, Provider]):
+        self.index = index
+        self.providers = providers
+        self.bodies: Dict[Tuple[Path, int], List[AwaitStep]] = {}
+        self.blocks: Dict[Tuple[Path, int], Tuple[DartFile, Block]] = {}
+        self.provider_steps: Dict[str, List[AwaitStep]] = {}
+        self._active: Set[Tuple[Path, int]] = set()
+
+    def sequence(self, source: DartFile, block: Block, end: Optional[int] = None) -> List[AwaitStep]:
+        """Awaits of one function body, in order (up to `end`)"""
+        key = (source.path, block.body_start)
+        if key in self.bodies and end is None:
+            return self.bodies[key]
+        if key in self._active:
+            return []
+        self._active.add(key)
+        masked = source.masked
+        steps = []
+        for match in AWAIT.finditer(masked, block.body_start, end if end is not None else block.body_end):
+            offset = match.start()
+            inner = body_of(source, offset)
+            if not inner or inner.body_start != block.body_start:
+                continue
+            branch = branch_of(source, block, offset)
+            if branch == 'catch':
+                continue
+            step = self.classify(source, block, match.end(), expression_end(source, match.end()))
+            step.branch = branch
+            step.statement = statement_start(source, offset)
+            binding = re.search(r'\b(?:final|var|late)\s+(?:[\w<>?,\s]+?\s+)?(\w+)\s*=\s*$',
+                                masked[step.statement:offset])
+            step.binding = binding.group(1) if binding else None
+            steps.append(step)
+        self._active.discard(key)
+        self.blocks[key] = (source, block)
+        if end is None:
+            self.bodies[key] = steps
+        return steps
+
+    def provider_sequence(self, name: str) -> List[AwaitStep]:
+        if name not in self.provider_steps:
+            self.provider_steps[name] = []
+            provider = self.providers.get(name)
+            block = build_block(provider) if provider else None
+            if block:
+                self.provider_steps[name] = self.sequence(provider.source, block)
+        return self.provider_steps[name]
+
+    def classify(self, source: DartFile, block: Block, start: int, end: int) -> AwaitStep:
+        masked = source.masked
+        text = masked[start:end]
+        offset = start + len(text) - len(text.lstrip())
+
+        if re.match(r'\s*Future\s*\.\s*wait\b', text):
+            step = AwaitStep('parallel', 'Future.wait', source, offset)
+            open_index = masked.find('[', start, end)
+            if open_index < 0:
+                open_index = masked.find('(', start, end)
+            close_index = source.close_of(open_index)
+            cursor = open_index + 1
+            for part in split_commas(masked[open_index + 1:close_index], '()[]{}'):
+                if part.strip():
+                    step.children.append(self.classify(source, block, cursor, cursor + len(part)))
+                cursor += len(part) + 1
+            step.end = end
+            return step
+
+        if re.match(r'\s*Future\s*(?:<[^<>]*>)?\s*\.\s*delayed\b', text):
+            duration = DURATION.search(source.text, start, end)
+            if duration:
+                step = AwaitStep('delay', f"Future.delayed {source.text[duration.start():duration.end()]}",
+                                 source, offset)
+                step.ms = int(duration.group(2)) * (1000 if duration.group(1) == 'seconds' else 1)
+            else:
+                # Padding up to a minimum declared in the function
+                minimum = re.search(r'(\w+)\s*=\s*' + DURATION.pattern,
+                                    source.text[block.body_start:block.body_end])
+                step = AwaitStep('pad', 'Future.delayed (pad to minimum)', source, offset)
+                if minimum:
+                    step.ms = int(minimum.group(3)) * (1000 if minimum.group(2) == 'seconds' else 1)
+                    step.label = f"Future.delayed (pad to {minimum.group(1)} = {step.ms} ms)"
+            step.end = end
+            return step
+
+        ref = REF_CALL.search(masked, start, end)
+        if ref and ref.group(2):
+            name = ref.group(2)
+            step = AwaitStep('provider', f"ref.{ref.group(1)}({name})", source, offset)
+            step.provider = name
+            step.children = self.provider_sequence(name)
+            step.end = end
+            return step
+
+        chains = [c for c in self.index.all_chains.get(source.path, []) if start <= c.root_offset < end]
+        head = re.match(r'\s*(\w+)\s*(?:\.|;|$)', text)
+        if not chains and head:
+            # `var query = client.from(...)...; await query.maybeSingle()`
+            chains = [c for c in self.index.all_chains.get(source.path, [])
+                      if c.variable == head.group(1) and c.function and c.function.body_start == block.body_start
+                      and c.root_offset < start][-1:]
+        if chains:
+            chain = chains[0]
+            step = AwaitStep('query', f"{chain.root}({chain.target or '?'}).{chain.operation}", source, offset)
+            step.round_trips = len(chains)
+            step.end = end
+            return step
+
+        call = RECEIVER_CALL.match(masked, start, end)
+        if not call:
+            step = AwaitStep('local', ' '.join(source.text[start:end].split())[:60], source, offset)
+            step.end = end
+            return step
+        receiver = call.group(1).replace(' ', '').rstrip('.')
+        name = call.group(2)
+        segments = [re.sub(r'\(\)$', '', s) for s in receiver.split('.')] if receiver else []
+        label = f"{receiver}.{name}()" if receiver else f"{name}()"
+        target = None
+        if len(segments) == 1 and segments[0][:1].isupper():
+            target = self.index.resolve_static(segments[0], name)
+        elif not segments or not segments[0][:1].isupper():
+            target = self.index.resolve(name, source, block.owner)
+
+        if target:
+            step = AwaitStep('call', label, source, offset)
+            step.owner_class = segments[0] if len(segments) == 1 and segments[0][:1].isupper() else None
+            step.children = self.sequence(*target)
+        elif name in SDK_PROMPTS:
+            step = AwaitStep('prompt', label, source, offset)
+        elif name in SDK_ROUND_TRIPS:
+            step = AwaitStep('sdk', label, source, offset)
+            step.round_trips = SDK_ROUND_TRIPS[name]
+        else:
+            step = AwaitStep('local', label, source, offset)
+        step.end = end
+        return step
+
+
+Time = Tuple[float, int]    # (ms, round trips) since the entry point started
+
+
+class Timeline:
+    """Finish times of the await steps; `worst` also runs the conditional ones"""
+
+    def __init__(self, rtt_ms: float, worst: bool):
+        self.rtt_ms = rtt_ms
+        self.worst = worst
+        self.providers: Dict[str, Time] = {}
+        self.spans: Dict[int, List[Tuple[Time, Time]]] = {}   # one per execution, in order
+
+    def run(self, steps: List[AwaitStep], t: Time) -> Time:
+        start = t
+        for step in steps:
+            # Padding is a no-op when the path is already slower, so it always runs
+            if step.conditional and not self.worst and step.kind != 'pad':
+                continue
+            t = self.step(step, t, start)
+        return t
+
+    def step(self, step: AwaitStep, t: Time, function_start: Time) -> Time:
+        begin = t
+        if step.kind in ('query', 'sdk'):
+            t = (t[0] + self.rtt_ms * step.round_trips, t[1] + step.round_trips)
+        elif step.kind == 'delay':
+            t = (t[0] + step.ms, t[1])
+        elif step.kind == 'pad':
+            t = (max(t[0], function_start[0] + step.ms), t[1])
+        elif step.kind == 'call':
+            t = self.run(step.children, t)
+        elif step.kind == 'provider':
+            if step.provider in self.providers:
+                done = self.providers[step.provider]
+                t = done if done[0] > t[0] else t
+            else:
+                self.providers[step.provider] = t
+                t = self.run(step.children, t)
+                self.providers[step.provider] = t
+        elif step.kind == 'parallel':
+            ends = [self.step(child, t, function_start) for child in step.children]
+            t = max(ends, default=t)
+        self.spans.setdefault(id(step), []).append((begin, t))
+        return t
+
+    def duration(self, step: AwaitStep) -> Time:
+        spans = self.spans.get(id(step))
+        if not spans:
+            return (0, 0)
+        begin, end = spans[0]
+        return (end[0] - begin[0], end[1] - begin[1])
+
+
+class Parallelizable:
+    """Consecutive awaits in one function that do not use each other's results"""
+
+    def __init__(self, source: DartFile, block: Block, steps: List[AwaitStep], saved: int):
+        self.source = source
+        self.block = block
+        self.steps = steps
+        self.saved = saved
+
+
+class Deferrable:
+    def __init__(self, step: AwaitStep, reason: str, round_trips: int):
+        self.step = step
+        self.reason = reason
+        self.round_trips = round_trips
+
+
+def word_used(name: str, text: str) -> bool:
+    return re.search(r'(?<![\w.$])%s\b' % re.escape(name), text) is not None
+
+
+def parallelizable_runs(graph: StartupGraph, timeline: Timeline) -> List[Parallelizable]:
+    """Runs of independent, network-bound sequential awaits"""
+    runs = []
+    for key, steps in graph.bodies.items():
+        source, block = graph.blocks[key]
+        masked = source.masked
+        run: List[AwaitStep] = []
+        tainted: Set[str] = set()
+
+        def close():
+            if len(run) > 1:
+                costs = [timeline.duration(s)[1] for s in run]
+                runs.append(Parallelizable(source, block, list(run), sum(costs) - max(costs)))
+
+        previous_end = block.body_start
+        for step in steps:
+            if id(step) not in timeline.spans:
+                continue
+            # Locals declared since the last await that derive from the run's results
+            for declaration in DECLARATION.finditer(masked, previous_end, step.statement):
+                rhs_end = masked.find(';', declaration.end())
+                if any(word_used(n, masked[declaration.end():rhs_end]) for n in tainted):
+                    tainted.add(declaration.group(1))
+            previous_end = step.end
+            statement = masked[step.statement:step.end]
+            costly = timeline.duration(step)[1] > 0
+            depends = any(word_used(n, statement) for n in tainted)
+            if step.conditional or not costly or depends:
+                close()
+                run, tainted = ([step], {step.binding} if step.binding else set()) \
+                    if costly and not step.conditional else ([], set())
+                continue
+            run.append(step)
+            if step.binding:
+                tainted.add(step.binding)
+        close()
+    return sorted(runs, key=lambda r: -r.saved)
+
+
+def deferrable_steps(graph: StartupGraph, timeline: Timeline,
+                     entries: List[Tuple[DartFile, Block, List[AwaitStep]]]) -> List[Deferrable]:
+    """Awaits in the entry functions that nothing before first paint depends on"""
+    results = []
+    for source, block, steps in entries:
+        masked = source.masked
+        for step in steps:
+            rts = timeline.duration(step)[1]
+            if step.kind not in ('call', 'sdk', 'prompt') or (rts == 0 and step.kind != 'prompt'):
+                continue
+            if step.binding:
+                uses = masked[step.end:block.body_end]
+                # Result only feeds a log line
+                lines = [line for line in uses.splitlines() if word_used(step.binding, line)]
+                if lines and all(re.search(r'\bif\s*\(\s*!?\s*%s\s*\)' % re.escape(step.binding), line)
+                                 for line in lines):
+                    results.append(Deferrable(step, f"result `{step.binding}` only decides a log line", rts))
+                continue
+            if step.kind == 'prompt':
+                results.append(Deferrable(step, "waits on a permission prompt before the first frame", rts))
+                continue
+            if step.kind == 'sdk':
+                results.append(Deferrable(step, "its result is never read", rts))
+                continue
+            if not step.owner_class:
+                continue
+            referenced = any(
+                word_used(step.owner_class, s.masked[b.body_start:b.body_end])
+                for s, b in graph.blocks.values()
+                if b.owner != step.owner_class and b.body_start != block.body_start
+            )
+            if not referenced:
+                results.append(Deferrable(
+                    step, f"nothing else on the startup path references {step.owner_class}", rts,
+                ))
+    return results
+
+
+def print_steps(steps: List[AwaitStep], timeline: Timeline, depth: int, printed: Set[str],
+                consumed: Dict[int, int]):
+    """Await tree in execution order; a function awaited twice is printed per call"""
+    icons = {'query': '🌐', 'sdk': '🌐', 'prompt': '🙋', 'call': '↳', 'provider': '🔌',
+             'parallel': '⇉', 'delay': '⏱️ ', 'pad': '⏱️ ', 'local': '·'}
+    for step in steps:
+        spans = timeline.spans.get(id(step), [])
+        if consumed.get(id(step), 0) >= len(spans) or not step.relevant():
+            continue
+        span = spans[consumed.get(id(step), 0)]
+        consumed[id(step)] = consumed.get(id(step), 0) + 1
+        branch = f" ({step.branch})" if step.branch else ''
+        timing = f"[{span[0][1]}→{span[1][1]} RT]"
+        if step.kind in ('delay', 'pad'):
+            timing = f"[+{span[1][0] - span[0][0]:.0f} ms]"
+        shared = step.kind == 'provider' and step.provider in printed
+        print(f"{'  ' * depth}{timing} {icons[step.kind]} {step.label} "
+              f"{step.source.rel}:{step.line}{branch}{' (already started)' if shared else ''}")
+        if step.kind == 'provider':
+            if shared:
+                continue
+            printed.add(step.provider)
+        print_steps(step.children, timeline, depth + 1, printed, consumed)
+
+
+def run_startup(args, paths: Optional[List[Path]], summaries: Optional[FileSummaries] = None):
+    candidates = [p.resolve() for p in provider_files(paths)]
+    support_files = provider_files([SERVICES_DIR, CONFIG_DIR])
+    if summaries:
+        # Only providers and classes named from main(), the services, the
+        # config or the startup provider's file (transitively) can be awaited
+        startup = [p for p in candidates if STARTUP_PROVIDER in summaries.providers(p)]
+        entries = [MAIN_FILE.resolve()] + [p.resolve() for p in support_files] + startup
+        candidates = referenced_files(summaries, candidates, entries)
+    provider_sources = [DartFile(p) for p in candidates]
+    support_sources = [DartFile(p) for p in support_files]
+    main_source = DartFile(MAIN_FILE)
+    providers: Dict[str, Provider] = {}
+    for source in provider_sources:
+        for provider in find_providers(source):
+            providers[provider.name] = provider
+
+    index = FunctionIndex(provider_sources + [main_source], support_sources)
+    graph = StartupGraph(index, providers)
+
+    main_block = next((b for b in main_source.blocks if b.kind == 'function' and b.name == 'main'), None)
+    run_app = main_source.masked.find('runApp(', main_block.body_start) if main_block else -1
+    main_steps = graph.sequence(main_source, main_block, run_app if run_app > 0 else None) if main_block else []
+    startup = providers.get(STARTUP_PROVIDER)
+    startup_block = build_block(startup) if startup else None
+    startup_steps = graph.provider_sequence(STARTUP_PROVIDER)
+
+    timelines = {}
+    for worst in (False, True):
+        timeline = Timeline(args.rtt_ms, worst)
+        before_run_app = timeline.run(main_steps, (0.0, 0))
+        splash = AwaitStep('provider', f"ref.watch({STARTUP_PROVIDER})", startup.source, startup.offset) \
+            if startup else None
+        if splash:
+            splash.provider = STARTUP_PROVIDER
+            splash.children = startup_steps
+            first_paint = timeline.step(splash, before_run_app, before_run_app)
+        else:
+            first_paint = before_run_app
+        timelines[worst] = (timeline, before_run_app, first_paint)
+    timeline, before_run_app, first_paint = timelines[True]
+    best_run_app, best_paint = timelines[False][1], timelines[False][2]
+
+    print(f"\n🧭 Await graph (worst case, RTT {args.rtt_ms:.0f} ms)")
+    print(f"  main() {main_source.rel}:{main_source.line_of(main_block.header_start)} — up to runApp")
+    printed: Set[str] = set()
+    consumed: Dict[int, int] = {}
+    print_steps(main_steps, timeline, 2, printed, consumed)
+    if startup:
+        print(f"  {STARTUP_PROVIDER} {startup.source.rel}:{startup.line} — splash until it completes")
+        print_steps(startup_steps, timeline, 2, printed, consumed)
+
+    runs = parallelizable_runs(graph, timeline)
+    print(f"\n⇉ Sequential awaits that could run in parallel: {len(runs)}")
+    for run in runs:
+        print(f"  {run.block.qualified_name} {run.source.rel} [-{run.saved} RT]")
+        for step in run.steps:
+            print(f"    line {step.line}: {step.label} ({timeline.duration(step)[1]} RT)")
+        print(f"    → Future.wait([...]) over these {len(run.steps)} awaits")
+
+    entries = [(main_source, main_block, main_steps)] if main_block else []
+    if startup and startup_block:
+        entries.append((startup.source, startup_block, startup_steps))
+    deferrable = deferrable_steps(graph, timeline, entries)
+    print(f"\n⏭️  Deferrable until after first paint: {len(deferrable)}")
+    for item in deferrable:
+        print(f"  {item.step.source.rel}:{item.step.line} {item.step.label} [{item.round_trips} RT]")
+        print(f"    {item.reason}")
+
+    pads = [s for s in startup_steps + main_steps if s.kind == 'pad' and id(s) in timeline.spans]
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"  Before runApp: {best_run_app[1]}–{before_run_app[1]} round trips "
+          f"(~{best_run_app[0]:.0f}–{before_run_app[0]:.0f} ms)")
+    print(f"  To first paint: {best_paint[1]}–{first_paint[1]} round trips "
+          f"(~{best_paint[0]:.0f}–{first_paint[0]:.0f} ms at {args.rtt_ms:.0f} ms RTT)")
+    for pad in pads:
+        padded = sorted({round(timelines[worst][0].duration(pad)[0]) for worst in (False, True)})
+        print(f"  Splash padding: {pad.label} adds {'–'.join(map(str, padded))} ms "
+              f"on top of the network path")
+    print(f"  Parallelizable: {len(runs)} runs, up to {sum(r.saved for r in runs)} round trips saved")
+    print(f"  Deferrable: {len(deferrable)} awaits, {sum(d.round_trips for d in deferrable)} round trips "
+          f"off the pre-paint path")
+    print("\n   Ranges run from unconditional awaits only to every branch taken;")
+    print("   SDK calls that do not resolve under lib/ count as local work")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Riverpod Provider Analyzer')
+    parser.add_argument('--invalidation', action='store_true',
+                        help='Report the rebuild cascade and queries of an invalidated provider')
+    parser.add_argument('--startup', action='store_true',
+                        help='Estimate the startup critical path in network round trips')
+    parser.add_argument('--root', default=DEFAULT_ROOT,
+                        help=f'Provider whose invalidation to follow (default: {DEFAULT_ROOT})')
+    parser.add_argument('--rtt-ms', type=float, default=DEFAULT_RTT_MS,
+                        help=f'Round-trip time for --startup estimates (default: {DEFAULT_RTT_MS})')
+    parser.add_argument('--since', metavar='REF',
+                        help='Skip reports whose inputs did not change since a git ref')
+    parser.add_argument('paths', nargs='*', type=Path, help='Dart files/directories (default: lib/providers)')
+
+    args = parser.parse_args()
+
+    if not any([args.invalidation, args.startup]):
+        parser.print_help()
+        print("\n⚠️  Please specify --invalidation or --startup")
+        sys.exit(1)
+
+    print("🚀 Riverpod Provider Analyzer")
+    print("="*60)
+
+    paths = [p.resolve() for p in args.paths] if args.paths else None
+
+    summaries = None
+    if args.since:
+        scope = ChangeScope(args.since, dependents=False)
+        print(f"🔎 {scope.describe()}")
+        inputs = (paths or [PROVIDERS_DIR]) + [SERVICES_DIR]
+        if args.invalidation and not scope.changed_files(inputs):
+            print("✅ No provider or service changes, skipping --invalidation")
+            args.invalidation = False
+        if args.startup and not scope.changed_files(inputs + [CONFIG_DIR, MAIN_FILE]):
+            print("✅ No provider, service, config or main.dart changes, skipping --startup")
+            args.startup = False
+        summaries = scope.summaries
+
+    if args.invalidation:
+        run_invalidation(args, paths, summaries)
+    if args.startup:
+        run_startup(args, paths, summaries)
+
+
+if __name__ == '__main__':
+    main()
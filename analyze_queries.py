@@ -0,0 +1,3113 @@
+#!/usr/bin/env python3
+"""
+Supabase Query Analyzer
+=======================
+Static analysis of the Supabase queries issued from lib/.
+
+--aggregations finds providers that download row sets and fold, sum or
+group them in Dart, and generates one SQL RPC per provider that returns
+only the aggregates (plus an incrementally refreshed daily rollup on
+statistiche_giornaliere for the per-day order figures).
+
+--prune-selects follows the rows of every bare/star `.select()` into the
+Freezed models and fromJson helpers that decode them and replaces the
+select with the columns actually read.
+
+--unbounded flags reads on tenant tables that have neither a row bound nor
+a time filter, ranks them by the payload they reach as the tables grow and
+prints a keyset-paginated (sort column, id) rewrite for each.
+
+--streams lists every realtime .stream() subscription (one per branch that
+opens it) with its filters and callers, flags missing organization_id
+filters, high-churn tables and per-event snapshot re-selects, and estimates
+messages per second per client from a synthetic order rate.
+
+--edge-functions catalogues the awaited round trips of every edge function
+under supabase/functions/ (helpers inlined), schedules the independent ones
+into Promise.all waves, flags write sequences that run without a
+transaction and counts round trips per path: sequential, batched, and with
+each run of database calls merged into one RPC. bench_queries.py replays
+the same catalogue against local Postgres.
+
+--since REF limits every mode to the change scope of a PR (see
+change_scope.py): the Dart files changed since REF plus callers of changed
+DatabaseService methods, users of changed providers and files querying
+tables a changed migration touches, and the edge functions changed since
+REF. A mode with nothing in scope is skipped. --streams then parses only
+the scoped files calling .stream() and looks for their callers in the files
+the cached summaries say name them.
+
+Usage:
+    python analyze_queries.py --aggregations               # Report + generated SQL
+    python analyze_queries.py --aggregations --apply       # Write the SQL migration
+    python analyze_queries.py --prune-selects              # Report column savings
+    python analyze_queries.py --prune-selects --apply      # Rewrite the selects
+    python analyze_queries.py --unbounded                  # Rank unbounded reads
+    python analyze_queries.py --unbounded --apply          # Write keyset indexes
+    python analyze_queries.py --streams                    # Realtime fan-out report
+    python analyze_queries.py --edge-functions             # Edge function round trips
+    python analyze_queries.py --edge-functions --function place-order
+    python analyze_queries.py --streams --unbounded --since origin/main
+"""
+
+import re
+import sys
+import argparse
+import itertools
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from change_scope import ChangeScope, FileSummaries
+from dart_index import (
+    Block, Call, DartFile, QueryChain, Provider, FreezedModel, dart_files, find_query_chains, chain_calls,
+    find_providers, provider_for, index_models, table_constants, expression_end,
+    snake_case, split_commas, first_string, statement_start, FILTER_METHODS, ROW_BOUND_METHODS,
+    TIME_FILTER_METHODS,
+)
+from edge_index import (
+    HANDLER_NAME, Branch, RoundTrip, TsFile, assignments, branches_at, edge_function_files, find_round_trips,
+    guards, identifiers, params_of,
+)
+from saas_schema import SchemaModel, Table, load_schema, migration_header, migration_target
+from source_edits import SourceEdits
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent
+LIB_DIR = PROJECT_ROOT / "lib"
+
+# Tables that need org filtering
+ORG_TABLES = {
+    'menu_items', 'categorie_menu', 'ingredients', 'sizes_master',
+    'ingredient_size_prices', 'menu_item_sizes', 'menu_item_included_ingredients',
+    'menu_item_extra_ingredients', 'ordini', 'ordini_items', 'notifiche',
+    'cashier_customers', 'daily_order_counters', 'allowed_cities', 'delivery_zones',
+    'business_rules', 'delivery_configuration', 'order_management',
+    'kitchen_management', 'display_branding', 'dashboard_security',
+    'promotional_banners', 'ingredient_consumption_rules', 'inventory_logs',
+    'payment_transactions', 'statistiche_giornaliere', 'order_reminders'
+}
+
+DEFAULT_TIMEZONE = 'Europe/Rome'
+
+COMPARISON_OPERATORS = {
+    'eq': '=', 'neq': '<>', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<=',
+    'like': 'LIKE', 'ilike': 'ILIKE',
+}
+
+DART_COMPARISONS = ('==', '!=', '>=', '<=', '>', '<')
+
+DART_CONVERSIONS = {'toUtc', 'toLocal', 'toIso8601String', 'toString', 'dbValue', 'name', 'value'}
+
+
+# ---------------------------------------------------------------------------
+# Dart expression -> SQL
+# ---------------------------------------------------------------------------
+
+class Binding:
+    """What a Dart variable stands for: a row of a table, or a JSON value"""
+
+    def __init__(self, alias: str, table: Optional[str] = None, json_sql: Optional[str] = None):
+        self.alias = alias
+        self.table = table
+        self.json_sql = json_sql
+
+
+class SqlContext:
+    def __init__(self, schema: SchemaModel, models: Dict[str, FreezedModel], scope_text: str,
+                 scope_start: int = 0):
+        self.schema = schema
+        self.models = models
+        self.scope_text = scope_text
+        self.scope_start = scope_start      # file offset of scope_text
+        self.bindings: Dict[str, Binding] = {}
+        self.position = 0                   # offset in scope_text being translated
+        self._all_definitions: Optional[Dict[str, List[Tuple[int, str]]]] = None
+
+    def at(self, offset: int) -> 'SqlContext':
+        """Translate as of file offset `offset`"""
+        self.position = offset - self.scope_start
+        return self
+
+    @property
+    def definitions(self) -> Dict[str, str]:
+        """Local `final x = expr;` definitions visible at `position` (the closest one before it)"""
+        if self._all_definitions is None:
+            found: Dict[str, List[Tuple[int, str]]] = {}
+            pattern = re.compile(r'\b(?:final|var|const|late)\s+(?:[\w<>?,\s]+?\s+)?(\w+)\s*=(?!=)\s*')
+            for match in pattern.finditer(self.scope_text):
+                end = self.scope_text.find(';', match.end())
+                found.setdefault(match.group(1), []).append(
+                    (match.start(), self.scope_text[match.end():end].strip())
+                )
+            self._all_definitions = found
+        definitions = {}
+        for name, candidates in self._all_definitions.items():
+            before = [expr for offset, expr in candidates if offset < self.position]
+            definitions[name] = before[-1] if before else candidates[0][1]
+        return definitions
+
+    def column_for_field(self, table: str, field: str) -> Optional[str]:
+        """Model field name -> column of `table`"""
+        schema_table = self.schema.table(table)
+        if not schema_table:
+            return None
+        columns = schema_table.columns.keys()
+        model = model_for_table(self.models, schema_table)
+        if model and field in model.fields:
+            return model.column_for(model.fields[field], columns)
+        for candidate in (snake_case(field), field):
+            if candidate in columns:
+                return candidate
+        return None
+
+
+def model_for_table(models: Dict[str, FreezedModel], table: Table) -> Optional[FreezedModel]:
+    """Freezed model whose columns overlap the table most"""
+    best = None
+    best_score = 0.0
+    columns = set(table.columns)
+    for model in models.values():
+        mapped = set(model.columns(columns).values())
+        overlap = len(mapped & columns)
+        if not mapped:
+            continue
+        score = overlap / len(mapped) + overlap / len(columns)
+        if overlap >= 3 and score > best_score:
+            best = model
+            best_score = score
+    return best
+
+
+def table_for_model(models: Dict[str, FreezedModel], schema: SchemaModel, model_name: str) -> Optional[str]:
+    for table in schema.tables.values():
+        model = model_for_table(models, table)
+        if model and model.name == model_name:
+            return table.name
+    return None
+
+
+def strip_dart_noise(expr: str) -> str:
+    """Remove casts, null assertions and numeric conversions"""
+    expr = ' '.join(expr.split())
+    expr = re.sub(r',\s*(?=[)\]])', '', expr)          # trailing commas in argument lists
+    expr = re.sub(r'\s+as\s+[\w<>?, ]+?(?=\s*(?:\?\?|\)|$|\?\.|\.))', '', expr)
+    expr = re.sub(r'\??\.(?:toDouble|toInt|toString|toLocal|toUtc)\(\)', '', expr)
+    expr = re.sub(r'(?<=[\w\])])!(?!=)', '', expr)
+    expr = expr.strip()
+    while expr.startswith('(') and expr.endswith(')') and len(split_top(expr[1:-1], ' ')) >= 1 \
+            and balanced(expr[1:-1]):
+        expr = expr[1:-1].strip()
+    return expr
+
+
+def balanced(expr: str) -> bool:
+    depth = 0
+    for ch in expr:
+        if ch in '([{':
+            depth += 1
+        elif ch in ')]}':
+            depth -= 1
+            if depth < 0:
+                return False
+    return depth == 0
+
+
+def split_top(expr: str, separator: str) -> List[str]:
+    """Split on a multi-char operator outside brackets and quotes"""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    i = 0
+    while i < len(expr):
+        ch = expr[i]
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+        elif ch in '([{':
+            depth += 1
+        elif ch in ')]}':
+            depth -= 1
+        elif depth == 0 and expr.startswith(separator, i):
+            parts.append(expr[start:i].strip())
+            i += len(separator)
+            start = i
+            continue
+        i += 1
+    parts.append(expr[start:].strip())
+    return parts
+
+
+def enum_literal(expr: str) -> Optional[str]:
+    """OrderStatus.cancelled / OrderType.dineIn.name -> SQL string literal"""
+    match = re.match(r'^(?:Order\w*|PaymentMethod|UserRole)\.(\w+)(?:\.(?:name|dbValue))?$', expr)
+    if match:
+        return f"'{snake_case(match.group(1))}'"
+    return None
+
+
+def is_local_time(expr: str, ctx: 'SqlContext', depth: int = 0) -> bool:
+    """DateTime converted with toLocal(); a parsed timestamptz is UTC in Dart otherwise"""
+    expr = ' '.join(expr.split())
+    if '.toLocal()' in expr:
+        return True
+    name = strip_dart_noise(expr)
+    if depth < 6 and re.match(r'^\w+$', name) and name in ctx.definitions:
+        return is_local_time(ctx.definitions[name], ctx, depth + 1)
+    return False
+
+
+def as_timestamptz(sql: str) -> str:
+    if sql.endswith('::timestamptz') or re.match(r'^\w+\.\w+$', sql):
+        return sql
+    return f"({sql})::timestamptz"
+
+
+def dart_to_sql(expr: str, ctx: SqlContext, depth: int = 0) -> Optional[str]:
+    """Translate a Dart value expression over bound rows to SQL, or None"""
+    if depth > 6:
+        return None
+    raw = ' '.join(expr.split())
+    expr = strip_dart_noise(expr)
+
+    coalesce = split_top(expr, '??')
+    if len(coalesce) > 1:
+        parts = [dart_to_sql(p, ctx, depth + 1) for p in coalesce]
+        if any(p is None for p in parts):
+            return None
+        # `x ?? []` / `x ?? {}` only guard the Dart side
+        parts = [p for p in parts if p not in ('[]', '{}')]
+        return parts[0] if len(parts) == 1 else f"coalesce({', '.join(parts)})"
+
+    for operator in (' + ', ' - ', ' * ', ' / '):
+        operands = split_top(expr, operator)
+        if len(operands) > 1:
+            parts = [dart_to_sql(p, ctx, depth + 1) for p in operands]
+            if any(p is None for p in parts):
+                return None
+            return '(' + operator.join(parts) + ')'
+
+    if re.match(r'^-?\d+(?:\.\d+)?$', expr) or expr in ('true', 'false'):
+        return expr
+    if re.match(r"^'[^'$]*'$", expr):
+        return expr
+    if expr in ('[]', '{}', 'null'):
+        return expr if expr != 'null' else 'NULL'
+
+    literal = enum_literal(expr)
+    if literal:
+        return literal
+
+    parse = re.match(r'^DateTime\.(?:tryParse|parse)\((.*)\)$', expr)
+    if parse:
+        inner = dart_to_sql(parse.group(1), ctx, depth + 1)
+        return as_timestamptz(inner) if inner else None
+
+    elapsed = re.match(r'^(.*)\.difference\((.*)\)\.in(Minutes|Seconds|Hours)$', expr)
+    if elapsed:
+        later, earlier = dart_to_sql(elapsed.group(1), ctx, depth + 1), dart_to_sql(elapsed.group(2), ctx, depth + 1)
+        if not later or not earlier:
+            return None
+        divisor = {'Seconds': 1, 'Minutes': 60, 'Hours': 3600}[elapsed.group(3)]
+        seconds = f"extract(epoch FROM {as_timestamptz(later)} - {as_timestamptz(earlier)})"
+        # Duration.inMinutes truncates toward zero; ::int alone would round
+        return f"trunc({seconds} / {divisor})::int" if divisor > 1 else f"trunc({seconds})::int"
+
+    shift = re.match(r'^(.*)\.(add|subtract)\(\s*(?:const\s+)?Duration\(\s*(days|hours|minutes|seconds)\s*:\s*(\d+)\s*\)\s*\)$',
+                     expr)
+    if shift:
+        inner = dart_to_sql(shift.group(1), ctx, depth + 1)
+        if not inner:
+            return None
+        sign = '+' if shift.group(2) == 'add' else '-'
+        return f"({as_timestamptz(inner)} {sign} interval '{shift.group(4)} {shift.group(3)}')"
+
+    part = re.match(r'^(.*)\.(hour|day|month|year|weekday)$', expr)
+    if part:
+        inner = dart_to_sql(part.group(1), ctx, depth + 1)
+        if not inner:
+            return None
+        field = {'weekday': 'isodow'}.get(part.group(2), part.group(2))
+        raw_part = re.match(r'^(.*)\.(?:hour|day|month|year|weekday)$', raw)
+        zone = 'p_timezone' if raw_part and is_local_time(raw_part.group(1), ctx) else "'UTC'"
+        return f"extract({field} FROM {as_timestamptz(inner)} AT TIME ZONE {zone})::int"
+
+    index = re.match(r"^(\w+)((?:\[\s*'\w+'\s*\])+)$", expr)
+    if index:
+        keys = re.findall(r"'(\w+)'", index.group(2))
+        return index_to_sql(index.group(1), keys, ctx, depth)
+
+    field = re.match(r'^(\w+)\.(\w+)$', expr)
+    if field and field.group(1) not in ctx.bindings and field.group(1) in ctx.definitions:
+        # `final duration = a.difference(b);` ... `duration.inMinutes`
+        definition = strip_dart_noise(ctx.definitions[field.group(1)])
+        if len(split_top(definition, ' ')) > 1:
+            definition = f"({definition})"
+        return dart_to_sql(f"{definition}.{field.group(2)}", ctx, depth + 1)
+    if field and field.group(1) in ctx.bindings:
+        binding = ctx.bindings[field.group(1)]
+        if binding.table:
+            column = ctx.column_for_field(binding.table, field.group(2))
+            return f"{binding.alias}.{column}" if column else None
+        return None
+
+    if re.match(r'^\w+$', expr):
+        if expr in ctx.bindings:
+            binding = ctx.bindings[expr]
+            return binding.json_sql
+        definition = ctx.definitions.get(expr)
+        if definition:
+            return dart_to_sql(definition, ctx, depth + 1)
+
+    return None
+
+
+def index_to_sql(name: str, keys: List[str], ctx: SqlContext, depth: int) -> Optional[str]:
+    """row['col'] / json['a']['b'] -> column or jsonb path"""
+    base = None
+    if name in ctx.bindings:
+        binding = ctx.bindings[name]
+        if binding.table:
+            table = ctx.schema.table(binding.table)
+            if not table or keys[0] not in table.columns:
+                return None
+            base = f"{binding.alias}.{keys[0]}"
+            keys = keys[1:]
+        else:
+            base = binding.json_sql
+    elif name in ctx.definitions:
+        base = dart_to_sql(ctx.definitions[name], ctx, depth + 1)
+    if base is None:
+        return None
+    if keys:
+        # Indexing further into a JSON value: keep it jsonb
+        base = re.sub(r"^\((.*)->>('\w+')\)$", r"(\1->\2)", base)
+    for i, key in enumerate(keys):
+        arrow = '->>' if i == len(keys) - 1 else '->'
+        base = f"({base}{arrow}'{key}')"
+    return base
+
+
+def condition_to_sql(expr: str, ctx: SqlContext) -> Optional[str]:
+    """Translate a Dart boolean condition over bound rows, or None"""
+    expr = strip_dart_noise(expr)
+
+    disjuncts = split_top(expr, '||')
+    if len(disjuncts) > 1:
+        parts = [condition_to_sql(p, ctx) for p in disjuncts]
+        return None if any(p is None for p in parts) else '(' + ' OR '.join(parts) + ')'
+
+    conjuncts = split_top(expr, '&&')
+    if len(conjuncts) > 1:
+        parts = [condition_to_sql(p, ctx) for p in conjuncts]
+        return None if any(p is None for p in parts) else ' AND '.join(parts)
+
+    if expr.startswith('!'):
+        inner = condition_to_sql(expr[1:], ctx)
+        if inner and inner.startswith('NOT (') and inner.endswith(')') and balanced(inner[5:-1]):
+            return inner[5:-1]
+        return f"NOT ({inner})" if inner else None
+
+    order = re.match(r'^(.*)\.(isBefore|isAfter|isAtSameMomentAs)\((.*)\)$', expr)
+    if order:
+        left, right = dart_to_sql(order.group(1), ctx), dart_to_sql(order.group(3), ctx)
+        if not left or not right:
+            return None
+        operator = {'isBefore': '<', 'isAfter': '>', 'isAtSameMomentAs': '='}[order.group(2)]
+        return f"{left} {operator} {right}"
+
+    member = re.match(r'^(.*)\.(isNotEmpty|isEmpty)$', expr)
+    if member:
+        inner = dart_to_sql(member.group(1), ctx)
+        if not inner:
+            return None
+        return f"coalesce({inner}::text, '') {'<>' if member.group(2) == 'isNotEmpty' else '='} ''"
+
+    for operator in DART_COMPARISONS:
+        sides = split_top(expr, f' {operator} ')
+        if len(sides) != 2:
+            continue
+        left, right = sides
+        if right == 'null' or left == 'null':
+            value = dart_to_sql(left if right == 'null' else right, ctx)
+            if not value:
+                return None
+            return f"{value} IS {'NOT ' if operator == '!=' else ''}NULL"
+        left_sql, right_sql = dart_to_sql(left, ctx), dart_to_sql(right, ctx)
+        if not left_sql or not right_sql:
+            return None
+        sql_operator = {'==': '=', '!=': 'IS DISTINCT FROM'}.get(operator, operator)
+        return f"{left_sql} {sql_operator} {right_sql}"
+
+    # Bare boolean: `trackStock` -> coalesce(r.track_stock, false)
+    return dart_to_sql(expr, ctx)
+
+
+# ---------------------------------------------------------------------------
+# Aggregation sites
+# ---------------------------------------------------------------------------
+
+class RowSet:
+    """A Dart variable holding (a filtered subset of) fetched rows"""
+
+    def __init__(self, name: str, site: 'AggregationSite', table: str,
+                 filters: Optional[List[str]] = None, group_key: Optional[str] = None,
+                 parent: Optional[str] = None, bases: Optional[List['RowSet']] = None):
+        self.name = name
+        self.site = site
+        self.table = table
+        self.filters = list(filters or [])
+        self.group_key = group_key
+        self.parent = parent                # root row variable for embedded tables
+        self.bases = list(bases or [])      # row sets this one was derived from
+        self.problem: Optional[str] = None  # why its rows cannot be reproduced in SQL
+
+    def derive(self, name: str, filters: Optional[List[str]] = None, group_key: Optional[str] = None,
+               table: Optional[str] = None, parent: Optional[str] = None) -> 'RowSet':
+        return RowSet(name, self.site, table or self.table,
+                      self.filters if filters is None else filters,
+                      self.group_key if group_key is None else group_key,
+                      self.parent if parent is None else parent, [self])
+
+    @property
+    def unsafe(self) -> Optional[str]:
+        """First untranslatable step on the way to these rows (reassignment, filter, guard)"""
+        if self.problem:
+            return self.problem
+        for base in self.bases:
+            if base.unsafe:
+                return base.unsafe
+        return None
+
+
+class Aggregate:
+    def __init__(self, label: str, kind: str, value_sql: Optional[str], rows: RowSet,
+                 group_sql: Optional[str] = None, filter_sql: Optional[str] = None,
+                 line: int = 0, dart: str = '', accumulates: bool = False):
+        self.label = label
+        self.kind = kind                    # 'sum' | 'count' | 'min' | 'max'
+        self.value_sql = value_sql
+        self.rows = rows
+        self.group_sql = group_sql
+        self.filter_sql = filter_sql
+        self.line = line
+        self.dart = dart
+        self.accumulates = accumulates      # `+=` / `++` into a variable several statements may share
+
+
+class AggregationSite:
+    """Row sets fetched in one function and folded together"""
+
+    def __init__(self, name: str, chains: List[QueryChain]):
+        self.name = name
+        self.chains = chains
+
+    @property
+    def table(self) -> str:
+        return self.chains[0].table
+
+
+class AggregationFinding:
+    def __init__(self, source: DartFile, owner: str, provider: Optional[Provider]):
+        self.source = source
+        self.owner = owner
+        self.provider = provider
+        self.sites: List[AggregationSite] = []
+        self.aggregates: List[Aggregate] = []
+        self.untranslated: List[str] = []
+        self.refused: Set[str] = set()      # result keys with an untranslated contribution
+        self.row_consumers: List[str] = []
+        self.params: Dict[str, Tuple[str, str]] = {}     # sql name -> (type, dart expr)
+
+    @property
+    def rpc_name(self) -> str:
+        base = self.provider.name[:-len('Provider')] if self.provider else self.owner.split('.')[-1]
+        return snake_case(base.lstrip('_')) + '_aggregates'
+
+    @property
+    def chains(self) -> List[QueryChain]:
+        return [c for site in self.sites for c in site.chains]
+
+
+# List methods that keep a row set a row set, and ones that hand rows to the UI
+ROW_PRESERVING_METHODS = {'where', 'toList', 'cast', 'whereType', 'map', 'toSet'}
+ROW_CONSUMING_METHODS = {'take', 'first', 'last', 'elementAt', 'sublist', 'skip'}
+
+
+
+def scope_of(chain: QueryChain, providers: List[Provider]) -> Optional[Tuple[int, int, str, Optional[Provider]]]:
+    """(start, end, owner, provider) of the code a chain's result can flow through"""
+    provider = provider_for(providers, chain.source, chain.root_offset)
+    if chain.function:
+        return chain.function.body_start, chain.function.body_end, chain.function.qualified_name, provider
+    if provider:
+        for start, end in provider.spans:
+            if start <= chain.root_offset <= end:
+                return start, end, provider.name, provider
+    return None
+
+
+def note(notes: List[str], message: str):
+    if message not in notes:
+        notes.append(message)
+
+
+def list_methods(expr: str) -> Optional[Tuple[str, List[Tuple[str, str]]]]:
+    """`rows.where((o) => ...).toList()` -> ('rows', [('where', '(o) => ...'), ('toList', '')])"""
+    expr = re.sub(r'^\s*await\s+', '', expr).strip()
+    expr = re.sub(r'\s+as\s+[\w<>?, ]+$', '', expr)
+    head = re.match(r'^\(\s*(\w+)\s+as\s+[\w<>?, ]+\)\s*|^(\w+)\s*', expr)
+    if not head:
+        return None
+    methods = []
+    i = head.end()
+    while i < len(expr):
+        call = re.compile(r'\s*\??\.\s*(\w+)\s*(?:<[^<>()]*(?:<[^<>()]*>)?[^<>()]*>)?\s*(\()?').match(expr, i)
+        if not call:
+            return None
+        if not call.group(2):
+            methods.append((call.group(1), ''))
+            i = call.end()
+            continue
+        depth = 0
+        quote = None
+        for k in range(call.end() - 1, len(expr)):
+            ch = expr[k]
+            if quote:
+                if ch == quote:
+                    quote = None
+            elif ch in ("'", '"'):
+                quote = ch
+            elif ch == '(':
+                depth += 1
+            elif ch == ')':
+                depth -= 1
+                if depth == 0:
+                    break
+        else:
+            return None
+        methods.append((call.group(1), expr[call.end():k]))
+        i = k + 1
+    return head.group(1) or head.group(2), methods
+
+
+def word_in(name: str, text: str) -> bool:
+    return re.search(r'(?<!\w)(?<![\w)\]]\.)%s\b' % re.escape(name), text) is not None
+
+
+def find_loops(text: str, masked: str, start: int, end: int) -> List[Tuple[str, str, int, int]]:
+    """(loop variable, iterable expr, body start, body end) of for-in loops"""
+    loops = []
+    pattern = re.compile(r'\bfor\s*\(\s*(?:final|var)?\s*(?:[\w<>?,]+\s+)?(\w+)\s+in\s+')
+    for match in pattern.finditer(masked, start, end):
+        paren = masked.rfind('(', match.start(), match.end())
+        close = paren
+        depth = 0
+        for i in range(paren, end):
+            if masked[i] == '(':
+                depth += 1
+            elif masked[i] == ')':
+                depth -= 1
+                if depth == 0:
+                    close = i
+                    break
+        iterable = text[match.end():close].strip()
+        body_open = close + 1
+        while body_open < end and masked[body_open].isspace():
+            body_open += 1
+        if body_open < end and masked[body_open] == '{':
+            depth = 0
+            body_close = body_open
+            for i in range(body_open, end):
+                if masked[i] == '{':
+                    depth += 1
+                elif masked[i] == '}':
+                    depth -= 1
+                    if depth == 0:
+                        body_close = i
+                        break
+        else:
+            body_close = masked.find(';', body_open, end)
+        loops.append((match.group(1), iterable, body_open, body_close))
+    return loops
+
+
+def enclosing_brace(masked: str, outer: int, offset: int) -> int:
+    """Offset of the innermost unclosed `{` before `offset` (or `outer`)"""
+    depth = 0
+    for i in range(offset - 1, outer, -1):
+        if masked[i] == '}':
+            depth += 1
+        elif masked[i] == '{':
+            if depth == 0:
+                return i
+            depth -= 1
+    return outer
+
+
+def if_chain(source: DartFile, brace: int) -> Optional[List[Optional[str]]]:
+    """Own conditions of the if/else-if/else branches up to the block at `brace`"""
+    masked, text = source.masked, source.text
+    head = masked[:brace].rstrip()
+    if head.endswith(')'):
+        close = len(head) - 1
+        open_paren = source.open_of(close)
+        before = masked[:open_paren].rstrip()
+        if not re.search(r'\bif$', before):
+            return None
+        condition = text[open_paren + 1:close]
+        previous = masked[:len(before) - 2].rstrip()
+        if re.search(r'\belse$', previous):
+            prior = previous_branches(source, len(previous) - 4)
+            return None if prior is None else prior + [condition]
+        return [condition]
+    if re.search(r'\belse$', head):
+        prior = previous_branches(source, len(head) - 4)
+        return None if prior is None else prior + [None]
+    return None
+
+
+def previous_branches(source: DartFile, else_offset: int) -> Optional[List[Optional[str]]]:
+    close = len(source.masked[:else_offset].rstrip()) - 1
+    if close < 0 or source.masked[close] != '}':
+        return None
+    return if_chain(source, source.open_of(close))
+
+
+def guards_between(source: DartFile, outer: int, offset: int) -> List[Optional[str]]:
+    """Conditions (None when untranslatable) that must hold for `offset` to run inside `outer`"""
+    masked, text = source.masked, source.text
+    conditions: List[Optional[str]] = []
+
+    brace = enclosing_brace(masked, outer, offset)
+    while brace > outer:
+        chain = if_chain(source, brace)
+        if chain is not None:
+            conditions.extend(f"!({c})" for c in chain[:-1])
+            if chain[-1] is not None:
+                conditions.append(chain[-1])
+        elif not masked[:brace].rstrip().endswith(('try', ')')):
+            conditions.append(None)
+        brace = enclosing_brace(masked, outer, brace)
+
+    # `if (!trackStock) continue;` earlier in an enclosing block
+    for match in re.finditer(r'\bif\s*\(', masked[outer:offset]):
+        open_paren = outer + match.end() - 1
+        close = source.close_of(open_paren)
+        if not re.match(r'\s*(?:continue|return)\b', masked[close + 1:close + 20]):
+            continue
+        block = enclosing_brace(masked, outer, open_paren)
+        if block == outer or source.close_of(block) > offset:
+            conditions.append(f"!({text[open_paren + 1:close]})")
+    return conditions
+
+
+class AggregationAnalyzer:
+    def __init__(self, schema: SchemaModel, models: Dict[str, FreezedModel]):
+        self.schema = schema
+        self.models = models
+        self.constants = table_constants()
+
+    def analyze(self, paths: List[Path]) -> List[AggregationFinding]:
+        findings = []
+        for path in dart_files(paths):
+            source = DartFile(path)
+            chains = [c for c in find_query_chains(source, self.constants)
+                      if c.is_read and c.operation == 'select' and c.variable and c.table]
+            if not chains:
+                continue
+            providers = find_providers(source)
+
+            by_scope: Dict[Tuple[int, int], List[QueryChain]] = {}
+            scopes = {}
+            for chain in chains:
+                scope = scope_of(chain, providers)
+                if scope:
+                    by_scope.setdefault(scope[:2], []).append(chain)
+                    scopes[scope[:2]] = scope
+
+            for key, scope_chains in by_scope.items():
+                finding = self.analyze_scope(source, scopes[key], scope_chains)
+                if finding and finding.aggregates:
+                    findings.append(finding)
+        return findings
+
+    def analyze_scope(self, source: DartFile, scope, chains: List[QueryChain]) -> Optional[AggregationFinding]:
+        start, end, owner, provider = scope
+        text, masked = source.text, source.masked
+        finding = AggregationFinding(source, owner, provider)
+        ctx = SqlContext(self.schema, self.models, text[start:end], start)
+
+        assignment = re.compile(r'\b(?:(?:final|var|late)\s+(?:[\w<>?,\s]+?\s+)?)?(\w+)\s*=(?!=)(?!>)\s*')
+        loops = find_loops(text, masked, start, end)
+
+        # `x = ...;` as a statement of its own (not a declaration) rebinds x; a row
+        # list bound more than once holds different rows depending on the branch taken
+        bindings_of: Dict[str, int] = {}
+        reassigned: Dict[str, int] = {}
+        for match in assignment.finditer(masked, start, end):
+            name = match.group(1)
+            bindings_of[name] = bindings_of.get(name, 0) + 1
+            declared = masked[match.start():match.start(1)].strip()
+            before = masked[start:match.start()].rstrip()
+            if not declared and re.search(r'(?:[;{})]|\belse)$', before):
+                reassigned.setdefault(name, source.line_of(match.start()))
+
+        def bind(rows: RowSet) -> RowSet:
+            if rows.name in reassigned and bindings_of.get(rows.name, 0) > 1:
+                rows.problem = rows.problem or f"`{rows.name}` is reassigned (line {reassigned[rows.name]})"
+            return rows
+
+        # Taint: which variables hold rows of which site
+        row_sets: Dict[str, RowSet] = {}
+        sites: Dict[str, AggregationSite] = {}
+        lists: Set[str] = set()
+        for chain in chains:
+            site = AggregationSite(chain.variable, [chain])
+            sites[chain.variable] = site
+            row_sets[chain.variable] = bind(RowSet(chain.variable, site, chain.table))
+            lists.add(chain.variable)
+
+        # Loop variables are per loop: `order` in two loops may walk two row sets
+        loop_rows: Dict[int, RowSet] = {}
+
+        def enclosing(offset: int):
+            """Loops whose body contains `offset`, innermost first"""
+            return sorted((l for l in loops if l[2] < offset <= l[3]), key=lambda l: -l[2])
+
+        def lookup(name: str, offset: int) -> Optional[RowSet]:
+            for variable, _, body_start, _ in enclosing(offset):
+                if variable == name:
+                    return loop_rows.get(body_start)
+            return row_sets.get(name)
+
+        def bind_loops(offset: int):
+            for variable, _, body_start, _ in reversed(enclosing(offset)):
+                rows = loop_rows.get(body_start)
+                if rows:
+                    ctx.bindings[variable] = Binding('c' if rows.parent else 'r', rows.table)
+
+        for _ in range(6):
+            changed = False
+
+            for match in assignment.finditer(masked, start, end):
+                target = match.group(1)
+                if target in row_sets:
+                    continue
+                expr_end = expression_end(source, match.end())
+                expr = text[match.end():expr_end]
+                sources = [name for name in list(row_sets) if word_in(name, expr) and name in lists]
+                if not sources:
+                    continue
+                first = row_sets[sources[0]]
+                if len(sources) > 1 and re.search(r'\.\.\.', expr):
+                    # [...a, ...b] merges two fetches into one row set
+                    merged = AggregationSite(target, [c for s in sources for c in row_sets[s].site.chains])
+                    old_sites = {id(row_sets[s].site) for s in sources}
+                    for s in sources:
+                        sites.pop(row_sets[s].site.name, None)
+                    sites[target] = merged
+                    for rows in list(row_sets.values()) + list(loop_rows.values()):
+                        if id(rows.site) in old_sites:
+                            rows.site = merged
+                    row_sets[target] = bind(RowSet(target, merged, first.table, first.filters, first.group_key,
+                                                   first.parent, [row_sets[s] for s in sources]))
+                    lists.add(target)
+                    changed = True
+                    continue
+                methods = list_methods(expr)
+                if methods is None or methods[0] != first.name:
+                    continue
+                filters = list(first.filters)
+                problem = None
+                for method, args in methods[1]:
+                    where = re.match(r'^\s*\((\w+)\)\s*(?:=>\s*|\{\s*return\s+)(.*?)[\s;},]*$', args, re.DOTALL)
+                    if method != 'where' or not where:
+                        continue
+                    ctx.at(match.start())
+                    ctx.bindings[where.group(1)] = Binding('c' if first.parent else 'r', first.table)
+                    sql = condition_to_sql(where.group(2), ctx)
+                    if sql:
+                        filters.append(sql)
+                    else:
+                        problem = problem or f"filter on line {source.line_of(match.start())}"
+                        note(finding.untranslated,
+                             f"line {source.line_of(match.start())}: filter `{' '.join(where.group(2).split())[:90]}`")
+                names = [m for m, _ in methods[1]]
+                if any(m in ROW_CONSUMING_METHODS for m in names):
+                    note(finding.row_consumers, f"{target} (line {source.line_of(match.start())})")
+                    continue
+                if any(m not in ROW_PRESERVING_METHODS for m in names):
+                    continue
+                derived = first.derive(target, filters=filters)
+                derived.problem = problem
+                row_sets[target] = bind(derived)
+                lists.add(target)
+                changed = True
+
+            for variable, iterable, body_start, body_end in loops:
+                if body_start in loop_rows:
+                    continue
+                ctx.at(body_start)
+                rows = self.iterated_rows(iterable, lambda name: lookup(name, body_start), ctx)
+                if not rows:
+                    continue
+                loop_rows[body_start] = rows.derive(variable)
+                changed = True
+
+                # rows.add(parse(row)) inside the loop copies rows into another list
+                for add in re.finditer(r'\b(\w+)\.add\(', masked[body_start:body_end]):
+                    target = add.group(1)
+                    args_end = source.close_of(body_start + add.end() - 1)
+                    if target not in row_sets and word_in(variable, text[body_start + add.end():args_end]):
+                        row_sets[target] = bind(rows.derive(target))
+                        lists.add(target)
+                # map.putIfAbsent(key, () => []).add(row) groups the rows that reach it
+                for group in re.finditer(r'\b(\w+)\.putIfAbsent\(\s*(\w+)\s*,\s*\(\)\s*=>\s*\[\]\s*\)\.add\(',
+                                         masked[body_start:body_end]):
+                    target = group.group(1)
+                    if target in row_sets:
+                        continue
+                    offset = body_start + group.start()
+                    bind_loops(offset)
+                    ctx.at(offset)
+                    key_sql = dart_to_sql(group.group(2), ctx)
+                    grouped = rows.derive(target, group_key=key_sql)
+                    if key_sql is None:
+                        grouped.problem = f"group key `{group.group(2)}` (line {source.line_of(offset)})"
+                    for guard in guards_between(source, body_start, offset):
+                        sql = condition_to_sql(guard, ctx) if guard is not None else None
+                        if sql is None:
+                            grouped.problem = grouped.problem or (
+                                f"`{target}` filled under `{' '.join((guard or 'else').split())[:60]}` "
+                                f"(line {source.line_of(offset)})"
+                            )
+                            break
+                        grouped.filters.append(sql)
+                    row_sets[target] = bind(grouped)
+
+            if not changed:
+                break
+
+        # Aggregates inside loops over rows
+        for variable, iterable, body_start, body_end in loops:
+            rows = loop_rows.get(body_start)
+            if not rows:
+                continue
+            bind_loops(body_start)
+            ctx.bindings[variable] = Binding('c' if rows.parent else 'r', rows.table)
+            self.collect_loop_aggregates(finding, ctx, source, rows, body_start, body_end, loops)
+
+        # fold()/length over row lists
+        for name in lists:
+            self.collect_list_aggregates(finding, ctx, source, row_sets[name], start, end)
+
+        # A key is emitted only when every statement feeding it was translated, and
+        # several statements may only feed one key by accumulating into it
+        by_label: Dict[str, List[Aggregate]] = {}
+        for aggregate in finding.aggregates:
+            by_label.setdefault(aggregate.label, []).append(aggregate)
+        for label, parts in by_label.items():
+            if len(parts) > 1 and (not all(p.accumulates for p in parts)
+                                   or len({p.group_sql is None for p in parts}) > 1):
+                note(finding.untranslated, f"`{label}` is assigned on lines {', '.join(str(p.line) for p in parts)}")
+                finding.refused.add(label)
+        for label in sorted(finding.refused):
+            if label in by_label:
+                note(finding.untranslated, f"`{label}` not emitted: part of it is untranslated")
+        finding.aggregates = [a for a in finding.aggregates if a.label not in finding.refused]
+
+        for match in re.finditer(r'\b(\w+)\s*:\s*(\w+)\s*[,)]', masked[start:end]):
+            if match.group(2) in lists and match.group(2) not in [c.variable for c in chains]:
+                note(finding.row_consumers, f"{match.group(2)} passed as `{match.group(1)}:`")
+
+        # Only fetches that feed an aggregate move to the RPC
+        used = {id(a.rows.site) for a in finding.aggregates}
+        all_rows = list(row_sets.values()) + list(loop_rows.values())
+        finding.sites = [s for s in {id(r.site): r.site for r in all_rows}.values() if id(s) in used]
+
+        if finding.aggregates:
+            self.collect_params(finding)
+        return finding
+
+    def iterated_rows(self, iterable: str, lookup, ctx: SqlContext) -> Optional[RowSet]:
+        """Row set a for-in iterable walks, including embedded child rows"""
+        expr = strip_dart_noise(iterable)
+        expr = re.sub(r'\.(?:entries|values|toList\(\))$', '', expr)
+        if re.match(r'^\w+$', expr) and lookup(expr):
+            return lookup(expr)
+
+        definition = ctx.definitions.get(expr)
+        if definition:
+            expr = strip_dart_noise(split_top(definition, '??')[0])
+            if re.match(r'^\w+$', expr) and lookup(expr):
+                return lookup(expr)
+
+        entry = re.match(r'^(\w+)\.value$', expr)
+        if entry and lookup(entry.group(1)):
+            return lookup(entry.group(1))
+
+        child = re.match(r"^(\w+)(?:\.(\w+)|\[\s*'(\w+)'\s*\])$", expr)
+        if child and lookup(child.group(1)):
+            parent = lookup(child.group(1))
+            name = child.group(2) or child.group(3)
+            table = self.embedded_table(parent, name)
+            if table:
+                return parent.derive(f"{parent.name}.{name}", table=table, parent=parent.name)
+        return None
+
+    def embedded_table(self, parent: RowSet, name: str) -> Optional[str]:
+        """Table of an embedded relation, by select alias or model field"""
+        if self.schema.table(name):
+            return name
+        schema_table = self.schema.table(parent.table)
+        model = model_for_table(self.models, schema_table) if schema_table else None
+        if model and name in model.fields and model.fields[name].nested_model:
+            return table_for_model(self.models, self.schema, model.fields[name].nested_model)
+        return None
+
+    def collect_loop_aggregates(self, finding: AggregationFinding, ctx: SqlContext, source: DartFile,
+                                rows: RowSet, body_start: int, body_end: int, loops):
+        text, masked = source.text, source.masked
+        body = masked[body_start:body_end]
+
+        # Skip statements that belong to nested loops over other row sets
+        nested = [(s, e) for v, _, s, e in loops if body_start < s < body_end]
+
+        def in_nested(offset: int) -> bool:
+            return any(s <= offset <= e for s, e in nested)
+
+        statement = re.compile(
+            r'(?P<lhs>[\w.]+(?:\[[^\]]+\])?(?:!?\.\w+)?(?:\[[^\]]+\])?)\s*'
+            r'(?:(?P<op>\+=|-=)\s*(?P<rhs>[^;]+)|(?P<inc>\+\+)|=\s*\(\s*(?P=lhs)\s*\?\?\s*0\s*\)\s*\+\s*(?P<rhs2>[^;]+));'
+        )
+        for match in statement.finditer(body):
+            offset = body_start + match.start()
+            if in_nested(offset):
+                continue
+            ctx.at(offset)
+            # Masking blanks string literals; keys like map['Standard'] are read from the source
+            lhs = text[body_start + match.start('lhs'):body_start + match.end('lhs')]
+            raw = ' '.join(text[offset:body_start + match.end()].split())
+            rhs = match.group('rhs') or match.group('rhs2')
+            if rhs:
+                rhs = text[body_start + match.start('rhs' if match.group('rhs') else 'rhs2'):
+                           body_start + match.end('rhs' if match.group('rhs') else 'rhs2')]
+
+            group_sql = rows.group_key
+            group = re.match(r'^(\w+)\[([^\]]+)\]', lhs)
+            label_base = group.group(1) + re.sub(r'^\w+\[[^\]]+\]!?', '', lhs) if group else lhs
+            label = snake_case(re.sub(r'[^\w]+', '_', label_base).strip('_'))
+
+            def refuse(reason: str):
+                note(finding.untranslated, f"line {source.line_of(offset)}: {reason}")
+                finding.refused.add(label)
+
+            if rows.unsafe:
+                refuse(f"`{raw[:60]}` walks rows with an untranslated step ({rows.unsafe})")
+                continue
+            if lhs.count('[') > 1:
+                refuse(f"nested grouping `{raw[:80]}`")
+                continue
+            if group:
+                key_sql = dart_to_sql(group.group(2), ctx)
+                if key_sql is None:
+                    refuse(f"group key `{group.group(2)}`")
+                    continue
+                group_sql = key_sql
+
+            if match.group('inc') or (rhs and strip_dart_noise(rhs) == '1'):
+                kind, value_sql = 'count', None
+            else:
+                kind = 'sum'
+                value_sql = dart_to_sql(rhs, ctx)
+                if value_sql is None:
+                    refuse(f"`{raw[:100]}`")
+                    continue
+                if match.group('op') == '-=':
+                    value_sql = f"-({value_sql})"
+
+            guards = guards_between(source, body_start, offset)
+            filter_parts = []
+            for guard in guards:
+                sql = condition_to_sql(guard, ctx) if guard is not None else None
+                if sql is None:
+                    refuse(f"`{raw[:60]}` guarded by `{' '.join((guard or 'else').split())[:60]}`")
+                    filter_parts = None
+                    break
+                filter_parts.append(sql)
+            if filter_parts is None:
+                continue
+
+            finding.aggregates.append(Aggregate(
+                label, kind, value_sql, rows, group_sql,
+                ' AND '.join(filter_parts) if filter_parts else None,
+                source.line_of(offset), raw, accumulates=True,
+            ))
+
+    def collect_list_aggregates(self, finding: AggregationFinding, ctx: SqlContext, source: DartFile,
+                                rows: RowSet, start: int, end: int):
+        text, masked = source.text, source.masked
+        name = re.escape(rows.name)
+        found = []
+        fold = re.compile(
+            r'(\w+)\s*=\s*%s\s*\.fold\s*(?:<\w+>)?\s*\(\s*[\d.]+\s*,\s*\(\s*(\w+)\s*,\s*(\w+)\s*\)\s*=>\s*\2\s*\+\s*'
+            % name
+        )
+        for match in fold.finditer(masked, start, end):
+            value_end = expression_end(source, match.end())
+            value = text[match.end():value_end]
+            found.append((match, 'sum', value, ' '.join(text[match.start():value_end].split())))
+
+        length = re.compile(r'(\w+)\s*=\s*%s\s*\.length\s*;' % name)
+        for match in length.finditer(masked, start, end):
+            found.append((match, 'count', None, ' '.join(text[match.start():match.end()].split())))
+
+        for match, kind, value, raw in found:
+            label = snake_case(match.group(1))
+            line = source.line_of(match.start())
+            if rows.unsafe:
+                note(finding.untranslated, f"line {line}: `{raw[:60]}` over rows with an untranslated step "
+                                           f"({rows.unsafe})")
+                finding.refused.add(label)
+                continue
+            value_sql = None
+            if kind == 'sum':
+                ctx.at(match.start())
+                ctx.bindings[match.group(3)] = Binding('r' if not rows.parent else 'c', rows.table)
+                value_sql = dart_to_sql(value, ctx)
+                if value_sql is None:
+                    note(finding.untranslated, f"line {line}: fold `{' '.join(value.split())}`")
+                    finding.refused.add(label)
+                    continue
+            finding.aggregates.append(Aggregate(label, kind, value_sql, rows, rows.group_key, None, line, raw))
+
+    def collect_params(self, finding: AggregationFinding):
+        """RPC parameters for the non-literal values the chains filter on"""
+        finding.params['p_organization_id'] = ('UUID', 'orgId')
+        for chain in finding.chains:
+            for method, column, args in chain.filters:
+                values = split_commas(args)
+                value = values[-1].strip() if len(values) > 1 else ''
+                if not column or method not in COMPARISON_OPERATORS or not value:
+                    continue
+                if value.startswith("'") or enum_literal(value) or is_dart_literal(value):
+                    continue
+                if column.endswith('organization_id'):
+                    continue
+                name = param_name(value)
+                finding.params.setdefault(name, (self.column_type(chain.table, column), value))
+        finding.params['p_timezone'] = ('TEXT', f"'{DEFAULT_TIMEZONE}'")
+
+    def column_type(self, table: str, column: str) -> str:
+        if '.' in column:
+            table, column = column.split('.', 1)
+        schema_table = self.schema.table(table)
+        if schema_table and column in schema_table.columns:
+            return re.sub(r'\(.*\)', '', schema_table.columns[column].data_type).upper()
+        return 'TEXT'
+
+
+def param_name(dart_value: str) -> str:
+    """`startDate.toUtc().toIso8601String()` -> p_start_date, `user.id` -> p_user_id"""
+    path = re.match(r'\s*(\w+(?:\??\.\w+)*)', dart_value)
+    if not path:
+        return 'p_value'
+    parts = [p for p in re.split(r'\??\.', path.group(1)) if p not in DART_CONVERSIONS]
+    return 'p_' + '_'.join(snake_case(p) for p in parts)
+
+
+def is_dart_literal(dart_value: str) -> bool:
+    value = dart_value.strip()
+    return value in ('true', 'false', 'null') or re.match(r'^-?\d+(?:\.\d+)?$', value) is not None
+
+
+# ---------------------------------------------------------------------------
+# SQL generation
+# ---------------------------------------------------------------------------
+
+def chain_where(chain: QueryChain, finding: AggregationFinding, alias: str = 'r') -> List[str]:
+    """PostgREST filters of a chain as SQL predicates"""
+    clauses = []
+    for method, column, args in chain.filters:
+        values = split_commas(args)
+        if not column:
+            continue
+        column_sql = f"{alias}.{column}" if '.' not in column else column.replace('.', '_e.', 1)
+        if method == 'filter' or method == 'not':
+            operator = first_string(values[1]) if len(values) > 1 else None
+            value = values[2].strip() if len(values) > 2 else ''
+            negate = method == 'not'
+            if operator == 'is' and value == 'null':
+                clauses.append(f"{column_sql} IS {'NOT ' if negate else ''}NULL")
+                continue
+            if operator in COMPARISON_OPERATORS:
+                sql = f"{column_sql} {COMPARISON_OPERATORS[operator]} {value_sql(value, finding)}"
+                clauses.append(f"NOT ({sql})" if negate else sql)
+                continue
+            clauses.append(f"/* unsupported filter: .{method}({' '.join(args.split())}) */ true")
+            continue
+        if method in COMPARISON_OPERATORS:
+            clauses.append(f"{column_sql} {COMPARISON_OPERATORS[method]} {value_sql(values[-1].strip(), finding)}")
+        elif method in ('inFilter', 'in_'):
+            clauses.append(f"{column_sql} = ANY({value_sql(values[-1].strip(), finding)})")
+        else:
+            clauses.append(f"/* unsupported filter: .{method}({' '.join(args.split())}) */ true")
+    return clauses
+
+
+def value_sql(dart_value: str, finding: AggregationFinding) -> str:
+    literal = enum_literal(dart_value.strip())
+    if literal:
+        return literal
+    if dart_value.strip().startswith("'"):
+        return "'" + (first_string(dart_value) or '') + "'"
+    if is_dart_literal(dart_value):
+        return dart_value.strip().upper() if dart_value.strip() == 'null' else dart_value.strip()
+    if dart_value.strip() == 'orgId':
+        return 'p_organization_id'
+    return param_name(dart_value)
+
+
+def foreign_key_join(schema: SchemaModel, child: str, parent: str) -> Optional[Tuple[str, str]]:
+    """(child column, parent column) of the FK from child to parent"""
+    table = schema.table(child)
+    if not table:
+        return None
+    for fk in table.foreign_keys:
+        if fk.ref_table == parent:
+            return fk.columns[0], fk.ref_columns[0]
+    return None
+
+
+def site_cte_name(site: AggregationSite) -> str:
+    return snake_case(site.name) + '_rows'
+
+
+def chain_window(chain: QueryChain) -> str:
+    """`.order(...).limit(n)` of a chain as ORDER BY/LIMIT lines (empty when unbounded)"""
+    limits = [re.match(r'\s*(\d+)', c.args) for c in chain.calls_named('limit')]
+    limit = next((m.group(1) for m in limits if m), None)
+    if not limit:
+        return ''
+    order = []
+    for call in chain.calls_named('order'):
+        if call.first_string:
+            ascending = re.search(r'ascending\s*:\s*true', call.args)
+            order.append(f"r.{call.first_string} {'ASC' if ascending else 'DESC'}")
+    window = f"\n        ORDER BY {', '.join(order)}" if order else ''
+    return window + f"\n        LIMIT {limit}"
+
+
+def aggregate_query(aggregate: Aggregate, child_ctes: Dict[Tuple[str, str], str]):
+    """(group expr, measure, FROM source, WHERE clause) of one aggregate, or None"""
+    rows = aggregate.rows
+    if rows.parent:
+        child = child_ctes.get((rows.site.name, rows.table))
+        if not child:
+            return None
+        source_sql = f"{child} c JOIN {site_cte_name(rows.site)} r ON r.id = c.parent_id"
+    else:
+        source_sql = f"{site_cte_name(rows.site)} r"
+
+    where = list(rows.filters)
+    if aggregate.filter_sql:
+        where.append(aggregate.filter_sql)
+    where_sql = f" WHERE {' AND '.join(where)}" if where else ''
+    measure = 'count(*)' if aggregate.kind == 'count' else f"coalesce(sum({aggregate.value_sql}), 0)"
+    return aggregate.group_sql, measure, source_sql, where_sql
+
+
+def generate_rpc(finding: AggregationFinding, schema: SchemaModel) -> str:
+    """CREATE FUNCTION returning the finding's aggregates as one JSONB object"""
+    lines = [
+        f"-- {finding.source.rel}: {finding.owner}",
+        f"-- Replaces {len(finding.chains)} row fetch(es) folded in Dart with one aggregate round trip",
+    ]
+    params = []
+    for name, (sql_type, dart) in finding.params.items():
+        default = f" DEFAULT '{DEFAULT_TIMEZONE}'" if name == 'p_timezone' else ''
+        params.append(f"    {name} {sql_type}{default}")
+    lines.append(f"CREATE OR REPLACE FUNCTION {finding.rpc_name}(")
+    lines.append(',\n'.join(params))
+    lines.append(")")
+    lines.append("RETURNS JSONB")
+    lines.append("LANGUAGE sql")
+    lines.append("STABLE")
+    lines.append("SECURITY INVOKER")
+    lines.append("SET search_path = public")
+    lines.append("AS $$")
+
+    ctes = []
+    child_ctes = {}
+    for site in finding.sites:
+        selects = []
+        for chain in site.chains:
+            where = chain_where(chain, finding)
+            table = schema.table(chain.table)
+            if not chain.org_filtered and table and 'organization_id' in table.columns:
+                # The Dart query leans on RLS alone; the RPC answers for p_organization_id
+                where.insert(0, 'r.organization_id = p_organization_id')
+            joins = ''
+            if any('_e.' in w for w in where):
+                embed = next((c.split('.')[0] for _, c, _ in chain.filters if c and '.' in c), None)
+                keys = foreign_key_join(schema, chain.table, embed) if embed else None
+                if keys:
+                    joins = f"\n        JOIN {embed} {embed}_e ON {embed}_e.{keys[1]} = r.{keys[0]}"
+            select = (
+                f"        SELECT r.*\n        FROM {chain.table} r{joins}\n        WHERE "
+                + "\n          AND ".join(where or ['true'])
+            )
+            select += chain_window(chain)
+            if chain_window(chain) and len(site.chains) > 1:
+                select = f"        ({select.strip()})"
+            selects.append(select)
+        ctes.append(f"    {site_cte_name(site)} AS (\n" + "\n        UNION ALL\n".join(selects) + "\n    )")
+
+    for aggregate in finding.aggregates:
+        rows = aggregate.rows
+        if rows.parent and (rows.site.name, rows.table) not in child_ctes:
+            keys = foreign_key_join(schema, rows.table, rows.site.table)
+            if keys:
+                name = f"{snake_case(rows.site.name)}_{rows.table}"
+                child_ctes[(rows.site.name, rows.table)] = name
+                ctes.append(
+                    f"    {name} AS (\n        SELECT c.*, r.id AS parent_id\n"
+                    f"        FROM {rows.table} c\n        JOIN {site_cte_name(rows.site)} r ON r.{keys[1]} = c.{keys[0]}\n    )"
+                )
+
+    lines.append("    WITH\n" + ",\n".join(ctes))
+    lines.append("    SELECT jsonb_build_object(")
+
+    # Statements accumulating into one Dart variable or map feed one key
+    by_label: Dict[str, List[Aggregate]] = {}
+    for aggregate in finding.aggregates:
+        by_label.setdefault(aggregate.label, []).append(aggregate)
+
+    fields = []
+    for label, parts in by_label.items():
+        comments = ''.join(f"        -- line {p.line}: {p.dart[:90]}\n" for p in parts)
+        queries = [aggregate_query(p, child_ctes) for p in parts]
+        queries = [q for q in queries if q]
+        if not queries:
+            continue
+        if parts[0].group_sql:
+            grouped = "\n            UNION ALL\n".join(
+                f"            SELECT {group_sql} AS k, {measure} AS v\n"
+                f"            FROM {source_sql}{where_sql}\n"
+                f"            GROUP BY 1"
+                for group_sql, measure, source_sql, where_sql in queries
+            )
+            if len(queries) > 1:
+                grouped = f"            SELECT k, sum(v) AS v FROM (\n{grouped}\n            ) p\n            GROUP BY k"
+            expr = (
+                f"(SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{{}}'::jsonb) FROM (\n"
+                f"{grouped}\n        ) g)"
+            )
+        else:
+            expr = "\n            + ".join(
+                f"(SELECT {measure} FROM {source_sql}{where_sql})"
+                for _, measure, source_sql, where_sql in queries
+            )
+        fields.append(f"{comments}        '{label}', {expr}")
+
+    lines.append(',\n'.join(fields))
+    lines.append("    );")
+    lines.append("$$;")
+    lines.append("")
+    lines.append(f"GRANT EXECUTE ON FUNCTION {finding.rpc_name}({', '.join(t for t, _ in finding.params.values())}) TO authenticated;")
+    return '\n'.join(lines)
+
+
+def generate_dart_call(finding: AggregationFinding) -> str:
+    lines = [f"final aggregates = await supabase.rpc('{finding.rpc_name}', params: {{"]
+    for name, (_, dart) in finding.params.items():
+        if name == 'p_timezone':
+            continue
+        lines.append(f"  '{name}': {dart.strip()},")
+    lines.append("}) as Map<String, dynamic>;")
+    return '\n'.join(lines)
+
+
+# Incrementally refreshed daily rollup. Triggers on ordini and ordini_items
+# queue the day of every order whose rollup columns change: the OLD and NEW
+# day of an update, deleted orders, and the parent order of an item change.
+# The queue holds one row per (organization, day); a writer that finds its
+# day already queued locks that row, so a refresh claiming it waits for the
+# writer to commit and then reads its order. The refresh recomputes the
+# claimed days only; a day left with no orders loses its row. p_since, or an
+# empty rollup, also recomputes every day with an order updated since then
+# (backfill).
+DAILY_ROLLUP_SQL = """CREATE TABLE IF NOT EXISTS statistiche_giornaliere_pending (
+    organization_id UUID NOT NULL REFERENCES organizations(id) ON DELETE CASCADE,
+    data DATE NOT NULL,                    -- day in {timezone}
+    PRIMARY KEY (organization_id, data)
+);
+
+ALTER TABLE statistiche_giornaliere_pending ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Managers can manage pending statistics" ON statistiche_giornaliere_pending;
+CREATE POLICY "Managers can manage pending statistics" ON statistiche_giornaliere_pending FOR ALL TO authenticated
+USING (
+    organization_id = get_current_organization_id()
+    AND is_organization_admin(organization_id)
+)
+WITH CHECK (
+    organization_id = get_current_organization_id()
+    AND is_organization_admin(organization_id)
+);
+
+-- DO UPDATE ... WHERE false writes nothing but locks an already queued day
+CREATE OR REPLACE FUNCTION queue_statistiche_giornaliere_ordini()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO statistiche_giornaliere_pending (organization_id, data)
+        VALUES (OLD.organization_id, (coalesce(OLD.slot_prenotato_start, OLD.created_at) AT TIME ZONE '{timezone}')::date)
+        ON CONFLICT (organization_id, data) DO UPDATE SET data = EXCLUDED.data WHERE false;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO statistiche_giornaliere_pending (organization_id, data)
+        VALUES (NEW.organization_id, (coalesce(NEW.slot_prenotato_start, NEW.created_at) AT TIME ZONE '{timezone}')::date)
+        ON CONFLICT (organization_id, data) DO UPDATE SET data = EXCLUDED.data WHERE false;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- Items deleted with their order find no parent: the ordini trigger queued its day
+CREATE OR REPLACE FUNCTION queue_statistiche_giornaliere_items()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO statistiche_giornaliere_pending (organization_id, data)
+        SELECT o.organization_id, (coalesce(o.slot_prenotato_start, o.created_at) AT TIME ZONE '{timezone}')::date
+        FROM ordini o
+        WHERE o.id = OLD.ordine_id
+        ON CONFLICT (organization_id, data) DO UPDATE SET data = EXCLUDED.data WHERE false;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO statistiche_giornaliere_pending (organization_id, data)
+        SELECT o.organization_id, (coalesce(o.slot_prenotato_start, o.created_at) AT TIME ZONE '{timezone}')::date
+        FROM ordini o
+        WHERE o.id = NEW.ordine_id
+        ON CONFLICT (organization_id, data) DO UPDATE SET data = EXCLUDED.data WHERE false;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- Only changes to columns the rollup reads: printed/pagato flips and the like queue nothing
+DROP TRIGGER IF EXISTS queue_statistiche_giornaliere_ordini ON ordini;
+CREATE TRIGGER queue_statistiche_giornaliere_ordini
+    AFTER INSERT OR DELETE ON ordini
+    FOR EACH ROW EXECUTE FUNCTION queue_statistiche_giornaliere_ordini();
+
+DROP TRIGGER IF EXISTS queue_statistiche_giornaliere_ordini_update ON ordini;
+CREATE TRIGGER queue_statistiche_giornaliere_ordini_update
+    AFTER UPDATE OF organization_id, slot_prenotato_start, created_at, stato, tipo, totale,
+        preparazione_at, pronto_at, completato_at ON ordini
+    FOR EACH ROW
+    WHEN ((OLD.organization_id, OLD.slot_prenotato_start, OLD.created_at, OLD.stato, OLD.tipo, OLD.totale,
+           OLD.preparazione_at, OLD.pronto_at, OLD.completato_at)
+          IS DISTINCT FROM
+          (NEW.organization_id, NEW.slot_prenotato_start, NEW.created_at, NEW.stato, NEW.tipo, NEW.totale,
+           NEW.preparazione_at, NEW.pronto_at, NEW.completato_at))
+    EXECUTE FUNCTION queue_statistiche_giornaliere_ordini();
+
+DROP TRIGGER IF EXISTS queue_statistiche_giornaliere_items ON ordini_items;
+CREATE TRIGGER queue_statistiche_giornaliere_items
+    AFTER INSERT OR DELETE ON ordini_items
+    FOR EACH ROW EXECUTE FUNCTION queue_statistiche_giornaliere_items();
+
+DROP TRIGGER IF EXISTS queue_statistiche_giornaliere_items_update ON ordini_items;
+CREATE TRIGGER queue_statistiche_giornaliere_items_update
+    AFTER UPDATE OF ordine_id, nome_prodotto, quantita, subtotale ON ordini_items
+    FOR EACH ROW
+    WHEN ((OLD.ordine_id, OLD.nome_prodotto, OLD.quantita, OLD.subtotale)
+          IS DISTINCT FROM (NEW.ordine_id, NEW.nome_prodotto, NEW.quantita, NEW.subtotale))
+    EXECUTE FUNCTION queue_statistiche_giornaliere_items();
+
+CREATE OR REPLACE FUNCTION refresh_statistiche_giornaliere(
+    p_organization_id UUID,
+    p_since TIMESTAMPTZ DEFAULT NULL,
+    p_timezone TEXT DEFAULT '{timezone}'
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+    v_since TIMESTAMPTZ;
+    v_claimed DATE[];
+    v_days INTEGER;
+BEGIN
+    v_since := coalesce(
+        p_since,
+        CASE WHEN NOT EXISTS (SELECT 1 FROM statistiche_giornaliere WHERE organization_id = p_organization_id)
+             THEN '-infinity'::timestamptz END
+    );
+
+    -- Its own statement: the claim waits for writers holding a queued day,
+    -- and the rollup below takes a snapshot that includes their orders
+    WITH claimed AS (
+        DELETE FROM statistiche_giornaliere_pending
+        WHERE organization_id = p_organization_id
+        RETURNING data
+    )
+    SELECT array_agg(data) INTO v_claimed FROM claimed;
+
+    WITH touched_days AS (
+        -- A queued {timezone} day covers one or two p_timezone days
+        SELECT (bound AT TIME ZONE p_timezone)::date AS data
+        FROM unnest(v_claimed) AS q(data)
+        CROSS JOIN LATERAL (VALUES
+            (q.data::timestamp AT TIME ZONE '{timezone}'),
+            ((q.data + 1)::timestamp AT TIME ZONE '{timezone}' - interval '1 microsecond')
+        ) AS b(bound)
+        UNION
+        SELECT (coalesce(slot_prenotato_start, created_at) AT TIME ZONE p_timezone)::date
+        FROM ordini
+        WHERE organization_id = p_organization_id
+          AND updated_at >= v_since
+    ),
+    day_orders AS (
+        SELECT o.*, d.data
+        FROM touched_days d
+        JOIN ordini o
+          ON o.organization_id = p_organization_id
+         AND coalesce(o.slot_prenotato_start, o.created_at) >= (d.data::timestamp AT TIME ZONE p_timezone)
+         AND coalesce(o.slot_prenotato_start, o.created_at) < ((d.data + 1)::timestamp AT TIME ZONE p_timezone)
+    ),
+    totals AS (
+        SELECT
+            data,
+            count(*) FILTER (WHERE stato <> 'cancelled') AS ordini_totali,
+            count(*) FILTER (WHERE stato <> 'cancelled' AND tipo = 'delivery') AS ordini_consegna,
+            count(*) FILTER (WHERE stato <> 'cancelled' AND tipo = 'takeaway') AS ordini_asporto,
+            count(*) FILTER (WHERE stato = 'cancelled') AS ordini_cancellati,
+            coalesce(sum(totale) FILTER (WHERE stato <> 'cancelled'), 0) AS fatturato_totale,
+            coalesce(sum(totale) FILTER (WHERE stato <> 'cancelled' AND tipo = 'delivery'), 0) AS fatturato_consegna,
+            coalesce(sum(totale) FILTER (WHERE stato <> 'cancelled' AND tipo = 'takeaway'), 0) AS fatturato_asporto,
+            coalesce(avg(totale) FILTER (WHERE stato <> 'cancelled'), 0) AS ordine_medio,
+            (avg(extract(epoch FROM pronto_at - preparazione_at)) / 60)::int AS tempo_medio_preparazione,
+            (avg(extract(epoch FROM completato_at - created_at))
+                FILTER (WHERE tipo = 'delivery' AND stato = 'completed') / 60)::int AS tempo_medio_consegna
+        FROM day_orders
+        GROUP BY data
+    ),
+    top_products AS (
+        SELECT data, jsonb_agg(jsonb_build_object('nome', nome_prodotto, 'quantita', quantita, 'fatturato', fatturato)
+                               ORDER BY quantita DESC) AS prodotti_top
+        FROM (
+            SELECT d.data, i.nome_prodotto, sum(i.quantita) AS quantita, sum(i.subtotale) AS fatturato,
+                   row_number() OVER (PARTITION BY d.data ORDER BY sum(i.quantita) DESC) AS rn
+            FROM day_orders d
+            JOIN ordini_items i ON i.ordine_id = d.id
+            WHERE d.stato <> 'cancelled'
+            GROUP BY d.data, i.nome_prodotto
+        ) ranked
+        WHERE rn <= 10
+        GROUP BY data
+    ),
+    upserted AS (
+        INSERT INTO statistiche_giornaliere (
+            organization_id, data, ordini_totali, ordini_consegna, ordini_asporto, ordini_cancellati,
+            fatturato_totale, fatturato_consegna, fatturato_asporto, ordine_medio,
+            tempo_medio_preparazione, tempo_medio_consegna, prodotti_top
+        )
+        SELECT
+            p_organization_id, t.data, t.ordini_totali, t.ordini_consegna, t.ordini_asporto, t.ordini_cancellati,
+            t.fatturato_totale, t.fatturato_consegna, t.fatturato_asporto, t.ordine_medio,
+            t.tempo_medio_preparazione, t.tempo_medio_consegna, coalesce(p.prodotti_top, '[]'::jsonb)
+        FROM totals t
+        LEFT JOIN top_products p USING (data)
+        ON CONFLICT (organization_id, data) DO UPDATE SET
+            ordini_totali = EXCLUDED.ordini_totali,
+            ordini_consegna = EXCLUDED.ordini_consegna,
+            ordini_asporto = EXCLUDED.ordini_asporto,
+            ordini_cancellati = EXCLUDED.ordini_cancellati,
+            fatturato_totale = EXCLUDED.fatturato_totale,
+            fatturato_consegna = EXCLUDED.fatturato_consegna,
+            fatturato_asporto = EXCLUDED.fatturato_asporto,
+            ordine_medio = EXCLUDED.ordine_medio,
+            tempo_medio_preparazione = EXCLUDED.tempo_medio_preparazione,
+            tempo_medio_consegna = EXCLUDED.tempo_medio_consegna,
+            prodotti_top = EXCLUDED.prodotti_top,
+            updated_at = now()
+        RETURNING data
+    ),
+    emptied AS (
+        DELETE FROM statistiche_giornaliere s
+        USING touched_days d
+        WHERE s.organization_id = p_organization_id
+          AND s.data = d.data
+          AND NOT EXISTS (SELECT 1 FROM totals t WHERE t.data = d.data)
+        RETURNING s.data
+    )
+    SELECT (SELECT count(*) FROM upserted) + (SELECT count(*) FROM emptied) INTO v_days;
+
+    RETURN v_days;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION refresh_statistiche_giornaliere(UUID, TIMESTAMPTZ, TEXT) TO authenticated;
+"""
+
+
+def estimate_payload(finding: AggregationFinding, schema: SchemaModel, rows: int) -> Tuple[int, int]:
+    """(bytes downloaded today, bytes of the aggregate response) for `rows` fetched rows"""
+    before = 0
+    for chain in finding.chains:
+        table = schema.table(chain.table)
+        if not table:
+            continue
+        select = chain.select
+        per_row = table.row_json_bytes(None if select is None or select.star else select.columns)
+        if select:
+            for embed, spec in select.embeds.items():
+                child = schema.table(select.embed_tables[embed])
+                if child:
+                    child_bytes = child.row_json_bytes(None if spec.star else spec.columns)
+                    # Order-like parents carry ~3 line items each
+                    per_row += child_bytes * (3 if child.name.endswith('_items') else 1)
+        before += per_row * rows // max(1, len(finding.chains))
+    after = 0
+    for aggregate in finding.aggregates:
+        after += len(aggregate.label) + 16
+        if aggregate.group_sql:
+            after += 24 * 30
+    return before, after
+
+
+def rollup_compatible(finding: AggregationFinding) -> bool:
+    """Order totals with no finer-than-day grouping fit the daily rollup"""
+    return all(site.table == 'ordini' for site in finding.sites) and not any(
+        a.group_sql and 'extract(hour' in a.group_sql for a in finding.aggregates
+    )
+
+
+def print_findings(findings: List[AggregationFinding], schema: SchemaModel, rows: int):
+    print(f"\n📊 {len(findings)} providers aggregate fetched rows in Dart")
+    for finding in findings:
+        name = finding.provider.name if finding.provider else finding.owner
+        print(f"\n🔌 {name} ({finding.source.rel})")
+        for site in finding.sites:
+            lines = ', '.join(str(c.line) for c in site.chains)
+            print(f"  📥 {site.name}: {len(site.chains)} fetch(es) of {site.table} (line {lines})")
+        groups = sum(1 for a in finding.aggregates if a.group_sql)
+        print(f"  ➕ {len(finding.aggregates)} aggregates ({groups} grouped) -> {finding.rpc_name}()")
+        before, after = estimate_payload(finding, schema, rows)
+        print(f"  📦 ~{before / 1024:.0f} KB per {rows} rows today -> ~{after / 1024:.1f} KB")
+        if rollup_compatible(finding):
+            print("  🗓️ per-day figures: can also read statistiche_giornaliere (refresh_statistiche_giornaliere)")
+        for message in finding.untranslated:
+            print(f"  ⚠️ not translated: {message}")
+        for consumer in finding.row_consumers:
+            print(f"  ⚠️ still needs rows: {consumer} (keep a bounded query)")
+
+
+# ---------------------------------------------------------------------------
+# Select-column pruning
+# ---------------------------------------------------------------------------
+
+class ResultUse:
+    """How a row (or list of rows) is consumed: Freezed models, row['key'] reads, escapes"""
+
+    def __init__(self):
+        self.models: Set[str] = set()
+        self.keys: Set[str] = set()
+        self.escapes: List[str] = []
+        self.row_names: Set[str] = set()
+
+    def merge(self, other: 'ResultUse'):
+        self.models |= other.models
+        self.keys |= other.keys
+        self.escapes.extend(other.escapes)
+
+
+class DecoderIndex:
+    """Hand-written `X.fromJson(json)` factories and `parseXFromJson(Map json)` helpers"""
+
+    PARAM = re.compile(r'\(\s*(?:Map(?:<\s*String\s*,\s*dynamic\s*>)?|dynamic)\s+(\w+)\s*\)\s*(?:async\s*)?$')
+
+    def __init__(self, models: Dict[str, FreezedModel]):
+        self.models = models
+        self.by_name: Dict[str, List[Tuple[DartFile, Block, str]]] = {}
+        self.uses: Dict[Tuple[str, int], ResultUse] = {}
+        for path in dart_files():
+            source = DartFile(path)
+            for block in source.blocks:
+                if block.kind != 'function' or not block.name:
+                    continue
+                header = source.masked[block.header_start:block.body_start].rstrip().rstrip('=>').rstrip()
+                param = self.PARAM.search(header)
+                if not param:
+                    continue
+                entry = (source, block, param.group(1))
+                self.by_name.setdefault(block.qualified_name, []).append(entry)
+                self.by_name.setdefault(block.name, []).append(entry)
+
+    def resolve(self, callee: str, source: DartFile) -> Optional[Tuple[DartFile, Block, str]]:
+        candidates = self.by_name.get(callee) or self.by_name.get(callee.split('.')[-1]) or []
+        local = [c for c in candidates if c[0].path == source.path]
+        if local:
+            return local[0]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def use_of(self, entry: Tuple[DartFile, Block, str]) -> ResultUse:
+        source, block, param = entry
+        key = (str(source.path), block.body_start)
+        if key not in self.uses:
+            self.uses[key] = ResultUse()         # recursion guard
+            use = ResultUse()
+            use.row_names.add(param)
+            trace_rows(use, source, block.body_start, block.body_end, set(), [], self)
+            self.uses[key] = use
+        return self.uses[key]
+
+
+LAMBDA_METHODS = {'map', 'where', 'forEach', 'any', 'every', 'firstWhere', 'lastWhere', 'expand'}
+NEUTRAL_MEMBERS = {'length', 'isEmpty', 'isNotEmpty', 'toList', 'cast', 'whereType', 'toSet', 'hashCode'}
+SINGLE_ROW_METHODS = {'first', 'last', 'single', 'firstWhere', 'lastWhere', 'firstOrNull', 'elementAt'}
+CALLEE_BEFORE_ARG = re.compile(
+    r'(?<![\w.$])((?:[A-Z]\w*\.)?\w+)\s*\(\s*$'
+)
+
+
+def trace_result_use(chain: QueryChain, scope_start: int, scope_end: int, decoders: DecoderIndex) -> ResultUse:
+    """Follow a query result through casts, loops and lambdas to fromJson() / row['key'] reads"""
+    source = chain.source
+    masked = source.masked
+    use = ResultUse()
+    pending: List[int] = []                     # offsets right after a row-valued expression
+    seen_names: Set[str] = set()
+    start = chain.end
+    if chain.extended_by:
+        # `query = query.eq(...)` builder: the rows appear where the builder is awaited
+        seen_names.add(chain.variable)
+        start = chain.extended_by[0]
+        for offset in chain.extended_by:
+            statement = re.compile(r'(?:(\w+)\s*=\s*)?await\s+\w+').match(masked, offset)
+            if not statement:
+                continue
+            if statement.group(1) and statement.group(1) != chain.variable:
+                use.row_names.add(statement.group(1))
+            elif not statement.group(1):
+                pending.append(chain_calls(source, statement.end())[1])
+    elif chain.variable:
+        use.row_names.add(chain.variable)
+    else:
+        pending.append(chain.end)
+
+    trace_rows(use, source, scope_start, scope_end, seen_names, pending, decoders, start)
+    return use
+
+
+def trace_rows(use: ResultUse, source: DartFile, scope_start: int, scope_end: int, seen_names: Set[str],
+               pending: List[int], decoders: DecoderIndex, first_use: Optional[int] = None):
+    masked = source.masked
+    while pending or use.row_names - seen_names:
+        for name in sorted(use.row_names - seen_names):
+            seen_names.add(name)
+            start = max(scope_start, first_use or scope_start)
+            for match in re.finditer(r'(?<!\w)(?<![\w)\]]\.)%s\b' % re.escape(name), masked[start:scope_end]):
+                offset = start + match.start()
+                after = masked[offset + len(name):offset + len(name) + 12]
+                prefix = masked[max(scope_start, offset - 160):offset]
+                # Declarations of the loop/lambda variable itself
+                if re.search(r'(?:\bfor\s*\(\s*(?:final|var)?\s*(?:[\w<>?,]+\s+)?|[(,]\s*)$', prefix) and \
+                        re.match(r'\s*(?:\bin\b|\)\s*(?:=>|\{|async))', after):
+                    continue
+                if re.search(r'\b(?:final|var|late|[\w<>?,]+)\s+$', prefix) and re.match(r'\s*=(?!=)', after):
+                    continue
+                classify_occurrence(use, source, offset, name, prefix, decoders)
+        while pending:
+            classify_tail(use, source, pending.pop(), None)
+
+
+def classify_occurrence(use: ResultUse, source: DartFile, offset: int, name: str, prefix: str,
+                        decoders: DecoderIndex):
+    masked = source.masked
+    if name and re.match(r'\s*(?:\??\[|[?!]?\.(?!\.))', masked[offset + len(name):]):
+        # row['key'] / rows.map(...) — whatever encloses it only sees the result
+        classify_tail(use, source, offset + len(name), None)
+        return
+    spread = re.search(r'(\w+)\s*=\s*\[[^;]*\.\.\.\s*$', prefix)
+    if spread:
+        use.row_names.add(spread.group(1))
+        return
+    loop = re.search(r'\bfor\s*\(\s*(?:final|var)?\s*(?:[\w<>?,]+\s+)?(\w+)\s+in\s+\(?\s*$', prefix)
+    if loop:
+        use.row_names.add(loop.group(1))
+        return
+
+    copy = re.search(r'\b(?:List|Map)(?:<[^<>]*>)?\.from\s*\(\s*$', prefix)
+    if copy:
+        # Map<String, dynamic>.from(row) is still the row
+        copy_start = offset - len(prefix) + copy.start()
+        copy_end = source.close_of(offset - len(prefix) + copy.end() - 1) + 1
+        outer_prefix = masked[max(0, copy_start - 160):copy_start]
+        classify_occurrence(use, source, copy_end, '', outer_prefix, decoders)
+        return
+
+    call = CALLEE_BEFORE_ARG.search(prefix)
+    if call and call.group(1) not in ('if', 'while', 'switch', 'return', 'await'):
+        callee = call.group(1)
+        model = re.match(r'^([A-Z]\w*)\.fromJson$', callee)
+        if model and model.group(1) in decoders.models:
+            use.models.add(model.group(1))
+            return
+        entry = decoders.resolve(callee, source)
+        if entry:
+            use.merge(decoders.use_of(entry))
+            return
+        if re.match(r'^(?:debugPrint|print|Logger\.\w+)$', callee):
+            return
+        note(use.escapes, f"{source.rel}:{source.line_of(offset)}: passed to {callee}()")
+        return
+
+    assign = re.search(r'(\w+)\s*=\s*(?:await\s+)?\(?\s*$', prefix)
+    if assign and not re.search(r'[=!<>]=\s*\(?\s*$', prefix):
+        classify_tail(use, source, offset + len(name), assign.group(1))
+        return
+    classify_tail(use, source, offset + len(name), None)
+
+
+def classify_tail(use: ResultUse, source: DartFile, offset: int, target: Optional[str]):
+    """Classify what happens right after a row-valued expression ending at `offset`"""
+    masked, text = source.masked, source.text
+    i = offset
+    while True:
+        cast = re.compile(r'\s*(?:as\s+[\w<>?, ]+?(?=[\s).;,\]]))?\s*\)?').match(masked, i)
+        i = cast.end() if cast else i
+        key = re.compile(r"\s*\??\[\s*'(\w+)'\s*\](\s*=(?!=))?").match(text, i)
+        if key:
+            if not key.group(2):                 # row['x'] = ... writes, not reads
+                use.keys.add(key.group(1))
+            return
+        member = re.compile(r'\s*[?!]?\.\s*(\w+)\s*(?:<[^<>()]*(?:<[^<>()]*>)?[^<>()]*>)?\s*(\()?').match(masked, i)
+        if not member:
+            break
+        method = member.group(1)
+        if member.group(2):
+            close = source.close_of(member.end() - 1)
+            args = text[member.end():close]
+            param = re.match(r'\s*\(\s*(?:\w+\s*,\s*)?(\w+)\s*\)\s*(?:=>|\{)', args)
+            if method in LAMBDA_METHODS and param:
+                use.row_names.add(param.group(1))
+            elif method == 'fold' and re.search(r'\(\s*\w+\s*,\s*(\w+)\s*\)\s*(?:=>|\{)', args):
+                use.row_names.add(re.search(r'\(\s*\w+\s*,\s*(\w+)\s*\)', args).group(1))
+            elif method in ('containsKey',):
+                use.keys.add(first_string(args) or '')
+                return
+            elif method not in NEUTRAL_MEMBERS | SINGLE_ROW_METHODS:
+                note(use.escapes, f"{source.rel}:{source.line_of(member.start(1))}: .{method}(...)")
+                return
+            i = close + 1
+            if method in ('map', 'expand', 'fold', 'any', 'every', 'forEach'):
+                return                   # result no longer holds rows
+            continue
+        if method in NEUTRAL_MEMBERS | SINGLE_ROW_METHODS:
+            i = member.end()
+            if method in ('length', 'isEmpty', 'isNotEmpty', 'hashCode'):
+                return
+            continue
+        note(use.escapes, f"{source.rel}:{source.line_of(member.start(1))}: .{method}")
+        return
+
+    rest = masked[i:i + 20]
+    if target:
+        use.row_names.add(target)
+        return
+    if re.match(r'\s*(?:[=!]=\s*null|\?\?|is\b)', rest) or re.match(r'\s*(?:[;,)]|$)', rest) and \
+            re.search(r'\b(?:if|while)\s*\(\s*!?\s*$', masked[max(0, offset - 80):offset - 1]):
+        return
+    context = ' '.join(text[max(0, offset - 40):i + 20].split())
+    note(use.escapes, f"{source.rel}:{source.line_of(offset)}: `{context}`")
+
+
+class SelectPruning:
+    def __init__(self, chain: QueryChain, use: ResultUse, columns: List[str], total_columns: int,
+                 row_bytes: int, pruned_bytes: int, rows: int):
+        self.chain = chain
+        self.use = use
+        self.columns = columns
+        self.total_columns = total_columns
+        self.row_bytes = row_bytes
+        self.pruned_bytes = pruned_bytes
+        self.rows = rows
+
+    @property
+    def saved_bytes(self) -> int:
+        return (self.row_bytes - self.pruned_bytes) * self.rows
+
+    @property
+    def select_literal(self) -> str:
+        select = self.chain.select
+        parts = list(self.columns)
+        if select:
+            for alias, spec in select.embeds.items():
+                table = select.embed_tables[alias]
+                inner = spec.raw.strip() if spec.raw is not None else '*'
+                prefix = f"{alias}:{table}" if alias != table else table
+                parts.append(f"{prefix}({inner})")
+        return "'" + ', '.join(parts) + "'"
+
+
+def select_prunings(schema: SchemaModel, models: Dict[str, FreezedModel],
+                    paths: Optional[List[Path]], default_rows: int) -> Tuple[List[SelectPruning], List[Tuple[QueryChain, str]]]:
+    """Bare/star selects whose consumers only read known columns"""
+    constants = table_constants()
+    decoders = DecoderIndex(models)
+    prunings = []
+    skipped = []
+    for path in dart_files(paths):
+        source = DartFile(path)
+        chains = [c for c in find_query_chains(source, constants) if c.is_read and c.operation == 'select']
+        if not chains:
+            continue
+        providers = find_providers(source)
+        for chain in chains:
+            select = chain.select
+            table = schema.table(chain.table or '')
+            if not select or not select.star or not table:
+                continue
+            if select.raw is None and chain.select_call.args.strip():
+                continue                         # .select(columnsVariable)
+            scope = scope_of(chain, providers)
+            if not scope:
+                skipped.append((chain, 'not inside a function'))
+                continue
+            use = trace_result_use(chain, scope[0], scope[1], decoders)
+            if use.escapes:
+                skipped.append((chain, f"rows escape: {use.escapes[0]}"))
+                continue
+            if not use.models and not use.keys:
+                skipped.append((chain, 'no column reads found'))
+                continue
+
+            needed = set(k for k in use.keys if k in table.columns)
+            for model_name in use.models:
+                needed |= set(models[model_name].columns(table.columns).values())
+            embeds = set(select.embeds)
+            missing = [k for k in use.keys if k not in table.columns and k not in embeds]
+            if missing:
+                skipped.append((chain, f"reads keys not in {table.name}: {', '.join(sorted(missing))}"))
+                continue
+            # Keep table order so the diff is stable and readable
+            columns = [c for c in table.columns if c in needed]
+            if not columns or len(columns) == len(table.columns):
+                continue
+            prunings.append(SelectPruning(
+                chain, use, columns, len(table.columns), table.row_json_bytes(), table.row_json_bytes(columns),
+                expected_rows(chain, default_rows),
+            ))
+    return prunings, skipped
+
+
+def expected_rows(chain: QueryChain, default_rows: int) -> int:
+    if chain.has('single', 'maybeSingle') or 'id' in chain.filter_columns('eq'):
+        return 1
+    for call in chain.calls_named('limit'):
+        literal = re.match(r'\s*(\d+)', call.args)
+        if literal:
+            return int(literal.group(1))
+    return default_rows
+
+
+def apply_prunings(prunings: List[SelectPruning]) -> int:
+    """Rewrite the select() arguments in place; returns files written"""
+    by_file: Dict[Path, List[SelectPruning]] = {}
+    for pruning in prunings:
+        by_file.setdefault(pruning.chain.source.path, []).append(pruning)
+
+    written = 0
+    for path, items in by_file.items():
+        source = items[0].chain.source
+        edits = SourceEdits(source.text, path)
+        for pruning in items:
+            call = pruning.chain.select_call
+            open_index = source.masked.index('(', call.offset)
+            edits.replace(open_index + 1, source.close_of(open_index), pruning.select_literal,
+                          f"{pruning.chain.table} select at line {pruning.chain.line}")
+        if edits.write():
+            print(f"  ✅ {source.rel}: {edits.stats()}")
+            written += 1
+    return written
+
+
+def print_prunings(prunings: List[SelectPruning], skipped: List[Tuple[QueryChain, str]]):
+    print(f"\n✂️  {len(prunings)} bare selects can be pruned")
+    for pruning in sorted(prunings, key=lambda p: -p.saved_bytes):
+        chain = pruning.chain
+        models = ', '.join(sorted(pruning.use.models)) or "row['...'] reads"
+        print(f"\n  {chain.source.rel}:{chain.line} {chain.table} -> {models}")
+        print(f"    .select({pruning.select_literal})")
+        print(f"    {len(pruning.columns)}/{pruning.total_columns} columns, "
+              f"{pruning.row_bytes} -> {pruning.pruned_bytes} B/row, "
+              f"~{pruning.saved_bytes / 1024:.1f} KB saved per call ({pruning.rows} rows)")
+    if skipped:
+        print(f"\n⏭️  {len(skipped)} star selects left alone:")
+        for chain, reason in skipped:
+            print(f"  {chain.source.rel}:{chain.line} {chain.table}: {reason}")
+
+
+# ---------------------------------------------------------------------------
+# Unbounded reads
+# ---------------------------------------------------------------------------
+
+# Rows added per tenant, as a multiple of the daily order volume. Tables that
+# are not listed are catalogs: they grow with the menu, not with time.
+GROWTH_PER_ORDER = {
+    'ordini': 1.0,
+    'ordini_items': 2.5,
+    'notifiche': 2.0,
+    'inventory_logs': 4.0,
+    'payment_transactions': 0.6,
+    'cashier_customers': 0.1,
+    'order_reminders': 0.05,
+}
+GROWTH_PER_DAY = {
+    'statistiche_giornaliere': 1.0,
+    'daily_order_counters': 1.0,
+}
+
+# Distinct values behind scoping columns that point at profiles, which are
+# shared by customers, kitchen and delivery staff
+SCOPE_POPULATION = {
+    'cliente_id': 2000,
+    'user_id': 2000,
+    'assegnato_delivery_id': 4,
+    'assegnato_cucina_id': 4,
+    'created_by': 6,
+}
+
+# Columns that reference a parent row without a foreign key
+SOFT_REFERENCES = {
+    ('inventory_logs', 'reference_id'): 'ordini',
+}
+
+PAGE_METHODS = {'order', 'limit', 'range', 'single', 'maybeSingle'}
+DEFAULT_PAGE_SIZE = 50
+
+
+class GrowthModel:
+    """Rows per tenant after `days` at `orders_per_day`"""
+
+    def __init__(self, schema: SchemaModel, orders_per_day: int, days: int):
+        self.schema = schema
+        self.orders_per_day = orders_per_day
+        self.days = days
+
+    def rows(self, table: str) -> float:
+        if table in GROWTH_PER_ORDER:
+            return GROWTH_PER_ORDER[table] * self.orders_per_day * self.days
+        return GROWTH_PER_DAY.get(table, 0.0) * self.days
+
+    def grows(self, table: str) -> bool:
+        return self.rows(table) > 0
+
+    def parent_of(self, table: str, column: str) -> Optional[str]:
+        if (table, column) in SOFT_REFERENCES:
+            return SOFT_REFERENCES[(table, column)]
+        schema_table = self.schema.table(table)
+        for fk in schema_table.foreign_keys if schema_table else []:
+            if fk.columns == [column]:
+                return fk.ref_table
+        return None
+
+    def scope_rows(self, table: str, column: str) -> float:
+        """Rows of `table` sharing one value of `column`"""
+        total = self.rows(table)
+        if column == 'organization_id':
+            return total
+        if column in SCOPE_POPULATION:
+            return total / SCOPE_POPULATION[column]
+        parent = self.parent_of(table, column)
+        if parent and self.grows(parent):
+            return total / self.rows(parent)
+        # Flags and non-key columns do not bound anything
+        return total
+
+    def fanout(self, parent: str, child: str) -> float:
+        """Embedded `child` rows per `parent` row"""
+        if any(fk.table == child for fk in self.schema.references_to(parent)) and self.grows(parent):
+            return self.rows(child) / self.rows(parent)
+        return 1.0
+
+
+class UnboundedRead:
+    def __init__(self, chain: QueryChain, scope: str, rows: float, row_bytes: int,
+                 sort_column: str, descending: bool, index: Optional[str], page_size: int):
+        self.chain = chain
+        self.scope = scope                    # narrowest equality column
+        self.rows = rows
+        self.row_bytes = row_bytes
+        self.sort_column = sort_column
+        self.descending = descending
+        self.index = index                    # existing keyset index, if any
+        self.page_size = page_size
+
+    @property
+    def payload_bytes(self) -> int:
+        return int(self.rows * self.row_bytes)
+
+    @property
+    def page_bytes(self) -> int:
+        return int(min(self.rows, self.page_size) * self.row_bytes)
+
+    @property
+    def index_name(self) -> str:
+        scope = 'org' if self.scope == 'organization_id' else re.sub(r'_id$', '', self.scope)
+        return f"idx_{self.chain.table}_{scope}_{self.sort_column}_keyset"
+
+    @property
+    def index_sql(self) -> str:
+        direction = ' DESC' if self.descending else ''
+        columns = [self.scope, f"{self.sort_column}{direction}"]
+        if self.sort_column != 'id':
+            columns.append(f"id{direction}")
+        return f"CREATE INDEX IF NOT EXISTS {self.index_name} ON {self.chain.table} ({', '.join(columns)});"
+
+
+def order_of(chain: QueryChain, table: Table) -> Tuple[str, bool]:
+    """Keyset sort column and direction: the chain's first .order(), else created_at desc"""
+    for call in chain.calls_named('order'):
+        column = call.first_string
+        if column in table.columns:
+            # supabase_flutter's order() defaults to ascending: false
+            return column, not re.search(r'ascending\s*:\s*true', call.args)
+    return ('created_at' if 'created_at' in table.columns else 'id'), True
+
+
+def keyset_index(schema: SchemaModel, table: str, scope: str, sort_column: str) -> Optional[str]:
+    wanted = [scope] if sort_column == 'id' else [scope, sort_column]
+    for index in schema.indexes_on(table):
+        columns = [c.split()[0] for c in index.columns]
+        if columns[:len(wanted)] == wanted and not index.predicate:
+            return index.name
+    return None
+
+
+def embedded_row_bytes(schema: SchemaModel, growth: GrowthModel, table: str, select) -> int:
+    extra = 0
+    for alias, spec in select.embeds.items():
+        child = schema.table(select.embed_tables[alias])
+        if not child:
+            continue
+        columns = None if spec.star else spec.columns
+        extra += len(alias) + 3 + int(child.row_json_bytes(columns) * growth.fanout(table, child.name))
+    return extra
+
+
+def unbounded_reads(schema: SchemaModel, growth: GrowthModel, paths: Optional[List[Path]],
+                    page_size: int = DEFAULT_PAGE_SIZE) -> Tuple[List[UnboundedRead], int]:
+    """Reads on ORG_TABLES without a row bound or time filter, largest expected payload first
+
+    Also returns how many unbounded reads hit catalog tables and were left alone.
+    """
+    constants = table_constants()
+    reads = []
+    catalog = 0
+    for path in dart_files(paths):
+        source = DartFile(path)
+        providers = None
+        for chain in find_query_chains(source, constants):
+            if chain.table not in ORG_TABLES or not chain.is_read:
+                continue
+            if chain.row_bounded or chain.time_filtered or chain.select_head:
+                continue
+            if chain.operation == 'stream' and chain.variable:
+                # `streamToListen = query.eq(...).limit(50)` in each branch
+                providers = providers if providers is not None else find_providers(source)
+                if all(sub.bounded for sub in stream_subscriptions(chain, providers)):
+                    continue
+            if 'id' in chain.filter_columns('inFilter', 'in_'):
+                continue                         # bounded by the id list
+            table = schema.table(chain.table)
+            if not table:
+                continue
+            if not growth.grows(table.name):
+                catalog += 1
+                continue
+
+            scope = 'organization_id'
+            rows = growth.rows(table.name)
+            for column in chain.filter_columns('eq'):
+                scoped = growth.scope_rows(table.name, column)
+                if scoped < rows:
+                    scope, rows = column, scoped
+            if rows <= page_size:
+                continue                         # e.g. reminders of one order
+
+            select = chain.select
+            if select and not select.star:
+                row_bytes = table.row_json_bytes(select.columns)
+            else:
+                row_bytes = table.row_json_bytes()
+            if select:
+                row_bytes += embedded_row_bytes(schema, growth, table.name, select)
+
+            sort_column, descending = order_of(chain, table)
+            reads.append(UnboundedRead(
+                chain, scope, rows, row_bytes, sort_column, descending,
+                keyset_index(schema, table.name, scope, sort_column), page_size,
+            ))
+    reads.sort(key=lambda r: -r.payload_bytes)
+    return reads, catalog
+
+
+def chain_receiver(chain: QueryChain) -> str:
+    prefix = chain.source.masked[chain.start:chain.root_offset].rstrip().rstrip('.').rstrip()
+    receiver = re.search(r'[\w.]+$', prefix)
+    return receiver.group(0) if receiver else 'Supabase.instance.client'
+
+
+def render_call(call: Call) -> str:
+    return f".{call.name}({' '.join(call.args.split())})"
+
+
+def keyset_rewrite(read: UnboundedRead) -> str:
+    """Dart for one keyset page: filters, then (sort, id) cursor, then order + limit"""
+    chain = read.chain
+    sort, comparison = read.sort_column, 'lt' if read.descending else 'gt'
+    ascending = 'false' if read.descending else 'true'
+    kept = [render_call(c) for c in chain.calls if c.name not in PAGE_METHODS]
+    page = [f".order('{sort}', ascending: {ascending})"]
+    if sort != 'id':
+        page.append(f".order('id', ascending: {ascending})")
+    page.append(".limit(pageSize)")
+
+    if chain.operation == 'stream':
+        # A stream cannot take the .or() cursor: keep the newest window live
+        # and load older history with the keyset select
+        return '\n'.join([chain_receiver(chain)] + [f"    {c}" for c in kept + page[:1] + page[-1:]]) + ';'
+
+    lines = [f"var query = {chain_receiver(chain)}"]
+    lines += [f"    {c}" for c in kept]
+    lines[-1] += ';'
+    if sort == 'id':
+        cursor = [f"query = query.{comparison}('id', cursorId);"]
+    else:
+        # The .or() alone is only a filter: the inclusive bound is what lets
+        # the index scan start at the cursor instead of at the newest row
+        bound = 'lte' if read.descending else 'gte'
+        cursor = [
+            f"query = query.{bound}('{sort}', cursor)",
+            f"    .or('{sort}.{comparison}.\"$cursor\",and({sort}.eq.\"$cursor\",id.{comparison}.$cursorId)');",
+        ]
+    lines += ["if (cursorId != null) {"] + [f"  {c}" for c in cursor] + [
+        "}",
+        "final page = await query",
+    ]
+    lines += [f"    {c}" for c in page]
+    lines[-1] += ';'
+    return '\n'.join(lines)
+
+
+def print_unbounded(reads: List[UnboundedRead], catalog: int, growth: GrowthModel):
+    print(f"\n📈 {len(reads)} unbounded reads on growing tables "
+          f"({growth.orders_per_day} orders/day over {growth.days} days)")
+    for read in reads:
+        chain = read.chain
+        scope = 'whole tenant' if read.scope == 'organization_id' else f"one {read.scope}"
+        print(f"\n  {chain.source.rel}:{chain.line} {chain.table}.{chain.operation} ({scope})")
+        print(f"    ~{read.rows:,.0f} rows x {read.row_bytes} B = ~{read.payload_bytes / 1024:,.0f} KB per call"
+              f" -> {read.page_size}-row page ~{read.page_bytes / 1024:.1f} KB")
+        if read.index:
+            print(f"    keyset index: {read.index}")
+        else:
+            print(f"    keyset index missing: {read.index_sql}")
+        for line in keyset_rewrite(read).splitlines():
+            print(f"      {line}")
+    if catalog:
+        print(f"\n⏭️  {catalog} unbounded reads on catalog tables left alone (bounded by menu size)")
+
+
+# ---------------------------------------------------------------------------
+# Realtime subscriptions
+# ---------------------------------------------------------------------------
+
+# Realtime change events per order: the insert, status updates and the
+# printed/pagato flags for ordini; config tables only change on edits
+EVENTS_PER_ORDER = {
+    'ordini': 7.0,
+    'ordini_items': 2.5,
+    'notifiche': 2.0,
+    'inventory_logs': 4.0,
+    'payment_transactions': 1.2,
+    'daily_order_counters': 1.0,
+    'cashier_customers': 0.3,
+    'order_reminders': 0.1,
+}
+CONFIG_EDITS_PER_HOUR = 0.5
+HIGH_CHURN_EVENTS = 1.0
+ORDER_LIFETIME_SECONDS = 45 * 60
+
+# Builder calls a .stream() accepts; the first filter is the only one sent to
+# Realtime as a postgres_changes filter
+STREAM_METHODS = {'eq', 'neq', 'lt', 'lte', 'gt', 'gte', 'inFilter', 'order', 'limit'}
+
+
+class Subscription:
+    """One way a .stream() chain can be opened: base calls plus one branch"""
+
+    def __init__(self, chain: QueryChain, calls: List[Call], offset: int,
+                 guards: List[Optional[str]], variable: Optional[str]):
+        self.chain = chain
+        self.calls = calls
+        self.offset = offset
+        self.guards = guards
+        self.variable = variable              # name the opened stream is assigned to
+        self.callers: List[Tuple[str, int, List[str]]] = []   # (file, line, named args)
+        self.refetch: Optional[QueryChain] = None
+
+    @property
+    def line(self) -> int:
+        return self.chain.source.line_of(self.offset)
+
+    @property
+    def filters(self) -> List[Tuple[str, str, str]]:
+        return [(c.name, c.first_string, c.args) for c in self.calls
+                if c.name in FILTER_METHODS and c.first_string]
+
+    @property
+    def server_filter(self) -> Optional[str]:
+        return self.filters[0][1] if self.filters else None
+
+    @property
+    def limit(self) -> Optional[int]:
+        for call in self.calls:
+            if call.name == 'limit':
+                literal = re.search(r'\d+', call.args)
+                return int(literal.group(0)) if literal else None
+        return None
+
+    @property
+    def order(self) -> Optional[str]:
+        for call in self.calls:
+            if call.name == 'order':
+                return call.first_string
+        return None
+
+    @property
+    def bounded(self) -> bool:
+        """This branch applies a row bound, an id filter or a time filter"""
+        return any(c.name in ROW_BOUND_METHODS | TIME_FILTER_METHODS for c in self.calls) or any(
+            method == 'eq' and column == 'id' for method, column, _ in self.filters
+        )
+
+    @property
+    def label(self) -> str:
+        guards = [g if g is not None else '<untranslated>' for g in self.guards]
+        return ' && '.join(guards) if guards else 'always'
+
+
+class RealtimeLoad:
+    """Messages per client from a synthetic per-tenant order rate"""
+
+    def __init__(self, orders_per_hour: float, tenants: int):
+        self.orders_per_hour = orders_per_hour
+        self.tenants = tenants
+
+    def tenant_events(self, table: str) -> float:
+        """Change events per second on `table` for one tenant"""
+        if table in EVENTS_PER_ORDER:
+            return self.orders_per_hour * EVENTS_PER_ORDER[table] / 3600
+        return CONFIG_EDITS_PER_HOUR / 3600
+
+    def delivered(self, sub: Subscription) -> float:
+        """Events per second that reach one subscribed client"""
+        table = sub.chain.table
+        rate = self.tenant_events(table)
+        columns = [column for method, column, _ in sub.filters if method == 'eq']
+        if 'id' in columns:
+            return EVENTS_PER_ORDER.get(table, 1.0) / ORDER_LIFETIME_SECONDS
+        for column in columns:
+            if column in SCOPE_POPULATION:
+                rate = min(rate, self.tenant_events(table) / SCOPE_POPULATION[column])
+        return rate
+
+    def evaluated(self, sub: Subscription) -> float:
+        """Events per second Realtime has to authorize for one subscribed client"""
+        if sub.server_filter in ('organization_id', 'id') or sub.server_filter in SCOPE_POPULATION:
+            return self.delivered(sub)
+        # RLS-only: every tenant's changes are checked against this client
+        return self.tenant_events(sub.chain.table) * self.tenants
+
+    @staticmethod
+    def high_churn(table: str) -> bool:
+        return EVENTS_PER_ORDER.get(table, 0.0) >= HIGH_CHURN_EVENTS
+
+
+def stream_scope(chain: QueryChain, providers: List[Provider]) -> Tuple[int, int, Optional[Provider]]:
+    scope = scope_of(chain, providers)
+    if scope:
+        return scope[0], scope[1], scope[3]
+    return chain.end, len(chain.source.text), None
+
+
+def stream_subscriptions(chain: QueryChain, providers: List[Provider]) -> List[Subscription]:
+    """Split a .stream() chain into the subscriptions its branches can open"""
+    source = chain.source
+    masked = source.masked
+    start, end, _ = stream_scope(chain, providers)
+    base = [c for c in chain.calls if c.offset < chain.end]
+    if not chain.variable:
+        return [Subscription(chain, base, chain.root_offset, guards_between(source, start, chain.root_offset), None)]
+
+    branches = []
+    pattern = re.compile(r'(?<![\w.])%s(?=\s*\.\s*\w+\s*\()' % re.escape(chain.variable))
+    for match in pattern.finditer(masked, chain.end, end):
+        calls, _ = chain_calls(source, match.end())
+        kept = []
+        for call in calls:
+            if call.name not in STREAM_METHODS:
+                break
+            kept.append(call)
+        assigned = re.search(r'(\w+)\s*=\s*$', masked[statement_start(source, match.start()):match.start()])
+        if assigned and assigned.group(1) == chain.variable:
+            base.extend(kept)                    # `query = query.eq(...)`
+            continue
+        branches.append((match.start(), kept, assigned.group(1) if assigned else None))
+
+    if not branches:
+        return [Subscription(chain, base, chain.root_offset,
+                             guards_between(source, start, chain.root_offset), chain.variable)]
+    return [
+        Subscription(chain, base + kept, offset, guards_between(source, start, offset), variable or chain.variable)
+        for offset, kept, variable in branches
+    ]
+
+
+def guard_holds(guard: Optional[str], passed: Set[str]) -> Optional[bool]:
+    """Evaluate `x != null` style guards for a caller passing the named args in `passed`"""
+    if guard is None:
+        return None
+    guard = guard.strip()
+    negated = re.match(r'^!\((.*)\)$', guard, re.DOTALL)
+    if negated:
+        inner = guard_holds(negated.group(1), passed)
+        return None if inner is None else not inner
+    null_check = re.match(r'^(\w+)\s*(==|!=)\s*null$', guard)
+    if null_check:
+        present = null_check.group(1) in passed
+        return present if null_check.group(2) == '!=' else not present
+    return None
+
+
+class CallSiteIndex:
+    """Every `name(` call and `ref.watch(name` / `ref.listen(name` in lib/, by identifier"""
+
+    CALL = re.compile(r'(?<![\w$])([A-Za-z_$][\w$]*)\s*\(')
+    WATCH = re.compile(r'\bref\s*\.\s*(?:watch|listen)\s*\(\s*([A-Za-z_$][\w$]*)')
+
+    def __init__(self, sources: List[DartFile]):
+        self.calls: Dict[str, List[Tuple[DartFile, int]]] = {}
+        self.watches: Dict[str, List[Tuple[DartFile, int]]] = {}
+        for source in sources:
+            for match in self.CALL.finditer(source.masked):
+                self.calls.setdefault(match.group(1), []).append((source, match.start()))
+            for match in self.WATCH.finditer(source.masked):
+                self.watches.setdefault(match.group(1), []).append((source, match.start()))
+
+
+def find_callers(sub: Subscription, provider: Optional[Provider], call_sites: CallSiteIndex):
+    """Call sites that open this subscription (methods) or watch its provider"""
+    chain = sub.chain
+    if provider:
+        for source, start in call_sites.watches.get(provider.name, []):
+            sub.callers.append((source.rel, source.line_of(start), []))
+        return
+    if not chain.function or not chain.function.name:
+        return
+    function = chain.function
+    for source, start in call_sites.calls.get(function.name, []):
+        if source.path == chain.source.path and function.header_start <= start <= function.body_start:
+            continue
+        open_index = source.masked.index('(', start)
+        args = source.text[open_index + 1:source.close_of(open_index)]
+        passed = [m.group(1) for m in (re.match(r'\s*(\w+)\s*:', a) for a in split_commas(args, '()[]{}'))
+                  if m and not re.match(r'\s*\w+\s*:\s*null\s*$', m.string)]
+        if all(guard_holds(g, set(passed)) is not False for g in sub.guards):
+            sub.callers.append((source.rel, source.line_of(start), passed))
+
+
+def find_refetch(sub: Subscription, chains: List[QueryChain], end: int) -> Optional[QueryChain]:
+    """A select issued inside `await for (... in stream)`: a full re-query per event"""
+    if not sub.variable:
+        return None
+    source = sub.chain.source
+    pattern = re.compile(r'\bawait\s+for\s*\([^()]*\bin\s+%s\s*\)\s*\{' % re.escape(sub.variable))
+    for match in pattern.finditer(source.masked, sub.offset, end):
+        body_end = source.close_of(match.end() - 1)
+        for chain in chains:
+            if chain.is_read and chain.operation == 'select' and match.end() <= chain.root_offset <= body_end:
+                return chain
+    return None
+
+
+def realtime_subscriptions(schema: SchemaModel, paths: Optional[List[Path]],
+                           summaries: Optional[FileSummaries] = None) -> List[Subscription]:
+    """Realtime subscriptions opened in the given files, with the call sites that open them"""
+    constants = table_constants()
+    selected = dart_files(paths)
+    if summaries:
+        # --since: parse only the files calling .stream(), and search for
+        # callers only in the files naming what those files declare
+        streaming = set(summaries.files_with('member_calls', 'stream'))
+        selected = [p for p in selected if p not in summaries.files or p in streaming]
+    sources = {path: DartFile(path) for path in selected}
+    found = []
+    for source in sources.values():
+        chains = find_query_chains(source, constants)
+        streams = [c for c in chains if c.operation == 'stream']
+        if streams:
+            found.append((source, chains, streams, find_providers(source)))
+
+    if summaries:
+        names = {p.name for _, _, _, providers in found for p in providers} | \
+            {c.function.name for _, _, streams, _ in found for c in streams if c.function and c.function.name}
+        caller_files = sorted({path for name in names for path in summaries.files_with('words', name)})
+    else:
+        caller_files = dart_files(None)
+    call_sites = CallSiteIndex([sources.get(path) or DartFile(path) for path in caller_files])
+
+    subscriptions = []
+    for source, chains, streams, providers in found:
+        for chain in streams:
+            _, end, provider = stream_scope(chain, providers)
+            for sub in stream_subscriptions(chain, providers):
+                find_callers(sub, provider, call_sites)
+                sub.refetch = find_refetch(sub, chains, end)
+                subscriptions.append(sub)
+    return subscriptions
+
+
+def refetch_bytes(sub: Subscription, schema: SchemaModel, growth: GrowthModel) -> int:
+    """Bytes re-downloaded per event when every event triggers a select of the snapshot"""
+    chain = sub.refetch
+    table = schema.table(chain.table or '')
+    if not table:
+        return 0
+    select = chain.select
+    row_bytes = table.row_json_bytes(None if not select or select.star else select.columns)
+    if select:
+        row_bytes += embedded_row_bytes(schema, growth, table.name, select)
+    return row_bytes * expected_rows(chain, snapshot_rows(sub) or DEFAULT_PAGE_SIZE)
+
+
+def snapshot_rows(sub: Subscription) -> Optional[int]:
+    if 'id' in [column for method, column, _ in sub.filters if method == 'eq']:
+        return 1
+    return sub.limit
+
+
+def channel_rewrite(sub: Subscription) -> str:
+    """Filtered postgres_changes channel that patches a local list instead of re-reading it"""
+    table = sub.chain.table
+    column = sub.server_filter if sub.server_filter in ('id', 'cliente_id') else 'organization_id'
+    value = next((split_commas(args)[1].strip() for _, c, args in sub.filters
+                  if c == column and len(split_commas(args)) > 1), 'organizationId')
+    return '\n'.join([
+        f"final channel = {chain_receiver(sub.chain)}",
+        f"    .channel('{table}:${value}')",
+        "    .onPostgresChanges(",
+        "      event: PostgresChangeEvent.all,",
+        "      schema: 'public',",
+        f"      table: '{table}',",
+        "      filter: PostgresChangeFilter(",
+        "        type: PostgresChangeFilterType.eq,",
+        f"        column: '{column}',",
+        f"        value: {value},",
+        "      ),",
+        "      callback: (payload) {",
+        "        // Patch the cached list with payload.newRecord / payload.oldRecord",
+        "        // (insert/update/delete) instead of re-reading the snapshot",
+        "      },",
+        "    )",
+        "    .subscribe();",
+        "// dispose: _client.removeChannel(channel);",
+    ])
+
+
+def org_stream_rewrite(sub: Subscription) -> str:
+    """Same low-churn stream, filtered by tenant on the server and by the rest in Dart"""
+    chain = sub.chain
+    lines = [chain_receiver(chain)]
+    lines += [f"    {render_call(c)}" for c in chain.calls if c.name in ('from', 'stream')]
+    lines.append("    .eq('organization_id', organizationId)")
+    lines += [f"    {render_call(c)}" for c in sub.calls if c.name in ('order', 'limit')]
+    lines[-1] += ';'
+    moved = [f"row['{c}'] == {split_commas(args)[1].strip()}" for m, c, args in sub.filters
+             if m == 'eq' and len(split_commas(args)) > 1]
+    if moved:
+        lines.append(f"// then in Dart: rows.where((row) => {' && '.join(moved)})")
+    return '\n'.join(lines)
+
+
+def print_subscriptions(subscriptions: List[Subscription], schema: SchemaModel, load: RealtimeLoad,
+                        growth: GrowthModel) -> int:
+    print(f"\n📡 {len(subscriptions)} realtime subscriptions "
+          f"({load.orders_per_hour:g} orders/hour per tenant, {load.tenants} tenants)")
+    flagged = 0
+    for sub in subscriptions:
+        chain = sub.chain
+        owner = chain.function.qualified_name if chain.function else 'provider'
+        filters = ', '.join(f"{m}({c})" for m, c, _ in sub.filters) or 'none (RLS only)'
+        print(f"\n  {chain.source.rel}:{sub.line} {owner} -> {chain.table}")
+        print(f"    when: {sub.label}")
+        print(f"    filters: {filters}; order: {sub.order or '-'}; limit: {sub.limit or 'none'}")
+        if sub.callers:
+            for rel, line, passed in sub.callers:
+                args = f" ({', '.join(passed)})" if passed else ''
+                print(f"    opened by {rel}:{line}{args}")
+        else:
+            print("    opened by: no caller reaches this branch")
+
+        delivered = load.delivered(sub)
+        evaluated = load.evaluated(sub)
+        print(f"    ~{delivered:.3g} msg/s per client delivered, {evaluated:.3g} msg/s authorized server-side")
+
+        warnings = []
+        suggest = False
+        if sub.server_filter != 'organization_id' and not (
+                sub.server_filter == 'id' or sub.server_filter in SCOPE_POPULATION):
+            warnings.append(f"no organization_id filter: every tenant's {chain.table} changes "
+                            f"are checked against each client ({load.tenants}x)")
+            suggest = True
+        if load.high_churn(chain.table):
+            rows = snapshot_rows(sub)
+            warnings.append(f"high-churn table: ~{EVENTS_PER_ORDER[chain.table]:g} events per order, "
+                            f"each re-emits the {f'{rows}-row' if rows else 'unbounded'} snapshot")
+        if sub.refetch:
+            per_event = refetch_bytes(sub, schema, growth)
+            warnings.append(f"re-selects the snapshot on every event ({sub.refetch.source.rel}:{sub.refetch.line}): "
+                            f"~{per_event / 1024:.0f} KB/event, ~{per_event * delivered / 1024:.3g} KB/s per client")
+            suggest = True
+        for warning in warnings:
+            print(f"    ⚠️ {warning}")
+        if not suggest or not sub.callers:
+            continue
+        flagged += 1
+        if sub.refetch or load.high_churn(chain.table):
+            print("    💡 filtered postgres_changes channel instead of a full snapshot:")
+            rewrite = channel_rewrite(sub)
+        else:
+            print("    💡 low churn, keep the stream but filter by tenant on the server:")
+            rewrite = org_stream_rewrite(sub)
+        for line in rewrite.splitlines():
+            print(f"      {line}")
+    return flagged
+
+
+# ---------------------------------------------------------------------------
+# Edge function round trips
+# ---------------------------------------------------------------------------
+
+class EdgeStep:
+    """A round trip on an edge function's request path (helper calls inlined)"""
+
+    def __init__(self, index: int, trip: RoundTrip, via: List[str], branches: List[Branch]):
+        self.index = index
+        self.trip = trip
+        self.via = via                  # helper functions the call goes through
+        self.branches = branches        # enclosing blocks, handler first
+        self.data: Set[int] = set()     # steps whose results it reads
+        self.control: Set[int] = set()  # steps deciding whether it runs at all
+        self.error_path = False         # catch blocks and `if (xError)` compensations
+        self.wave: Optional[int] = None
+
+    @property
+    def line(self) -> int:
+        return self.trip.line
+
+    @property
+    def label(self) -> str:
+        return self.trip.label
+
+    @property
+    def kind(self) -> str:
+        return self.trip.kind
+
+    @property
+    def is_db(self) -> bool:
+        return self.trip.is_db
+
+    @property
+    def is_write(self) -> bool:
+        return self.trip.is_write
+
+    @property
+    def structure(self) -> Tuple[int, ...]:
+        """Loops and closures around the step; only steps sharing them can be batched"""
+        return tuple(b.brace for b in self.branches if b.kind not in ('if', 'else', 'try', 'block'))
+
+    @property
+    def guard(self) -> Optional[Branch]:
+        conditions = [b for b in self.branches if b.conditional]
+        return conditions[-1] if conditions else None
+
+
+def exclusive_arms(a: List[Branch], b: List[Branch]) -> bool:
+    """True when the two block stacks sit in different arms of the same if/else chain"""
+    arms = {branch.chain: branch.arm for branch in a if branch.conditional}
+    return any(arms.get(branch.chain, branch.arm) != branch.arm for branch in b if branch.conditional)
+
+
+class EdgeFlow:
+    """Round trips of one edge function's handler with their data and control dependencies
+
+    Steps are scheduled into waves: a wave is one Promise.all of steps that
+    neither read each other's results nor reorder side effects. Reads may run
+    ahead of the guards that protect them (their result is simply discarded
+    on the error path); writes and RPCs never do.
+    """
+
+    def __init__(self, source: TsFile):
+        self.source = source
+        self.trips = find_round_trips(source)
+        self.steps: List[EdgeStep] = []
+        self.waves: List[List[EdgeStep]] = []
+        handler = source.function(HANDLER_NAME)
+        if handler:
+            self.walk(handler, {}, set(), [], [], False)
+            self.schedule()
+
+    @property
+    def name(self) -> str:
+        return self.source.function_name
+
+    @property
+    def happy_steps(self) -> List[EdgeStep]:
+        return [s for s in self.steps if not s.error_path]
+
+    def walk(self, block: Block, taint: Dict[str, Set[int]], control: Set[int], outer: List[Branch],
+             via: List[str], error_path: bool) -> Set[int]:
+        """Append the steps `block` issues; returns their indexes"""
+        source = self.source
+        events = [(t.offset, 1, t) for t in self.trips.get(block.name, [])]
+        events += [(offset, 0, (names, reads, merge)) for offset, names, reads, merge in assignments(source, block)]
+        events += [(end, 2, (start, names)) for start, end, names in guards(source, block)]
+
+        def tainted(names: List[str]) -> Set[int]:
+            return set().union(*(taint.get(n, set()) for n in names))
+
+        issued: Set[int] = set()
+        exits: List[Tuple[List[Branch], Set[int]]] = []
+        error_names: Set[str] = set()
+        for _, kind, event in sorted(events, key=lambda e: (e[0], e[1])):
+            if kind == 0:
+                names, reads, merge = event
+                value = tainted(reads)
+                for name in names:
+                    taint[name] = (taint.get(name, set()) | value) if merge else value
+                continue
+            if kind == 2:
+                start, names = event
+                exits.append((branches_at(source, block, start), tainted(names)))
+                continue
+
+            # Early exits in another arm of an if/else never run on this step's path
+            trip = event
+            branches = branches_at(source, block, trip.offset)
+            step_control = set(control) | tainted([n for b in branches if b.conditional for n in b.names])
+            for guard_branches, ids in exits:
+                if not exclusive_arms(guard_branches, branches):
+                    step_control |= ids
+            data = tainted(trip.uses)
+            on_error = error_path or any(
+                b.kind == 'catch' or b.kind == 'if' and set(b.own_names) & error_names for b in branches
+            )
+
+            if trip.kind == 'call':
+                callee = source.function(trip.target)
+                if callee is None or callee.name in via:
+                    continue
+                head = trip.calls[0]
+                open_index = source.masked.index('(', head.offset)
+                args = split_commas(source.masked[open_index + 1:source.close_of(open_index)], '(){}[]')
+                params = {p: tainted(identifiers(a)) for p, a in zip(params_of(source, callee), args)}
+                ids = self.walk(callee, params, step_control, outer + branches, via + [callee.name], on_error)
+                issued |= ids
+                for name in trip.binds:
+                    taint[name] = ids | data
+                continue
+
+            step = EdgeStep(len(self.steps), trip, via, outer + branches)
+            step.data = data
+            step.control = step_control
+            step.error_path = on_error
+            self.steps.append(step)
+            issued.add(step.index)
+            for name in trip.binds:
+                taint[name] = {step.index}
+            error_names.update(trip.error_binds)
+        return issued
+
+    def schedule(self):
+        """Assign every happy-path step to the earliest wave it can join
+
+        Nothing runs ahead of the auth check: a speculative read is harmless
+        for a rejected caller only once the caller is known.
+        """
+        for step in self.happy_steps:
+            blockers = step.data | {i for i in step.control if step.is_write or self.steps[i].trip.kind == 'auth'}
+            earliest = 0
+            for other in self.steps[:step.index]:
+                if other.wave is None or exclusive_arms(step.branches, other.branches):
+                    continue
+                ordered = other.index in blockers or (
+                    (step.is_write or other.is_write)
+                    and (step.is_write and other.is_write or step.trip.target == other.trip.target)
+                )
+                if ordered:
+                    earliest = max(earliest, other.wave + 1)
+            for wave in range(earliest, len(self.waves)):
+                if all(member.structure == step.structure for member in self.waves[wave]):
+                    step.wave = wave
+                    self.waves[wave].append(step)
+                    break
+            else:
+                step.wave = len(self.waves)
+                self.waves.append([step])
+
+    def ahead_of_guard(self, step: EdgeStep) -> List[EdgeStep]:
+        """Steps whose guard `step` now runs before (speculative reads)"""
+        return [self.steps[i] for i in sorted(step.control)
+                if self.steps[i].wave is not None and self.steps[i].wave >= step.wave]
+
+    def paths(self) -> List[Tuple[str, List[EdgeStep]]]:
+        """Happy paths, one per combination of mutually exclusive if/else arms"""
+        happy = self.happy_steps
+        arms: Dict[int, Dict[int, str]] = {}
+        for step in happy:
+            for branch in step.branches:
+                if branch.conditional:
+                    arms.setdefault(branch.chain, {})[branch.arm] = branch.label
+        exclusive = {chain: sorted(a.items()) for chain, a in arms.items() if len(a) > 1}
+
+        paths = []
+        for combination in itertools.product(*exclusive.values()):
+            chosen = {chain: arm for chain, (arm, _) in zip(exclusive, combination)}
+            steps = [s for s in happy if all(
+                chosen.get(b.chain, b.arm) == b.arm for b in s.branches if b.conditional)]
+            paths.append((', '.join(label for _, label in combination) or 'every branch taken', steps))
+        return paths
+
+    @staticmethod
+    def round_trips(steps: List[EdgeStep]) -> Tuple[int, int, int]:
+        """Sequential, Promise.all and single-RPC round trips of a path"""
+        waves = sorted({s.wave for s in steps})
+        merged = 0
+        in_db_run = False
+        for wave in waves:
+            db_only = all(s.is_db for s in steps if s.wave == wave)
+            if not (db_only and in_db_run):
+                merged += 1
+            in_db_run = db_only
+        return len(steps), len(waves), merged
+
+    def write_sequences(self) -> List[Tuple[List[EdgeStep], List[EdgeStep], List[EdgeStep]]]:
+        """(reads, writes, compensations) of paths writing several tables without a transaction
+
+        RPCs already run in their own transaction and are left out; the reads
+        listed are the ones in the writes' blocks that decide what they write.
+        """
+        sequences = []
+        seen = set()
+        for _, steps in self.paths():
+            writes = [s for s in steps if s.kind == 'from' and s.is_write]
+            key = tuple(s.index for s in writes)
+            if key in seen:
+                continue
+            seen.add(key)
+            compensations = [
+                s for s in self.steps if s.error_path and s.kind == 'from' and s.is_write
+                and not any(exclusive_arms(s.branches, w.branches) for w in writes)
+            ]
+            if len(writes) < 2 and not (writes and compensations):
+                continue
+            needed = set().union(*(w.data | w.control for w in writes))
+            blocks = {tuple(b.brace for b in w.branches) for w in writes}
+            reads = [s for s in steps if s.is_db and not s.is_write and s.index in needed
+                     and tuple(b.brace for b in s.branches) in blocks]
+            sequences.append((reads, writes, compensations))
+        return sequences
+
+
+def edge_flows(names: Optional[List[str]] = None) -> List[EdgeFlow]:
+    """Round-trip catalogue of every edge function handler"""
+    return [EdgeFlow(TsFile(path)) for path in edge_function_files(names)]
+
+
+def step_ref(step: EdgeStep) -> str:
+    return f"L{step.line} {step.label}"
+
+
+def print_edge_flow(flow: EdgeFlow) -> Tuple[int, int, int]:
+    """Print one edge function; returns its worst path (sequential, Promise.all, RPC)"""
+    print(f"\n📦 {flow.name} ({flow.source.rel}): {len(flow.happy_steps)} round trips on the request path")
+    for step in flow.steps:
+        via = f" via {' → '.join(step.via)}" if step.via else ''
+        guard = step.guard.label if step.guard else ''
+        wave = f"wave {step.wave + 1}" if step.wave is not None else 'on error'
+        print(f"    L{step.line:<5} {step.label:<36} {wave:<9} {guard[:40]}{via}")
+
+    parallel = [w for w in flow.waves if any(
+        not exclusive_arms(a.branches, b.branches) for a, b in itertools.combinations(w, 2))]
+    if parallel:
+        print("\n  ⚡ Independent round trips (one Promise.all each):")
+        for wave in parallel:
+            print(f"    wave {wave[0].wave + 1}: {', '.join(step_ref(s) for s in wave)}")
+            for step in wave:
+                ahead = flow.ahead_of_guard(step)
+                if ahead:
+                    print(f"      L{step.line} runs ahead of the checks on "
+                          f"{', '.join(f'L{s.line}' for s in ahead)} (read; dropped if they fail)")
+
+    sequences = flow.write_sequences()
+    if sequences:
+        print("\n  🔒 Write sequences without a transaction (merge into one plpgsql RPC):")
+        for reads, writes, compensations in sequences:
+            chain = ' → '.join(step_ref(s) for s in sorted(reads + writes, key=lambda s: s.index))
+            print(f"    {chain}")
+            print(f"      {len(reads) + len(writes)} round trips; a failure between writes leaves partial rows")
+            for step in compensations:
+                print(f"      compensates with {step_ref(step)} (not atomic, and itself can fail)")
+
+    worst = (0, 0, 0)
+    print("\n  🛣️  Round trips per path (sequential → Promise.all → one RPC per database run):")
+    for label, steps in flow.paths():
+        trips = flow.round_trips(steps)
+        worst = max(worst, trips)
+        print(f"    {label[:60]:<60} {trips[0]:>3} → {trips[1]:>3} → {trips[2]:>3}")
+    return worst
+
+
+def run_aggregations(args, schema: SchemaModel, models: Dict[str, FreezedModel], paths: Optional[List[Path]]):
+    findings = AggregationAnalyzer(schema, models).analyze(paths)
+    print_findings(findings, schema, args.rows)
+
+    def render(migration: Path) -> str:
+        sql = [
+            migration_header(
+                f"{migration.name.split('_')[0]}: CLIENT AGGREGATION RPCS",
+                'Generated by analyze_queries.py --aggregations: aggregates computed in Postgres',
+            ),
+            "BEGIN;\n",
+        ]
+        for finding in findings:
+            sql.append(generate_rpc(finding, schema) + "\n")
+        sql.append("-- Daily order rollup, refreshed from the days the ordini/ordini_items triggers queue")
+        sql.append(DAILY_ROLLUP_SQL.format(timezone=DEFAULT_TIMEZONE))
+        sql.append("COMMIT;\n")
+        return '\n'.join(sql)
+
+    migration, sql = migration_target('client_aggregation_rpcs', render)
+
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    for finding in findings:
+        print(f"\n📝 {finding.rpc_name} — Dart call:")
+        for line in generate_dart_call(finding).splitlines():
+            print(f"    {line}")
+
+    if migration.exists():
+        print(f"\n✅ {migration.relative_to(PROJECT_ROOT)} is up to date")
+    elif args.apply:
+        migration.write_text(sql, encoding='utf-8')
+        print(f"\n✅ Wrote {migration.relative_to(PROJECT_ROOT)}")
+    else:
+        print(f"\n⚠️  DRY RUN - would write {migration.relative_to(PROJECT_ROOT)}")
+        print("   Run with --apply to write the migration")
+
+
+def run_prune_selects(args, schema: SchemaModel, models: Dict[str, FreezedModel], paths: Optional[List[Path]]):
+    prunings, skipped = select_prunings(schema, models, paths, args.rows)
+    print_prunings(prunings, skipped)
+
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"  Selects pruned: {len(prunings)}")
+    print(f"  Estimated savings: ~{sum(p.saved_bytes for p in prunings) / 1024:.0f} KB per full refresh")
+
+    if args.apply:
+        files = apply_prunings(prunings)
+        print(f"\n✅ Rewrote {len(prunings)} selects in {files} files")
+        print("   Run flutter analyze and exercise the affected screens")
+    else:
+        print("\n⚠️  DRY RUN - No files were modified")
+        print("   Run with --apply to rewrite the selects")
+
+
+def run_unbounded(args, schema: SchemaModel, paths: Optional[List[Path]]):
+    growth = GrowthModel(schema, args.orders_per_day, args.days)
+    reads, catalog = unbounded_reads(schema, growth, paths, args.page_size)
+    print_unbounded(reads, catalog, growth)
+
+    missing: Dict[str, UnboundedRead] = {}
+    for read in reads:
+        if not read.index:
+            missing.setdefault(read.index_name, read)
+
+    def render(migration: Path) -> str:
+        sql = [
+            migration_header(
+                f"{migration.name.split('_')[0]}: KEYSET PAGINATION INDEXES",
+                'Generated by analyze_queries.py --unbounded: (scope, sort, id) indexes for keyset pages',
+            ),
+            "BEGIN;\n",
+        ]
+        for read in missing.values():
+            sql.append(f"-- {read.chain.source.rel}:{read.chain.line}")
+            sql.append(read.index_sql + "\n")
+        sql.append("COMMIT;\n")
+        return '\n'.join(sql)
+
+    migration, sql = migration_target('keyset_pagination_indexes', render)
+
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"  Unbounded reads: {len(reads)}")
+    print(f"  Payload at {args.days} days: ~{sum(r.payload_bytes for r in reads) / 1024 / 1024:,.1f} MB "
+          f"-> ~{sum(r.page_bytes for r in reads) / 1024:,.0f} KB with {args.page_size}-row pages")
+    print(f"  Keyset indexes to add: {len(missing)}")
+
+    if not missing:
+        print("\n✅ Every keyset page is already backed by an index")
+    elif migration.exists():
+        print(f"\n✅ {migration.relative_to(PROJECT_ROOT)} is up to date")
+    elif args.apply:
+        migration.write_text(sql, encoding='utf-8')
+        print(f"\n✅ Wrote {migration.relative_to(PROJECT_ROOT)}")
+    else:
+        print(f"\n⚠️  DRY RUN - would write {migration.relative_to(PROJECT_ROOT)}")
+        print("   Run with --apply to write the migration")
+
+
+def run_streams(args, schema: SchemaModel, paths: Optional[List[Path]], summaries: Optional[FileSummaries] = None):
+    load = RealtimeLoad(args.orders_per_hour, args.tenants)
+    growth = GrowthModel(schema, args.orders_per_day, args.days)
+    subscriptions = realtime_subscriptions(schema, paths, summaries)
+    flagged = print_subscriptions(subscriptions, schema, load, growth)
+
+    reachable = [s for s in subscriptions if s.callers]
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"  Subscriptions: {len(subscriptions)} ({len(reachable)} reachable from callers)")
+    print(f"  Flagged: {flagged}")
+    print(f"  Peak per client: ~{max((load.delivered(s) for s in reachable), default=0):.3g} msg/s delivered, "
+          f"~{max((load.evaluated(s) for s in reachable), default=0):.3g} msg/s authorized")
+
+
+def run_edge_functions(args):
+    flows = edge_flows(args.functions)
+    worst = {flow.name: print_edge_flow(flow) for flow in flows}
+
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"  Edge functions: {len(flows)}")
+    print(f"  Round trips catalogued: {sum(len(f.happy_steps) for f in flows)}")
+    print(f"  Write sequences without a transaction: {sum(len(f.write_sequences()) for f in flows)}")
+    print("\n  Worst path (sequential → Promise.all → one RPC per database run):")
+    for name, (sequential, parallel, merged) in worst.items():
+        print(f"    {name:<24} {sequential:>3} → {parallel:>3} → {merged:>3}")
+    print("\n  Replay them against local Postgres: python bench_queries.py --edge-functions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Supabase Query Analyzer')
+    parser.add_argument('--aggregations', action='store_true',
+                        help='Find client-side aggregation and generate RPCs')
+    parser.add_argument('--prune-selects', action='store_true',
+                        help='Replace bare .select() with the columns the decoded model reads')
+    parser.add_argument('--unbounded', action='store_true',
+                        help='Find reads on growing tables without a row bound and suggest keyset pages')
+    parser.add_argument('--streams', action='store_true',
+                        help='List realtime .stream() subscriptions and estimate their fan-out')
+    parser.add_argument('--edge-functions', action='store_true',
+                        help='Catalogue edge function round trips and flag batching / RPC candidates')
+    parser.add_argument('--apply', action='store_true', help='Write generated SQL / rewrites')
+    parser.add_argument('--rows', type=int, default=1000, help='Rows per fetch for payload estimates')
+    parser.add_argument('--orders-per-day', type=int, default=150, help='Tenant order volume for growth estimates')
+    parser.add_argument('--days', type=int, default=365, help='Growth horizon in days')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='Rows per keyset page')
+    parser.add_argument('--orders-per-hour', type=float, default=60, help='Peak tenant order rate for --streams')
+    parser.add_argument('--tenants', type=int, default=50, help='Tenants sharing Realtime for --streams')
+    parser.add_argument('--function', dest='functions', action='append',
+                        help='Edge function to analyze with --edge-functions (repeatable, default: all)')
+    parser.add_argument('--since', metavar='REF',
+                        help='Only analyze files changed since a git ref and their reverse dependencies')
+    parser.add_argument('paths', nargs='*', type=Path, help='Dart files to analyze (default: lib/)')
+
+    args = parser.parse_args()
+
+    if not any([args.aggregations, args.prune_selects, args.unbounded, args.streams, args.edge_functions]):
+        parser.print_help()
+        print("\n⚠️  Please specify --aggregations, --prune-selects, --unbounded, --streams or --edge-functions")
+        sys.exit(1)
+
+    print("🚀 Supabase Query Analyzer")
+    print("="*60)
+
+    paths = [p.resolve() for p in args.paths] if args.paths else None
+    dart_modes = any([args.aggregations, args.prune_selects, args.unbounded, args.streams])
+    run_dart = run_edge = True
+    summaries = None
+
+    if args.since:
+        # --edge-functions alone needs no Dart reverse dependencies
+        scope = ChangeScope(args.since, dependents=dart_modes)
+        print(f"🔎 {scope.describe()}")
+        # An empty list would mean "all of lib/" to the runners below
+        paths = scope.dart_files(paths)
+        run_dart = bool(paths)
+        if args.functions is None:
+            args.functions = sorted(scope.edge_functions)
+            run_edge = bool(args.functions)
+        if not run_dart and dart_modes:
+            print("✅ No Dart files in scope, skipping the Dart analyses")
+        if not run_edge and args.edge_functions:
+            print("✅ No edge functions in scope, skipping --edge-functions")
+        if args.streams and run_dart:
+            summaries = scope.summaries
+
+    # Only the Dart analyses read the schema and the models
+    schema = load_schema() if dart_modes and run_dart else None
+    models = index_models() if (args.aggregations or args.prune_selects) and run_dart else {}
+
+    if args.aggregations and run_dart:
+        run_aggregations(args, schema, models, paths)
+    if args.prune_selects and run_dart:
+        run_prune_selects(args, schema, models, paths)
+    if args.unbounded and run_dart:
+        run_unbounded(args, schema, paths)
+    if args.streams and run_dart:
+        run_streams(args, schema, paths, summaries)
+    if args.edge_functions and run_edge:
+        run_edge_functions(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Cashier Customer Matching Benchmark
+===================================
+Compares the per-pattern lookup loop of DatabaseService.findMatchingCustomer
+with the single match_cashier_customer RPC (migration generated by
+wire_org_context.py) at growing customer counts per organization:
+
+  loop      One query per name variant / phone combination, as the app did
+  rpc       One ranked pg_trgm query
+
+Each lookup is one of:
+  known     Existing customer, same name and phone
+  swapped   Existing customer typed as "surname name"
+  typo      Existing customer with a misspelled name, same phone
+  new       Unknown customer (the loop runs every query before giving up)
+
+--rtt-ms adds a simulated client round trip per query, since the loop's
+cost on a phone is dominated by round trips rather than server time.
+
+Usage:
+    python bench_cashier_matching.py                             # 10k/100k/1M customers
+    python bench_cashier_matching.py --customers 10000 100000 --lookups 500
+    python bench_cashier_matching.py --rtt-ms 40 --json matching.json
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+from local_postgres import (
+    DEFAULT_DSN, require_psycopg, connect, prepare_bench_database, drop_scratch_database,
+    seed_organizations, latency_summary,
+)
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+LOOKUP_KINDS = ['known', 'swapped', 'typo', 'new']
+
+FIRST_NAMES = [
+    'giovanni', 'giuseppe', 'salvatore', 'maria', 'anna', 'rosa', 'giorgio', 'carmelo', 'vincenzo',
+    'francesca', 'angela', 'paolo', 'marco', 'luca', 'giulia', 'sara', 'antonio', 'concetta',
+    'gaetano', 'rosario', 'emanuele', 'chiara', 'valentina', 'alessandro', 'simone', 'martina',
+]
+LAST_NAMES = [
+    'rossi', 'russo', 'barrano', 'giombattista', 'scollo', 'cannizzo', 'occhipinti', 'iacono',
+    'distefano', 'licitra', 'cascone', 'battaglia', 'agosta', 'nicosia', 'campo', 'schembari',
+    'sallemi', 'bellassai', 'raniolo', 'pace', 'leggio', 'mangione', 'giudice', 'anfuso',
+]
+
+# Names are built from the arrays so the hottest names repeat, as in a real
+# town; nome_normalized/telefono_normalized come from the 003 trigger
+SEED_CUSTOMERS_SQL = """
+INSERT INTO cashier_customers (organization_id, nome, telefono, ordini_count, ultimo_ordine_at)
+SELECT %(org)s,
+       initcap((%(first)s::text[])[1 + (random() * (cardinality(%(first)s::text[]) - 1))::int]) || ' ' ||
+       initcap((%(last)s::text[])[1 + (random() * (cardinality(%(last)s::text[]) - 1))::int]) ||
+       CASE WHEN n %% 7 = 0 THEN ' ' || initcap((%(last)s::text[])[1 + (n %% cardinality(%(last)s::text[]))]) ELSE '' END,
+       CASE WHEN n %% 10 = 0 THEN NULL ELSE '+39 3' || lpad((n::bigint * 7919 %% 1000000000)::text, 9, '0') END,
+       (random() * 40)::int,
+       now() - random() * interval '365 days'
+FROM generate_series(%(first_n)s::int, %(last_n)s::int) AS n
+"""
+
+SAMPLE_SQL = """
+SELECT nome, telefono FROM cashier_customers
+WHERE organization_id = %s AND telefono IS NOT NULL AND nome ~ ' '
+ORDER BY random() LIMIT %s
+"""
+
+# As findMatchingCustomer calls it: best match only, no trigram suggestions
+RPC_SQL = "SELECT (customer).id, match_kind FROM match_cashier_customer(%s, %s, %s, 1, false)"
+
+# The loop's PostgREST queries (select() is a star select)
+EXACT_SQL = """
+SELECT * FROM cashier_customers
+WHERE nome_normalized = %s AND telefono_normalized = %s AND organization_id = %s LIMIT 2
+"""
+NAME_SQL = """
+SELECT * FROM cashier_customers
+WHERE nome_normalized = %s AND organization_id = %s ORDER BY ordini_count DESC LIMIT 1
+"""
+PREFIX_SQL = """
+SELECT * FROM cashier_customers
+WHERE nome_normalized ILIKE %s AND organization_id = %s ORDER BY ordini_count DESC LIMIT 5
+"""
+
+
+def name_patterns(normalized: str) -> List[str]:
+    """Port of DatabaseService._buildNameSearchPatterns"""
+    patterns = [normalized]
+    parts = [p for p in normalized.split(' ') if p]
+    if len(parts) >= 2:
+        swapped = list(parts)
+        swapped[0], swapped[-1] = parts[-1], parts[0]
+        if ' '.join(swapped) != normalized:
+            patterns.append(' '.join(swapped))
+        if len(parts) > 2:
+            first_two = ' '.join([parts[1], parts[0]] + parts[2:])
+            if first_two not in patterns:
+                patterns.append(first_two)
+    return patterns
+
+
+def suffix(phone: Optional[str]) -> Optional[str]:
+    return phone[-6:] if phone and len(phone) >= 6 else None
+
+
+def loop_match(conn, org_id: str, nome: str, telefono: Optional[str], rtt_ms: float) -> Tuple[Optional[str], int]:
+    """Port of the findMatchingCustomer loop; returns (customer id, round trips)"""
+    trips = 0
+
+    def query(sql: str, params: tuple) -> List[Dict]:
+        nonlocal trips
+        trips += 1
+        if rtt_ms:
+            time.sleep(rtt_ms / 1000)
+        cur = conn.execute(sql, params)
+        columns = [d.name for d in cur.description]
+        return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    normalized = nome.strip().lower()
+    phone = ''.join(ch for ch in telefono if ch.isdigit()) if telefono else None
+    patterns = name_patterns(normalized)
+    phone_ok = phone is not None and len(phone) >= 6
+
+    if phone_ok:
+        for pattern in patterns:
+            rows = query(EXACT_SQL, (pattern, phone, org_id))
+            if rows:
+                return str(rows[0]['id']), trips
+
+    for pattern in patterns:
+        rows = query(NAME_SQL, (pattern, org_id))
+        if rows:
+            existing = rows[0]['telefono_normalized']
+            if phone_ok and existing and len(existing) >= 6:
+                if suffix(phone) == suffix(existing):
+                    return str(rows[0]['id']), trips
+                continue
+            return str(rows[0]['id']), trips
+
+    searched = set()
+    for pattern in patterns:
+        first = pattern.split(' ')[0]
+        if len(first) >= 3 and first not in searched:
+            searched.add(first)
+            rows = query(PREFIX_SQL, (f"{first}%", org_id))
+            if phone_ok:
+                for row in rows:
+                    existing = row['telefono_normalized']
+                    if existing and len(existing) >= 6 and suffix(existing) == suffix(phone):
+                        return str(row['id']), trips
+
+    return None, trips
+
+
+def rpc_match(conn, org_id: str, nome: str, telefono: Optional[str], rtt_ms: float) -> Tuple[Optional[str], int]:
+    if rtt_ms:
+        time.sleep(rtt_ms / 1000)
+    row = conn.execute(RPC_SQL, (org_id, nome, telefono)).fetchone()
+    if not row:
+        return None, 1
+    return str(row[0]), 1
+
+
+def typo(word: str, rng: random.Random) -> str:
+    """Drop or swap one letter of the longest word"""
+    parts = word.split(' ')
+    i = max(range(len(parts)), key=lambda k: len(parts[k]))
+    w = parts[i]
+    if len(w) > 4:
+        j = rng.randrange(1, len(w) - 2)
+        w = w[:j] + w[j + 1] + w[j] + w[j + 2:] if rng.random() < 0.5 else w[:j] + w[j + 1:]
+    parts[i] = w
+    return ' '.join(parts)
+
+
+def build_lookups(conn, org_id: str, count: int, rng: random.Random) -> List[Tuple[str, str, Optional[str]]]:
+    sample = conn.execute(SAMPLE_SQL, (org_id, count)).fetchall()
+    lookups = []
+    for i, (nome, telefono) in enumerate(sample):
+        kind = LOOKUP_KINDS[i % len(LOOKUP_KINDS)]
+        if kind == 'swapped':
+            parts = nome.split(' ')
+            nome = ' '.join([parts[-1]] + parts[1:-1] + [parts[0]])
+        elif kind == 'typo':
+            nome = typo(nome, rng)
+        elif kind == 'new':
+            nome = f"{rng.choice(FIRST_NAMES)} Nuovocliente{i}"
+            telefono = f"+39 320 {rng.randrange(10**7):07d}"
+        lookups.append((kind, nome, telefono))
+    return lookups
+
+
+def run_size(conn, org_id: str, lookups: List[Tuple[str, str, Optional[str]]], rtt_ms: float) -> Dict:
+    results: Dict[str, Dict] = {}
+    for variant, match in (('loop', loop_match), ('rpc', rpc_match)):
+        by_kind: Dict[str, List[float]] = {k: [] for k in LOOKUP_KINDS}
+        trips: Dict[str, List[int]] = {k: [] for k in LOOKUP_KINDS}
+        found: List[Optional[str]] = []
+        for kind, nome, telefono in lookups:
+            started = time.perf_counter()
+            customer_id, round_trips = match(conn, org_id, nome, telefono, rtt_ms)
+            by_kind[kind].append((time.perf_counter() - started) * 1000)
+            trips[kind].append(round_trips)
+            found.append(customer_id)
+        results[variant] = {
+            kind: {
+                **latency_summary(by_kind[kind]),
+                'round_trips': round(sum(trips[kind]) / max(len(trips[kind]), 1), 2),
+                'matched': sum(1 for (k, _, _), f in zip(lookups, found) if k == kind and f),
+            }
+            for kind in LOOKUP_KINDS
+        }
+        results[variant]['_found'] = found
+    agree = sum(1 for a, b in zip(results['loop'].pop('_found'), results['rpc'].pop('_found')) if a == b)
+    results['agreement'] = round(agree / max(len(lookups), 1), 3)
+    return results
+
+
+def run(args) -> List[Dict]:
+    rng = random.Random(args.seed)
+    dsn = prepare_bench_database(args.dsn, args.database)
+    results = []
+    with connect(dsn) as conn:
+        org_id = seed_organizations(conn, 1, prefix='cashier')[0]
+        seeded = 0
+        for size in sorted(args.customers):
+            print(f"\n🌱 Seeding customers {seeded + 1:,}..{size:,}")
+            conn.execute(SEED_CUSTOMERS_SQL, {
+                'org': org_id, 'first': FIRST_NAMES, 'last': LAST_NAMES,
+                'first_n': seeded + 1, 'last_n': size,
+            })
+            conn.execute("ANALYZE cashier_customers")
+            seeded = size
+
+            lookups = build_lookups(conn, org_id, args.lookups, rng)
+            measured = run_size(conn, org_id, lookups, args.rtt_ms)
+            results.append({'customers': size, **measured})
+    return results
+
+
+def print_comparison(results: List[Dict]):
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"\n{'customers':>10} {'kind':<8} {'variant':<6} {'trips':>6} {'p50 ms':>9} {'p95 ms':>9} {'matched':>8}")
+    for result in results:
+        for kind in LOOKUP_KINDS:
+            for variant in ('loop', 'rpc'):
+                m = result[variant][kind]
+                print(f"{result['customers']:>10,} {kind:<8} {variant:<6} {m['round_trips']:>6} "
+                      f"{m['p50_ms']:>9.2f} {m['p95_ms']:>9.2f} {m['matched']:>8}")
+        print(f"{'':>10} same customer chosen by loop and rpc: {result['agreement']:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cashier Customer Matching Benchmark')
+    parser.add_argument('--dsn', default=DEFAULT_DSN, help='Admin DSN (default: $LOCAL_DATABASE_URL)')
+    parser.add_argument('--database', default='rotante_bench_cashier', help='Scratch database name')
+    parser.add_argument('--keep-database', action='store_true', help='Do not drop the scratch database')
+    parser.add_argument('--customers', nargs='+', type=int, default=[10_000, 100_000, 1_000_000],
+                        help='Customers per organization')
+    parser.add_argument('--lookups', type=int, default=200, help='Lookups per size (split across kinds)')
+    parser.add_argument('--rtt-ms', type=float, default=0.0, help='Simulated client round trip per query')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for lookups')
+    parser.add_argument('--json', metavar='PATH', help='Write results as JSON')
+
+    args = parser.parse_args()
+    require_psycopg()
+
+    print("🔎 Cashier Customer Matching Benchmark")
+    print("="*60)
+
+    try:
+        results = run(args)
+    finally:
+        if not args.keep_database:
+            drop_scratch_database(args.dsn, args.database)
+
+    print_comparison(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Order Placement Contention Simulator
+====================================
+Fires N concurrent order placements at a local Postgres loaded with the SaaS
+schema and measures how the per-tenant hot rows serialize checkout:
+
+  - daily_order_counters (organization_id, data)  -> numero_ordine trigger (003)
+  - rate_limits (identifier, endpoint, window)    -> check_rate_limit() (010)
+
+Counter designs compared:
+  row       Current design: ON CONFLICT upsert on daily_order_counters
+  sequence  One Postgres sequence per organization (non-transactional, may gap)
+  block     Each worker claims blocks of numbers from daily_order_counters
+
+Placement modes:
+  edge      One autocommit statement per call, like place-order via PostgREST
+  rpc       All calls in a single transaction, like a transactional RPC
+
+Usage:
+    python bench_order_contention.py                            # All designs, edge mode
+    python bench_order_contention.py --clients 100 --orders 5000
+    python bench_order_contention.py --design row block --mode rpc
+    python bench_order_contention.py --json contention.json     # Save results
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import Counter
+from typing import Dict, List, Optional
+
+from local_postgres import (
+    psycopg, DEFAULT_DSN, require_psycopg, connect, connect_async, prepare_bench_database,
+    drop_scratch_database, seed_organizations, latency_summary,
+)
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+DESIGNS = ['row', 'sequence', 'block']
+MODES = ['edge', 'rpc']
+
+# Tables written by a placement; truncated between designs
+PLACEMENT_TABLES = ['ordini_items', 'ordini', 'daily_order_counters', 'rate_limits', 'audit_logs', 'notifiche']
+
+# Same body as assign_order_number_trigger() in 003_orders_delivery.sql
+ROW_COUNTER_TRIGGER = """
+CREATE OR REPLACE FUNCTION assign_order_number_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF NEW.numero_ordine IS NULL THEN
+        NEW.numero_ordine := generate_numero_ordine_v2(NEW.organization_id);
+    END IF;
+    RETURN NEW;
+END;
+$$
+"""
+
+SEQUENCE_COUNTER_TRIGGER = """
+CREATE OR REPLACE FUNCTION assign_order_number_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF NEW.numero_ordine IS NULL THEN
+        NEW.numero_ordine := to_char(CURRENT_DATE, 'YYYYMMDD') || '-' || lpad(
+            nextval(('order_number_seq_' || replace(NEW.organization_id::text, '-', ''))::regclass)::TEXT,
+            3, '0'
+        );
+    END IF;
+    RETURN NEW;
+END;
+$$
+"""
+
+CLAIM_BLOCK_SQL = """
+INSERT INTO daily_order_counters (organization_id, data, counter)
+VALUES (%s, CURRENT_DATE, %s)
+ON CONFLICT (organization_id, data)
+DO UPDATE SET counter = daily_order_counters.counter + EXCLUDED.counter
+RETURNING counter, to_char(data, 'YYYYMMDD')
+"""
+
+INSERT_ORDER_SQL = """
+INSERT INTO ordini (
+    organization_id, numero_ordine, nome_cliente, telefono_cliente, tipo, stato,
+    subtotale, costo_consegna, totale, metodo_pagamento, source
+) VALUES (%s, %s, %s, %s, %s, 'confirmed', %s, %s, %s, 'cash', 'app')
+RETURNING id
+"""
+
+INSERT_ITEM_SQL = """
+INSERT INTO ordini_items (organization_id, ordine_id, nome_prodotto, prezzo_unitario, quantita, subtotale)
+VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+LOCK_SAMPLE_SQL = """
+SELECT wait_event, left(query, 200)
+FROM pg_stat_activity
+WHERE datname = current_database()
+  AND wait_event_type = 'Lock'
+"""
+
+
+class BlockAllocator:
+    """Per-worker order numbers handed out from pre-claimed counter blocks"""
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self.blocks: Dict[str, list] = {}    # org -> [next, high, day]
+        self.claims = 0
+
+    async def next_number(self, conn, org_id: str) -> str:
+        block = self.blocks.get(org_id)
+        if not block or block[0] > block[1]:
+            # The day comes from the counter row, so numbers and prefix agree
+            # with the server's CURRENT_DATE across midnight and timezones
+            cur = await conn.execute(CLAIM_BLOCK_SQL, (org_id, self.block_size))
+            high, day = await cur.fetchone()
+            block = [high - self.block_size + 1, high, day]
+            self.blocks[org_id] = block
+            self.claims += 1
+        number = block[0]
+        block[0] += 1
+        return f"{block[2]}-{number:03d}"
+
+
+class DesignResult:
+    def __init__(self, design: str, mode: str):
+        self.design = design
+        self.mode = mode
+        self.latencies_ms: List[float] = []
+        self.step_latencies_ms: Dict[str, List[float]] = {}
+        self.errors: Counter = Counter()
+        self.deadlocks = 0
+        self.lock_samples = 0
+        self.lock_waiting_samples = 0
+        self.lock_waiters_total = 0
+        self.lock_waiters_max = 0
+        self.lock_waits_by_statement: Counter = Counter()
+        self.wall_seconds = 0.0
+        self.server_deadlocks = 0
+        self.duplicate_numbers = 0
+        self.block_claims = 0
+        self.sample_interval_ms = 0.0
+
+    def add_step(self, step: str, elapsed_ms: float):
+        self.step_latencies_ms.setdefault(step, []).append(elapsed_ms)
+
+    def to_dict(self) -> Dict:
+        placed = len(self.latencies_ms)
+        return {
+            'design': self.design,
+            'mode': self.mode,
+            'placed': placed,
+            'orders_per_sec': round(placed / self.wall_seconds, 1) if self.wall_seconds else 0.0,
+            'latency': latency_summary(self.latencies_ms),
+            'steps': {k: latency_summary(v) for k, v in sorted(self.step_latencies_ms.items())},
+            'errors': dict(self.errors),
+            'deadlocks': self.deadlocks,
+            'server_deadlocks': self.server_deadlocks,
+            'lock_wait': {
+                'samples': self.lock_samples,
+                'samples_with_waiters': self.lock_waiting_samples,
+                'max_waiters': self.lock_waiters_max,
+                'mean_waiters': round(self.lock_waiters_total / self.lock_samples, 2) if self.lock_samples else 0.0,
+                # Each waiting backend seen in a sample ~ one interval spent blocked
+                'est_backend_ms': round(self.lock_waiters_total * self.sample_interval_ms, 1),
+                'by_statement': dict(self.lock_waits_by_statement),
+            },
+            'duplicate_numbers': self.duplicate_numbers,
+            'block_claims': self.block_claims,
+        }
+
+
+def statement_label(query: str) -> str:
+    """Short name for the statement a backend is blocked in"""
+    lowered = query.lower()
+    if 'check_rate_limit' in lowered:
+        return 'check_rate_limit'
+    if 'daily_order_counters' in lowered:
+        return 'claim_block'
+    if 'insert into ordini_items' in lowered:
+        return 'insert_items'
+    if 'insert into ordini' in lowered:
+        return 'insert_order'
+    return 'other'
+
+
+def install_design(conn, design: str, org_ids: List[str]):
+    """Switch the numbering trigger to the requested counter design"""
+    for table in PLACEMENT_TABLES:
+        conn.execute(f"TRUNCATE {table} CASCADE")
+
+    if design == 'sequence':
+        for org_id in org_ids:
+            seq = 'order_number_seq_' + org_id.replace('-', '')
+            conn.execute(f"DROP SEQUENCE IF EXISTS {seq}")
+            conn.execute(f"CREATE SEQUENCE {seq}")
+        conn.execute(SEQUENCE_COUNTER_TRIGGER)
+    else:
+        # 'block' passes numero_ordine explicitly, so the trigger is a no-op for it
+        conn.execute(ROW_COUNTER_TRIGGER)
+
+    conn.execute("ANALYZE")
+
+
+async def place_order(conn, org_id: str, args, result: DesignResult,
+                      allocator: Optional[BlockAllocator]):
+    """One checkout: rate limit, order insert (numbering), item inserts"""
+
+    async def step(name: str, query: str, params):
+        started = time.perf_counter()
+        cur = await conn.execute(query, params)
+        result.add_step(name, (time.perf_counter() - started) * 1000)
+        return cur
+
+    cur = await step(
+        'check_rate_limit',
+        "SELECT check_rate_limit(%s, 'place-order', %s, 60)",
+        (org_id, args.rate_limit_max),
+    )
+    allowed = (await cur.fetchone())[0].get('allowed', True)
+    if not allowed:
+        result.errors['rate_limited'] += 1
+        return False
+
+    numero = None
+    if allocator is not None:
+        started = time.perf_counter()
+        numero = await allocator.next_number(conn, org_id)
+        result.add_step('claim_block', (time.perf_counter() - started) * 1000)
+
+    items = [
+        (f"Pizza {random.randint(1, 40)}", round(random.uniform(5, 12), 2), random.randint(1, 3))
+        for _ in range(args.items)
+    ]
+    subtotal = round(sum(price * qty for _, price, qty in items), 2)
+
+    cur = await step(
+        'insert_order',
+        INSERT_ORDER_SQL,
+        (org_id, numero, 'Cliente Bench', '3330000000', random.choice(['delivery', 'takeaway']),
+         subtotal, 3.0, subtotal + 3.0),
+    )
+    order_id = (await cur.fetchone())[0]
+
+    started = time.perf_counter()
+    async with conn.cursor() as item_cur:
+        await item_cur.executemany(
+            INSERT_ITEM_SQL,
+            [(org_id, order_id, name, price, qty, round(price * qty, 2)) for name, price, qty in items],
+        )
+    result.add_step('insert_items', (time.perf_counter() - started) * 1000)
+    return True
+
+
+async def worker(dsn: str, queue: asyncio.Queue, args, result: DesignResult):
+    """One simulated edge-function instance with its own connection"""
+    conn = await connect_async(dsn, autocommit=True)
+    allocator = BlockAllocator(args.block_size) if result.design == 'block' else None
+
+    try:
+        while True:
+            try:
+                org_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+
+            started = time.perf_counter()
+            try:
+                if args.mode == 'rpc':
+                    async with conn.transaction():
+                        placed = await place_order(conn, org_id, args, result, allocator)
+                else:
+                    placed = await place_order(conn, org_id, args, result, allocator)
+                if placed:
+                    result.latencies_ms.append((time.perf_counter() - started) * 1000)
+            except psycopg.errors.DeadlockDetected:
+                result.deadlocks += 1
+                result.errors['deadlock_detected'] += 1
+            except psycopg.Error as e:
+                # conn.transaction() has already rolled back in rpc mode
+                result.errors[type(e).__name__] += 1
+    finally:
+        if allocator is not None:
+            result.block_claims += allocator.claims
+        await conn.close()
+
+
+async def lock_monitor(dsn: str, stop: asyncio.Event, args, result: DesignResult):
+    """Sample pg_stat_activity for backends blocked on heavyweight locks"""
+    conn = await connect_async(dsn, autocommit=True)
+    interval = args.sample_ms / 1000.0
+    result.sample_interval_ms = args.sample_ms
+
+    try:
+        while not stop.is_set():
+            cur = await conn.execute(LOCK_SAMPLE_SQL)
+            rows = await cur.fetchall()
+            result.lock_samples += 1
+            if rows:
+                result.lock_waiting_samples += 1
+                result.lock_waiters_total += len(rows)
+                result.lock_waiters_max = max(result.lock_waiters_max, len(rows))
+                for _, query in rows:
+                    result.lock_waits_by_statement[statement_label(query or '')] += 1
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await conn.close()
+
+
+def server_deadlock_count(conn) -> int:
+    """Deadlocks Postgres has recorded for the current database"""
+    row = conn.execute(
+        "SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()"
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def duplicate_order_numbers(conn) -> int:
+    """Order numbers issued twice for the same organization (should be 0)"""
+    row = conn.execute(
+        """SELECT coalesce(sum(n - 1), 0) FROM (
+            SELECT count(*) AS n FROM ordini
+            GROUP BY organization_id, numero_ordine HAVING count(*) > 1
+        ) dup"""
+    ).fetchone()
+    return int(row[0])
+
+
+def build_workload(org_ids: List[str], total: int, skew: float) -> List[str]:
+    """Organization id per order; skew > 0 concentrates orders on the first tenant"""
+    if len(org_ids) == 1 or skew <= 0:
+        return [org_ids[i % len(org_ids)] for i in range(total)]
+    weights = [skew] + [(1 - skew) / (len(org_ids) - 1)] * (len(org_ids) - 1)
+    return random.choices(org_ids, weights=weights, k=total)
+
+
+async def run_design(dsn: str, design: str, org_ids: List[str], args) -> DesignResult:
+    """Run the full workload against one counter design"""
+    with connect(dsn) as conn:
+        install_design(conn, design, org_ids)
+        deadlocks_before = server_deadlock_count(conn)
+
+    result = DesignResult(design, args.mode)
+    queue: asyncio.Queue = asyncio.Queue()
+    for org_id in build_workload(org_ids, args.orders, args.skew):
+        queue.put_nowait(org_id)
+
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(lock_monitor(dsn, stop, args, result))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(dsn, queue, args, result) for _ in range(args.clients)))
+    result.wall_seconds = time.perf_counter() - started
+
+    stop.set()
+    await monitor
+
+    with connect(dsn) as conn:
+        result.server_deadlocks = server_deadlock_count(conn) - deadlocks_before
+        result.duplicate_numbers = duplicate_order_numbers(conn)
+
+    return result
+
+
+def print_result(data: Dict):
+    latency = data['latency']
+    lock = data['lock_wait']
+    print(f"\n📊 {data['design']} ({data['mode']} mode)")
+    print(f"  Placed: {data['placed']}  Throughput: {data['orders_per_sec']} orders/s")
+    print(f"  Latency: p50 {latency['p50_ms']}ms  p99 {latency['p99_ms']}ms  max {latency['max_ms']}ms")
+    for step, summary in data['steps'].items():
+        print(f"    {step:<18} p50 {summary['p50_ms']:>8}ms  p99 {summary['p99_ms']:>8}ms")
+    print(f"  Lock waits: {lock['samples_with_waiters']}/{lock['samples']} samples, "
+          f"max {lock['max_waiters']} waiters, ~{lock['est_backend_ms']}ms blocked")
+    if lock['by_statement']:
+        print(f"    by statement: {lock['by_statement']}")
+    print(f"  Deadlocks: {data['deadlocks']} (server counter: {data['server_deadlocks']})")
+    if data['errors']:
+        print(f"  ⚠️ Errors: {data['errors']}")
+    if data['duplicate_numbers']:
+        print(f"  ❌ Duplicate order numbers: {data['duplicate_numbers']}")
+    if data['design'] == 'block':
+        print(f"  Block claims: {data['block_claims']}")
+
+
+def print_comparison(results: List[Dict]):
+    print("\n" + "="*60)
+    print("COMPARISON")
+    print("="*60)
+    print(f"  {'design':<10} {'orders/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'blocked ms':>12} {'deadlocks':>10}")
+    for data in results:
+        print(f"  {data['design']:<10} {data['orders_per_sec']:>10} {data['latency']['p50_ms']:>10} "
+              f"{data['latency']['p99_ms']:>10} {data['lock_wait']['est_backend_ms']:>12} {data['deadlocks']:>10}")
+
+
+async def run(args) -> List[Dict]:
+    dsn = prepare_bench_database(args.dsn, args.database)
+    with connect(dsn) as conn:
+        org_ids = seed_organizations(conn, args.orgs, prefix='contention')
+
+    print(f"🚀 {args.orders} placements, {args.clients} concurrent clients, "
+          f"{len(org_ids)} organization(s), {args.mode} mode")
+
+    results = []
+    for design in args.design:
+        print(f"\n📝 Running design: {design}...")
+        result = await run_design(dsn, design, org_ids, args)
+        data = result.to_dict()
+        print_result(data)
+        results.append(data)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Order Placement Contention Simulator')
+    parser.add_argument('--dsn', default=DEFAULT_DSN, help='Admin DSN (default: $LOCAL_DATABASE_URL)')
+    parser.add_argument('--database', default='rotante_bench_contention', help='Scratch database name')
+    parser.add_argument('--keep-database', action='store_true', help='Do not drop the scratch database')
+    parser.add_argument('--design', nargs='+', choices=DESIGNS, default=DESIGNS, help='Counter designs to compare')
+    parser.add_argument('--mode', choices=MODES, default='edge', help='edge: autocommit per call, rpc: one transaction')
+    parser.add_argument('--clients', type=int, default=50, help='Concurrent placement clients')
+    parser.add_argument('--orders', type=int, default=2000, help='Placements per design')
+    parser.add_argument('--orgs', type=int, default=1, help='Organizations sharing the workload')
+    parser.add_argument('--skew', type=float, default=0.0, help='Share of orders for the busiest org (0 = uniform)')
+    parser.add_argument('--items', type=int, default=3, help='Line items per order')
+    parser.add_argument('--block-size', type=int, default=20, help='Numbers claimed per block (block design)')
+    parser.add_argument('--rate-limit-max', type=int, default=1_000_000, help='p_max_requests for check_rate_limit')
+    parser.add_argument('--sample-ms', type=float, default=10.0, help='Lock sampling interval')
+    parser.add_argument('--json', metavar='PATH', help='Write results as JSON')
+
+    args = parser.parse_args()
+    require_psycopg()
+
+    print("🔒 Order Placement Contention Simulator")
+    print("="*60)
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if not args.keep_database:
+            drop_scratch_database(args.dsn, args.database)
+
+    print_comparison(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,842 @@
+#!/usr/bin/env python3
+"""
+Order Pipeline Load Test
+========================
+Replays a day of orders through the calls the app makes, against a local
+Postgres loaded with the SaaS schema behind an in-process PostgREST stand-in.
+No Supabase project is needed.
+
+Call sequences replayed:
+  place-order       Create path of supabase/functions/place-order: auth, membership,
+                    rate limit, price validation reads, order + items inserts
+  kitchen stream    RealtimeService.watchKitchenOrders(): every ordini change is
+                    followed by a re-read of the 50-order snapshot with ordini_items(*)
+  status updates    assignOrderToKitchen, updateOrderStatus and assignOrderToDelivery
+                    as the staff app issues them while the order moves along
+
+Every PostgREST request is one transaction on a shared connection pool
+(--pool-size, PostgREST's db-pool). Edge function admin calls run as
+service_role; app calls and the edge user client run as authenticated with
+request.jwt.claim.sub set, so RLS is paid where the app pays it. Realtime is
+stood in for by a NOTIFY trigger on ordini fanned out to the kitchen screens.
+
+The day (a synthesized lunch/dinner curve, or --recording) is replayed open
+loop: its busiest window is compressed by each --speedup in turn into
+--step-seconds of wall clock. A step is sustained when at least 95% of the
+offered orders are placed and place-order p99 stays within --slo-ms; the
+saturation point of a tenant count is the highest sustained offered rate.
+
+Usage:
+    python bench_order_pipeline.py                                  # 1, 5 and 20 tenants
+    python bench_order_pipeline.py --tenants 10 --speedup 60 240 960
+    python bench_order_pipeline.py --recording orders.json          # Replay a recorded day
+    python bench_order_pipeline.py --pool-size 20 --kitchens 4
+    python bench_order_pipeline.py --json pipeline.json             # Save results
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from analyze_queries import edge_flows, foreign_key_join
+from bench_queries import SEED_MENU_SQL
+from dart_index import split_commas
+from local_postgres import (
+    psycopg, DEFAULT_DSN, require_psycopg, connect, connect_async, prepare_bench_database,
+    drop_scratch_database, seed_organizations, latency_summary,
+)
+from saas_schema import load_schema, split_top_level
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+# What a Supabase project grants the API roles out of the box
+POSTGREST_GRANTS_SQL = [
+    "GRANT USAGE ON SCHEMA public, auth TO anon, authenticated, service_role",
+    "GRANT ALL ON ALL TABLES IN SCHEMA public TO anon, authenticated, service_role",
+    "GRANT ALL ON ALL SEQUENCES IN SCHEMA public TO anon, authenticated, service_role",
+    "GRANT EXECUTE ON ALL FUNCTIONS IN SCHEMA public TO anon, authenticated, service_role",
+    "GRANT EXECUTE ON FUNCTION auth.uid() TO anon, authenticated, service_role",
+]
+
+REALTIME_CHANNEL = 'realtime_ordini'
+
+# Stand-in for the Realtime WAL listener: one message per ordini row change
+REALTIME_TRIGGER_SQL = [
+    """CREATE OR REPLACE FUNCTION realtime_ordini_notify()
+    RETURNS TRIGGER
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        r ordini%ROWTYPE;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN r := OLD; ELSE r := NEW; END IF;
+        PERFORM pg_notify('realtime_ordini', json_build_object(
+            'type', TG_OP, 'id', r.id, 'organization_id', r.organization_id,
+            'at', extract(epoch FROM clock_timestamp())
+        )::text);
+        RETURN NULL;
+    END;
+    $$""",
+    "DROP TRIGGER IF EXISTS realtime_ordini_notify ON ordini",
+    """CREATE TRIGGER realtime_ordini_notify
+    AFTER INSERT OR UPDATE OR DELETE ON ordini
+    FOR EACH ROW EXECUTE FUNCTION realtime_ordini_notify()""",
+]
+
+SEED_CUSTOMERS_SQL = """
+WITH users AS (
+    INSERT INTO auth.users (email)
+    SELECT 'customer-' || n || '-' || %(org)s::text || '@example.com' FROM generate_series(1, %(count)s) AS n
+    RETURNING id
+)
+INSERT INTO organization_members (organization_id, user_id, role, accepted_at)
+SELECT %(org)s::uuid, id, 'customer', now() FROM users
+RETURNING user_id
+"""
+
+# Tables a replay writes; truncated before each tenant count
+PIPELINE_TABLES = ['ordini_items', 'ordini', 'daily_order_counters', 'rate_limits', 'audit_logs', 'notifiche']
+
+# Share of the day's orders per hour, pizzeria lunch and dinner peaks
+HOURLY_SHARE = {11: 2, 12: 10, 13: 8, 14: 2, 18: 6, 19: 18, 20: 24, 21: 18, 22: 8, 23: 4}
+DELIVERY_SHARE = 0.5
+CARD_SHARE = 0.3
+SIZE_SHARE = 0.4         # items with a size variant (sizes_master, menu_item_sizes reads)
+INGREDIENT_SHARE = 0.2   # items with added ingredients (ingredients reads)
+
+# Minutes of day time after placement at which the staff app moves the order on
+LIFECYCLE = {
+    'delivery': [
+        (1, 'assignOrderToKitchen', None), (2, 'updateOrderStatus', 'preparing'),
+        (15, 'updateOrderStatus', 'ready'), (16, 'assignOrderToDelivery', None),
+        (18, 'updateOrderStatus', 'delivering'), (40, 'updateOrderStatus', 'completed'),
+    ],
+    'takeaway': [
+        (1, 'assignOrderToKitchen', None), (2, 'updateOrderStatus', 'preparing'),
+        (15, 'updateOrderStatus', 'ready'), (25, 'updateOrderStatus', 'completed'),
+    ],
+}
+
+# Same timestamp columns as DatabaseService.updateOrderStatus()
+STATUS_TIMESTAMPS = {
+    'confirmed': 'confermato_at', 'preparing': 'preparazione_at', 'ready': 'pronto_at',
+    'delivering': 'in_consegna_at', 'completed': 'completato_at', 'cancelled': 'cancellato_at',
+}
+
+STREAM_LIMIT = 50
+SUSTAINED_SHARE = 0.95
+
+
+# ---------------------------------------------------------------------------
+# PostgREST stand-in
+# ---------------------------------------------------------------------------
+
+class CallStats:
+    """Latency per call label, pool waits and errors for one replay step"""
+
+    def __init__(self):
+        self.latencies_ms: Dict[str, List[float]] = {}
+        self.pool_wait_ms: List[float] = []
+        self.errors: Counter = Counter()
+
+    def add(self, label: str, elapsed_ms: float):
+        self.latencies_ms.setdefault(label, []).append(elapsed_ms)
+
+
+class PostgrestError(Exception):
+    """A request that failed inside the database"""
+
+
+class StubPostgrest:
+    """In-process PostgREST: one transaction per request on a shared connection pool"""
+
+    def __init__(self, pool: asyncio.Queue, schema, stats: CallStats):
+        self.pool = pool
+        self.schema = schema
+        self.stats = stats
+
+    async def request(self, label: str, sql: str, params: list, rtt_ms: float,
+                      role: Optional[str] = 'service_role', user_id: Optional[str] = None):
+        """Run one request as `role` and return its decoded JSON (role None = the auth server's own login)"""
+        started = time.perf_counter()
+        await asyncio.sleep(rtt_ms / 2000.0)
+        waiting = time.perf_counter()
+        conn = await self.pool.get()
+        self.stats.pool_wait_ms.append((time.perf_counter() - waiting) * 1000)
+        try:
+            async with conn.transaction():
+                if role:
+                    await conn.execute(
+                        "SELECT set_config('role', %s, true), set_config('request.jwt.claim.sub', %s, true)",
+                        (role, user_id or ''),
+                    )
+                cur = await conn.execute(sql, params)
+                row = await cur.fetchone() if cur.description else None
+                result = row[0] if row else None
+        except psycopg.Error as e:
+            self.stats.errors[f"{label}: {type(e).__name__}"] += 1
+            raise PostgrestError(str(e).splitlines()[0] if str(e) else type(e).__name__)
+        finally:
+            self.pool.put_nowait(conn)
+        await asyncio.sleep(rtt_ms / 2000.0)
+        self.stats.add(label, (time.perf_counter() - started) * 1000)
+        return result
+
+    def column_type(self, table: str, column: str) -> str:
+        return self.schema.table(table).columns[column].data_type
+
+    def where(self, table: str, filters: List[Tuple[str, str, object]]) -> Tuple[str, list]:
+        """eq/in filters as PostgREST renders them, cast to the column type"""
+        clauses = []
+        params = []
+        for column, op, value in filters:
+            cast = self.column_type(table, column)
+            if op == 'in':
+                clauses.append(f"{table}.{column} = ANY(%s::{cast}[])")
+                params.append(list(value))
+            else:
+                clauses.append(f"{table}.{column} = %s::{cast}")
+                params.append(value)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def columns(self, table: str, select: str) -> str:
+        """Select list with embedded resources as correlated json_agg subqueries"""
+        parts = []
+        for item in split_commas(select, '()'):
+            item = item.strip()
+            if '(' not in item:
+                parts.append(f"{table}.{item}")
+                continue
+            child, inner = item[:-1].split('(', 1)
+            child_column, parent_column = foreign_key_join(self.schema, child, table)
+            inner_columns = ', '.join(f"{child}.{c.strip()}" for c in split_commas(inner, '()'))
+            parts.append(
+                f"(SELECT coalesce(json_agg(_embed), '[]') FROM (SELECT {inner_columns} FROM {child} "
+                f"WHERE {child}.{child_column} = {table}.{parent_column}) _embed) AS {child}"
+            )
+        return ', '.join(parts)
+
+    @staticmethod
+    def as_json(query: str) -> str:
+        return f"SELECT coalesce(json_agg(_postgrest_t), '[]') FROM ({query}) _postgrest_t"
+
+    async def select(self, label: str, table: str, select: str, filters: list, rtt_ms: float,
+                     order: Optional[str] = None, limit: Optional[int] = None, **auth) -> list:
+        where, params = self.where(table, filters)
+        query = f"SELECT {self.columns(table, select)} FROM {table}{where}"
+        if order:
+            query += f" ORDER BY {table}.{order}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return await self.request(label, self.as_json(query), params, rtt_ms, **auth)
+
+    async def insert(self, label: str, table: str, rows: List[Dict], rtt_ms: float,
+                     returning: bool = False, **auth) -> list:
+        keys = list(rows[0])
+        columns = ', '.join(keys)
+        query = (f"INSERT INTO {table} ({columns}) SELECT {columns} "
+                 f"FROM json_populate_recordset(null::{table}, %s::json)")
+        if returning:
+            query = f"WITH _postgrest_t AS ({query} RETURNING *) " \
+                    f"SELECT coalesce(json_agg(_postgrest_t), '[]') FROM _postgrest_t"
+        return await self.request(label, query, [json.dumps(rows)], rtt_ms, **auth)
+
+    async def update(self, label: str, table: str, values: Dict, filters: list, rtt_ms: float, **auth) -> list:
+        where, params = self.where(table, filters)
+        columns = ', '.join(values)
+        query = (f"UPDATE {table} SET ({columns}) = (SELECT {columns} "
+                 f"FROM json_populate_record(null::{table}, %s::json)){where}")
+        return await self.request(label, query, [json.dumps(values)] + params, rtt_ms, **auth)
+
+    async def rpc(self, label: str, name: str, args: Dict, rtt_ms: float, **auth) -> Optional[Dict]:
+        declared = {}
+        for argument in split_top_level(self.schema.functions[name].arguments):
+            words = argument.split()
+            declared[words[0]] = words[1]
+        named = ', '.join(f"{k} := %s::{declared[k]}" for k in args)
+        return await self.request(label, f"SELECT to_json({name}({named}))", list(args.values()), rtt_ms, **auth)
+
+
+# ---------------------------------------------------------------------------
+# Day of orders
+# ---------------------------------------------------------------------------
+
+class OrderSpec:
+    """One order of the day: when, what kind and how many line items"""
+
+    def __init__(self, offset_s: float, tipo: str, payment: str, items: int):
+        self.offset_s = offset_s
+        self.tipo = tipo
+        self.payment = payment
+        self.items = items
+
+
+class Tenant:
+    """A seeded organization with its staff, customers and menu"""
+
+    def __init__(self, org_id: str, owner_id: str, customers: List[str], menu: List[Tuple[str, str, float]],
+                 sizes: List[str], ingredients: List[str]):
+        self.org_id = org_id
+        self.owner_id = owner_id
+        self.customers = customers
+        self.menu = menu
+        self.sizes = sizes
+        self.ingredients = ingredients
+
+
+def synthesize_day(orders: int, items: int, rng: random.Random) -> List[OrderSpec]:
+    """`orders` orders spread over HOURLY_SHARE"""
+    hours = list(HOURLY_SHARE)
+    weights = [HOURLY_SHARE[h] for h in hours]
+    day = []
+    for hour in rng.choices(hours, weights=weights, k=orders):
+        day.append(OrderSpec(
+            hour * 3600 + rng.uniform(0, 3600),
+            'delivery' if rng.random() < DELIVERY_SHARE else 'takeaway',
+            'card' if rng.random() < CARD_SHARE else 'cash',
+            rng.randint(1, max(1, 2 * items - 1)),
+        ))
+    return sorted(day, key=lambda o: o.offset_s)
+
+
+def load_recording(path: str, items: int) -> List[OrderSpec]:
+    """Orders exported from ordini (created_at, tipo, metodo_pagamento, ordini_items or items)"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('orders', [])
+
+    day = []
+    for row in data:
+        created = datetime.fromisoformat(str(row['created_at']).replace('Z', '+00:00'))
+        count = row.get('ordini_items', row.get('items', items))
+        day.append(OrderSpec(
+            created.hour * 3600 + created.minute * 60 + created.second,
+            'delivery' if row.get('tipo') == 'delivery' else 'takeaway',
+            'card' if row.get('metodo_pagamento') == 'card' else 'cash',
+            max(1, len(count) if isinstance(count, list) else int(count)),
+        ))
+    return sorted(day, key=lambda o: o.offset_s)
+
+
+def tenant_arrivals(day: List[OrderSpec], tenants: List[Tenant], rng: random.Random) -> List[Tuple[float, Tenant, OrderSpec]]:
+    """Every tenant replays the day, jittered by up to five minutes"""
+    arrivals = []
+    for tenant in tenants:
+        for spec in day:
+            arrivals.append((max(0.0, spec.offset_s + rng.uniform(-300, 300)), tenant, spec))
+    return sorted(arrivals, key=lambda a: a[0])
+
+
+def busiest_window(arrivals: List[Tuple[float, Tenant, OrderSpec]], length_s: float) -> List[Tuple[float, Tenant, OrderSpec]]:
+    """The `length_s` seconds of day time with the most arrivals"""
+    best = (0, 0)
+    first = 0
+    for last in range(len(arrivals)):
+        while arrivals[last][0] - arrivals[first][0] > length_s:
+            first += 1
+        if last - first + 1 > best[1] - best[0]:
+            best = (first, last + 1)
+    return arrivals[best[0]:best[1]]
+
+
+# ---------------------------------------------------------------------------
+# Call sequences
+# ---------------------------------------------------------------------------
+
+class Pipeline:
+    """One replay step: placements, the staff lifecycle and the kitchen screens"""
+
+    def __init__(self, api: StubPostgrest, args, speedup: float, rng: random.Random):
+        self.api = api
+        self.args = args
+        self.speedup = speedup
+        self.rng = rng
+        self.placed_ms: List[float] = []
+        self.failed: Counter = Counter()
+        self.last_placed = 0.0
+        self.lifecycle: List[asyncio.Task] = []
+
+    def order_items(self, tenant: Tenant, spec: OrderSpec) -> List[Dict]:
+        items = []
+        for _ in range(spec.items):
+            menu_item_id, name, price = self.rng.choice(tenant.menu)
+            varianti = {}
+            if tenant.sizes and self.rng.random() < SIZE_SHARE:
+                varianti['size'] = {'id': self.rng.choice(tenant.sizes)}
+            if tenant.ingredients and self.rng.random() < INGREDIENT_SHARE:
+                varianti['addedIngredients'] = [{'id': self.rng.choice(tenant.ingredients), 'quantity': 1}]
+            quantity = self.rng.randint(1, 2)
+            items.append({
+                'menu_item_id': menu_item_id, 'nome_prodotto': name, 'quantita': quantity,
+                'prezzo_unitario': price, 'subtotale': round(price * quantity, 2), 'varianti': varianti,
+            })
+        return items
+
+    async def place_order(self, tenant: Tenant, spec: OrderSpec) -> Optional[str]:
+        """place-order create path, call for call (labels match analyze_queries --edge-functions)"""
+        api, rtt = self.api, self.args.edge_rtt_ms
+        user_id = self.rng.choice(tenant.customers)
+        org_id = tenant.org_id
+        items = self.order_items(tenant, spec)
+
+        await api.request('auth getUser', "SELECT to_json(u) FROM auth.users u WHERE id = %s::uuid",
+                          [user_id], rtt, role=None)
+        membership = await api.select(
+            'organization_members.select', 'organization_members', 'id, is_active, role',
+            [('organization_id', 'eq', org_id), ('user_id', 'eq', user_id)], rtt,
+        )
+        if not membership or not membership[0]['is_active']:
+            self.failed['not_a_member'] += 1
+            return None
+
+        rate_limit = await api.rpc('rpc check_rate_limit', 'check_rate_limit', {
+            'p_identifier': org_id, 'p_endpoint': 'place-order',
+            'p_max_requests': self.args.rate_limit_max, 'p_window_minutes': 60,
+        }, rtt, role='authenticated', user_id=user_id)
+        if rate_limit and not rate_limit.get('allowed', True):
+            self.failed['rate_limited'] += 1
+            return None
+
+        await api.select('profiles.select', 'profiles', 'ruolo', [('id', 'eq', user_id)], rtt)
+
+        # validateAndCorrectPrices()
+        menu_ids = sorted({i['menu_item_id'] for i in items})
+        size_ids = sorted({i['varianti']['size']['id'] for i in items if 'size' in i['varianti']})
+        ingredient_ids = sorted({a['id'] for i in items for a in i['varianti'].get('addedIngredients', [])})
+        await api.select('menu_items.select', 'menu_items', 'id, prezzo, prezzo_scontato',
+                         [('id', 'in', menu_ids), ('organization_id', 'eq', org_id)], rtt)
+        if size_ids:
+            await api.select('sizes_master.select', 'sizes_master', 'id, price_multiplier',
+                             [('id', 'in', size_ids), ('organization_id', 'eq', org_id)], rtt)
+            await api.select('menu_item_sizes.select', 'menu_item_sizes', 'menu_item_id, size_id, price_override',
+                             [('menu_item_id', 'in', menu_ids), ('size_id', 'in', size_ids),
+                              ('organization_id', 'eq', org_id)], rtt)
+        if ingredient_ids:
+            await api.select('ingredients.select', 'ingredients', 'id, prezzo',
+                             [('id', 'in', ingredient_ids), ('organization_id', 'eq', org_id)], rtt)
+            if size_ids:
+                await api.select('ingredient_size_prices.select', 'ingredient_size_prices',
+                                 'ingredient_id, size_id, prezzo',
+                                 [('ingredient_id', 'in', ingredient_ids), ('size_id', 'in', size_ids),
+                                  ('organization_id', 'eq', org_id)], rtt)
+
+        subtotal = round(sum(i['subtotale'] for i in items), 2)
+        delivery_fee = 3.0 if spec.tipo == 'delivery' else 0.0
+        order = await api.insert('ordini.insert', 'ordini', [{
+            'cliente_id': user_id, 'organization_id': org_id,
+            'stato': 'confirmed' if spec.payment == 'cash' else 'pending',
+            'tipo': spec.tipo, 'nome_cliente': 'Cliente Load', 'telefono_cliente': '3330000000',
+            'subtotale': subtotal, 'costo_consegna': delivery_fee, 'sconto': 0,
+            'totale': subtotal + delivery_fee, 'metodo_pagamento': spec.payment, 'pagato': False,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+        }], rtt, returning=True)
+        order_id = order[0]['id']
+
+        await api.insert('ordini_items.insert', 'ordini_items',
+                         [dict(item, ordine_id=order_id, organization_id=org_id) for item in items], rtt)
+
+        if spec.payment == 'card':
+            started = time.perf_counter()
+            await asyncio.sleep(self.args.external_ms / 1000.0)
+            api.stats.add('POST api.stripe.com', (time.perf_counter() - started) * 1000)
+        return order_id
+
+    async def placement(self, tenant: Tenant, spec: OrderSpec):
+        """App -> place-order invoke -> staff lifecycle"""
+        started = time.perf_counter()
+        await asyncio.sleep(self.args.app_rtt_ms / 2000.0)
+        try:
+            order_id = await self.place_order(tenant, spec)
+        except PostgrestError:
+            self.failed['error'] += 1
+            return
+        await asyncio.sleep(self.args.app_rtt_ms / 2000.0)
+        if order_id is None:
+            return
+        self.placed_ms.append((time.perf_counter() - started) * 1000)
+        self.api.stats.add('place-order', self.placed_ms[-1])
+        self.last_placed = time.perf_counter()
+        self.lifecycle.append(asyncio.ensure_future(self.move_along(tenant, spec, order_id)))
+
+    async def move_along(self, tenant: Tenant, spec: OrderSpec, order_id: str):
+        """Staff app status updates at compressed LIFECYCLE times"""
+        api, rtt = self.api, self.args.app_rtt_ms
+        auth = {'role': 'authenticated', 'user_id': tenant.owner_id}
+        steps = list(LIFECYCLE[spec.tipo])
+        if spec.payment == 'card':
+            # verify-payment confirms the order before the kitchen sees it
+            steps.insert(0, (0.5, 'updateOrderStatus', 'confirmed'))
+
+        elapsed = 0.0
+        for minutes, call, status in steps:
+            await asyncio.sleep((minutes - elapsed) * 60 / self.speedup)
+            elapsed = minutes
+            filters = [('id', 'eq', order_id)]
+            try:
+                if call == 'updateOrderStatus':
+                    values = {'stato': status, STATUS_TIMESTAMPS[status]: datetime.now(timezone.utc).isoformat()}
+                    await api.update(call, 'ordini', values, filters, rtt, **auth)
+                elif call == 'assignOrderToKitchen':
+                    await api.update(call, 'ordini', {'assegnato_cucina_id': tenant.owner_id}, filters, rtt, **auth)
+                else:
+                    await api.update(call, 'ordini', {'assegnato_delivery_id': tenant.owner_id}, filters, rtt, **auth)
+            except PostgrestError:
+                return
+
+
+class KitchenScreen:
+    """RealtimeService.watchKitchenOrders() on one device"""
+
+    def __init__(self, api: StubPostgrest, tenant: Tenant, args):
+        self.api = api
+        self.tenant = tenant
+        self.args = args
+        self.order_ids: List[str] = []
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.lag_ms: List[float] = []
+        self.refetch_errors = 0
+
+    @property
+    def auth(self) -> Dict:
+        return {'role': 'authenticated', 'user_id': self.tenant.owner_id}
+
+    async def run(self):
+        # .stream() initial load: no organization_id filter, RLS scopes it
+        try:
+            rows = await self.api.select('ordini.stream', 'ordini', 'id', [], self.args.app_rtt_ms,
+                                         order='created_at DESC', limit=STREAM_LIMIT, **self.auth)
+            self.order_ids = [r['id'] for r in rows]
+        except PostgrestError:
+            self.refetch_errors += 1
+
+        while True:
+            event = await self.events.get()
+            if event is None:
+                return
+            if event['type'] == 'INSERT':
+                self.order_ids = ([event['id']] + self.order_ids)[:STREAM_LIMIT]
+            elif event['type'] == 'DELETE':
+                self.order_ids = [i for i in self.order_ids if i != event['id']]
+            if not self.order_ids:
+                continue
+            # await-for body: full snapshot re-read, statuses filtered in Dart
+            try:
+                await self.api.select(
+                    'ordini.select (stream refetch)', 'ordini', '*, ordini_items(*)',
+                    [('id', 'in', self.order_ids)], self.args.app_rtt_ms,
+                    order='created_at DESC', **self.auth,
+                )
+            except PostgrestError:
+                self.refetch_errors += 1
+                continue
+            self.lag_ms.append((time.time() - event['at']) * 1000)
+
+
+class RealtimeStub:
+    """LISTEN on the ordini trigger and fan out to the screens allowed to see the row"""
+
+    def __init__(self, screens: List[KitchenScreen]):
+        self.screens = screens
+        self.events = 0
+        self.delivered = 0
+        self.filtered = 0
+
+    async def run(self, dsn: str, ready: asyncio.Event):
+        conn = await connect_async(dsn, autocommit=True)
+        try:
+            await conn.execute(f"LISTEN {REALTIME_CHANNEL}")
+            ready.set()
+            async for notify in conn.notifies():
+                event = json.loads(notify.payload)
+                self.events += 1
+                for screen in self.screens:
+                    # watchKitchenOrders() subscribes unfiltered: every screen is
+                    # checked against RLS for every change, tenants other than the row's are dropped
+                    if screen.tenant.org_id == event['organization_id']:
+                        screen.events.put_nowait(event)
+                        self.delivered += 1
+                    else:
+                        self.filtered += 1
+        finally:
+            await conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Load steps
+# ---------------------------------------------------------------------------
+
+def load_tenants(conn, org_ids: List[str], customers: int, menu_items: int) -> List[Tenant]:
+    """Seed menu and customers for each organization"""
+    tenants = []
+    for org_id in org_ids:
+        for statement in SEED_MENU_SQL:
+            conn.execute(statement, {'org': org_id, 'items': menu_items, 'ingredients': menu_items})
+        customer_ids = [str(r[0]) for r in conn.execute(SEED_CUSTOMERS_SQL, {'org': org_id, 'count': customers})]
+        owner_id = conn.execute(
+            "SELECT user_id FROM organization_members WHERE organization_id = %s AND role = 'owner'", (org_id,)
+        ).fetchone()[0]
+        tenants.append(Tenant(
+            org_id, str(owner_id), customer_ids,
+            [(str(r[0]), r[1], float(r[2])) for r in conn.execute(
+                "SELECT id, nome, prezzo FROM menu_items WHERE organization_id = %s", (org_id,))],
+            [str(r[0]) for r in conn.execute("SELECT id FROM sizes_master WHERE organization_id = %s", (org_id,))],
+            [str(r[0]) for r in conn.execute("SELECT id FROM ingredients WHERE organization_id = %s", (org_id,))],
+        ))
+    conn.execute("ANALYZE")
+    return tenants
+
+
+def reset_orders(conn):
+    for table in PIPELINE_TABLES:
+        conn.execute(f"TRUNCATE {table} CASCADE")
+    conn.execute("ANALYZE")
+
+
+async def open_pool(dsn: str, size: int) -> asyncio.Queue:
+    pool: asyncio.Queue = asyncio.Queue()
+    for conn in await asyncio.gather(*(connect_async(dsn, autocommit=True) for _ in range(size))):
+        pool.put_nowait(conn)
+    return pool
+
+
+async def close_pool(pool: asyncio.Queue):
+    while not pool.empty():
+        await pool.get_nowait().close()
+
+
+async def drain(tasks: List[asyncio.Task], timeout: float) -> int:
+    """Wait for tasks up to `timeout` seconds; cancel and count the rest"""
+    pending = [t for t in tasks if not t.done()]
+    if pending:
+        _, pending = await asyncio.wait(pending, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    return len(pending)
+
+
+async def run_step(dsn: str, schema, tenants: List[Tenant], arrivals, speedup: float, args,
+                   rng: random.Random) -> Dict:
+    """Replay the busiest window of the day at `speedup` for --step-seconds"""
+    window = busiest_window(arrivals, args.step_seconds * speedup)
+    start = window[0][0] if window else 0.0
+    stats = CallStats()
+    pool = await open_pool(dsn, args.pool_size)
+    api = StubPostgrest(pool, schema, stats)
+    pipeline = Pipeline(api, args, speedup, rng)
+
+    screens = [KitchenScreen(api, tenant, args) for tenant in tenants for _ in range(args.kitchens)]
+    realtime = RealtimeStub(screens)
+    ready = asyncio.Event()
+    listener = asyncio.ensure_future(realtime.run(dsn, ready))
+    await ready.wait()
+    screen_tasks = [asyncio.ensure_future(s.run()) for s in screens]
+
+    started = time.perf_counter()
+    placements = []
+    for offset, tenant, spec in window:
+        delay = (offset - start) / speedup - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        placements.append(asyncio.ensure_future(pipeline.placement(tenant, spec)))
+
+    unfinished = await drain(placements, args.drain_seconds)
+    wall = max(args.step_seconds, (pipeline.last_placed or time.perf_counter()) - started)
+    unfinished += await drain(pipeline.lifecycle, args.drain_seconds)
+
+    for screen in screens:
+        screen.events.put_nowait(None)
+    await drain(screen_tasks, args.drain_seconds)
+    listener.cancel()
+    await asyncio.gather(listener, return_exceptions=True)
+    await close_pool(pool)
+
+    offered = len(window) / args.step_seconds
+    placed = len(pipeline.placed_ms)
+    latency = latency_summary(pipeline.placed_ms)
+    lag = [ms for s in screens for ms in s.lag_ms]
+    sustained = (bool(window) and placed >= SUSTAINED_SHARE * len(window)
+                 and latency['p99_ms'] <= args.slo_ms)
+    return {
+        'tenants': len(tenants),
+        'speedup': speedup,
+        'offered': len(window),
+        'offered_per_sec': round(offered, 2),
+        'placed': placed,
+        'orders_per_sec': round(placed / wall, 2) if wall else 0.0,
+        'failed': dict(pipeline.failed),
+        'unfinished': unfinished,
+        'sustained': sustained,
+        'place_order': latency,
+        'calls': {k: latency_summary(v) for k, v in sorted(stats.latencies_ms.items())},
+        'pool_wait': latency_summary(stats.pool_wait_ms),
+        'errors': dict(stats.errors),
+        'realtime': {
+            'events': realtime.events,
+            'delivered': realtime.delivered,
+            'filtered_by_rls': realtime.filtered,
+            'refetch_errors': sum(s.refetch_errors for s in screens),
+            'lag': latency_summary(lag),
+        },
+    }
+
+
+def print_step(data: Dict):
+    mark = '✅' if data['sustained'] else '❌'
+    latency = data['place_order']
+    print(f"\n  {mark} x{data['speedup']:g}: offered {data['offered_per_sec']} orders/s, "
+          f"sustained {data['orders_per_sec']} orders/s ({data['placed']}/{data['offered']} placed)")
+    print(f"     place-order p50 {latency['p50_ms']}ms  p99 {latency['p99_ms']}ms  max {latency['max_ms']}ms  "
+          f"pool wait p99 {data['pool_wait']['p99_ms']}ms")
+    for label, summary in data['calls'].items():
+        print(f"       {label:<34} n={summary['count']:<6} p50 {summary['p50_ms']:>8}ms  p99 {summary['p99_ms']:>8}ms")
+    rt = data['realtime']
+    print(f"     realtime: {rt['events']} changes, {rt['delivered']} delivered, "
+          f"{rt['filtered_by_rls']} dropped by RLS, lag p99 {rt['lag']['p99_ms']}ms")
+    if data['failed'] or data['errors'] or data['unfinished']:
+        print(f"     ⚠️ failed {data['failed']}  errors {data['errors']}  unfinished {data['unfinished']}")
+
+
+def catalogue_coverage():
+    """Round trips of place-order's create path that the replay does not issue"""
+    flows = edge_flows(['place-order'])
+    if not flows:
+        return
+    replayed = {
+        'auth getUser', 'organization_members.select', 'rpc check_rate_limit', 'profiles.select',
+        'menu_items.select', 'sizes_master.select', 'menu_item_sizes.select', 'ingredients.select',
+        'ingredient_size_prices.select', 'ordini.insert', 'ordini_items.insert', 'POST api.stripe.com',
+    }
+    for label, steps in flows[0].paths():
+        if 'else of if (isUpdate)' in label:
+            missing = sorted({s.label for s in steps} - replayed)
+            print(f"📋 place-order {label}: {len(steps)} catalogued round trips"
+                  + (f", not replayed: {', '.join(missing)}" if missing else ", all replayed"))
+
+
+async def run(args) -> List[Dict]:
+    rng = random.Random(args.seed)
+    schema = load_schema()
+    day = load_recording(args.recording, args.items) if args.recording else \
+        synthesize_day(args.orders_per_day, args.items, rng)
+    if not day:
+        print("❌ Error: the day has no orders")
+        sys.exit(1)
+
+    dsn = prepare_bench_database(args.dsn, args.database)
+    with connect(dsn) as conn:
+        for statement in POSTGREST_GRANTS_SQL + REALTIME_TRIGGER_SQL:
+            conn.execute(statement)
+        org_ids = seed_organizations(conn, max(args.tenants), prefix='pipeline')
+        print(f"🌱 Seeding menus ({args.menu_items} items) and {args.customers} customers per tenant")
+        all_tenants = load_tenants(conn, org_ids, args.customers, args.menu_items)
+
+    catalogue_coverage()
+    print(f"🚀 {len(day)} orders per tenant per day, {args.step_seconds:g}s steps, "
+          f"pool {args.pool_size}, {args.kitchens} kitchen screen(s) per tenant")
+
+    results = []
+    for count in args.tenants:
+        tenants = all_tenants[:count]
+        with connect(dsn) as conn:
+            reset_orders(conn)
+        arrivals = tenant_arrivals(day, tenants, rng)
+        print(f"\n📝 {count} tenant(s)")
+        for speedup in args.speedup:
+            data = await run_step(dsn, schema, tenants, arrivals, speedup, args, rng)
+            print_step(data)
+            results.append(data)
+            if not data['sustained'] and not args.full:
+                break
+
+    return results
+
+
+def saturation(results: List[Dict]) -> Dict[int, Dict]:
+    """Highest sustained offered rate per tenant count, and the step that broke it"""
+    points: Dict[int, Dict] = {}
+    for data in results:
+        point = points.setdefault(data['tenants'], {
+            'offered_per_sec': 0.0, 'sustained_per_sec': 0.0, 'p99_ms': None, 'broke_at': None,
+        })
+        if data['sustained'] and data['offered_per_sec'] >= point['offered_per_sec']:
+            point['offered_per_sec'] = data['offered_per_sec']
+            point['sustained_per_sec'] = data['orders_per_sec']
+            point['p99_ms'] = data['place_order']['p99_ms']
+        elif not data['sustained'] and point['broke_at'] is None:
+            point['broke_at'] = data['offered_per_sec']
+    return points
+
+
+def print_summary(points: Dict[int, Dict], args):
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"  Saturation (>= {SUSTAINED_SHARE:.0%} placed, place-order p99 <= {args.slo_ms:g}ms):")
+    print(f"  {'tenants':>8} {'sustained/s':>12} {'p99 ms':>10} {'broke at/s':>11}")
+    for count, point in sorted(points.items()):
+        broke = point['broke_at'] if point['broke_at'] is not None else '-'
+        p99 = point['p99_ms'] if point['p99_ms'] is not None else '-'
+        print(f"  {count:>8} {point['sustained_per_sec']:>12} {p99:>10} {broke:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Order Pipeline Load Test')
+    parser.add_argument('--dsn', default=DEFAULT_DSN, help='Admin DSN (default: $LOCAL_DATABASE_URL)')
+    parser.add_argument('--database', default='rotante_bench_pipeline', help='Scratch database name')
+    parser.add_argument('--keep-database', action='store_true', help='Do not drop the scratch database')
+    parser.add_argument('--tenants', type=int, nargs='+', default=[1, 5, 20], help='Tenant counts to saturate')
+    parser.add_argument('--speedup', type=float, nargs='+', default=[60, 120, 240, 480, 960],
+                        help='Day-time compression factors, one load step each')
+    parser.add_argument('--step-seconds', type=float, default=20.0, help='Wall-clock length of a load step')
+    parser.add_argument('--drain-seconds', type=float, default=30.0, help='Wait for in-flight calls after a step')
+    parser.add_argument('--full', action='store_true', help='Keep stepping after the first unsustained step')
+    parser.add_argument('--recording', metavar='PATH', help='JSON export of a day of ordini to replay')
+    parser.add_argument('--orders-per-day', type=int, default=150, help='Synthesized orders per tenant per day')
+    parser.add_argument('--items', type=int, default=3, help='Mean line items per order')
+    parser.add_argument('--menu-items', type=int, default=60, help='Menu items (and ingredients) per tenant')
+    parser.add_argument('--customers', type=int, default=50, help='Customer accounts per tenant')
+    parser.add_argument('--kitchens', type=int, default=2, help='Kitchen screens streaming per tenant')
+    parser.add_argument('--pool-size', type=int, default=10, help='PostgREST db-pool connections')
+    parser.add_argument('--edge-rtt-ms', type=float, default=2.0, help='Edge function <-> PostgREST round trip')
+    parser.add_argument('--app-rtt-ms', type=float, default=30.0, help='App <-> Supabase round trip')
+    parser.add_argument('--external-ms', type=float, default=250.0, help='Stripe call for card orders')
+    parser.add_argument('--slo-ms', type=float, default=1000.0, help='place-order p99 a sustained step must meet')
+    parser.add_argument('--rate-limit-max', type=int, default=1_000_000,
+                        help='p_max_requests for check_rate_limit (place-order ships with 20/hour per org)')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed for the synthesized day')
+    parser.add_argument('--json', metavar='PATH', help='Write results as JSON')
+
+    args = parser.parse_args()
+    require_psycopg()
+
+    print("🍕 Order Pipeline Load Test")
+    print("="*60)
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if not args.keep_database:
+            drop_scratch_database(args.dsn, args.database)
+
+    points = saturation(results)
+    print_summary(points, args)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results,
+                       'saturation': {str(k): v for k, v in points.items()}}, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
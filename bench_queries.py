@@ -0,0 +1,601 @@
+#!/usr/bin/env python3
+"""
+Unbounded Query Payload Benchmark
+=================================
+Replays the reads flagged by `analyze_queries.py --unbounded` against a
+synthetic tenant in a local Postgres and compares, at growing dataset
+sizes, the full response with one keyset page (sort column, id):
+
+  full      The query as the app issues it today (json_agg, like PostgREST)
+  page      Second keyset page, without the suggested index
+  page+idx  Second keyset page, after creating the suggested index
+
+Reads scoped to one customer or driver use the busiest value in the
+dataset. Other equality filters (stato, completato, ...) are dropped, so
+the full-response figures are an upper bound.
+
+--edge-functions replays the round-trip catalogue of
+`analyze_queries.py --edge-functions` instead: every database call of each
+edge function runs as SQL against a seeded tenant (writes inside a
+transaction that is rolled back), and the measured server time is combined
+with --rtt-ms / --external-ms into the latency of each path as written,
+with independent calls under Promise.all, and with each run of database
+calls merged into one RPC.
+
+Usage:
+    python bench_queries.py                                 # 30/180/365 days, 150 orders/day
+    python bench_queries.py --days 90 365 730 --orders-per-day 300
+    python bench_queries.py --json unbounded.json           # Save results
+    python bench_queries.py --edge-functions                # Edge function round trips
+    python bench_queries.py --edge-functions --function place-order --rtt-ms 40
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+from analyze_queries import (
+    GrowthModel, UnboundedRead, EdgeFlow, EdgeStep, unbounded_reads, edge_flows, step_ref,
+    COMPARISON_OPERATORS, DEFAULT_PAGE_SIZE,
+)
+from dart_index import split_commas
+from local_postgres import (
+    psycopg, DEFAULT_DSN, require_psycopg, connect, prepare_bench_database, drop_scratch_database,
+    seed_organizations, latency_summary,
+)
+from saas_schema import load_schema, split_top_level
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+# Tables the synthetic tenant fills; other flagged reads are reported as skipped
+SEEDED_TABLES = {'ordini', 'order_reminders', 'notifiche', 'cashier_customers'}
+
+SEED_PEOPLE_SQL = """
+INSERT INTO auth.users (email)
+SELECT 'bench-' || %(role)s || '-' || n || '-' || substr(md5(random()::text), 1, 8) || '@example.com'
+FROM generate_series(1, %(count)s) AS n
+RETURNING id
+"""
+
+SEED_CASHIER_CUSTOMERS_SQL = """
+INSERT INTO cashier_customers (organization_id, nome, telefono, nome_normalized, telefono_normalized, created_at)
+SELECT %(org)s, 'Cliente banco ' || n, '+39 333 ' || lpad(n::text, 7, '0'),
+       'cliente banco ' || n, '39333' || lpad(n::text, 7, '0'),
+       now() - make_interval(days => %(first_day)s) - random() * make_interval(days => %(span)s)
+FROM generate_series(1, %(count)s) AS n
+RETURNING id
+"""
+
+# One statement per horizon slice; created_at spreads the orders over the days
+SEED_ORDERS_SQL = """
+INSERT INTO ordini (
+    organization_id, numero_ordine, nome_cliente, telefono_cliente, tipo, stato,
+    subtotale, costo_consegna, totale, metodo_pagamento, source,
+    cliente_id, cashier_customer_id, assegnato_delivery_id, indirizzo_consegna, citta_consegna,
+    note, created_at, updated_at, completato_at
+)
+SELECT %(org)s, 'B' || d || '-' || n, 'Cliente ' || n, '+39 340 ' || lpad(n::text, 7, '0'),
+       CASE WHEN n %% 3 = 0 THEN 'delivery' ELSE 'takeaway' END, 'completed',
+       18.5, CASE WHEN n %% 3 = 0 THEN 2.5 ELSE 0 END, 21, 'cash', 'app',
+       (%(customers)s::uuid[])[1 + (random() * (cardinality(%(customers)s::uuid[]) - 1))::int],
+       CASE WHEN n %% 4 = 0
+            THEN (%(cashier)s::uuid[])[1 + (random() * (cardinality(%(cashier)s::uuid[]) - 1))::int] END,
+       CASE WHEN n %% 3 = 0
+            THEN (%(drivers)s::uuid[])[1 + (random() * (cardinality(%(drivers)s::uuid[]) - 1))::int] END,
+       CASE WHEN n %% 3 = 0 THEN 'Via Roma ' || n END, CASE WHEN n %% 3 = 0 THEN 'Vittoria' END,
+       CASE WHEN n %% 5 = 0 THEN 'Senza cipolla, citofono rotto' END,
+       ts, ts, ts + interval '25 minutes'
+FROM generate_series(%(first_day)s::int, %(last_day)s::int) AS d,
+     generate_series(1, %(per_day)s::int) AS n,
+     LATERAL (SELECT date_trunc('day', now()) - make_interval(days => d)
+                     + make_interval(mins => 660 + (n * 600 / %(per_day)s))) AS t(ts)
+RETURNING id, cliente_id, created_at
+"""
+
+SEED_REMINDERS_SQL = """
+INSERT INTO order_reminders (organization_id, ordine_id, titolo, descrizione, completato, created_at)
+SELECT %(org)s, o.id, 'Richiamare cliente', 'Verificare indirizzo di consegna', random() < 0.2, o.created_at
+FROM ordini o
+WHERE o.organization_id = %(org)s AND o.created_at >= %(since)s AND random() < %(share)s
+"""
+
+SEED_NOTIFICATIONS_SQL = """
+INSERT INTO notifiche (organization_id, user_id, ordine_id, titolo, messaggio, tipo, created_at)
+SELECT %(org)s, o.cliente_id, o.id, 'Ordine ' || s.titolo, 'Il tuo ordine #' || o.numero_ordine || ' ' || s.messaggio,
+       'order', o.created_at + s.delay
+FROM ordini o
+CROSS JOIN (VALUES ('confermato', 'è stato confermato!', interval '1 minute'),
+                   ('pronto', 'è pronto!', interval '20 minutes')) AS s(titolo, messaggio, delay)
+WHERE o.organization_id = %(org)s AND o.created_at >= %(since)s AND o.cliente_id IS NOT NULL
+"""
+
+
+def seed_slice(conn, org_id: str, people: Dict[str, List[str]], first_day: int, last_day: int,
+               orders_per_day: int):
+    """Orders (and their reminders/notifications) for days first_day..last_day ago"""
+    span = last_day - first_day + 1
+    cashier = [str(r[0]) for r in conn.execute(SEED_CASHIER_CUSTOMERS_SQL, {
+        'org': org_id, 'first_day': first_day, 'span': span,
+        'count': max(1, int(orders_per_day * span * 0.1)),
+    }).fetchall()]
+    people['cashier'].extend(cashier)
+
+    rows = conn.execute(SEED_ORDERS_SQL, {
+        'org': org_id, 'first_day': first_day, 'last_day': last_day, 'per_day': orders_per_day,
+        'customers': people['customers'], 'cashier': people['cashier'], 'drivers': people['drivers'],
+    }).fetchall()
+    since = min(r[2] for r in rows)
+    conn.execute(SEED_REMINDERS_SQL, {'org': org_id, 'since': since, 'share': 0.05})
+    conn.execute(SEED_NOTIFICATIONS_SQL, {'org': org_id, 'since': since})
+    conn.execute("ANALYZE")
+
+
+def read_columns(read: UnboundedRead, schema) -> List[str]:
+    table = schema.table(read.chain.table)
+    select = read.chain.select
+    if select and not select.star:
+        return [c for c in select.columns if c in table.columns]
+    return list(table.columns)
+
+
+def scope_value(conn, read: UnboundedRead, org_id: str):
+    """Worst case: the scope value with the most rows"""
+    if read.scope == 'organization_id':
+        return org_id
+    row = conn.execute(
+        f"SELECT {read.scope} FROM {read.chain.table} WHERE organization_id = %s AND {read.scope} IS NOT NULL "
+        f"GROUP BY 1 ORDER BY count(*) DESC LIMIT 1",
+        (org_id,),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def timed_payload(conn, sql: str, params: tuple, repeat: int) -> Dict:
+    latencies = []
+    payload = ''
+    for _ in range(repeat):
+        started = time.perf_counter()
+        payload = conn.execute(sql, params).fetchone()[0]
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {'bytes': len(payload.encode('utf-8')), **latency_summary(latencies)}
+
+
+def keyset_filter(read: UnboundedRead, cursor: tuple) -> Tuple[str, tuple]:
+    """The cursor filter keyset_rewrite() emits, as SQL, for the page after (sort value, id)"""
+    sort, comparison = read.sort_column, '<' if read.descending else '>'
+    if sort == 'id':
+        return f"id {comparison} %s", (cursor[1],)
+    bound = '<=' if read.descending else '>='
+    return (f"{sort} {bound} %s AND ({sort} {comparison} %s OR ({sort} = %s AND id {comparison} %s))",
+            (cursor[0], cursor[0], cursor[0], cursor[1]))
+
+
+def measure_read(conn, read: UnboundedRead, schema, org_id: str, repeat: int) -> Dict:
+    table = read.chain.table
+    columns = ', '.join(read_columns(read, schema))
+    value = scope_value(conn, read, org_id)
+    direction = 'DESC' if read.descending else 'ASC'
+    sort = read.sort_column
+    order_by = f"{sort} {direction}" + (f", id {direction}" if sort != 'id' else '')
+    where = f"{read.scope} = %s" + (" AND organization_id = %s" if read.scope != 'organization_id' else '')
+    params = (value, org_id) if read.scope != 'organization_id' else (value,)
+
+    full_sql = (f"SELECT coalesce(json_agg(t), '[]')::text FROM "
+                f"(SELECT {columns} FROM {table} WHERE {where} ORDER BY {order_by}) t")
+    result = {'full': timed_payload(conn, full_sql, params, repeat)}
+    result['rows'] = conn.execute(f"SELECT count(*) FROM {table} WHERE {where}", params).fetchone()[0]
+
+    # Cursor = last row of the first page
+    cursor = conn.execute(
+        f"SELECT {sort}, id FROM {table} WHERE {where} ORDER BY {order_by} LIMIT 1 OFFSET %s",
+        params + (read.page_size - 1,),
+    ).fetchone()
+    if not cursor:
+        return result
+    keyset, cursor_params = keyset_filter(read, cursor)
+    page_sql = (f"SELECT coalesce(json_agg(t), '[]')::text FROM "
+                f"(SELECT {columns} FROM {table} WHERE {where} AND {keyset} "
+                f"ORDER BY {order_by} LIMIT {read.page_size}) t")
+    page_params = params + tuple(cursor_params)
+    result['page'] = timed_payload(conn, page_sql, page_params, repeat)
+    if not read.index:
+        conn.execute(read.index_sql)
+        conn.execute(f"ANALYZE {table}")
+        result['page+idx'] = timed_payload(conn, page_sql, page_params, repeat)
+        conn.execute(f"DROP INDEX IF EXISTS {read.index_name}")
+    return result
+
+
+def run(args) -> List[Dict]:
+    schema = load_schema()
+    reads, _ = unbounded_reads(schema, GrowthModel(schema, args.orders_per_day, max(args.days)),
+                               None, args.page_size)
+    benchable = [r for r in reads if r.chain.table in SEEDED_TABLES]
+    for read in reads:
+        if read not in benchable:
+            print(f"  ⏭️  {read.chain.source.rel}:{read.chain.line} {read.chain.table}: not seeded")
+    if not benchable:
+        print("✅ No unbounded reads on seeded tables")
+        return []
+
+    dsn = prepare_bench_database(args.dsn, args.database)
+    results = []
+    with connect(dsn) as conn:
+        org_id = seed_organizations(conn, 1, prefix='unbounded')[0]
+        people = {
+            'customers': [str(r[0]) for r in conn.execute(SEED_PEOPLE_SQL, {'role': 'c', 'count': args.customers})],
+            'drivers': [str(r[0]) for r in conn.execute(SEED_PEOPLE_SQL, {'role': 'd', 'count': args.drivers})],
+            'cashier': [],
+        }
+
+        seeded = 0
+        for horizon in sorted(args.days):
+            print(f"\n🌱 Seeding days {seeded}..{horizon - 1} ({args.orders_per_day} orders/day)")
+            seed_slice(conn, org_id, people, seeded, horizon - 1, args.orders_per_day)
+            seeded = horizon
+            for read in benchable:
+                measured = measure_read(conn, read, schema, org_id, args.repeat)
+                results.append({
+                    'days': horizon,
+                    'read': f"{read.chain.source.rel}:{read.chain.line}",
+                    'table': read.chain.table,
+                    'scope': read.scope,
+                    **measured,
+                })
+    return results
+
+
+def print_comparison(results: List[Dict]):
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"\n{'read':<48} {'days':>5} {'rows':>8} {'variant':<9} {'KB':>10} {'p50 ms':>9}")
+    for result in results:
+        for variant in ('full', 'page', 'page+idx'):
+            if variant not in result:
+                continue
+            m = result[variant]
+            read = result['read'] if variant == 'full' else ''
+            rows = f"{result['rows']:,}" if variant == 'full' else ''
+            print(f"{read[-48:]:<48} {result['days']:>5} {rows:>8} {variant:<9} "
+                  f"{m['bytes'] / 1024:>10,.1f} {m['p50_ms']:>9.2f}")
+
+
+# ---------------------------------------------------------------------------
+# Edge function replay
+# ---------------------------------------------------------------------------
+
+SEED_MENU_SQL = [
+    """INSERT INTO menu_items (organization_id, nome, prezzo)
+    SELECT %(org)s, 'Pizza ' || n, 5 + n %% 10 FROM generate_series(1, %(items)s) AS n""",
+    """INSERT INTO sizes_master (organization_id, nome, slug, price_multiplier)
+    VALUES (%(org)s, 'Normale', 'normale', 1.0), (%(org)s, 'Maxi', 'maxi', 1.5), (%(org)s, 'Baby', 'baby', 0.8)""",
+    """INSERT INTO menu_item_sizes (organization_id, menu_item_id, size_id)
+    SELECT %(org)s, m.id, s.id FROM menu_items m CROSS JOIN sizes_master s
+    WHERE m.organization_id = %(org)s AND s.organization_id = %(org)s""",
+    """INSERT INTO ingredients (organization_id, nome, prezzo)
+    SELECT %(org)s, 'Ingrediente ' || n, 0.5 + n %% 3 FROM generate_series(1, %(ingredients)s) AS n""",
+    """INSERT INTO ingredient_size_prices (organization_id, ingredient_id, size_id, prezzo)
+    SELECT %(org)s, i.id, s.id, i.prezzo * s.price_multiplier FROM ingredients i CROSS JOIN sizes_master s
+    WHERE i.organization_id = %(org)s AND s.organization_id = %(org)s""",
+]
+
+SEED_ORDER_ITEMS_SQL = """
+INSERT INTO ordini_items (organization_id, ordine_id, menu_item_id, nome_prodotto, prezzo_unitario, quantita, subtotale)
+SELECT o.organization_id, o.id, m.id, m.nome, m.prezzo, 1 + n %% 2, m.prezzo * (1 + n %% 2)
+FROM ordini o
+CROSS JOIN generate_series(1, %(per_order)s) AS n
+CROSS JOIN LATERAL (SELECT id, nome, prezzo FROM menu_items
+                    WHERE organization_id = o.organization_id OFFSET (n * 7) %% %(items)s LIMIT 1) m
+WHERE o.organization_id = %(org)s
+"""
+
+TS_LITERAL = re.compile(r"^(?:true|false|null|-?\d+(?:\.\d+)?|'[^']*'|\"[^\"]*\")$")
+
+
+def ts_literal(raw: str):
+    """Python value of a TypeScript literal"""
+    raw = raw.strip()
+    if raw in ('true', 'false'):
+        return raw == 'true'
+    if raw == 'null':
+        return None
+    if raw[:1] in ('"', "'"):
+        return raw[1:-1]
+    return float(raw) if '.' in raw else int(raw)
+
+
+def module_constant(step: EdgeStep, raw: str) -> str:
+    """Resolve `NAME` to the literal of a top-level `const NAME = ...` when there is one"""
+    match = re.search(r'\bconst\s+%s\s*(?::[^=\n]+)?=\s*([^\n]+)' % re.escape(raw.strip()), step.trip.source.text)
+    return match.group(1).strip() if match else raw
+
+
+def payload_is_object(step: EdgeStep, payload: str) -> bool:
+    """True when an insert payload is one row (`{...}` or a variable declared as one)"""
+    if not re.fullmatch(r'\w+', payload):
+        return payload.startswith('{')
+    masked = step.trip.source.masked
+    declarations = list(re.finditer(
+        r'\b(?:const|let|var)\s+%s\s*(?::[^=\n]+)?=\s*(\S)' % payload, masked[:step.trip.offset]))
+    return bool(declarations) and declarations[-1].group(1) == '{'
+
+
+class EdgeReplay:
+    """Turns catalogued edge function round trips into SQL against the seeded tenant"""
+
+    def __init__(self, conn, schema, org_id: str, items: int):
+        self.conn = conn
+        self.schema = schema
+        self.org_id = org_id
+        self.items = items
+        self.samples: Dict[Tuple[str, str, bool], object] = {}
+
+    def sample(self, table: str, column: str, many: bool):
+        """Existing values for a filter column (the tenant id for organization_id)"""
+        if column == 'organization_id':
+            return [self.org_id] if many else self.org_id
+        key = (table, column, many)
+        if key not in self.samples:
+            rows = self.conn.execute(
+                f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL LIMIT %s",
+                (self.items if many else 1,),
+            ).fetchall()
+            values = [r[0] for r in rows]
+            self.samples[key] = values if many else (values[0] if values else None)
+        return self.samples[key]
+
+    def where(self, step: EdgeStep, table) -> Tuple[List[str], list]:
+        clauses, params = [], []
+        for method, column, raw in step.trip.filters:
+            if not column or not table.has_column(column):
+                continue
+            parts = split_commas(raw, '(){}[]')
+            value = module_constant(step, parts[1]) if len(parts) > 1 else ''
+            literal = TS_LITERAL.match(value.strip())
+            if method in ('is', 'is_', 'isFilter'):
+                clauses.append(f"{column} IS {value.strip().upper() or 'NULL'}")
+            elif method in ('in', 'in_', 'inFilter'):
+                clauses.append(f"{column} = ANY(%s)")
+                params.append(self.sample(table.name, column, True))
+            elif method in COMPARISON_OPERATORS:
+                clauses.append(f"{column} {COMPARISON_OPERATORS[method]} %s")
+                params.append(ts_literal(value) if literal else self.sample(table.name, column, False))
+        return clauses, params
+
+    def rpc_statement(self, step: EdgeStep) -> Tuple[Optional[str], list]:
+        function = self.schema.functions.get(step.trip.target or '')
+        if function is None:
+            return None, []
+        passed = {}
+        parts = split_commas(step.trip.calls[0].args, '(){}[]')
+        if len(parts) > 1 and parts[1].strip().startswith('{'):
+            for entry in split_commas(parts[1].strip()[1:-1], '(){}[]'):
+                key, _, value = entry.partition(':')
+                if key.strip():
+                    passed[key.strip()] = value.strip() or key.strip()
+
+        names, params = [], []
+        for argument in split_top_level(function.arguments):
+            words = argument.split()
+            if len(words) < 2 or words[0] not in passed:
+                continue
+            value = module_constant(step, passed[words[0]])
+            kind = words[1].lower()
+            if TS_LITERAL.match(value):
+                params.append(ts_literal(value))
+            elif kind in ('uuid', 'text', 'varchar'):
+                params.append(self.org_id)
+            elif kind in ('integer', 'int', 'bigint', 'numeric'):
+                params.append(1)
+            elif kind == 'boolean':
+                params.append(True)
+            else:
+                params.append('{}')
+            names.append(f"{words[0]} => %s")
+        return f"SELECT {function.name}({', '.join(names)})::text", params
+
+    def statement(self, step: EdgeStep) -> Tuple[Optional[str], list, str]:
+        """(sql, params, note); sql is None when the step cannot run locally"""
+        trip = step.trip
+        if trip.kind == 'rpc':
+            sql, params = self.rpc_statement(step)
+            return sql, params, '' if sql else 'function not in the SaaS schema'
+        if trip.kind != 'from':
+            return None, [], 'network only'
+        table = self.schema.table(trip.target or '')
+        if table is None:
+            return None, [], 'table not in the SaaS schema'
+
+        clauses, params = self.where(step, table)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        operation = trip.operation
+        if operation == 'select':
+            select = trip.select
+            columns = [c for c in select.columns if table.has_column(c)] if select and not select.star else []
+            return (f"SELECT coalesce(json_agg(t), '[]')::text FROM "
+                    f"(SELECT {', '.join(columns) or '*'} FROM {table.name}{where}) t"), params, ''
+        if operation in ('insert', 'upsert'):
+            # Copies of existing tenant rows: same width, indexes and triggers as the real payload
+            columns = ', '.join(c for c, col in table.columns.items() if not col.primary_key)
+            payload = split_commas([c for c in trip.calls if c.name == operation][0].args, '(){}[]')[0].strip()
+            rows = 1 if payload_is_object(step, payload) else self.items
+            scope = " WHERE organization_id = %s" if table.has_column('organization_id') else ''
+            return (f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {table.name}{scope} "
+                    f"LIMIT {rows} ON CONFLICT DO NOTHING"), ([self.org_id] if scope else []), ''
+        if not clauses:
+            return None, [], f"unfiltered {operation}"
+        if operation == 'update':
+            column = 'updated_at' if table.has_column('updated_at') else clauses[0].split()[0]
+            value = 'now()' if column == 'updated_at' else column
+            return f"UPDATE {table.name} SET {column} = {value}{where}", params, ''
+        return f"DELETE FROM {table.name}{where}", params, ''
+
+
+def replay_flow(replay: EdgeReplay, flow: EdgeFlow, repeat: int) -> Tuple[Dict[int, float], Dict[int, str]]:
+    """p50 server ms per step; every repetition runs in a transaction that is rolled back"""
+    statements = {s.index: replay.statement(s) for s in flow.happy_steps}
+    timings: Dict[int, List[float]] = {i: [] for i, (sql, _, _) in statements.items() if sql}
+    notes = {i: note for i, (sql, _, note) in statements.items() if note}
+
+    for _ in range(repeat):
+        with replay.conn.transaction(force_rollback=True):
+            for index in timings:
+                sql, params, _ = statements[index]
+                try:
+                    with replay.conn.transaction():
+                        started = time.perf_counter()
+                        replay.conn.execute(sql, params)
+                        timings[index].append((time.perf_counter() - started) * 1000)
+                except psycopg.Error as e:
+                    notes[index] = str(e).splitlines()[0] if str(e) else type(e).__name__
+
+    server = {i: latency_summary(v)['p50_ms'] for i, v in timings.items() if v}
+    return server, notes
+
+
+def path_latency(flow: EdgeFlow, steps: List[EdgeStep], server: Dict[int, float], args) -> Dict[str, float]:
+    """Sequential, Promise.all and one-RPC latency of a path from measured server time"""
+    def network(step: EdgeStep) -> float:
+        return args.external_ms if step.kind == 'fetch' else args.rtt_ms
+
+    def cost(step: EdgeStep) -> float:
+        return server.get(step.index, 0.0) + network(step)
+
+    waves = sorted({s.wave for s in steps})
+    by_wave = {w: [s for s in steps if s.wave == w] for w in waves}
+    parallel = sum(max(cost(s) for s in by_wave[w]) for w in waves)
+
+    merged = 0.0
+    run_server = None
+    for wave in waves:
+        members = by_wave[wave]
+        if all(s.is_db for s in members):
+            # One RPC per run of database-only waves: server time adds up, the round trip is paid once
+            if run_server is None:
+                run_server = 0.0
+                merged += args.rtt_ms
+            run_server += sum(server.get(s.index, 0.0) for s in members)
+            continue
+        if run_server is not None:
+            merged += run_server
+            run_server = None
+        merged += max(cost(s) for s in members)
+    merged += run_server or 0.0
+
+    return {
+        'sequential': round(sum(cost(s) for s in steps), 2),
+        'promise_all': round(parallel, 2),
+        'rpc': round(merged, 2),
+    }
+
+
+def run_edge_functions(args) -> List[Dict]:
+    schema = load_schema()
+    flows = [f for f in edge_flows(args.function) if f.happy_steps]
+    if not flows:
+        print("✅ No edge function round trips found")
+        return []
+
+    dsn = prepare_bench_database(args.dsn, args.database)
+    results = []
+    with connect(dsn) as conn:
+        org_id = seed_organizations(conn, 1, prefix='edge')[0]
+        print(f"\n🌱 Seeding menu ({args.menu_items} items) and {args.orders_per_day * 7:,} orders")
+        for statement in SEED_MENU_SQL:
+            conn.execute(statement, {'org': org_id, 'items': args.menu_items, 'ingredients': args.menu_items})
+        people = {
+            'customers': [str(r[0]) for r in conn.execute(SEED_PEOPLE_SQL, {'role': 'c', 'count': args.customers})],
+            'drivers': [str(r[0]) for r in conn.execute(SEED_PEOPLE_SQL, {'role': 'd', 'count': args.drivers})],
+            'cashier': [],
+        }
+        seed_slice(conn, org_id, people, 0, 6, args.orders_per_day)
+        conn.execute(SEED_ORDER_ITEMS_SQL, {'org': org_id, 'per_order': args.items, 'items': args.menu_items})
+        conn.execute("ANALYZE")
+
+        replay = EdgeReplay(conn, schema, org_id, args.items)
+        for flow in flows:
+            server, notes = replay_flow(replay, flow, args.repeat)
+            for step in flow.happy_steps:
+                if step.index in notes:
+                    print(f"  ⏭️  {flow.name} {step_ref(step)}: {notes[step.index]}")
+            for label, steps in flow.paths():
+                sequential, parallel, merged = flow.round_trips(steps)
+                results.append({
+                    'function': flow.name,
+                    'path': label,
+                    'round_trips': {'sequential': sequential, 'promise_all': parallel, 'rpc': merged},
+                    'server_ms': round(sum(server.get(s.index, 0.0) for s in steps), 2),
+                    'latency_ms': path_latency(flow, steps, server, args),
+                    'steps': [
+                        {'step': step_ref(s), 'wave': s.wave + 1, 'server_ms': server.get(s.index)}
+                        for s in steps
+                    ],
+                })
+    return results
+
+
+def print_edge_comparison(results: List[Dict], args):
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"  RTT {args.rtt_ms:g} ms per database/auth call, {args.external_ms:g} ms per external API call")
+    print(f"\n{'function / path':<44} {'variant':<12} {'trips':>5} {'ms':>9}")
+    for result in results:
+        name = f"{result['function']} {result['path']}"
+        for variant in ('sequential', 'promise_all', 'rpc'):
+            label = name[:44] if variant == 'sequential' else ''
+            print(f"{label:<44} {variant:<12} {result['round_trips'][variant]:>5} "
+                  f"{result['latency_ms'][variant]:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Unbounded Query Payload Benchmark')
+    parser.add_argument('--dsn', default=DEFAULT_DSN, help='Admin DSN (default: $LOCAL_DATABASE_URL)')
+    parser.add_argument('--database', default='rotante_bench_queries', help='Scratch database name')
+    parser.add_argument('--keep-database', action='store_true', help='Do not drop the scratch database')
+    parser.add_argument('--days', nargs='+', type=int, default=[30, 180, 365], help='Dataset sizes in days of orders')
+    parser.add_argument('--orders-per-day', type=int, default=150, help='Orders per day for the tenant')
+    parser.add_argument('--customers', type=int, default=2000, help='Customer profiles placing orders')
+    parser.add_argument('--drivers', type=int, default=4, help='Delivery staff profiles')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='Rows per keyset page')
+    parser.add_argument('--repeat', type=int, default=5, help='Executions per measurement')
+    parser.add_argument('--edge-functions', action='store_true',
+                        help='Replay the edge function round-trip catalogue instead of the unbounded reads')
+    parser.add_argument('--function', action='append', help='Edge function to replay (repeatable, default: all)')
+    parser.add_argument('--rtt-ms', type=float, default=20.0, help='Round trip per database/auth call')
+    parser.add_argument('--external-ms', type=float, default=250.0, help='Latency of external API calls (Stripe, FCM)')
+    parser.add_argument('--items', type=int, default=3, help='Order lines per order / ids per .in() filter')
+    parser.add_argument('--menu-items', type=int, default=60, help='Menu items (and ingredients) on the tenant menu')
+    parser.add_argument('--json', metavar='PATH', help='Write results as JSON')
+
+    args = parser.parse_args()
+    require_psycopg()
+
+    print("📏 Unbounded Query Payload Benchmark" if not args.edge_functions else "📏 Edge Function Round Trip Benchmark")
+    print("="*60)
+
+    try:
+        results = run_edge_functions(args) if args.edge_functions else run(args)
+    finally:
+        if not args.keep_database:
+            drop_scratch_database(args.dsn, args.database)
+
+    if args.edge_functions:
+        print_edge_comparison(results, args)
+    else:
+        print_comparison(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2, default=str)
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
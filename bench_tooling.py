@@ -0,0 +1,718 @@
+#!/usr/bin/env python3
+"""
+Tooling Benchmark Suite
+=======================
+Times the migration scripts and analyzers against synthetic corpora at
+multiples of this checkout (236 Dart files, a 1,788-line
+database_service.dart, 16 SaaS migrations) and compares the timings with a
+stored JSON baseline.
+
+Each corpus is generated deterministically into a scratch directory: Freezed
+models, Riverpod providers watching each other, a DatabaseService and other
+services with multi-line .from() chains, feature screens, and synthetic SQL
+migrations after the real ones. The files the scripts look up by name
+(MODEL_FILES_TO_UPDATE, KEY_PROVIDERS, the settings models, main.dart, the
+organization and startup providers, constants.dart) are in place, and the
+edge functions and the printer bridge are copied as they are. The tooling
+scripts are copied into the corpus root, so their PROJECT_ROOT is the
+corpus, and run as subprocesses in dry-run/report modes. Phase timings
+come from their --profile traces; the analyzers are timed per mode, and
+analysis_daemon.py as a one-shot query that indexes in-process.
+
+Not benchmarked here: modes that need a local Postgres (the bench_*.py
+scripts, analyze_indexes.py --bench, printer_load_model.py --bench) and
+the long-running analysis_daemon.py --serve.
+
+A phase regresses when its median is more than --threshold above the
+baseline and slower by more than --min-ms (to ignore noise on short phases).
+A run that fails or exceeds --timeout fails the suite as well.
+
+Usage:
+    python bench_tooling.py --run                          # Compare with the baseline (exit 1 on regression)
+    python bench_tooling.py --update-baseline              # Measure and store the baseline
+    python bench_tooling.py --run --scales 1,10 --repeat 5 --timeout 300
+    python bench_tooling.py --run --only wire_org_context  # Benchmarks whose name contains this
+    python bench_tooling.py --generate /tmp/corpus --scales 10   # Write a corpus and stop
+"""
+
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent
+DEFAULT_BASELINE = PROJECT_ROOT / "benchmarks" / "tooling_baseline.json"
+DEFAULT_SCALES = [1, 10]
+
+# Real files copied into every corpus: the scripts depend on their contents
+ANCHOR_FILES = [
+    "lib/main.dart",
+    "lib/providers/organization_provider.dart",
+    "lib/providers/app_startup_provider.dart",
+    "lib/core/utils/constants.dart",
+    "printer/server.js",
+]
+ANCHOR_DIRS = ["database_migrations/saas", "supabase/functions"]
+
+# Shape of this checkout, per 1x: (directory, files, average lines)
+CORPUS_SHAPE = {
+    'models': 27, 'providers': 45, 'services': 22, 'widgets': 14, 'utils': 9, 'features': 96,
+}
+SERVICE_LINES = 1788
+SERVICE_LINES_OTHER = 265
+PROVIDER_LINES = 227
+WIDGET_LINES = 290
+FEATURE_LINES = 720
+MIGRATIONS = 16
+TABLES_PER_SCALE = 20
+
+REAL_TABLES = [
+    'ordini', 'ordini_items', 'menu_items', 'categorie_menu', 'ingredients', 'cashier_customers',
+    'delivery_zones', 'promotional_banners', 'order_reminders', 'notifiche', 'sizes_master',
+]
+FEATURE_AREAS = ['customer', 'manager', 'kitchen', 'delivery', 'onboarding']
+
+# (name, command, profiled): profiled commands report phases through --profile
+BENCHMARKS = [
+    ('migrate_to_saas', ['migrate_to_saas.py', '--dry-run'], True),
+    ('migrate_to_saas_phase2', ['migrate_to_saas_phase2.py', '--dry-run'], True),
+    ('wire_org_context', ['wire_org_context.py', '--dry-run'], True),
+    ('analyze_queries --aggregations', ['analyze_queries.py', '--aggregations'], False),
+    ('analyze_queries --prune-selects', ['analyze_queries.py', '--prune-selects'], False),
+    ('analyze_queries --unbounded', ['analyze_queries.py', '--unbounded'], False),
+    ('analyze_queries --streams', ['analyze_queries.py', '--streams'], False),
+    ('analyze_providers --invalidation', ['analyze_providers.py', '--invalidation'], False),
+    ('analyze_providers --startup', ['analyze_providers.py', '--startup'], False),
+    ('analyze_queries --edge-functions', ['analyze_queries.py', '--edge-functions'], False),
+    ('analyze_indexes', ['analyze_indexes.py'], False),
+    ('printer_load_model', ['printer_load_model.py'], False),
+    # No daemon listens in the corpus: indexes in-process and answers once (--check exits 1 on findings)
+    ('analysis_daemon --tenant-scope',
+     ['analysis_daemon.py', '--tenant-scope', 'lib/providers/organization_provider.dart'], False),
+]
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpus
+# ---------------------------------------------------------------------------
+
+def pascal(snake: str) -> str:
+    return ''.join(part.capitalize() for part in snake.split('_'))
+
+
+def camel(snake: str) -> str:
+    name = pascal(snake)
+    return name[0].lower() + name[1:]
+
+
+MODEL_TEMPLATE = """import 'package:freezed_annotation/freezed_annotation.dart';
+
+part '{snake}.freezed.dart';
+part '{snake}.g.dart';
+
+/// Synthetic model {index}
+@freezed
+class {cls} with _${cls} {{
+  const factory {cls}({{
+    required String id,
+{fields}
+    @JsonKey(name: 'created_at') required DateTime createdAt,
+    @JsonKey(name: 'updated_at') DateTime? updatedAt,
+  }}) = _{cls};
+
+  factory {cls}.fromJson(Map<String, dynamic> json) => _${cls}FromJson(json);
+}}
+"""
+
+PROVIDER_FUNCTION = """
+@riverpod
+Future<List<{model}>> {name}(Ref ref) async {{
+{watches}  final supabase = Supabase.instance.client;
+{org}  final response = await supabase
+      .from('{table}')
+      .select()
+{filter}      .order('created_at', ascending: false);
+
+  return (response as List)
+      .map((json) => {model}.fromJson(json))
+      .toList();
+}}
+"""
+
+PROVIDER_STREAM = """
+@riverpod
+Stream<List<Map<String, dynamic>>> {name}(Ref ref) async* {{
+  final orgId = await ref.watch(currentOrganizationProvider.future);
+  if (orgId == null) return;
+  yield* Supabase.instance.client
+      .from('{table}')
+      .stream(primaryKey: ['id'])
+      .eq('organization_id', orgId)
+      .order('created_at', ascending: false);
+}}
+"""
+
+SERVICE_METHOD = """
+  /// Synthetic query {index} on {table}
+  Future<List<Map<String, dynamic>>> {name}({{{params}int limit = 50}}) async {{
+    try {{
+      var query = _client
+          .from('{table}')
+          .select('id, nome, stato, created_at');
+{filter}      final response = await query
+          .order('created_at', ascending: false)
+          .limit(limit);
+      return List<Map<String, dynamic>>.from(response);
+    }} catch (e) {{
+      throw _handleDbError(e);
+    }}
+  }}
+"""
+
+SERVICE_WRITE = """
+  /// Synthetic write {index} on {table}
+  Future<void> {name}(String id, Map<String, dynamic> updates) async {{
+    try {{
+      await _client
+          .from('{table}')
+          .update({{
+            ...updates,
+            'updated_at': _nowUtcIso(),
+          }})
+          .eq('id', id);
+    }} catch (e) {{
+      throw _handleDbError(e);
+    }}
+  }}
+"""
+
+# DatabaseService methods the scripts look up by name
+SERVICE_COUNT = """
+  /// Synthetic count {index} on {table}
+  Future<int> {name}({{String? stato}}) async {{
+    try {{
+      var query = _client
+          .from('{table}')
+          .select('id');
+      if (stato != null) {{
+        query = query.eq('stato', stato);
+      }}
+      final response = await query;
+      return (response as List).length;
+    }} catch (e) {{
+      throw _handleDbError(e);
+    }}
+  }}
+"""
+
+# Helpers findMatchingCustomer (a METHODS_TO_UPDATE entry) is written around
+NAMED_SERVICE_METHODS = """
+  Future<Map<String, dynamic>?> findMatchingCustomer(String nome, String? telefono) async {
+    for (final pattern in _buildNameSearchPatterns(nome)) {
+      final response = await _client
+          .from('cashier_customers')
+          .select()
+          .ilike('nome', pattern)
+          .limit(1);
+      if ((response as List).isNotEmpty) return response.first;
+    }
+    return null;
+  }
+
+  List<String> _buildNameSearchPatterns(String nome) {
+    final words = nome.trim().split(' ');
+    return ['%$nome%', if (words.length > 1) '%${words.last} ${words.first}%'];
+  }
+
+  String _nowUtcIso() => DateTime.now().toUtc().toIso8601String();
+
+  Exception _handleDbError(Object e) => Exception('Database error: $e');
+"""
+
+WIDGET_TEMPLATE = """import 'package:flutter/material.dart';
+import 'package:flutter_riverpod/flutter_riverpod.dart';
+{imports}
+
+/// Synthetic {kind} {index}
+class {cls} extends ConsumerWidget {{
+  const {cls}({{super.key}});
+
+  @override
+  Widget build(BuildContext context, WidgetRef ref) {{
+{watches}
+    return Scaffold(
+      appBar: AppBar(title: const Text('{cls}')),
+      body: ListView(
+        children: [
+{children}
+        ],
+      ),
+    );
+  }}
+{helpers}}}
+"""
+
+WIDGET_CHILD = """          Padding(
+            padding: const EdgeInsets.symmetric(horizontal: 16, vertical: 8),
+            child: Column(
+              crossAxisAlignment: CrossAxisAlignment.start,
+              children: [
+                Text('Sezione {n}', style: Theme.of(context).textTheme.titleMedium),
+                const SizedBox(height: 8),
+                _row{n}(context),
+              ],
+            ),
+          ),"""
+
+WIDGET_HELPER = """
+  Widget _row{n}(BuildContext context) {{
+    return Row(
+      children: [
+        const Icon(Icons.circle, size: 12),
+        const SizedBox(width: 8),
+        Expanded(child: Text('Valore {n}')),
+      ],
+    );
+  }}
+"""
+
+WIDGET_QUERY_HELPER = """
+  Future<List<Map<String, dynamic>>> _load{n}(String orgId) async {{
+    final response = await Supabase.instance.client
+        .from('{table}')
+        .select('id, nome, created_at')
+        .eq('organization_id', orgId)
+        .order('created_at', ascending: false)
+        .limit(25);
+    return List<Map<String, dynamic>>.from(response);
+  }}
+"""
+
+MIGRATION_TABLE = """
+CREATE TABLE IF NOT EXISTS public.{table} (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    organization_id UUID NOT NULL REFERENCES public.organizations(id) ON DELETE CASCADE,
+    nome TEXT NOT NULL,
+    stato TEXT NOT NULL DEFAULT 'attivo',
+    importo NUMERIC(10,2) DEFAULT 0,
+    ordine INTEGER DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_{table}_org_created ON public.{table}(organization_id, created_at DESC);
+
+ALTER TABLE public.{table} ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "{table}_org_select" ON public.{table}
+    FOR SELECT USING (organization_id IN (SELECT get_user_organization_ids()));
+
+CREATE OR REPLACE FUNCTION public.{table}_totals(p_organization_id UUID)
+RETURNS NUMERIC
+LANGUAGE sql STABLE
+AS $$
+    SELECT coalesce(sum(importo), 0) FROM public.{table} WHERE organization_id = p_organization_id;
+$$;
+"""
+
+
+class CorpusWriter:
+    """Writes one synthetic checkout at `scale` times this one"""
+
+    def __init__(self, root: Path, scale: int):
+        self.root = root
+        self.scale = scale
+        self.rng = random.Random(scale)
+        self.lib = root / "lib"
+        self.files = 0
+        self.bytes = 0
+        self.tables = list(REAL_TABLES)
+        self.models: List[Tuple[str, str]] = []      # (snake file stem, class)
+        self.providers: List[Tuple[str, str]] = []   # (provider name, file stem)
+
+    def write(self, relative: str, content: str):
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+        self.files += relative.endswith('.dart')
+        self.bytes += len(content)
+
+    def generate(self):
+        for relative in ANCHOR_FILES:
+            self.write(relative, (PROJECT_ROOT / relative).read_text(encoding='utf-8'))
+        for relative in ANCHOR_DIRS:
+            for path in sorted((PROJECT_ROOT / relative).rglob("*")):
+                if path.is_file():
+                    self.write(path.relative_to(PROJECT_ROOT).as_posix(), path.read_text(encoding='utf-8'))
+        for path in PROJECT_ROOT.glob("*.py"):
+            if path.name != Path(__file__).name:
+                shutil.copy2(path, self.root / path.name)
+
+        self.migrations()
+        self.model_files()
+        self.provider_files()
+        self.service_files()
+        self.widget_files('core/widgets', 'widget', CORPUS_SHAPE['widgets'] * self.scale, WIDGET_LINES)
+        for index in range(CORPUS_SHAPE['utils'] * self.scale - 1):
+            self.write(f"lib/core/utils/synthetic_util_{index}.dart",
+                       f"/// Synthetic helper {index}\nString formatValue{index}(num value) => value.toStringAsFixed(2);\n")
+        per_area = CORPUS_SHAPE['features'] * self.scale // len(FEATURE_AREAS)
+        for area in FEATURE_AREAS:
+            self.widget_files(f'features/{area}/screens', f'{area}_screen', per_area, FEATURE_LINES)
+
+    def migrations(self):
+        count = min(900, max(4, MIGRATIONS * (self.scale - 1)))
+        tables = [f"synth_{i}" for i in range(TABLES_PER_SCALE * self.scale)]
+        self.tables += tables
+        per_migration = -(-len(tables) // count)
+        for index in range(count):
+            chunk = tables[index * per_migration:(index + 1) * per_migration]
+            if not chunk:
+                break
+            body = ''.join(MIGRATION_TABLE.format(table=t) for t in chunk)
+            self.write(f"database_migrations/saas/{17 + index:03d}_synthetic_{index}.sql",
+                       f"-- Synthetic migration {index}\nBEGIN;\n{body}\nCOMMIT;\n")
+
+    def model_files(self):
+        from migrate_to_saas import MODEL_FILES_TO_UPDATE
+        names = [f.removesuffix('.dart') for f in MODEL_FILES_TO_UPDATE]
+        names += [f"synthetic_{i}_model" for i in range(CORPUS_SHAPE['models'] * self.scale - len(names))]
+        for index, snake in enumerate(names):
+            fields = '\n'.join(
+                f"    {self.rng.choice(['String?', 'int?', 'double?', 'bool?'])} campo{j},"
+                for j in range(self.rng.randint(4, 14))
+            )
+            self.write(f"lib/core/models/{snake}.dart",
+                       MODEL_TEMPLATE.format(snake=snake, cls=pascal(snake), fields=fields, index=index))
+            self.models.append((snake, pascal(snake)))
+        for snake in ['business_rules_settings', 'delivery_configuration_settings', 'display_branding_settings',
+                      'kitchen_management_settings', 'order_management_settings']:
+            self.write(f"lib/core/models/settings/{snake}.dart",
+                       MODEL_TEMPLATE.format(snake=snake, cls=pascal(snake), fields="    bool? attivo,", index=snake))
+
+    def provider_files(self):
+        from wire_org_context import KEY_PROVIDERS
+        stems = [f.removesuffix('.dart') for f in KEY_PROVIDERS]
+        stems += [f"synthetic_{i}_provider" for i in range(CORPUS_SHAPE['providers'] * self.scale - len(stems) - 2)]
+        per_file = max(1, PROVIDER_LINES // 20)
+        for file_index, stem in enumerate(stems):
+            model_stem, model = self.rng.choice(self.models)
+            parts = []
+            for j in range(per_file):
+                name = f"{camel(stem)}{j}"
+                table = self.rng.choice(self.tables)
+                if j == 0 and self.rng.random() < 0.1:
+                    parts.append(PROVIDER_STREAM.format(name=name, table=table))
+                else:
+                    watched = self.rng.sample(self.providers, k=min(len(self.providers), self.rng.randint(0, 2)))
+                    watches = ''.join(f"  ref.watch({p}Provider);\n" for p, _ in watched)
+                    org_filtered = file_index >= len(KEY_PROVIDERS) or file_index % 3
+                    org = "  final orgId = await ref.watch(currentOrganizationProvider.future);\n" if org_filtered else ''
+                    filter_ = "      .eq('organization_id', orgId!)\n" if org_filtered else ''
+                    parts.append(PROVIDER_FUNCTION.format(
+                        name=name, model=model, table=table, watches=watches, org=org, filter=filter_))
+                self.providers.append((name, stem))
+            imports = {f"import '{s}.dart';" for p, s in self.providers if s != stem and f"{p}Provider" in ''.join(parts)}
+            header = '\n'.join([
+                "import 'package:riverpod_annotation/riverpod_annotation.dart';",
+                "import 'package:supabase_flutter/supabase_flutter.dart';",
+                f"import '../core/models/{model_stem}.dart';",
+                "import 'organization_provider.dart';",
+                *sorted(imports),
+                "",
+                f"part '{stem}.g.dart';",
+            ])
+            self.write(f"lib/providers/{stem}.dart", header + '\n' + ''.join(parts))
+
+    def service_files(self):
+        from wire_org_context import METHODS_TO_UPDATE
+        methods = [NAMED_SERVICE_METHODS]
+        for index, (name, table) in enumerate(METHODS_TO_UPDATE):
+            if name == 'findMatchingCustomer':
+                continue
+            template = SERVICE_WRITE if name.startswith(('save', 'update', 'create', 'increment')) else SERVICE_COUNT
+            methods.append(template.format(index=index, table=table, name=name))
+        lines = sum(m.count('\n') for m in methods)
+        index = len(methods)
+        while lines < SERVICE_LINES * self.scale - 10:
+            table = self.rng.choice(self.tables)
+            if index % 4 == 3:
+                method = SERVICE_WRITE.format(index=index, table=table, name=f"updateSynthetic{index}")
+            else:
+                scoped = index % 3 != 0
+                method = SERVICE_METHOD.format(
+                    index=index, table=table, name=f"getSynthetic{index}",
+                    params='String? organizationId, ' if scoped else '',
+                    filter=("      if (organizationId != null) {\n"
+                            "        query = query.eq('organization_id', organizationId);\n"
+                            "      }\n") if scoped else '',
+                )
+            methods.append(method)
+            lines += method.count('\n')
+            index += 1
+        self.write("lib/core/services/database_service.dart", '\n'.join([
+            "import 'package:supabase_flutter/supabase_flutter.dart';",
+            "",
+            "class DatabaseService {",
+            "  final SupabaseClient _client = Supabase.instance.client;",
+            ''.join(methods) + "}",
+            "",
+        ]))
+
+        for service in range(CORPUS_SHAPE['services'] * self.scale - 1):
+            body, lines, index = [], 0, 0
+            while lines < SERVICE_LINES_OTHER:
+                method = SERVICE_METHOD.format(
+                    index=index, table=self.rng.choice(self.tables), name=f"fetch{index}",
+                    params='String? organizationId, ', filter=(
+                        "      if (organizationId != null) {\n"
+                        "        query = query.eq('organization_id', organizationId);\n"
+                        "      }\n"),
+                ).replace('_handleDbError(e)', "Exception('Synthetic service error: $e')")
+                body.append(method)
+                lines += method.count('\n')
+                index += 1
+            self.write(f"lib/core/services/synthetic_{service}_service.dart", '\n'.join([
+                "import 'package:supabase_flutter/supabase_flutter.dart';",
+                "",
+                f"class Synthetic{service}Service {{",
+                "  final SupabaseClient _client = Supabase.instance.client;",
+                ''.join(body) + "}",
+                "",
+            ]))
+
+    def widget_files(self, directory: str, kind: str, count: int, target_lines: int):
+        for index in range(count):
+            snake = f"synthetic_{kind}_{index}"
+            watched = self.rng.sample(self.providers, k=min(len(self.providers), self.rng.randint(1, 3)))
+            watches = '\n'.join(f"    final data{j} = ref.watch({p}Provider);" for j, (p, _) in enumerate(watched))
+            depth = '../' * (directory.count('/') + 1)
+            imports = sorted({f"import '{depth}providers/{stem}.dart';" for _, stem in watched})
+            children, helpers, n = [], [], 0
+            lines = WIDGET_TEMPLATE.count('\n') + len(watched)
+            while lines < target_lines:
+                children.append(WIDGET_CHILD.format(n=n))
+                helpers.append(WIDGET_HELPER.format(n=n))
+                lines += WIDGET_CHILD.count('\n') + WIDGET_HELPER.count('\n') + 2
+                n += 1
+            if self.rng.random() < 0.25:
+                imports.append("import 'package:supabase_flutter/supabase_flutter.dart';")
+                helpers.append(WIDGET_QUERY_HELPER.format(n=n, table=self.rng.choice(self.tables)))
+            self.write(f"lib/{directory}/{snake}.dart", WIDGET_TEMPLATE.format(
+                cls=pascal(snake), kind=kind.replace('_', ' '), index=index, imports='\n'.join(imports),
+                watches=watches, children='\n'.join(children), helpers=''.join(helpers),
+            ))
+
+
+def generate_corpus(root: Path, scale: int) -> CorpusWriter:
+    writer = CorpusWriter(root, scale)
+    writer.generate()
+    return writer
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def run_benchmark(corpus: Path, command: List[str], profiled: bool,
+                  timeout: float) -> Tuple[Optional[Dict[str, float]], str]:
+    """Phase timings (ms) of one run, or None and the error output"""
+    trace = corpus / "bench.trace.json"
+    args = [sys.executable, *command] + (['--profile', str(trace)] if profiled else [])
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(args, cwd=corpus, capture_output=True, text=True, encoding='utf-8', timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None, f"timed out after {timeout:g}s"
+    total = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        return None, (result.stderr or result.stdout).strip()[-800:]
+
+    phases = {'total': total}
+    if profiled:
+        events = json.loads(trace.read_text(encoding='utf-8'))['traceEvents']
+        for event in events:
+            if event.get('ph') == 'X' and event.get('cat') == 'phase':
+                phases[event['name']] = phases.get(event['name'], 0.0) + event['dur'] / 1000
+    return phases, ''
+
+
+def measure(scales: List[int], repeat: int, only: Optional[str], keep: bool,
+            timeout: float) -> Tuple[dict, dict, List[str]]:
+    """Median phase timings per scale and benchmark, the corpus sizes, and the failed runs"""
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    corpora = {}
+    failures = []
+    for scale in scales:
+        corpus = Path(tempfile.mkdtemp(prefix=f"rotante_corpus_{scale}x_"))
+        try:
+            start = time.perf_counter()
+            writer = generate_corpus(corpus, scale)
+            corpora[str(scale)] = {'dart_files': writer.files, 'megabytes': round(writer.bytes / 1e6, 1)}
+            print(f"\n📦 {scale}x corpus: {writer.files} Dart files, {writer.bytes / 1e6:.1f} MB "
+                  f"(generated in {time.perf_counter() - start:.1f}s)")
+
+            results[str(scale)] = {}
+            for name, command, profiled in BENCHMARKS:
+                if only and only not in name:
+                    continue
+                runs = []
+                for _ in range(repeat):
+                    phases, error = run_benchmark(corpus, command, profiled, timeout)
+                    if phases is None:
+                        print(f"  ❌ {name}: {error}")
+                        failures.append(f"{scale}x {name}: {error.splitlines()[-1] if error else 'failed'}")
+                        break
+                    runs.append(phases)
+                if not runs:
+                    continue
+                medians = {phase: statistics.median(r.get(phase, 0.0) for r in runs) for phase in runs[0]}
+                results[str(scale)][name] = medians
+                print(f"  ⏱️  {name:<36} {medians['total']:>9.0f} ms")
+        finally:
+            if keep:
+                print(f"  Corpus kept at {corpus}")
+            else:
+                shutil.rmtree(corpus, ignore_errors=True)
+    return results, corpora, failures
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_ms: float) -> List[str]:
+    """Print every phase against the baseline; the regressed ones"""
+    regressions = []
+    for scale, benchmarks in results.items():
+        print(f"\n📊 {scale}x against baseline ({baseline.get('created', '?')})")
+        for name, phases in benchmarks.items():
+            base = baseline.get('results', {}).get(scale, {}).get(name)
+            if not base:
+                print(f"  🆕 {name}: no baseline")
+                continue
+            for phase, current in phases.items():
+                before = base.get(phase)
+                if before is None:
+                    continue
+                change = (current - before) / before if before else 0.0
+                regressed = current > before * (1 + threshold) and current - before > min_ms
+                icon = '❌' if regressed else ('✅' if change <= 0 else '  ')
+                label = name if phase == 'total' else f"{name} › {phase}"
+                print(f"  {icon} {label:<60} {before:>9.1f} → {current:>9.1f} ms ({change:+.0%})")
+                if regressed:
+                    regressions.append(f"{scale}x {label}: {before:.1f} → {current:.1f} ms ({change:+.0%})")
+    return regressions
+
+
+def scaling_table(results: dict):
+    scales = sorted(results, key=int)
+    if len(scales) < 2:
+        return
+    print("\n📈 Scaling (total ms)")
+    print(f"  {'benchmark':<36}" + ''.join(f"{s + 'x':>12}" for s in scales))
+    names = [n for n, _, _ in BENCHMARKS if any(n in results[s] for s in scales)]
+    for name in names:
+        cells = ''.join(f"{results[s][name]['total']:>12.0f}" if name in results[s] else f"{'-':>12}" for s in scales)
+        print(f"  {name:<36}{cells}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tooling Benchmark Suite')
+    parser.add_argument('--run', action='store_true', help='Measure and compare with the baseline')
+    parser.add_argument('--update-baseline', action='store_true', help='Measure and store as the baseline')
+    parser.add_argument('--generate', metavar='DIR', type=Path, help='Only write a corpus (first scale) to DIR')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='Corpus sizes as multiples of this checkout (default: 1,10)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark; the median is kept')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown before failing (0.25 = 25%%)')
+    parser.add_argument('--min-ms', type=float, default=20, help='Ignore slowdowns smaller than this')
+    parser.add_argument('--timeout', type=float, default=900, help='Seconds before a run counts as failed')
+    parser.add_argument('--only', metavar='NAME', help='Only benchmarks whose name contains NAME')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='Baseline JSON path')
+    parser.add_argument('--keep-corpus', action='store_true', help='Do not delete the generated corpora')
+    parser.add_argument('--json', metavar='PATH', help='Write results as JSON')
+
+    args = parser.parse_args()
+
+    if not any([args.run, args.update_baseline, args.generate]):
+        parser.print_help()
+        print("\n⚠️  Please specify --run, --update-baseline or --generate")
+        sys.exit(1)
+
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+
+    print("🚀 Tooling Benchmark Suite")
+    print("="*60)
+
+    if args.generate:
+        writer = generate_corpus(args.generate, scales[0])
+        print(f"✅ {scales[0]}x corpus at {args.generate}: {writer.files} Dart files, {writer.bytes / 1e6:.1f} MB")
+        return
+
+    baseline = None
+    if args.run and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+
+    results, corpora, failures = measure(scales, args.repeat, args.only, args.keep_corpus, args.timeout)
+    scaling_table(results)
+    document = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'corpora': corpora,
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+
+    regressions = []
+    if args.run:
+        if baseline is None:
+            print(f"\n⚠️  No baseline at {args.baseline}, run with --update-baseline first")
+        else:
+            regressions = compare(results, baseline, args.threshold, args.min_ms)
+
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        if args.baseline.exists():
+            # Keep scales and benchmarks that were not re-measured
+            previous = json.loads(args.baseline.read_text(encoding='utf-8'))
+            for scale, benchmarks in previous.get('results', {}).items():
+                for name, phases in benchmarks.items():
+                    results.setdefault(scale, {}).setdefault(name, phases)
+            for scale, corpus in previous.get('corpora', {}).items():
+                corpora.setdefault(scale, corpus)
+        args.baseline.write_text(json.dumps(document, indent=2) + '\n', encoding='utf-8')
+        print(f"\n✅ Baseline written to {args.baseline}")
+
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"  Scales: {', '.join(f'{s}x' for s in results)}")
+    print(f"  Benchmarks: {sum(len(b) for b in results.values())}")
+    for failure in failures:
+        print(f"  ❌ Failed: {failure}")
+    if args.run and baseline is not None:
+        print(f"  Regressions (>{args.threshold:.0%} and >{args.min_ms:g} ms): {len(regressions)}")
+        for regression in regressions:
+            print(f"    ❌ {regression}")
+    if args.run and (regressions or failures):
+        sys.exit(1)
+    if args.run and baseline is not None:
+        print("\n✅ No phase regressed")
+
+
+if __name__ == '__main__':
+    main()
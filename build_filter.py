@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Targeted build_runner
+=====================
+Regenerates only the .freezed.dart / .g.dart parts whose inputs a migration
+script modified, instead of every generated file in lib/.
+
+A library's generated parts are declared by its own `part '...';` directives
+and built from that library alone: Freezed and json_serializable only emit
+calls into other models (fromJson, toJson, copyWith), never their fields, and
+riverpod_generator hashes the provider's own source. So the parts to rebuild
+for a set of modified sources are the parts of those libraries (or of the
+library a modified `part of` file belongs to), passed to build_runner as
+--build-filter arguments.
+
+The time of the last full build is kept in .dart_tool/ to report what a
+targeted build saved; without one the full build is extrapolated from the
+targeted build's time per output.
+
+Usage:
+    python build_filter.py lib/core/models/order_model.dart --dry-run   # Show the filtered command
+    python build_filter.py lib/core/models/order_model.dart --apply     # Run it
+    python build_filter.py --full                                        # Full build, record its time
+"""
+
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+from pathlib import Path
+from typing import List, Optional
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent
+LIB_DIR = PROJECT_ROOT / "lib"
+TIMINGS_FILE = PROJECT_ROOT / ".dart_tool" / "build_filter_timings.json"
+
+GENERATED_PART = re.compile(r"""^part\s+['"]([^'"]+\.(?:freezed|g)\.dart)['"]\s*;""", re.MULTILINE)
+PART_OF = re.compile(r"""^part\s+of\s+['"]([^'"]+)['"]\s*;""", re.MULTILINE)
+BUILD_COMMAND = ['dart', 'run', 'build_runner', 'build', '--delete-conflicting-outputs']
+
+
+def generated_parts(library: Path) -> List[Path]:
+    """Generated parts declared by one library"""
+    if not library.exists():
+        return []
+    text = library.read_text(encoding='utf-8')
+    return [(library.parent / part).resolve() for part in GENERATED_PART.findall(text)]
+
+
+def all_generated_parts() -> List[Path]:
+    return [part for library in sorted(LIB_DIR.rglob("*.dart"))
+            if not library.name.endswith(('.freezed.dart', '.g.dart'))
+            for part in generated_parts(library)]
+
+
+def load_full_build_seconds() -> Optional[float]:
+    try:
+        return json.loads(TIMINGS_FILE.read_text(encoding='utf-8'))['full_build_seconds']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_full_build_seconds(seconds: float):
+    TIMINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    TIMINGS_FILE.write_text(json.dumps({'full_build_seconds': round(seconds, 2)}), encoding='utf-8')
+
+
+def run_build(command: List[str]) -> Optional[float]:
+    """Run build_runner from the project root; seconds taken, or None if it failed"""
+    if not shutil.which(command[0]):
+        print(f"  ⚠️ {command[0]} not found on PATH, run it yourself:")
+        print(f"     {' '.join(command)}")
+        return None
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=PROJECT_ROOT)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        print(f"  ❌ build_runner exited with {result.returncode}")
+        return None
+    return elapsed
+
+
+class GeneratedParts:
+    """Sources a script modified, and the generated parts they feed"""
+
+    def __init__(self):
+        self.sources: List[Path] = []
+
+    def record(self, path: Path):
+        path = path.resolve()
+        if path not in self.sources:
+            self.sources.append(path)
+
+    def outputs(self) -> List[Path]:
+        outputs = []
+        for source in self.sources:
+            library = source
+            part_of = PART_OF.search(source.read_text(encoding='utf-8')) if source.exists() else None
+            if part_of:
+                library = (source.parent / part_of.group(1)).resolve()
+            for part in generated_parts(library):
+                if part not in outputs:
+                    outputs.append(part)
+        return outputs
+
+    def command(self) -> List[str]:
+        root = PROJECT_ROOT.resolve()
+        return BUILD_COMMAND + [f"--build-filter={p.relative_to(root).as_posix()}" for p in self.outputs()]
+
+    def build(self, dry_run: bool) -> Optional[float]:
+        """Run (or show) the targeted build and report the time saved; seconds taken"""
+        outputs = self.outputs()
+        if not outputs:
+            print("  ✅ No generated parts depend on the modified files, nothing to build")
+            return 0.0
+        total = len(all_generated_parts())
+        print(f"  🎯 {len(outputs)} of {total} generated parts depend on {len(self.sources)} modified files:")
+        for output in outputs:
+            print(f"     {output.relative_to(PROJECT_ROOT.resolve())}")
+        if dry_run:
+            print(f"  Would run: {' '.join(self.command())}")
+            return None
+
+        elapsed = run_build(self.command())
+        if elapsed is None:
+            return None
+        full = load_full_build_seconds()
+        basis = "last full build"
+        if full is None:
+            full = elapsed / len(outputs) * total
+            basis = "extrapolated per output; run build_filter.py --full to measure"
+        print(f"  ✅ Targeted build: {elapsed:.1f}s vs ~{full:.1f}s full ({basis}), "
+              f"saved ~{max(full - elapsed, 0):.1f}s")
+        return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Targeted build_runner')
+    parser.add_argument('--dry-run', action='store_true', help='Show the generated parts and command')
+    parser.add_argument('--apply', action='store_true', help='Run build_runner for those parts only')
+    parser.add_argument('--full', action='store_true', help='Run a full build and record its time')
+    parser.add_argument('sources', nargs='*', type=Path, help='Modified Dart sources')
+
+    args = parser.parse_args()
+
+    if not any([args.dry_run, args.apply, args.full]) or ((args.dry_run or args.apply) and not args.sources):
+        parser.print_help()
+        print("\n⚠️  Please specify --dry-run or --apply with the modified sources, or --full")
+        sys.exit(1)
+
+    print("🚀 Targeted build_runner")
+    print("="*60)
+
+    if args.full:
+        elapsed = run_build(BUILD_COMMAND)
+        if elapsed is None:
+            sys.exit(1)
+        save_full_build_seconds(elapsed)
+        print(f"  ✅ Full build: {elapsed:.1f}s ({len(all_generated_parts())} generated parts), recorded")
+        return
+
+    parts = GeneratedParts()
+    for source in args.sources:
+        parts.record(source)
+    parts.build(args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
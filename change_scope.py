@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Change Scope
+============
+Narrows the analyzers to what a change can affect, for CI. Asks git which
+Dart, SQL and edge function files changed since a ref (merge base with HEAD,
+plus uncommitted and untracked files) and adds their reverse dependencies:
+
+  - Dart files calling a DatabaseService method whose body changed
+  - providers watching a provider declared in a changed file (transitively)
+    and the files that use them
+  - Dart files querying a table or RPC a changed migration touches
+
+The search is textual and errs on the side of including a file. It runs
+over per-file summaries (identifiers, member calls, quoted names, declared
+types and providers) cached in .dart_tool/change_scope_index.json with the
+table and function names of the folded schema; only files whose mtime or
+size changed are parsed again, and the schema only when a migration did.
+
+Usage:
+    python change_scope.py --since origin/main      # List the scoped files and why
+"""
+
+import re
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from dart_index import GENERATED_SUFFIXES, DartFile, dart_files, find_providers, table_constants
+from saas_schema import load_schema, migration_files
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent
+LIB_DIR = PROJECT_ROOT / "lib"
+DATABASE_SERVICE = LIB_DIR / "core" / "services" / "database_service.dart"
+FUNCTIONS_DIR = PROJECT_ROOT / "supabase" / "functions"
+SHARED_FUNCTION_DIRS = {'_shared'}
+SUMMARIES_FILE = PROJECT_ROOT / ".dart_tool" / "change_scope_index.json"
+SUMMARIES_VERSION = 1
+
+HUNK = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@', re.MULTILINE)
+SQL_TABLE = re.compile(
+    r'\b(?:TABLE(?:\s+IF\s+(?:NOT\s+)?EXISTS)?(?:\s+ONLY)?|ON|INTO|UPDATE|FROM|JOIN)'
+    r'\s+(?:public\.)?"?(\w+)"?',
+    re.IGNORECASE,
+)
+SQL_FUNCTION = re.compile(r'\bFUNCTION\s+(?:public\.)?(\w+)\s*\(', re.IGNORECASE)
+WORD = re.compile(r'\w+')
+MEMBER_CALL = re.compile(r'\.\s*(\w+)\s*\(')
+QUOTED_NAME = re.compile(r"'(\w+)'")
+DECLARED_TYPE = re.compile(r'\b(?:class|mixin|extension|enum)\s+(\w+)')
+
+
+def git(*args: str) -> str:
+    """Run git in the project; exit with its message on failure"""
+    result = subprocess.run(['git', *args], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"❌ Error: git {' '.join(args)}: {result.stderr.strip()}")
+        sys.exit(1)
+    return result.stdout
+
+
+def changed_lines(base: str, path: Path) -> Optional[List[Tuple[int, int]]]:
+    """New-side line ranges touched since `base` (None = the whole file is new)"""
+    diff = git('diff', '-U0', base, '--', str(path.relative_to(PROJECT_ROOT)))
+    if not diff:
+        return None
+    ranges = []
+    for start, count in HUNK.findall(diff):
+        first = int(start)
+        length = int(count) if count else 1
+        # Pure deletions (length 0) touch the line they were removed after
+        ranges.append((first, first + max(length, 1) - 1))
+    return ranges
+
+
+def diff_text(base: str, path: Path, new: bool) -> str:
+    """Added and removed lines since `base` (the whole file when it is new)"""
+    if new:
+        return path.read_text(encoding='utf-8', errors='replace')
+    diff = git('diff', '-U0', base, '--', str(path.relative_to(PROJECT_ROOT)))
+    return '\n'.join(line[1:] for line in diff.splitlines()
+                     if line[:1] in '+-' and not line.startswith(('+++', '---')))
+
+
+def within(paths: Iterable[Path], under: Optional[Iterable[Path]]) -> List[Path]:
+    roots = [r.resolve() for r in under] if under else None
+    return sorted(p for p in paths if roots is None or any(r == p or r in p.parents for r in roots))
+
+
+def word_set(text: str, pattern: re.Pattern = WORD) -> str:
+    """Distinct matches as ' a b c ': membership is a substring test on the cached string"""
+    return ' %s ' % ' '.join(sorted(set(pattern.findall(text))))
+
+
+def summarize(path: Path) -> dict:
+    """What the reverse-dependency search needs from one Dart file"""
+    text = path.read_text(encoding='utf-8', errors='replace')
+    stat = path.stat()
+    source = DartFile(path, text)
+    entry = {
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'words': word_set(text),
+        'member_calls': word_set(text, MEMBER_CALL),
+        'quoted': word_set(text, QUOTED_NAME),
+        'types': word_set(source.masked, DECLARED_TYPE),
+        'providers': {p.name: p.watched() for p in find_providers(source)},
+    }
+    if path == DATABASE_SERVICE.resolve():
+        # (name, first line, last line, identifiers in the body) per DatabaseService method
+        entry['methods'] = [
+            [b.name, source.line_of(b.header_start), source.line_of(b.body_end),
+             word_set(source.masked[b.body_start:b.body_end])]
+            for b in source.blocks if b.kind == 'function' and b.owner == 'DatabaseService'
+        ]
+    return entry
+
+
+class FileSummaries:
+    """Per-file summaries of lib/, cached in .dart_tool/ and re-parsed only where mtime or size changed"""
+
+    def __init__(self, path: Path = SUMMARIES_FILE):
+        self.path = path
+        try:
+            cached = json.loads(path.read_text(encoding='utf-8'))
+            if cached.get('version') != SUMMARIES_VERSION:
+                cached = {}
+            entries, self.schema = cached.get('files', {}), cached.get('schema', {})
+        except (OSError, ValueError):
+            entries, self.schema = {}, {}
+
+        self.files: Dict[Path, dict] = {}
+        self._inverted: Dict[str, Dict[str, List[Path]]] = {}   # field -> name -> files
+        self.reparsed = 0
+        prefix = len(str(PROJECT_ROOT.resolve())) + 1      # str(path)[prefix:] is relative to the root
+        # Sorted as strings: sorting thousands of Paths costs more than the stats
+        for path in sorted(LIB_DIR.resolve().rglob("*.dart"), key=str):
+            if path.name.endswith(GENERATED_SUFFIXES):
+                continue
+            entry = entries.get(str(path)[prefix:])
+            stat = path.stat()
+            if not entry or entry['mtime'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                entry = summarize(path)
+                self.reparsed += 1
+            self.files[path] = entry
+        if self.reparsed or len(entries) != len(self.files):
+            self.save()
+
+    def save(self):
+        prefix = len(str(PROJECT_ROOT.resolve())) + 1
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({
+            'version': SUMMARIES_VERSION,
+            'files': {str(p)[prefix:]: entry for p, entry in self.files.items()},
+            'schema': self.schema,
+        }), encoding='utf-8')
+
+    def schema_names(self) -> Set[str]:
+        """Tables and functions of the SaaS schema, folded again only when a migration changed"""
+        signature = [[p.name, p.stat().st_mtime_ns, p.stat().st_size] for p in migration_files()]
+        if self.schema.get('signature') != signature:
+            schema = load_schema()
+            self.schema = {'signature': signature, 'names': sorted(set(schema.tables) | set(schema.functions))}
+            self.save()
+        return set(self.schema['names'])
+
+    def files_with(self, field: str, name: str) -> List[Path]:
+        """Files whose `field` (words, member_calls, quoted, types) contains `name`"""
+        if field not in self._inverted:
+            inverted: Dict[str, List[Path]] = {}
+            for path, entry in self.files.items():
+                for word in entry[field].split():
+                    inverted.setdefault(word, []).append(path)
+            self._inverted[field] = inverted
+        return self._inverted[field].get(name, [])
+
+    def providers(self, path: Path) -> Dict[str, List[str]]:
+        """Providers declared in a file -> the providers they watch"""
+        return self.files.get(path, {}).get('providers', {})
+
+
+class ChangeScope:
+    """Files changed since a ref and the files they can affect"""
+
+    def __init__(self, since: str, dependents: bool = True):
+        """dependents=False skips the reverse dependency search, for tools that only need the changed files"""
+        self.since = since
+        self.dependents = dependents
+        self.base = git('merge-base', since, 'HEAD').strip()
+        tracked = [l for l in git('diff', '--name-only', '--diff-filter=d', self.base).splitlines() if l]
+        untracked = [l for l in git('ls-files', '--others', '--exclude-standard').splitlines() if l]
+        self.new: Set[Path] = {(PROJECT_ROOT / p).resolve() for p in untracked}
+        self.changed: List[Path] = sorted({(PROJECT_ROOT / p).resolve() for p in tracked + untracked})
+
+        self.reasons: Dict[Path, str] = {}          # Dart file in scope -> why
+        self.methods: Set[str] = set()              # changed DatabaseService methods
+        self.providers: Set[str] = set()            # changed providers and their watchers
+        self.tables: Set[str] = set()               # tables / RPCs touched by changed SQL
+        self.edge_functions: Set[str] = set()
+        self._summaries: Optional[FileSummaries] = None
+
+        lib = LIB_DIR.resolve()
+        for path in dart_files(p for p in self.changed if lib in p.parents):
+            self.reasons[path] = 'changed'
+        if dependents:
+            self._service_methods()
+            self._provider_watchers()
+            self._schema_users()
+        self._edge_functions()
+
+    # -- reverse dependencies ------------------------------------------------
+
+    @property
+    def summaries(self) -> FileSummaries:
+        if self._summaries is None:
+            self._summaries = FileSummaries()
+        return self._summaries
+
+    def _add(self, path: Path, reason: str):
+        self.reasons.setdefault(path, reason)
+
+    def _service_methods(self):
+        """Changed DatabaseService methods, private helpers folded into their callers"""
+        service = DATABASE_SERVICE.resolve()
+        if service not in self.reasons:
+            return
+        ranges = None if service in self.new else changed_lines(self.base, service)
+        methods = self.summaries.files[service]['methods']
+        for name, first, last, _ in methods:
+            if ranges is None or any(start <= last and end >= first for start, end in ranges):
+                self.methods.add(name)
+
+        # A changed private helper changes every method calling it
+        private = {m for m in self.methods if m.startswith('_')}
+        while private:
+            calls = [f" {m} " for m in private]
+            private = set()
+            for name, _, _, body in methods:
+                if name not in self.methods and any(call in body for call in calls):
+                    self.methods.add(name)
+                    if name.startswith('_'):
+                        private.add(name)
+
+        for name in sorted(m for m in self.methods if not m.startswith('_')):
+            for path in self.summaries.files_with('member_calls', name):
+                if path != service:
+                    self._add(path, f"calls DatabaseService.{name}")
+
+    def _provider_watchers(self):
+        """Providers declared in changed files, everything watching them, and their users"""
+        queue = []
+        for path in self.changed_files():
+            queue.extend(self.summaries.providers(path))
+        self.providers.update(queue)
+
+        while queue:
+            name = queue.pop()
+            for path in self.summaries.files_with('words', name):
+                self._add(path, f"uses {name}")
+                for provider, watched in self.summaries.providers(path).items():
+                    if provider not in self.providers and name in watched:
+                        self.providers.add(provider)
+                        queue.append(provider)
+
+    def _schema_users(self):
+        """Dart files querying a table or calling an RPC that changed SQL touches"""
+        sql_files = [p for p in self.changed if p.suffix == '.sql']
+        if not sql_files:
+            return
+        known = self.summaries.schema_names()
+        for path in sql_files:
+            text = diff_text(self.base, path, path in self.new)
+            self.tables.update(n.lower() for n in SQL_TABLE.findall(text) if n.lower() in known)
+            self.tables.update(n.lower() for n in SQL_FUNCTION.findall(text) if n.lower() in known)
+        if not self.tables:
+            return
+
+        # AppConstants.tableOrdini is looked up by its member name
+        constants = {c.split('.')[-1]: t for c, t in table_constants().items() if t in self.tables}
+        for table in sorted(self.tables):
+            for path in self.summaries.files_with('quoted', table):
+                self._add(path, f"queries {table}")
+        for member, table in sorted(constants.items()):
+            for path in self.summaries.files_with('words', member):
+                self._add(path, f"queries {table}")
+
+    def _edge_functions(self):
+        functions_dir = FUNCTIONS_DIR.resolve()
+        for path in self.changed:
+            if functions_dir in path.parents:
+                name = path.relative_to(functions_dir).parts[0]
+                if name in SHARED_FUNCTION_DIRS:
+                    self.edge_functions.update(
+                        d.name for d in functions_dir.iterdir() if d.is_dir() and d.name not in SHARED_FUNCTION_DIRS)
+                elif path.parent != functions_dir:
+                    self.edge_functions.add(name)
+
+    # -- queries ---------------------------------------------------------------
+
+    def dart_files(self, under: Optional[Iterable[Path]] = None) -> List[Path]:
+        """Dart files in scope, optionally only those under the given files/directories"""
+        return within(self.reasons, under)
+
+    def changed_files(self, under: Optional[Iterable[Path]] = None) -> List[Path]:
+        """Dart files changed since the ref themselves, without reverse dependencies"""
+        return within([p for p, reason in self.reasons.items() if reason == 'changed'], under)
+
+    def includes(self, path: Path) -> bool:
+        return path.resolve() in self.reasons
+
+    def describe(self) -> str:
+        dart = f"{len(self.reasons)} Dart files in scope" if self.dependents else \
+            f"{len(self.reasons)} Dart files changed"
+        return f"{len(self.changed)} changed files since {self.since} -> {dart}, {len(self.edge_functions)} edge functions"
+
+
+def print_scope(scope: ChangeScope):
+    print(f"🔎 {scope.describe()} (merge base {scope.base[:10]})")
+    if scope.methods:
+        print(f"\n  DatabaseService methods changed: {', '.join(sorted(scope.methods))}")
+    if scope.providers:
+        print(f"  Providers changed or watching them: {', '.join(sorted(scope.providers))}")
+    if scope.tables:
+        print(f"  Tables/RPCs touched by SQL: {', '.join(sorted(scope.tables))}")
+    if scope.edge_functions:
+        print(f"  Edge functions: {', '.join(sorted(scope.edge_functions))}")
+    print()
+    for path in scope.dart_files():
+        print(f"  {path.relative_to(PROJECT_ROOT.resolve())}  ({scope.reasons[path]})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Change Scope')
+    parser.add_argument('--since', metavar='REF', help='Git ref to diff against (e.g. origin/main)')
+
+    args = parser.parse_args()
+
+    if not args.since:
+        parser.print_help()
+        print("\n⚠️  Please specify --since")
+        sys.exit(1)
+
+    print_scope(ChangeScope(args.since))
+
+
+if __name__ == '__main__':
+    main()
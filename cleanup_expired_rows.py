@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Batched Expired-Row Cleanup
+===========================
+Bounded replacement for cleanup_expired_nonces() (011/013) and
+cleanup_old_rate_limits() (010), which delete every expired row in a single
+statement. Rows are removed in small keyset-ordered batches addressed by
+ctid, each in its own short transaction, until the backlog is gone or the
+time budget is spent. Every run appends a metrics line (JSON) to a log.
+
+Usage:
+    python cleanup_expired_rows.py --dry-run                   # Count expired rows
+    python cleanup_expired_rows.py --apply                     # Delete in batches
+    python cleanup_expired_rows.py --apply --target nonces --batch-size 2000 --max-seconds 30
+    python cleanup_expired_rows.py --benchmark                 # Generated-data benchmark
+"""
+
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from local_postgres import (
+    DEFAULT_DSN, require_psycopg, connect, prepare_bench_database,
+    drop_scratch_database, latency_summary,
+)
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent
+METRICS_FILE = PROJECT_ROOT / "cleanup_metrics.jsonl"
+
+# table, ordering column, expiry predicate (must match the SQL functions)
+CLEANUP_TARGETS = {
+    'nonces': {
+        'table': 'request_nonces',
+        'column': 'expires_at',
+        'cutoff': "now()",
+        'function': 'cleanup_expired_nonces',
+    },
+    'rate_limits': {
+        'table': 'rate_limits',
+        'column': 'window_end',
+        'cutoff': "now() - INTERVAL '24 hours'",
+        'function': 'cleanup_old_rate_limits',
+    },
+}
+
+# Keyset batch: walk the time index forward from the last (key, ctid) seen
+# so dead tuples of earlier batches are never rescanned, lock what is free
+# and delete it by ctid. Rows another session holds are skipped but still
+# advance the cursor, so a locked batch does not end the run early.
+BATCH_DELETE_SQL = """
+WITH candidates AS (
+    SELECT ctid, {column} AS key
+    FROM {table}
+    WHERE {column} < %(cutoff)s
+      AND {column} >= %(last_key)s
+      AND ({column}, ctid) > (%(last_key)s, %(last_ctid)s::tid)
+    ORDER BY {column}, ctid
+    LIMIT %(batch_size)s
+), batch AS (
+    SELECT t.ctid
+    FROM {table} t
+    WHERE t.ctid = ANY(ARRAY(SELECT ctid FROM candidates))
+      AND t.{column} < %(cutoff)s
+    FOR UPDATE SKIP LOCKED
+), deleted AS (
+    DELETE FROM {table} t
+    USING batch
+    WHERE t.ctid = batch.ctid
+    RETURNING 1
+), last AS (
+    SELECT key, ctid::text AS ctid FROM candidates ORDER BY key DESC, ctid DESC LIMIT 1
+)
+SELECT (SELECT count(*) FROM candidates), (SELECT count(*) FROM deleted), last.key, last.ctid
+FROM (SELECT 1) one
+LEFT JOIN last ON true
+"""
+
+
+class CleanupRun:
+    def __init__(self, target: str, batch_size: int, max_seconds: float):
+        self.target = target
+        self.batch_size = batch_size
+        self.max_seconds = max_seconds
+        self.started_at = datetime.now(timezone.utc)
+        self.deleted = 0
+        self.batches = 0
+        self.skipped_locked = 0
+        self.batch_latencies_ms: List[float] = []
+        self.stopped_reason = 'done'
+        self.duration_seconds = 0.0
+        self.size_before = 0
+        self.size_after = 0
+        self.dead_tuples_after = 0
+        self.remaining = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'target': self.target,
+            'started_at': self.started_at.isoformat(),
+            'batch_size': self.batch_size,
+            'max_seconds': self.max_seconds,
+            'deleted': self.deleted,
+            'batches': self.batches,
+            'skipped_locked': self.skipped_locked,
+            'duration_seconds': round(self.duration_seconds, 3),
+            'rows_per_second': round(self.deleted / self.duration_seconds, 1) if self.duration_seconds else 0.0,
+            'batch_latency': latency_summary(self.batch_latencies_ms),
+            'stopped_reason': self.stopped_reason,
+            'remaining_expired': self.remaining,
+            'table_bytes_before': self.size_before,
+            'table_bytes_after': self.size_after,
+            'dead_tuples_after': self.dead_tuples_after,
+        }
+
+
+def table_size(conn, table: str) -> int:
+    """Total relation size including indexes and TOAST"""
+    return conn.execute("SELECT pg_total_relation_size(%s::regclass)", (table,)).fetchone()[0]
+
+
+def dead_tuples(conn, table: str) -> int:
+    row = conn.execute(
+        "SELECT n_dead_tup FROM pg_stat_user_tables WHERE relname = %s", (table,)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def has_plain_index(conn, table: str, column: str) -> bool:
+    """True when a non-partial index leads with the keyset column"""
+    row = conn.execute(
+        """SELECT 1
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = %s::regclass
+          AND a.attname = %s
+          AND i.indpred IS NULL
+        LIMIT 1""",
+        (table, column),
+    ).fetchone()
+    return row is not None
+
+
+def count_expired(conn, target: str, cutoff=None) -> int:
+    """Rows the SQL cleanup function would delete right now"""
+    spec = CLEANUP_TARGETS[target]
+    if cutoff is None:
+        query = f"SELECT count(*) FROM {spec['table']} WHERE {spec['column']} < {spec['cutoff']}"
+        return conn.execute(query).fetchone()[0]
+    query = f"SELECT count(*) FROM {spec['table']} WHERE {spec['column']} < %s"
+    return conn.execute(query, (cutoff,)).fetchone()[0]
+
+
+def run_batched_cleanup(conn, target: str, batch_size: int, max_seconds: float,
+                        max_batches: Optional[int] = None, pause_ms: float = 0) -> CleanupRun:
+    """Delete expired rows of one target in bounded batches"""
+    spec = CLEANUP_TARGETS[target]
+    run = CleanupRun(target, batch_size, max_seconds)
+    run.size_before = table_size(conn, spec['table'])
+
+    if not has_plain_index(conn, spec['table'], spec['column']):
+        # idx_rate_limits_window_end (010) has a now() predicate, so it is
+        # either rejected or never matches a later cutoff
+        print(f"  ⚠️ No plain index on {spec['table']}({spec['column']}): every batch scans the table")
+
+    # Freeze the cutoff so rows expiring during the run wait for the next one
+    cutoff = conn.execute(f"SELECT {spec['cutoff']}").fetchone()[0]
+    # '-infinity' has no Python datetime; year 1 sorts before every real key
+    last_key = datetime.min.replace(tzinfo=timezone.utc)
+    last_ctid = '(0,0)'
+    query = BATCH_DELETE_SQL.format(table=spec['table'], column=spec['column'])
+
+    started = time.perf_counter()
+    while True:
+        if time.perf_counter() - started >= max_seconds:
+            run.stopped_reason = 'time_budget'
+            break
+        if max_batches is not None and run.batches >= max_batches:
+            run.stopped_reason = 'max_batches'
+            break
+
+        batch_started = time.perf_counter()
+        with conn.transaction():
+            candidates, deleted, max_key, max_ctid = conn.execute(
+                query, {'cutoff': cutoff, 'last_key': last_key, 'last_ctid': last_ctid, 'batch_size': batch_size}
+            ).fetchone()
+        run.batch_latencies_ms.append((time.perf_counter() - batch_started) * 1000)
+
+        if candidates == 0:
+            break
+
+        run.batches += 1
+        run.deleted += deleted
+        run.skipped_locked += candidates - deleted
+        last_key, last_ctid = max_key, max_ctid
+
+        if pause_ms:
+            time.sleep(pause_ms / 1000.0)
+
+    run.duration_seconds = time.perf_counter() - started
+    run.remaining = count_expired(conn, target, cutoff)
+    run.size_after = table_size(conn, spec['table'])
+    run.dead_tuples_after = dead_tuples(conn, spec['table'])
+    return run
+
+
+def append_metrics(path: Path, run: CleanupRun):
+    """Append one JSON line per run"""
+    with path.open('a', encoding='utf-8') as f:
+        f.write(json.dumps(run.to_dict()) + '\n')
+
+
+def print_run(run: CleanupRun):
+    data = run.to_dict()
+    latency = data['batch_latency']
+    print(f"  ✅ {data['target']}: deleted {data['deleted']} rows in {data['batches']} batches "
+          f"({data['duration_seconds']}s, {data['rows_per_second']} rows/s)")
+    print(f"     batch p50 {latency['p50_ms']}ms  p99 {latency['p99_ms']}ms  max {latency['max_ms']}ms")
+    print(f"     size {data['table_bytes_before']} -> {data['table_bytes_after']} bytes, "
+          f"{data['dead_tuples_after']} dead tuples, stopped: {data['stopped_reason']}")
+    if data['skipped_locked']:
+        print(f"  ⚠️ {data['skipped_locked']} expired rows were locked by other sessions and skipped")
+    if data['remaining_expired']:
+        print(f"  ⚠️ {data['remaining_expired']} expired rows left for the next run")
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def generate_rows(conn, target: str, expired: int, live: int):
+    """Insert expired and still-valid rows for a target"""
+    if target == 'nonces':
+        conn.execute(
+            """INSERT INTO request_nonces (nonce, expires_at)
+            SELECT md5(random()::text || g::text), now() - (random() * INTERVAL '30 days') - INTERVAL '1 minute'
+            FROM generate_series(1, %s) g""",
+            (expired,),
+        )
+        conn.execute(
+            """INSERT INTO request_nonces (nonce, expires_at)
+            SELECT md5(random()::text || g::text), now() + (random() * INTERVAL '10 minutes') + INTERVAL '1 minute'
+            FROM generate_series(1, %s) g""",
+            (live,),
+        )
+    else:
+        conn.execute(
+            """INSERT INTO rate_limits (identifier, endpoint, window_start, window_end)
+            SELECT md5(g::text), 'place-order', ts - INTERVAL '1 hour', ts
+            FROM (
+                SELECT g, now() - INTERVAL '25 hours' - (random() * INTERVAL '30 days') AS ts
+                FROM generate_series(1, %s) g
+            ) s""",
+            (expired,),
+        )
+        conn.execute(
+            """INSERT INTO rate_limits (identifier, endpoint, window_start, window_end)
+            SELECT md5(random()::text || g::text), 'place-order', now(), now() + INTERVAL '1 hour'
+            FROM generate_series(1, %s) g""",
+            (live,),
+        )
+
+
+def benchmark(args):
+    """Compare single-statement cleanup with batched cleanup on generated data"""
+    dsn = prepare_bench_database(args.dsn, args.database)
+    results = {}
+
+    try:
+        with connect(dsn) as conn:
+            for target in args.target:
+                spec = CLEANUP_TARGETS[target]
+                print(f"\n📝 {target}: backlog of {args.backlog} expired + {args.live} live rows")
+
+                # Baseline: the existing SQL function on a never-cleaned table
+                generate_rows(conn, target, args.backlog, args.live)
+                conn.execute(f"VACUUM ANALYZE {spec['table']}")
+                started = time.perf_counter()
+                deleted = conn.execute(f"SELECT {spec['function']}()").fetchone()[0]
+                single_ms = (time.perf_counter() - started) * 1000
+                print(f"  {spec['function']}(): {deleted} rows in one statement, {single_ms:.1f}ms "
+                      f"(locks held for the whole delete)")
+
+                conn.execute(f"TRUNCATE {spec['table']}")
+                generate_rows(conn, target, args.backlog, args.live)
+                conn.execute(f"VACUUM ANALYZE {spec['table']}")
+                backlog_run = run_batched_cleanup(conn, target, args.batch_size, args.max_seconds)
+                print_run(backlog_run)
+
+                # Steady state: new rows arrive, the job runs on a schedule
+                rounds = []
+                for i in range(args.rounds):
+                    generate_rows(conn, target, args.arrivals, args.arrivals)
+                    run = run_batched_cleanup(conn, target, args.batch_size, args.max_seconds)
+                    conn.execute(f"VACUUM {spec['table']}")
+                    rounds.append({
+                        'round': i + 1,
+                        'deleted': run.deleted,
+                        'batch_p99_ms': latency_summary(run.batch_latencies_ms)['p99_ms'],
+                        'table_bytes': table_size(conn, spec['table']),
+                    })
+                    print(f"  round {i + 1}: deleted {run.deleted}, batch p99 "
+                          f"{rounds[-1]['batch_p99_ms']}ms, table {rounds[-1]['table_bytes']} bytes")
+
+                results[target] = {
+                    'single_statement': {'deleted': deleted, 'duration_ms': round(single_ms, 1)},
+                    'batched_backlog': backlog_run.to_dict(),
+                    'steady_state': rounds,
+                }
+    finally:
+        if not args.keep_database:
+            drop_scratch_database(args.dsn, args.database)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batched Expired-Row Cleanup')
+    parser.add_argument('--dry-run', action='store_true', help='Count expired rows only')
+    parser.add_argument('--apply', action='store_true', help='Delete expired rows in batches')
+    parser.add_argument('--benchmark', action='store_true', help='Run the generated-data benchmark')
+    parser.add_argument('--dsn', default=DEFAULT_DSN, help='Database DSN (default: $LOCAL_DATABASE_URL)')
+    parser.add_argument('--target', nargs='+', choices=sorted(CLEANUP_TARGETS), default=sorted(CLEANUP_TARGETS))
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows per delete batch')
+    parser.add_argument('--max-seconds', type=float, default=60.0, help='Time budget per target')
+    parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+    parser.add_argument('--pause-ms', type=float, default=0.0, help='Sleep between batches')
+    parser.add_argument('--metrics-file', type=Path, default=METRICS_FILE, help='JSON-lines metrics log')
+    parser.add_argument('--database', default='rotante_bench_cleanup', help='Scratch database (benchmark)')
+    parser.add_argument('--keep-database', action='store_true', help='Keep the scratch database (benchmark)')
+    parser.add_argument('--backlog', type=int, default=500_000, help='Expired rows before first run (benchmark)')
+    parser.add_argument('--live', type=int, default=10_000, help='Unexpired rows (benchmark)')
+    parser.add_argument('--arrivals', type=int, default=20_000, help='New rows per round (benchmark)')
+    parser.add_argument('--rounds', type=int, default=5, help='Steady-state rounds (benchmark)')
+    parser.add_argument('--json', metavar='PATH', help='Write benchmark results as JSON')
+
+    args = parser.parse_args()
+
+    if not any([args.dry_run, args.apply, args.benchmark]):
+        parser.print_help()
+        print("\n⚠️  Please specify --dry-run, --apply, or --benchmark")
+        sys.exit(1)
+
+    require_psycopg()
+
+    print("🧹 Batched Expired-Row Cleanup")
+    print("="*60)
+
+    if args.benchmark:
+        results = benchmark(args)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            print(f"\n✅ Results written to {args.json}")
+        return
+
+    with connect(args.dsn) as conn:
+        for target in args.target:
+            if args.dry_run:
+                print(f"  {target}: {count_expired(conn, target)} expired rows")
+                continue
+            run = run_batched_cleanup(
+                conn, target, args.batch_size, args.max_seconds, args.max_batches, args.pause_ms
+            )
+            print_run(run)
+            append_metrics(args.metrics_file, run)
+
+    if args.dry_run:
+        print("\n⚠️  DRY RUN - No rows were deleted")
+        print("   Run with --apply to delete")
+    else:
+        print(f"\n✅ Metrics appended to {args.metrics_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,980 @@
+#!/usr/bin/env python3
+"""
+Dart Source Index
+=================
+Lightweight, regex-and-bracket based index of the Flutter sources shared by
+the analyzers: Supabase query chains, enclosing functions, Riverpod
+providers and their ref.watch/read edges, and the Freezed models in
+lib/core/models with the columns they decode.
+
+Usage:
+    python dart_index.py --queries        # List every Supabase query chain
+    python dart_index.py --providers      # List providers and their ref edges
+    python dart_index.py --models         # List Freezed models and their columns
+"""
+
+import re
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent
+LIB_DIR = PROJECT_ROOT / "lib"
+MODELS_DIR = LIB_DIR / "core" / "models"
+CONSTANTS_FILE = LIB_DIR / "core" / "utils" / "constants.dart"
+
+GENERATED_SUFFIXES = ('.g.dart', '.freezed.dart')
+
+CHAIN_ROOTS = ('from', 'rpc')
+
+READ_METHODS = {'select', 'stream'}
+WRITE_METHODS = {'insert', 'update', 'upsert', 'delete'}
+FILTER_METHODS = {
+    'eq', 'neq', 'gt', 'gte', 'lt', 'lte', 'like', 'ilike', 'is_', 'isFilter',
+    'inFilter', 'in_', 'contains', 'containedBy', 'filter', 'not', 'or', 'match',
+    'textSearch', 'overlaps', 'rangeGt', 'rangeLt',
+}
+ROW_BOUND_METHODS = {'limit', 'range', 'single', 'maybeSingle'}
+TIME_FILTER_METHODS = {'gt', 'gte', 'lt', 'lte'}
+
+CONTROL_KEYWORDS = {
+    'if', 'for', 'while', 'switch', 'catch', 'else', 'do', 'try', 'finally',
+    'return', 'await', 'assert', 'super', 'this', 'new',
+}
+
+PROVIDER_DECLARATION = re.compile(
+    r'\bfinal\s+(\w+Provider)\s*=\s*((?:Async)?\w*Provider)\b((?:\s*\.\s*(?:autoDispose|family))*)'
+)
+RIVERPOD_ANNOTATION = re.compile(r'@(riverpod|Riverpod\s*\(([^)]*)\))')
+REF_CALL = re.compile(
+    r'\b_?ref\s*\.\s*(watch|read|listen|invalidate|refresh|invalidateSelf)\s*\(\s*(\w+Provider)?'
+)
+MASK_START = re.compile(r"[/'\"]")
+STRING_LITERAL = re.compile(r"r?('''|\"\"\"|'|\")(.*?)\1", re.DOTALL)
+
+
+# ---------------------------------------------------------------------------
+# Source masking
+# ---------------------------------------------------------------------------
+
+def mask_dart(text: str) -> str:
+    """Same-length copy with comments and string contents blanked
+
+    Quote characters are kept so string positions can still be found;
+    interpolations are blanked too, so brackets in the mask always balance.
+    """
+    out = list(text)
+    i = 0
+    length = len(text)
+
+    def blank(start: int, end: int):
+        for k in range(start, min(end, length)):
+            if out[k] != '\n':
+                out[k] = ' '
+
+    while i < length:
+        interesting = MASK_START.search(text, i)
+        if not interesting:
+            break
+        i = interesting.start()
+        ch = text[i]
+
+        if ch == '/' and text.startswith('//', i):
+            end = text.find('\n', i)
+            end = length if end == -1 else end
+            blank(i, end)
+            i = end
+            continue
+
+        if ch == '/' and text.startswith('/*', i):
+            depth = 1
+            j = i + 2
+            while j < length and depth:
+                if text.startswith('/*', j):
+                    depth += 1
+                    j += 2
+                elif text.startswith('*/', j):
+                    depth -= 1
+                    j += 2
+                else:
+                    j += 1
+            blank(i, j)
+            i = j
+            continue
+
+        if ch in ("'", '"'):
+            raw = i > 0 and text[i - 1] == 'r' and (i < 2 or not (text[i - 2].isalnum() or text[i - 2] == '_'))
+            quote = text[i:i + 3] if text[i:i + 3] in ("'''", '"""') else ch
+            j = i + len(quote)
+            while j < length:
+                if not raw and text[j] == '\\':
+                    j += 2
+                    continue
+                if not raw and text.startswith('${', j):
+                    depth = 1
+                    j += 2
+                    while j < length and depth:
+                        if text[j] == '{':
+                            depth += 1
+                        elif text[j] == '}':
+                            depth -= 1
+                        elif text[j] in ("'", '"'):
+                            close = text.find(text[j], j + 1)
+                            j = length if close == -1 else close
+                        j += 1
+                    continue
+                if text.startswith(quote, j):
+                    break
+                if len(quote) == 1 and text[j] == '\n':
+                    break
+                j += 1
+            blank(i + len(quote), j)
+            i = j + len(quote)
+            continue
+
+        i += 1
+
+    return ''.join(out)
+
+
+OPENERS = {'(': ')', '[': ']', '{': '}'}
+CLOSERS = {')': '(', ']': '[', '}': '{'}
+
+
+def match_bracket(masked: str, open_index: int) -> int:
+    """Index of the bracket closing the one at `open_index` (in masked text)"""
+    depth = 0
+    for i in range(open_index, len(masked)):
+        ch = masked[i]
+        if ch in OPENERS:
+            depth += 1
+        elif ch in CLOSERS:
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(masked) - 1
+
+
+def match_bracket_backward(masked: str, close_index: int) -> int:
+    """Index of the bracket opening the one at `close_index`"""
+    depth = 0
+    for i in range(close_index, -1, -1):
+        ch = masked[i]
+        if ch in CLOSERS:
+            depth += 1
+        elif ch in OPENERS:
+            depth -= 1
+            if depth == 0:
+                return i
+    return 0
+
+
+def string_literals(raw: str) -> List[str]:
+    """Contents of the string literals in a raw argument"""
+    return [m.group(2) for m in STRING_LITERAL.finditer(raw)]
+
+
+def first_string(raw: str) -> Optional[str]:
+    literals = string_literals(raw)
+    return literals[0] if literals else None
+
+
+def snake_case(name: str) -> str:
+    return re.sub(r'(?<=[a-z0-9])([A-Z])', r'_\1', name).lower()
+
+
+def lower_camel(name: str) -> str:
+    return name[:1].lower() + name[1:]
+
+
+def table_constants() -> Dict[str, str]:
+    """AppConstants.tableX -> table name"""
+    constants = {}
+    if CONSTANTS_FILE.exists():
+        text = CONSTANTS_FILE.read_text(encoding='utf-8')
+        for name, value in re.findall(r"static\s+const\s+String\s+(table\w+)\s*=\s*'(\w+)'", text):
+            constants[f"AppConstants.{name}"] = value
+    return constants
+
+
+# ---------------------------------------------------------------------------
+# Files and blocks
+# ---------------------------------------------------------------------------
+
+class Block:
+    def __init__(self, name: Optional[str], kind: str, header_start: int,
+                 body_start: int, body_end: int, owner: Optional[str] = None):
+        self.name = name
+        self.kind = kind            # 'class' | 'function' | 'closure'
+        self.header_start = header_start
+        self.body_start = body_start
+        self.body_end = body_end
+        self.owner = owner          # enclosing class name
+
+    @property
+    def qualified_name(self) -> str:
+        if self.owner and self.name:
+            return f"{self.owner}.{self.name}"
+        return self.name or '<closure>'
+
+    def contains(self, offset: int) -> bool:
+        return self.body_start <= offset <= self.body_end
+
+
+class DartFile:
+    def __init__(self, path: Path, text: Optional[str] = None):
+        self.path = path
+        self.text = text if text is not None else path.read_text(encoding='utf-8')
+        self.masked = mask_dart(self.text)
+        self.line_starts = [0] + [m.end() for m in re.finditer('\n', self.text)]
+        self._blocks: Optional[List[Block]] = None
+        self._pairs: Optional[Dict[int, int]] = None
+
+    def _bracket_pairs(self) -> Dict[int, int]:
+        if self._pairs is None:
+            pairs = {}
+            stack = []
+            for match in re.finditer(r'[()\[\]{}]', self.masked):
+                index = match.start()
+                if self.masked[index] in OPENERS:
+                    stack.append(index)
+                elif stack:
+                    open_index = stack.pop()
+                    pairs[open_index] = index
+                    pairs[index] = open_index
+            self._pairs = pairs
+        return self._pairs
+
+    def close_of(self, open_index: int) -> int:
+        """Index of the bracket closing the one at `open_index`"""
+        return self._bracket_pairs().get(open_index, len(self.masked) - 1)
+
+    def open_of(self, close_index: int) -> int:
+        """Index of the bracket opening the one at `close_index`"""
+        return self._bracket_pairs().get(close_index, 0)
+
+    @property
+    def rel(self) -> str:
+        try:
+            return str(self.path.relative_to(PROJECT_ROOT))
+        except ValueError:
+            return str(self.path)
+
+    def line_of(self, offset: int) -> int:
+        lo, hi = 0, len(self.line_starts) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.line_starts[mid] <= offset:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo + 1
+
+    @property
+    def blocks(self) -> List[Block]:
+        if self._blocks is None:
+            self._blocks = find_blocks(self)
+        return self._blocks
+
+    def enclosing(self, offset: int, kinds: Iterable[str] = ('function',)) -> Optional[Block]:
+        """Innermost block of the given kinds containing `offset`"""
+        best = None
+        for block in self.blocks:
+            if block.kind in kinds and block.contains(offset):
+                if best is None or block.body_start >= best.body_start:
+                    best = block
+        return best
+
+    def enclosing_class(self, offset: int) -> Optional[Block]:
+        return self.enclosing(offset, kinds=('class',))
+
+
+def statement_start(source: 'DartFile', offset: int) -> int:
+    """Start of the statement/expression containing `offset`"""
+    masked = source.masked
+    i = offset - 1
+    while i >= 0:
+        ch = masked[i]
+        if ch in CLOSERS:
+            i = source.open_of(i) - 1
+            continue
+        if ch in ';{}([,':
+            return i + 1
+        if ch == '>' and i > 0 and masked[i - 1] == '=':
+            return i + 1
+        i -= 1
+    return 0
+
+
+def expression_end(source: 'DartFile', offset: int) -> int:
+    """End (exclusive) of the expression starting at `offset`"""
+    masked = source.masked
+    i = offset
+    length = len(masked)
+    while i < length:
+        ch = masked[i]
+        if ch in OPENERS:
+            i = source.close_of(i) + 1
+            continue
+        if ch in ';,' or ch in CLOSERS:
+            return i
+        i += 1
+    return length
+
+
+def header_name(masked: str, header: str) -> Tuple[Optional[str], str]:
+    """Name and kind of a block from the text preceding its `{`"""
+    class_match = re.search(r'\b(?:class|mixin|extension|enum)\s+(\w+)[^{]*$', header)
+    if class_match:
+        return class_match.group(1), 'class'
+
+    stripped = re.sub(r'(?:\basync\*?|\bsync\*)\s*$', '', header.rstrip()).rstrip()
+    if not stripped.endswith(')'):
+        getter = re.search(r'\bget\s+(\w+)\s*$', stripped)
+        if getter:
+            return getter.group(1), 'function'
+        return None, 'closure'
+
+    open_index = match_bracket_backward(stripped, len(stripped) - 1)
+    before = stripped[:open_index].rstrip()
+    before = re.sub(r'<[^<>]*(?:<[^<>]*>[^<>]*)*>$', '', before).rstrip()
+    name_match = re.search(r'([\w$]+(?:\.\w+)?)$', before)
+    if not name_match:
+        return None, 'closure'
+    name = name_match.group(1)
+    if name in CONTROL_KEYWORDS:
+        return None, 'control'
+    # `foo((ref) {` and `list.map((x) {` are closures passed as arguments
+    if before.endswith('(') or before.endswith(','):
+        return None, 'closure'
+    preceding = before[:name_match.start()].rstrip()
+    if preceding.endswith('.') or preceding.endswith('=') or preceding.endswith('('):
+        return None, 'closure'
+    return name.split('.')[-1], 'function'
+
+
+def find_blocks(source: DartFile) -> List[Block]:
+    """Classes, functions/methods and closures with their body spans"""
+    masked = source.masked
+    blocks: List[Block] = []
+    class_stack: List[Block] = []
+
+    for match in re.finditer(r'\{', masked):
+        open_index = match.start()
+        header_start = open_index - 1
+        while header_start >= 0:
+            ch = masked[header_start]
+            if ch in ')]':
+                header_start = source.open_of(header_start) - 1
+                continue
+            if ch in ';{}([':
+                break
+            header_start -= 1
+        header_start += 1
+        header = masked[header_start:open_index]
+        name, kind = header_name(masked, header)
+        if kind == 'control':
+            continue
+        close_index = source.close_of(open_index)
+
+        while class_stack and class_stack[-1].body_end < open_index:
+            class_stack.pop()
+        owner = class_stack[-1].name if class_stack else None
+
+        block = Block(name, kind, header_start + len(header) - len(header.lstrip()),
+                      open_index, close_index, owner if kind != 'class' else None)
+        blocks.append(block)
+        if kind == 'class':
+            class_stack.append(block)
+
+    # Arrow-bodied functions: name(args) => expr;
+    for match in re.finditer(r'=>', masked):
+        window_start = max(0, match.start() - 400)
+        before = masked[window_start:match.start()]
+        stripped = re.sub(r'(?:\basync\*?)?\s*$', '', before)
+        if not stripped.endswith(')'):
+            continue
+        open_index = source.open_of(window_start + len(stripped) - 1)
+        if open_index < window_start:
+            continue
+        name, kind = header_name(masked, stripped)
+        if kind != 'function':
+            continue
+        end = expression_end(source, match.end())
+        owner_block = None
+        for block in blocks:
+            if block.kind == 'class' and block.contains(match.start()):
+                owner_block = block
+        blocks.append(Block(name, 'function', statement_start(source, open_index), match.end(), end,
+                            owner_block.name if owner_block else None))
+
+    return blocks
+
+
+def dart_files(paths: Optional[Iterable[Path]] = None) -> List[Path]:
+    """Hand-written Dart files under lib/ (generated parts excluded)"""
+    candidates = paths if paths is not None else LIB_DIR.rglob("*.dart")
+    return sorted(p for p in candidates if p.suffix == '.dart' and not p.name.endswith(GENERATED_SUFFIXES))
+
+
+# ---------------------------------------------------------------------------
+# Supabase query chains
+# ---------------------------------------------------------------------------
+
+class Call:
+    def __init__(self, name: str, args: str, offset: int):
+        self.name = name
+        self.args = args
+        self.offset = offset
+
+    @property
+    def first_string(self) -> Optional[str]:
+        return first_string(self.args)
+
+
+class SelectSpec:
+    """Parsed PostgREST select string"""
+
+    def __init__(self, raw: Optional[str]):
+        self.raw = raw
+        self.star = raw is None or raw.strip() in ('', '*')
+        self.columns: List[str] = []
+        self.embeds: Dict[str, 'SelectSpec'] = {}
+        self.embed_tables: Dict[str, str] = {}
+        if raw is not None:
+            self._parse(raw)
+
+    def _parse(self, raw: str):
+        for part in split_commas(raw):
+            part = part.strip()
+            if not part:
+                continue
+            embed = re.match(r'^(?:(\w+)\s*:\s*)?(\w+)(?:!\w+)?\s*\((.*)\)$', part, re.DOTALL)
+            if embed:
+                alias, table, inner = embed.groups()
+                key = alias or table
+                self.embeds[key] = SelectSpec(inner)
+                self.embed_tables[key] = table
+                continue
+            if part == '*':
+                self.star = True
+                continue
+            column = re.match(r'^(?:\w+\s*:\s*)?(\w+)', part)
+            if column:
+                self.columns.append(column.group(1))
+
+
+def split_commas(text: str, brackets: str = '()') -> List[str]:
+    """Split on commas outside the given bracket pairs"""
+    opening = brackets[0::2]
+    closing = brackets[1::2]
+    parts = []
+    depth = 0
+    start = 0
+    for i, ch in enumerate(text):
+        if ch in opening:
+            depth += 1
+        elif ch in closing:
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+class QueryChain:
+    def __init__(self, source: DartFile, root: str, target: Optional[str], start: int, end: int):
+        self.source = source
+        self.root = root                      # 'from' | 'rpc'
+        self.target = target                  # table or function name
+        self.start = start                    # statement start
+        self.end = end                        # chain end (exclusive)
+        self.calls: List[Call] = []
+        self.variable: Optional[str] = None
+        self.awaited = False
+        self.returned = False
+        self.function: Optional[Block] = None
+        self.extended_by: List[int] = []      # offsets of later `query = query...` statements
+
+    @property
+    def table(self) -> Optional[str]:
+        return self.target if self.root == 'from' else None
+
+    @property
+    def line(self) -> int:
+        return self.source.line_of(self.root_offset)
+
+    @property
+    def root_offset(self) -> int:
+        return self.calls[0].offset if self.calls else self.start
+
+    @property
+    def text(self) -> str:
+        return self.source.text[self.start:self.end]
+
+    def call_names(self) -> List[str]:
+        return [c.name for c in self.calls]
+
+    def calls_named(self, *names: str) -> List[Call]:
+        return [c for c in self.calls if c.name in names]
+
+    def has(self, *names: str) -> bool:
+        return any(c.name in names for c in self.calls)
+
+    @property
+    def operation(self) -> str:
+        if self.root == 'rpc':
+            return 'rpc'
+        for call in self.calls[1:]:
+            if call.name in WRITE_METHODS:
+                return call.name
+            if call.name in READ_METHODS:
+                return call.name
+        return 'select'
+
+    @property
+    def is_read(self) -> bool:
+        return self.root == 'from' and self.operation in READ_METHODS
+
+    @property
+    def select(self) -> Optional[SelectSpec]:
+        """Select spec of a read (None for writes and stream)"""
+        selects = self.calls_named('select')
+        if not selects or self.operation != 'select':
+            return None
+        literals = string_literals(selects[0].args)
+        return SelectSpec(''.join(literals) if literals else None)
+
+    @property
+    def select_call(self) -> Optional[Call]:
+        selects = self.calls_named('select')
+        return selects[0] if selects else None
+
+    @property
+    def filters(self) -> List[Tuple[str, Optional[str], str]]:
+        """(method, column, raw args) for every filter call"""
+        result = []
+        for call in self.calls:
+            if call.name in FILTER_METHODS:
+                result.append((call.name, call.first_string, call.args))
+        return result
+
+    def filter_columns(self, *methods: str) -> List[str]:
+        return [col for name, col, _ in self.filters if col and (not methods or name in methods)]
+
+    @property
+    def org_filtered(self) -> bool:
+        return 'organization_id' in self.filter_columns() or any(
+            'organization_id' in (col or '') for _, col, _ in self.filters
+        )
+
+    @property
+    def row_bounded(self) -> bool:
+        """True when the response size does not grow with table size"""
+        if self.has(*ROW_BOUND_METHODS) or self.has('count') and self.select_head:
+            return True
+        return 'id' in self.filter_columns('eq')
+
+    @property
+    def select_head(self) -> bool:
+        select = self.select_call
+        return bool(select and re.search(r'head\s*:\s*true', select.args))
+
+    @property
+    def time_filtered(self) -> bool:
+        return bool(self.filter_columns(*TIME_FILTER_METHODS))
+
+
+def resolve_target(raw: str, constants: Dict[str, str]) -> Optional[str]:
+    literal = first_string(raw)
+    if literal is not None:
+        return literal
+    name = raw.strip()
+    return constants.get(name)
+
+
+def chain_calls(source: DartFile, start: int) -> Tuple[List[Call], int]:
+    """Parse `.name(args)` calls from `start` until the chain ends"""
+    masked = source.masked
+    calls = []
+    i = start
+    length = len(masked)
+    call_pattern = re.compile(r'\s*(?:\?\.|\.|\.\.)\s*(\w+)\s*(?:<[^<>()]*(?:<[^<>()]*>)?[^<>()]*>)?\s*\(')
+
+    while i < length:
+        match = call_pattern.match(masked, i)
+        if not match:
+            # Allow property access like `.count` or `.future` to end the chain
+            break
+        open_index = match.end() - 1
+        close_index = source.close_of(open_index)
+        calls.append(Call(match.group(1), source.text[open_index + 1:close_index], match.start(1)))
+        i = close_index + 1
+
+    return calls, i
+
+
+def find_query_chains(source: DartFile, constants: Optional[Dict[str, str]] = None) -> List[QueryChain]:
+    """Every `.from(...)`/`.rpc(...)` chain in a file"""
+    constants = constants if constants is not None else table_constants()
+    masked = source.masked
+    chains = []
+
+    for match in re.finditer(r'\.\s*(%s)\s*\(' % '|'.join(CHAIN_ROOTS), masked):
+        root = match.group(1)
+        open_index = match.end() - 1
+        close_index = source.close_of(open_index)
+        raw = source.text[open_index + 1:close_index]
+
+        # `List.from(x)`, `Map.from(x)` and friends are not Supabase
+        receiver = masked[max(0, match.start() - 200):match.start()].rstrip()
+        receiver_name = re.search(r'(\w+)\s*(?:<[^<>]*(?:<[^<>]*>)?[^<>]*>)?$', receiver)
+        if root == 'from' and receiver_name and (
+                receiver_name.group(1)[:1].isupper() and receiver_name.group(1) not in ('SupabaseConfig', 'Supabase')
+                or receiver_name.group(1) == 'storage'):
+            continue
+        if root == 'from' and not (first_string(raw) or raw.strip() in constants or re.match(r'^\w+$', raw.strip())):
+            continue
+
+        target = resolve_target(raw.split(',')[0], constants)
+        start = statement_start(source, match.start())
+        calls, end = chain_calls(source, close_index + 1)
+        chain = QueryChain(source, root, target, start, end)
+        chain.calls = [Call(root, raw, match.start(1))] + calls
+
+        prefix = masked[start:match.start()]
+        assign = re.search(r'(?:^|[\s(])(\w+)\s*=\s*(?:await\s+)?[\w.\s?!]*$', prefix)
+        if assign and not re.search(r'[=!<>]=\s*$', prefix[:assign.end(1) + 2]):
+            chain.variable = assign.group(1)
+        chain.awaited = bool(re.search(r'\bawait\b', prefix))
+        chain.returned = bool(re.search(r'\breturn\b|=>', masked[max(0, start - 3):match.start()]))
+        chain.function = source.enclosing(match.start())
+        chains.append(chain)
+
+    extend_split_chains(source, chains)
+    return chains
+
+
+def extend_split_chains(source: DartFile, chains: List[QueryChain]):
+    """Append calls of `query = query.eq(...)` / `await query.limit(...)` statements"""
+    masked = source.masked
+    for chain in chains:
+        if not chain.variable or chain.awaited or not chain.function:
+            continue
+        name = re.escape(chain.variable)
+        body_end = chain.function.body_end
+        pattern = re.compile(
+            r'\b%s\s*=\s*(?:await\s+)?%s\b|\bawait\s+%s\b|\breturn\s+%s\b' % (name, name, name, name)
+        )
+        for match in pattern.finditer(masked, chain.end, body_end):
+            calls, end = chain_calls(source, match.end())
+            chain.calls.extend(calls)
+            chain.extended_by.append(match.start())
+            if 'await' in match.group(0):
+                chain.awaited = True
+
+
+def index_queries(paths: Optional[Iterable[Path]] = None) -> List[QueryChain]:
+    """Query chains across the given files (default: all of lib/)"""
+    constants = table_constants()
+    chains = []
+    for path in dart_files(paths):
+        chains.extend(find_query_chains(DartFile(path), constants))
+    return chains
+
+
+# ---------------------------------------------------------------------------
+# Providers
+# ---------------------------------------------------------------------------
+
+class Provider:
+    def __init__(self, name: str, source: DartFile, kind: str, declared_type: str, offset: int):
+        self.name = name
+        self.source = source
+        self.kind = kind                    # 'final' | 'riverpod-function' | 'riverpod-class'
+        self.declared_type = declared_type  # FutureProvider, StateNotifierProvider, @riverpod ...
+        self.offset = offset
+        self.spans: List[Tuple[int, int]] = []
+        self.auto_dispose = False
+        self.family = False
+        self.keep_alive = False
+        self.notifier_class: Optional[str] = None
+        self.edges: List[Tuple[str, str, int]] = []   # (kind, provider, offset)
+
+    @property
+    def line(self) -> int:
+        return self.source.line_of(self.offset)
+
+    def owns(self, offset: int) -> bool:
+        return any(start <= offset <= end for start, end in self.spans)
+
+    def watched(self) -> List[str]:
+        return sorted({p for kind, p, _ in self.edges if kind == 'watch'})
+
+    def read(self) -> List[str]:
+        return sorted({p for kind, p, _ in self.edges if kind in ('read', 'listen')})
+
+
+def find_providers(source: DartFile) -> List[Provider]:
+    """Providers declared in one file, with the code spans that belong to them"""
+    masked = source.masked
+    providers = []
+    classes = {b.name: b for b in source.blocks if b.kind == 'class'}
+
+    for match in PROVIDER_DECLARATION.finditer(masked):
+        name, declared_type, modifiers = match.groups()
+        provider = Provider(name, source, 'final', declared_type, match.start(1))
+        provider.auto_dispose = 'autoDispose' in modifiers
+        provider.family = 'family' in modifiers
+        end = expression_end(source, match.end())
+        while end < len(masked) and masked[end] != ';':
+            end = expression_end(source, end + 1)
+        provider.spans.append((match.start(), end))
+
+        body = masked[match.end():end]
+        notifier = re.search(r'\b(\w+)\s*(?:\.new\b|\(\s*_?ref\b)', source.text[match.end():end])
+        if notifier and notifier.group(1) in classes:
+            provider.notifier_class = notifier.group(1)
+        elif re.search(r'<\s*(\w+)\s*,', body):
+            candidate = re.search(r'<\s*(\w+)\s*,', body).group(1)
+            if candidate in classes:
+                provider.notifier_class = candidate
+        if provider.notifier_class:
+            block = classes[provider.notifier_class]
+            provider.spans.append((block.header_start, block.body_end))
+        providers.append(provider)
+
+    for match in RIVERPOD_ANNOTATION.finditer(masked):
+        after = match.end()
+        declaration = re.compile(
+            r'\s*(?:@\w+(?:\([^)]*\))?\s*)*(?:class\s+(\w+)\s+extends\s+_\$\w+|'
+            r'(?:[\w<>?,\s]+?\s+)?(\w+)\s*\(\s*(?:\w+\s+)?ref\b)'
+        ).match(masked, after)
+        if not declaration:
+            continue
+        class_name, function_name = declaration.groups()
+        base = class_name or function_name
+        provider = Provider(
+            lower_camel(base) + 'Provider', source,
+            'riverpod-class' if class_name else 'riverpod-function',
+            '@riverpod', declaration.start(1) if class_name else declaration.start(2),
+        )
+        provider.keep_alive = bool(match.group(2) and re.search(r'keepAlive\s*:\s*true', match.group(2)))
+        provider.auto_dispose = not provider.keep_alive
+        if class_name and class_name in classes:
+            block = classes[class_name]
+            provider.spans.append((block.header_start, block.body_end))
+            provider.notifier_class = class_name
+        else:
+            block = source.enclosing(declaration.end() + 1) or next(
+                (b for b in source.blocks if b.kind == 'function' and b.body_start > declaration.end()), None
+            )
+            if block:
+                provider.spans.append((match.start(), block.body_end))
+            params = masked[declaration.end():declaration.end() + 200].split(')')[0]
+            provider.family = ',' in params
+        providers.append(provider)
+
+    for provider in providers:
+        for start, end in provider.spans:
+            for ref in REF_CALL.finditer(masked, start, end):
+                kind, target = ref.groups()
+                if kind == 'invalidateSelf':
+                    provider.edges.append(('invalidate', provider.name, ref.start()))
+                elif target:
+                    provider.edges.append((kind, target, ref.start()))
+
+    return providers
+
+
+def index_providers(paths: Optional[Iterable[Path]] = None) -> Dict[str, Provider]:
+    """Providers across lib/, keyed by name"""
+    providers = {}
+    for path in dart_files(paths):
+        source = DartFile(path)
+        for provider in find_providers(source):
+            providers[provider.name] = provider
+    return providers
+
+
+def provider_for(providers: Iterable[Provider], source: DartFile, offset: int) -> Optional[Provider]:
+    """Provider whose code contains `offset` in `source`"""
+    best = None
+    for provider in providers:
+        if provider.source.path != source.path:
+            continue
+        for start, end in provider.spans:
+            if start <= offset <= end and (best is None or start >= min(s for s, _ in best.spans)):
+                best = provider
+    return best
+
+
+# ---------------------------------------------------------------------------
+# Freezed models
+# ---------------------------------------------------------------------------
+
+class ModelField:
+    def __init__(self, name: str, dart_type: str, json_key: Optional[str],
+                 required: bool, default: Optional[str]):
+        self.name = name
+        self.dart_type = dart_type
+        self.json_key = json_key
+        self.required = required
+        self.default = default
+
+    @property
+    def nested_model(self) -> Optional[str]:
+        """Model class of a List<X>/X field, if it looks like one"""
+        match = re.search(r'(\w+Model)\b', self.dart_type)
+        return match.group(1) if match else None
+
+
+class FreezedModel:
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.path = path
+        self.fields: Dict[str, ModelField] = {}
+
+    def column_for(self, field: ModelField, table_columns: Optional[Iterable[str]] = None) -> Optional[str]:
+        """Database column a field decodes from"""
+        if field.json_key:
+            return field.json_key
+        columns = set(table_columns) if table_columns is not None else None
+        for candidate in (snake_case(field.name), field.name):
+            if columns is None or candidate in columns:
+                return candidate
+        return None
+
+    def columns(self, table_columns: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """field name -> column, for fields that map to a column"""
+        result = {}
+        for field in self.fields.values():
+            column = self.column_for(field, table_columns)
+            if column:
+                result[field.name] = column
+        return result
+
+
+FREEZED_CLASS = re.compile(r'@freezed\s+(?:abstract\s+|sealed\s+)?class\s+(\w+)')
+
+
+def parse_model_fields(params: str) -> Dict[str, ModelField]:
+    fields = {}
+    params = re.sub(r'(?m)^\s*//[^\n]*$|/\*.*?\*/', '', params, flags=re.DOTALL)
+    offset = 0
+    for masked_part in split_commas(mask_dart(params), '()[]{}<>'):
+        part = ' '.join(params[offset:offset + len(masked_part)].split())
+        offset += len(masked_part) + 1
+        if not part:
+            continue
+        json_key = None
+        key = re.search(r"@JsonKey\s*\([^)]*name\s*:\s*'(\w+)'", part)
+        if key:
+            json_key = key.group(1)
+        default = None
+        default_match = re.search(r'@Default\s*\((.*?)\)\s', part)
+        if default_match:
+            default = default_match.group(1)
+        cleaned = re.sub(r'@\w+(?:\s*\((?:[^()]|\([^()]*\))*\))?', '', part).strip()
+        required = cleaned.startswith('required ')
+        cleaned = re.sub(r'^required\s+', '', cleaned)
+        match = re.match(r'^(.*\S)\s+(\w+)$', cleaned)
+        if not match:
+            continue
+        dart_type, name = match.groups()
+        fields[name] = ModelField(name, dart_type, json_key, required, default)
+    return fields
+
+
+def index_models(models_dir: Path = MODELS_DIR) -> Dict[str, FreezedModel]:
+    """Freezed models keyed by class name"""
+    models = {}
+    for path in sorted(models_dir.rglob("*.dart")):
+        if path.name.endswith(GENERATED_SUFFIXES):
+            continue
+        source = DartFile(path)
+        for match in FREEZED_CLASS.finditer(source.masked):
+            name = match.group(1)
+            factory = re.compile(r'const\s+factory\s+%s\s*\(\s*\{' % name).search(source.masked, match.end())
+            if not factory:
+                continue
+            open_index = factory.end() - 1
+            close_index = source.close_of(open_index)
+            model = FreezedModel(name, path)
+            model.fields = parse_model_fields(source.text[open_index + 1:close_index])
+            models[name] = model
+    return models
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def print_queries(chains: List[QueryChain]):
+    for chain in chains:
+        function = chain.function.qualified_name if chain.function else '<top level>'
+        bound = '' if not chain.is_read or chain.row_bounded else ' [unbounded]'
+        print(f"  {chain.source.rel}:{chain.line} {function}: "
+              f"{chain.root}({chain.target}) {'.'.join(chain.call_names()[1:])}{bound}")
+
+
+def print_providers(providers: Dict[str, Provider]):
+    for name in sorted(providers):
+        provider = providers[name]
+        flags = []
+        if provider.auto_dispose:
+            flags.append('autoDispose')
+        if provider.keep_alive:
+            flags.append('keepAlive')
+        if provider.family:
+            flags.append('family')
+        print(f"  {name} ({provider.declared_type}{', ' + ', '.join(flags) if flags else ''}) "
+              f"{provider.source.rel}:{provider.line}")
+        if provider.watched():
+            print(f"    watch: {', '.join(provider.watched())}")
+        if provider.read():
+            print(f"    read:  {', '.join(provider.read())}")
+
+
+def print_models(models: Dict[str, FreezedModel]):
+    for name in sorted(models):
+        model = models[name]
+        columns = model.columns()
+        print(f"  {name} ({model.path.name}): {', '.join(columns.values())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dart Source Index')
+    parser.add_argument('--queries', action='store_true', help='List Supabase query chains')
+    parser.add_argument('--providers', action='store_true', help='List providers and ref edges')
+    parser.add_argument('--models', action='store_true', help='List Freezed models')
+
+    args = parser.parse_args()
+
+    if not any([args.queries, args.providers, args.models]):
+        parser.print_help()
+        print("\n⚠️  Please specify --queries, --providers, or --models")
+        sys.exit(1)
+
+    if args.queries:
+        chains = index_queries()
+        print(f"📋 {len(chains)} query chains")
+        print_queries(chains)
+    if args.providers:
+        providers = index_providers()
+        print(f"🔌 {len(providers)} providers")
+        print_providers(providers)
+    if args.models:
+        models = index_models()
+        print(f"📦 {len(models)} Freezed models")
+        print_models(models)
+
+
+if __name__ == '__main__':
+    main()
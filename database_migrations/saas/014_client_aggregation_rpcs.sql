@@ -0,0 +1,613 @@
+-- ===========================================================================
+-- MIGRATION 014: CLIENT AGGREGATION RPCS
+-- Generated by analyze_queries.py --aggregations: aggregates computed in Postgres
+-- ===========================================================================
+
+BEGIN;
+
+-- lib/features/delivery/screens/delivery_analytics_screen.dart: deliveryAnalyticsProvider
+-- Replaces 1 row fetch(es) folded in Dart with one aggregate round trip
+CREATE OR REPLACE FUNCTION delivery_analytics_aggregates(
+    p_organization_id UUID,
+    p_user_id UUID,
+    p_start_date TIMESTAMPTZ,
+    p_end_date TIMESTAMPTZ,
+    p_timezone TEXT DEFAULT 'Europe/Rome'
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+    WITH
+    response_rows AS (
+        SELECT r.*
+        FROM ordini r
+        WHERE r.organization_id = p_organization_id
+          AND r.tipo = 'delivery'
+          AND r.stato = 'completed'
+          AND r.assegnato_delivery_id = p_user_id
+          AND r.completato_at >= p_start_date
+          AND r.completato_at <= p_end_date
+    )
+    SELECT jsonb_build_object(
+        -- line 128: ordersByHour[hour] = (ordersByHour[hour] ?? 0) + 1;
+        'orders_by_hour', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT extract(hour FROM r.completato_at AT TIME ZONE 'UTC')::int AS k, count(*) AS v
+            FROM response_rows r WHERE r.completato_at IS NOT NULL
+            GROUP BY 1
+        ) g),
+        -- line 143: ordersCompleted = orders.length;
+        'orders_completed', (SELECT count(*) FROM response_rows r)
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION delivery_analytics_aggregates(UUID, UUID, TIMESTAMPTZ, TIMESTAMPTZ, TEXT) TO authenticated;
+
+-- lib/providers/dashboard_analytics_provider.dart: DashboardAnalyticsNotifier._fetchAnalytics
+-- Replaces 4 row fetch(es) folded in Dart with one aggregate round trip
+CREATE OR REPLACE FUNCTION dashboard_analytics_aggregates(
+    p_organization_id UUID,
+    p_start_date TIMESTAMPTZ,
+    p_end_date TIMESTAMPTZ,
+    p_previous_start TIMESTAMPTZ,
+    p_previous_end TIMESTAMPTZ,
+    p_timezone TEXT DEFAULT 'Europe/Rome'
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+    WITH
+    orders_response_rows AS (
+        SELECT r.*
+        FROM ordini r
+        WHERE r.organization_id = p_organization_id
+          AND r.slot_prenotato_start >= p_start_date
+          AND r.slot_prenotato_start <= p_end_date
+        UNION ALL
+        SELECT r.*
+        FROM ordini r
+        WHERE r.organization_id = p_organization_id
+          AND r.slot_prenotato_start IS NULL
+          AND r.created_at >= p_start_date
+          AND r.created_at <= p_end_date
+    ),
+    previous_orders_response_rows AS (
+        SELECT r.*
+        FROM ordini r
+        WHERE r.organization_id = p_organization_id
+          AND r.slot_prenotato_start >= p_previous_start
+          AND r.slot_prenotato_start <= p_previous_end
+        UNION ALL
+        SELECT r.*
+        FROM ordini r
+        WHERE r.organization_id = p_organization_id
+          AND r.slot_prenotato_start IS NULL
+          AND r.created_at >= p_previous_start
+          AND r.created_at <= p_previous_end
+    ),
+    orders_response_ordini_items AS (
+        SELECT c.*, r.id AS parent_id
+        FROM ordini_items c
+        JOIN orders_response_rows r ON r.id = c.ordine_id
+    )
+    SELECT jsonb_build_object(
+        -- line 353: totalRevenue += order.totale;
+        'total_revenue', (SELECT coalesce(sum(r.totale), 0) FROM orders_response_rows r WHERE r.stato IS DISTINCT FROM 'cancelled'),
+        -- line 354: totalOrders++;
+        'total_orders', (SELECT count(*) FROM orders_response_rows r WHERE r.stato IS DISTINCT FROM 'cancelled'),
+        -- line 360: totalDeliveryMinutes += duration.inMinutes;
+        'total_delivery_minutes', (SELECT coalesce(sum(trunc(extract(epoch FROM r.completato_at - r.created_at) / 60)::int), 0) FROM orders_response_rows r WHERE r.stato IS DISTINCT FROM 'cancelled' AND r.tipo = 'delivery' AND r.stato = 'completed' AND r.completato_at IS NOT NULL),
+        -- line 361: deliveryCount++;
+        'delivery_count', (SELECT count(*) FROM orders_response_rows r WHERE r.stato IS DISTINCT FROM 'cancelled' AND r.tipo = 'delivery' AND r.stato = 'completed' AND r.completato_at IS NOT NULL),
+        -- line 365: hourlyRevenue[hour] = (hourlyRevenue[hour] ?? 0) + order.totale;
+        'hourly_revenue', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT extract(hour FROM r.created_at AT TIME ZONE p_timezone)::int AS k, coalesce(sum(r.totale), 0) AS v
+            FROM orders_response_rows r WHERE r.stato IS DISTINCT FROM 'cancelled'
+            GROUP BY 1
+        ) g),
+        -- line 368: totalItemsSold += item.quantita;
+        'total_items_sold', (SELECT coalesce(sum(c.quantita), 0) FROM orders_response_ordini_items c JOIN orders_response_rows r ON r.id = c.parent_id WHERE r.stato IS DISTINCT FROM 'cancelled'),
+        -- line 399: itemSalesMap[name]!.salesCount += item.quantita;
+        'item_sales_map_sales_count', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT c.nome_prodotto AS k, coalesce(sum(c.quantita), 0) AS v
+            FROM orders_response_ordini_items c JOIN orders_response_rows r ON r.id = c.parent_id WHERE r.stato IS DISTINCT FROM 'cancelled'
+            GROUP BY 1
+        ) g),
+        -- line 400: itemSalesMap[name]!.revenue += item.subtotale;
+        'item_sales_map_revenue', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT c.nome_prodotto AS k, coalesce(sum(c.subtotale), 0) AS v
+            FROM orders_response_ordini_items c JOIN orders_response_rows r ON r.id = c.parent_id WHERE r.stato IS DISTINCT FROM 'cancelled'
+            GROUP BY 1
+        ) g),
+        -- line 473: previousHourlyRevenue[hour] = (previousHourlyRevenue[hour] ?? 0) + (o['totale'] as num).to
+        'previous_hourly_revenue', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT extract(hour FROM r.created_at AT TIME ZONE p_timezone)::int AS k, coalesce(sum(r.totale), 0) AS v
+            FROM previous_orders_response_rows r WHERE r.stato IS DISTINCT FROM 'cancelled'
+            GROUP BY 1
+        ) g)
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION dashboard_analytics_aggregates(UUID, TIMESTAMPTZ, TIMESTAMPTZ, TIMESTAMPTZ, TIMESTAMPTZ, TEXT) TO authenticated;
+
+-- lib/providers/delivery_revenue_provider.dart: DeliveryRevenue._fetchDataForDate
+-- Replaces 1 row fetch(es) folded in Dart with one aggregate round trip
+CREATE OR REPLACE FUNCTION delivery_revenue_aggregates(
+    p_organization_id UUID,
+    p_start_of_day TIMESTAMPTZ,
+    p_end_of_day TIMESTAMPTZ,
+    p_timezone TEXT DEFAULT 'Europe/Rome'
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+    WITH
+    orders_response_rows AS (
+        SELECT r.*
+        FROM ordini r
+        WHERE r.organization_id = p_organization_id
+          AND r.tipo = 'delivery'
+          AND r.stato = 'completed'
+          AND r.slot_prenotato_start >= p_start_of_day
+          AND r.slot_prenotato_start <= p_end_of_day
+    )
+    SELECT jsonb_build_object(
+        -- line 217: onTime++;
+        -- line 223: onTime++;
+        'on_time', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT k, sum(v) AS v FROM (
+            SELECT r.assegnato_delivery_id AS k, count(*) AS v
+            FROM orders_response_rows r WHERE r.assegnato_delivery_id IS NOT NULL AND coalesce(r.assegnato_delivery_id::text, '') <> '' AND (r.completato_at < (r.slot_prenotato_start + interval '15 minutes') OR r.completato_at = (r.slot_prenotato_start + interval '15 minutes')) AND r.slot_prenotato_start IS NOT NULL AND r.completato_at IS NOT NULL
+            GROUP BY 1
+            UNION ALL
+            SELECT r.assegnato_delivery_id AS k, count(*) AS v
+            FROM orders_response_rows r WHERE r.assegnato_delivery_id IS NOT NULL AND coalesce(r.assegnato_delivery_id::text, '') <> '' AND NOT (r.slot_prenotato_start IS NOT NULL AND r.completato_at IS NOT NULL)
+            GROUP BY 1
+            ) p
+            GROUP BY k
+        ) g),
+        -- line 219: late++;
+        'late', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT r.assegnato_delivery_id AS k, count(*) AS v
+            FROM orders_response_rows r WHERE r.assegnato_delivery_id IS NOT NULL AND coalesce(r.assegnato_delivery_id::text, '') <> '' AND NOT ((r.completato_at < (r.slot_prenotato_start + interval '15 minutes') OR r.completato_at = (r.slot_prenotato_start + interval '15 minutes'))) AND r.slot_prenotato_start IS NOT NULL AND r.completato_at IS NOT NULL
+            GROUP BY 1
+        ) g),
+        -- line 231: totalDeliveryTimeMinutes += deliveryDuration.inMinutes;
+        'total_delivery_time_minutes', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT r.assegnato_delivery_id AS k, coalesce(sum(trunc(extract(epoch FROM r.completato_at - r.in_consegna_at) / 60)::int), 0) AS v
+            FROM orders_response_rows r WHERE r.assegnato_delivery_id IS NOT NULL AND coalesce(r.assegnato_delivery_id::text, '') <> '' AND r.in_consegna_at IS NOT NULL AND r.completato_at IS NOT NULL
+            GROUP BY 1
+        ) g),
+        -- line 232: validDeliveryTimes++;
+        'valid_delivery_times', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT r.assegnato_delivery_id AS k, count(*) AS v
+            FROM orders_response_rows r WHERE r.assegnato_delivery_id IS NOT NULL AND coalesce(r.assegnato_delivery_id::text, '') <> '' AND r.in_consegna_at IS NOT NULL AND r.completato_at IS NOT NULL
+            GROUP BY 1
+        ) g)
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION delivery_revenue_aggregates(UUID, TIMESTAMPTZ, TIMESTAMPTZ, TEXT) TO authenticated;
+
+-- lib/providers/heatmap_data_provider.dart: deliveryHeatmapData
+-- Replaces 1 row fetch(es) folded in Dart with one aggregate round trip
+CREATE OR REPLACE FUNCTION delivery_heatmap_data_aggregates(
+    p_organization_id UUID,
+    p_two_months_ago TIMESTAMPTZ,
+    p_timezone TEXT DEFAULT 'Europe/Rome'
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+    WITH
+    response_rows AS (
+        SELECT r.*
+        FROM ordini r
+        WHERE r.organization_id = p_organization_id
+          AND r.tipo = 'delivery'
+          AND r.latitude_consegna IS NOT NULL
+          AND r.longitude_consegna IS NOT NULL
+          AND r.created_at >= p_two_months_ago
+        ORDER BY r.created_at DESC
+        LIMIT 2000
+    )
+    SELECT jsonb_build_object(
+        -- line 161: latSum += lat;
+        'lat_sum', (SELECT coalesce(sum(r.latitude_consegna), 0) FROM response_rows r WHERE r.latitude_consegna IS NOT NULL AND r.longitude_consegna IS NOT NULL),
+        -- line 162: lngSum += lng;
+        'lng_sum', (SELECT coalesce(sum(r.longitude_consegna), 0) FROM response_rows r WHERE r.latitude_consegna IS NOT NULL AND r.longitude_consegna IS NOT NULL),
+        -- line 169: ordersByZone[zone] = (ordersByZone[zone] ?? 0) + 1;
+        'orders_by_zone', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT coalesce(r.zone, r.citta_consegna, 'Sconosciuta') AS k, count(*) AS v
+            FROM response_rows r WHERE r.latitude_consegna IS NOT NULL AND r.longitude_consegna IS NOT NULL
+            GROUP BY 1
+        ) g),
+        -- line 179: ordersByHour[hour] = (ordersByHour[hour] ?? 0) + 1;
+        'orders_by_hour', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT extract(hour FROM (coalesce(r.slot_prenotato_start, r.created_at))::timestamptz AT TIME ZONE p_timezone)::int AS k, count(*) AS v
+            FROM response_rows r WHERE (coalesce(r.slot_prenotato_start, r.created_at))::timestamptz IS NOT NULL AND coalesce(r.slot_prenotato_start, r.created_at) IS NOT NULL AND r.latitude_consegna IS NOT NULL AND r.longitude_consegna IS NOT NULL
+            GROUP BY 1
+        ) g)
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION delivery_heatmap_data_aggregates(UUID, TIMESTAMPTZ, TEXT) TO authenticated;
+
+-- lib/providers/inventory_ui_providers.dart: stockSummary
+-- Replaces 1 row fetch(es) folded in Dart with one aggregate round trip
+CREATE OR REPLACE FUNCTION stock_summary_aggregates(
+    p_organization_id UUID,
+    p_timezone TEXT DEFAULT 'Europe/Rome'
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+    WITH
+    data_rows AS (
+        SELECT r.*
+        FROM ingredients r
+        WHERE r.organization_id = p_organization_id
+          AND r.attivo = true
+    )
+    SELECT jsonb_build_object(
+        -- line 81: total++;
+        'total', (SELECT count(*) FROM data_rows r),
+        -- line 85: tracked++;
+        'tracked', (SELECT count(*) FROM data_rows r WHERE coalesce(r.track_stock, false)),
+        -- line 88: totalValue += qty;
+        'total_value', (SELECT coalesce(sum(coalesce(r.stock_quantity, 0)), 0) FROM data_rows r WHERE coalesce(r.track_stock, false)),
+        -- line 92: critical++;
+        'critical', (SELECT count(*) FROM data_rows r WHERE coalesce(r.stock_quantity, 0) <= (coalesce(r.low_stock_threshold, 0) * 0.2) AND coalesce(r.low_stock_threshold, 0) > 0 AND coalesce(r.track_stock, false)),
+        -- line 94: lowStock++;
+        'low_stock', (SELECT count(*) FROM data_rows r WHERE NOT (coalesce(r.stock_quantity, 0) <= (coalesce(r.low_stock_threshold, 0) * 0.2)) AND coalesce(r.stock_quantity, 0) <= coalesce(r.low_stock_threshold, 0) AND coalesce(r.low_stock_threshold, 0) > 0 AND coalesce(r.track_stock, false))
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION stock_summary_aggregates(UUID, TEXT) TO authenticated;
+
+-- lib/providers/product_analytics_provider.dart: productAnalyticsProvider
+-- Replaces 2 row fetch(es) folded in Dart with one aggregate round trip
+CREATE OR REPLACE FUNCTION product_analytics_aggregates(
+    p_organization_id UUID,
+    p_start_date TIMESTAMPTZ,
+    p_end_date TIMESTAMPTZ,
+    p_timezone TEXT DEFAULT 'Europe/Rome'
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+    WITH
+    orders_response_rows AS (
+        SELECT r.*
+        FROM ordini r
+        WHERE r.organization_id = p_organization_id
+          AND r.slot_prenotato_start >= p_start_date
+          AND r.slot_prenotato_start <= p_end_date
+          AND r.stato <> 'cancelled'
+        UNION ALL
+        SELECT r.*
+        FROM ordini r
+        WHERE r.organization_id = p_organization_id
+          AND r.slot_prenotato_start IS NULL
+          AND r.created_at >= p_start_date
+          AND r.created_at <= p_end_date
+          AND r.stato <> 'cancelled'
+    ),
+    orders_response_ordini_items AS (
+        SELECT c.*, r.id AS parent_id
+        FROM ordini_items c
+        JOIN orders_response_rows r ON r.id = c.ordine_id
+    )
+    SELECT jsonb_build_object(
+        -- line 137: totalProductsSold += quantity;
+        'total_products_sold', (SELECT coalesce(sum(coalesce(c.quantita, 1)), 0) FROM orders_response_ordini_items c JOIN orders_response_rows r ON r.id = c.parent_id),
+        -- line 138: totalRevenue += subtotale;
+        'total_revenue', (SELECT coalesce(sum(coalesce(c.subtotale, 0.0)), 0) FROM orders_response_ordini_items c JOIN orders_response_rows r ON r.id = c.parent_id),
+        -- line 145: productMap[productName]!.salesCount += quantity;
+        'product_map_sales_count', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT coalesce(c.nome_prodotto, 'Sconosciuto') AS k, coalesce(sum(coalesce(c.quantita, 1)), 0) AS v
+            FROM orders_response_ordini_items c JOIN orders_response_rows r ON r.id = c.parent_id
+            GROUP BY 1
+        ) g),
+        -- line 146: productMap[productName]!.revenue += subtotale;
+        'product_map_revenue', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT coalesce(c.nome_prodotto, 'Sconosciuto') AS k, coalesce(sum(coalesce(c.subtotale, 0.0)), 0) AS v
+            FROM orders_response_ordini_items c JOIN orders_response_rows r ON r.id = c.parent_id
+            GROUP BY 1
+        ) g),
+        -- line 154: salesBySizeMap[sizeName] = (salesBySizeMap[sizeName] ?? 0) + quantity;
+        -- line 158: salesBySizeMap['Standard'] = (salesBySizeMap['Standard'] ?? 0) + quantity;
+        'sales_by_size_map', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT k, sum(v) AS v FROM (
+            SELECT coalesce(((c.varianti->'size')->>'name'), 'Standard') AS k, coalesce(sum(coalesce(c.quantita, 1)), 0) AS v
+            FROM orders_response_ordini_items c JOIN orders_response_rows r ON r.id = c.parent_id WHERE (c.varianti->>'size') IS NOT NULL
+            GROUP BY 1
+            UNION ALL
+            SELECT 'Standard' AS k, coalesce(sum(coalesce(c.quantita, 1)), 0) AS v
+            FROM orders_response_ordini_items c JOIN orders_response_rows r ON r.id = c.parent_id WHERE NOT ((c.varianti->>'size') IS NOT NULL)
+            GROUP BY 1
+            ) p
+            GROUP BY k
+        ) g)
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION product_analytics_aggregates(UUID, TIMESTAMPTZ, TIMESTAMPTZ, TEXT) TO authenticated;
+
+-- lib/providers/product_monthly_sales_provider.dart: productMonthlySalesProvider
+-- Replaces 1 row fetch(es) folded in Dart with one aggregate round trip
+CREATE OR REPLACE FUNCTION product_monthly_sales_aggregates(
+    p_organization_id UUID,
+    p_start_date_str TIMESTAMPTZ,
+    p_timezone TEXT DEFAULT 'Europe/Rome'
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+    WITH
+    response_rows AS (
+        SELECT r.*
+        FROM ordini_items r
+        JOIN ordini ordini_e ON ordini_e.id = r.ordine_id
+        WHERE ordini_e.created_at >= p_start_date_str
+          AND ordini_e.organization_id = p_organization_id
+          AND ordini_e.stato <> 'cancelled'
+    )
+    SELECT jsonb_build_object(
+        -- line 46: salesMap[menuItemId] = (salesMap[menuItemId] ?? 0) + quantity;
+        'sales_map', (SELECT coalesce(jsonb_object_agg(coalesce(k::text, ''), v), '{}'::jsonb) FROM (
+            SELECT r.menu_item_id AS k, coalesce(sum(coalesce(r.quantita, 0)), 0) AS v
+            FROM response_rows r WHERE r.menu_item_id IS NOT NULL AND coalesce(r.quantita, 0) > 0
+            GROUP BY 1
+        ) g)
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION product_monthly_sales_aggregates(UUID, TIMESTAMPTZ, TEXT) TO authenticated;
+
+-- Daily order rollup, refreshed from the days the ordini/ordini_items triggers queue
+CREATE TABLE IF NOT EXISTS statistiche_giornaliere_pending (
+    organization_id UUID NOT NULL REFERENCES organizations(id) ON DELETE CASCADE,
+    data DATE NOT NULL,                    -- day in Europe/Rome
+    PRIMARY KEY (organization_id, data)
+);
+
+ALTER TABLE statistiche_giornaliere_pending ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Managers can manage pending statistics" ON statistiche_giornaliere_pending;
+CREATE POLICY "Managers can manage pending statistics" ON statistiche_giornaliere_pending FOR ALL TO authenticated
+USING (
+    organization_id = get_current_organization_id()
+    AND is_organization_admin(organization_id)
+)
+WITH CHECK (
+    organization_id = get_current_organization_id()
+    AND is_organization_admin(organization_id)
+);
+
+-- DO UPDATE ... WHERE false writes nothing but locks an already queued day
+CREATE OR REPLACE FUNCTION queue_statistiche_giornaliere_ordini()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO statistiche_giornaliere_pending (organization_id, data)
+        VALUES (OLD.organization_id, (coalesce(OLD.slot_prenotato_start, OLD.created_at) AT TIME ZONE 'Europe/Rome')::date)
+        ON CONFLICT (organization_id, data) DO UPDATE SET data = EXCLUDED.data WHERE false;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO statistiche_giornaliere_pending (organization_id, data)
+        VALUES (NEW.organization_id, (coalesce(NEW.slot_prenotato_start, NEW.created_at) AT TIME ZONE 'Europe/Rome')::date)
+        ON CONFLICT (organization_id, data) DO UPDATE SET data = EXCLUDED.data WHERE false;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- Items deleted with their order find no parent: the ordini trigger queued its day
+CREATE OR REPLACE FUNCTION queue_statistiche_giornaliere_items()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO statistiche_giornaliere_pending (organization_id, data)
+        SELECT o.organization_id, (coalesce(o.slot_prenotato_start, o.created_at) AT TIME ZONE 'Europe/Rome')::date
+        FROM ordini o
+        WHERE o.id = OLD.ordine_id
+        ON CONFLICT (organization_id, data) DO UPDATE SET data = EXCLUDED.data WHERE false;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO statistiche_giornaliere_pending (organization_id, data)
+        SELECT o.organization_id, (coalesce(o.slot_prenotato_start, o.created_at) AT TIME ZONE 'Europe/Rome')::date
+        FROM ordini o
+        WHERE o.id = NEW.ordine_id
+        ON CONFLICT (organization_id, data) DO UPDATE SET data = EXCLUDED.data WHERE false;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- Only changes to columns the rollup reads: printed/pagato flips and the like queue nothing
+DROP TRIGGER IF EXISTS queue_statistiche_giornaliere_ordini ON ordini;
+CREATE TRIGGER queue_statistiche_giornaliere_ordini
+    AFTER INSERT OR DELETE ON ordini
+    FOR EACH ROW EXECUTE FUNCTION queue_statistiche_giornaliere_ordini();
+
+DROP TRIGGER IF EXISTS queue_statistiche_giornaliere_ordini_update ON ordini;
+CREATE TRIGGER queue_statistiche_giornaliere_ordini_update
+    AFTER UPDATE OF organization_id, slot_prenotato_start, created_at, stato, tipo, totale,
+        preparazione_at, pronto_at, completato_at ON ordini
+    FOR EACH ROW
+    WHEN ((OLD.organization_id, OLD.slot_prenotato_start, OLD.created_at, OLD.stato, OLD.tipo, OLD.totale,
+           OLD.preparazione_at, OLD.pronto_at, OLD.completato_at)
+          IS DISTINCT FROM
+          (NEW.organization_id, NEW.slot_prenotato_start, NEW.created_at, NEW.stato, NEW.tipo, NEW.totale,
+           NEW.preparazione_at, NEW.pronto_at, NEW.completato_at))
+    EXECUTE FUNCTION queue_statistiche_giornaliere_ordini();
+
+DROP TRIGGER IF EXISTS queue_statistiche_giornaliere_items ON ordini_items;
+CREATE TRIGGER queue_statistiche_giornaliere_items
+    AFTER INSERT OR DELETE ON ordini_items
+    FOR EACH ROW EXECUTE FUNCTION queue_statistiche_giornaliere_items();
+
+DROP TRIGGER IF EXISTS queue_statistiche_giornaliere_items_update ON ordini_items;
+CREATE TRIGGER queue_statistiche_giornaliere_items_update
+    AFTER UPDATE OF ordine_id, nome_prodotto, quantita, subtotale ON ordini_items
+    FOR EACH ROW
+    WHEN ((OLD.ordine_id, OLD.nome_prodotto, OLD.quantita, OLD.subtotale)
+          IS DISTINCT FROM (NEW.ordine_id, NEW.nome_prodotto, NEW.quantita, NEW.subtotale))
+    EXECUTE FUNCTION queue_statistiche_giornaliere_items();
+
+CREATE OR REPLACE FUNCTION refresh_statistiche_giornaliere(
+    p_organization_id UUID,
+    p_since TIMESTAMPTZ DEFAULT NULL,
+    p_timezone TEXT DEFAULT 'Europe/Rome'
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+    v_since TIMESTAMPTZ;
+    v_claimed DATE[];
+    v_days INTEGER;
+BEGIN
+    v_since := coalesce(
+        p_since,
+        CASE WHEN NOT EXISTS (SELECT 1 FROM statistiche_giornaliere WHERE organization_id = p_organization_id)
+             THEN '-infinity'::timestamptz END
+    );
+
+    -- Its own statement: the claim waits for writers holding a queued day,
+    -- and the rollup below takes a snapshot that includes their orders
+    WITH claimed AS (
+        DELETE FROM statistiche_giornaliere_pending
+        WHERE organization_id = p_organization_id
+        RETURNING data
+    )
+    SELECT array_agg(data) INTO v_claimed FROM claimed;
+
+    WITH touched_days AS (
+        -- A queued Europe/Rome day covers one or two p_timezone days
+        SELECT (bound AT TIME ZONE p_timezone)::date AS data
+        FROM unnest(v_claimed) AS q(data)
+        CROSS JOIN LATERAL (VALUES
+            (q.data::timestamp AT TIME ZONE 'Europe/Rome'),
+            ((q.data + 1)::timestamp AT TIME ZONE 'Europe/Rome' - interval '1 microsecond')
+        ) AS b(bound)
+        UNION
+        SELECT (coalesce(slot_prenotato_start, created_at) AT TIME ZONE p_timezone)::date
+        FROM ordini
+        WHERE organization_id = p_organization_id
+          AND updated_at >= v_since
+    ),
+    day_orders AS (
+        SELECT o.*, d.data
+        FROM touched_days d
+        JOIN ordini o
+          ON o.organization_id = p_organization_id
+         AND coalesce(o.slot_prenotato_start, o.created_at) >= (d.data::timestamp AT TIME ZONE p_timezone)
+         AND coalesce(o.slot_prenotato_start, o.created_at) < ((d.data + 1)::timestamp AT TIME ZONE p_timezone)
+    ),
+    totals AS (
+        SELECT
+            data,
+            count(*) FILTER (WHERE stato <> 'cancelled') AS ordini_totali,
+            count(*) FILTER (WHERE stato <> 'cancelled' AND tipo = 'delivery') AS ordini_consegna,
+            count(*) FILTER (WHERE stato <> 'cancelled' AND tipo = 'takeaway') AS ordini_asporto,
+            count(*) FILTER (WHERE stato = 'cancelled') AS ordini_cancellati,
+            coalesce(sum(totale) FILTER (WHERE stato <> 'cancelled'), 0) AS fatturato_totale,
+            coalesce(sum(totale) FILTER (WHERE stato <> 'cancelled' AND tipo = 'delivery'), 0) AS fatturato_consegna,
+            coalesce(sum(totale) FILTER (WHERE stato <> 'cancelled' AND tipo = 'takeaway'), 0) AS fatturato_asporto,
+            coalesce(avg(totale) FILTER (WHERE stato <> 'cancelled'), 0) AS ordine_medio,
+            (avg(extract(epoch FROM pronto_at - preparazione_at)) / 60)::int AS tempo_medio_preparazione,
+            (avg(extract(epoch FROM completato_at - created_at))
+                FILTER (WHERE tipo = 'delivery' AND stato = 'completed') / 60)::int AS tempo_medio_consegna
+        FROM day_orders
+        GROUP BY data
+    ),
+    top_products AS (
+        SELECT data, jsonb_agg(jsonb_build_object('nome', nome_prodotto, 'quantita', quantita, 'fatturato', fatturato)
+                               ORDER BY quantita DESC) AS prodotti_top
+        FROM (
+            SELECT d.data, i.nome_prodotto, sum(i.quantita) AS quantita, sum(i.subtotale) AS fatturato,
+                   row_number() OVER (PARTITION BY d.data ORDER BY sum(i.quantita) DESC) AS rn
+            FROM day_orders d
+            JOIN ordini_items i ON i.ordine_id = d.id
+            WHERE d.stato <> 'cancelled'
+            GROUP BY d.data, i.nome_prodotto
+        ) ranked
+        WHERE rn <= 10
+        GROUP BY data
+    ),
+    upserted AS (
+        INSERT INTO statistiche_giornaliere (
+            organization_id, data, ordini_totali, ordini_consegna, ordini_asporto, ordini_cancellati,
+            fatturato_totale, fatturato_consegna, fatturato_asporto, ordine_medio,
+            tempo_medio_preparazione, tempo_medio_consegna, prodotti_top
+        )
+        SELECT
+            p_organization_id, t.data, t.ordini_totali, t.ordini_consegna, t.ordini_asporto, t.ordini_cancellati,
+            t.fatturato_totale, t.fatturato_consegna, t.fatturato_asporto, t.ordine_medio,
+            t.tempo_medio_preparazione, t.tempo_medio_consegna, coalesce(p.prodotti_top, '[]'::jsonb)
+        FROM totals t
+        LEFT JOIN top_products p USING (data)
+        ON CONFLICT (organization_id, data) DO UPDATE SET
+            ordini_totali = EXCLUDED.ordini_totali,
+            ordini_consegna = EXCLUDED.ordini_consegna,
+            ordini_asporto = EXCLUDED.ordini_asporto,
+            ordini_cancellati = EXCLUDED.ordini_cancellati,
+            fatturato_totale = EXCLUDED.fatturato_totale,
+            fatturato_consegna = EXCLUDED.fatturato_consegna,
+            fatturato_asporto = EXCLUDED.fatturato_asporto,
+            ordine_medio = EXCLUDED.ordine_medio,
+            tempo_medio_preparazione = EXCLUDED.tempo_medio_preparazione,
+            tempo_medio_consegna = EXCLUDED.tempo_medio_consegna,
+            prodotti_top = EXCLUDED.prodotti_top,
+            updated_at = now()
+        RETURNING data
+    ),
+    emptied AS (
+        DELETE FROM statistiche_giornaliere s
+        USING touched_days d
+        WHERE s.organization_id = p_organization_id
+          AND s.data = d.data
+          AND NOT EXISTS (SELECT 1 FROM totals t WHERE t.data = d.data)
+        RETURNING s.data
+    )
+    SELECT (SELECT count(*) FROM upserted) + (SELECT count(*) FROM emptied) INTO v_days;
+
+    RETURN v_days;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION refresh_statistiche_giornaliere(UUID, TIMESTAMPTZ, TEXT) TO authenticated;
+
+COMMIT;
@@ -0,0 +1,155 @@
+-- ===========================================================================
+-- MIGRATION 015: CASHIER CUSTOMER MATCHING
+-- Generated by wire_org_context.py: ranked pg_trgm matching in one round trip
+-- ===========================================================================
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+-- organization_id (uuid) next to a gin_trgm_ops column in one GIN index
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
+-- Exact name lookups (idx_cashier_customers_search was dropped in 013)
+CREATE INDEX IF NOT EXISTS idx_cashier_customers_org_nome
+    ON cashier_customers (organization_id, nome_normalized);
+
+-- Prefix/contains/similarity on names within one organization, also used by
+-- searchCashierCustomers' ilike
+CREATE INDEX IF NOT EXISTS idx_cashier_customers_org_nome_trgm
+    ON cashier_customers USING gin (organization_id, nome_normalized gin_trgm_ops);
+
+-- Phone validation compares the last 6 digits
+CREATE INDEX IF NOT EXISTS idx_cashier_customers_org_phone_suffix
+    ON cashier_customers (organization_id, right(telefono_normalized, 6));
+
+CREATE OR REPLACE FUNCTION match_cashier_customer(
+    p_organization_id UUID,
+    p_nome TEXT,
+    p_telefono TEXT DEFAULT NULL,
+    p_limit INTEGER DEFAULT 5,
+    p_suggest BOOLEAN DEFAULT true
+)
+RETURNS TABLE (customer cashier_customers, match_kind TEXT, score REAL)
+LANGUAGE plpgsql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_nome TEXT := lower(btrim(p_nome));
+    v_limit INTEGER := greatest(p_limit, 1);
+    v_seen UUID[] := '{}';
+    v_match RECORD;
+BEGIN
+    -- Matching is always within one organization
+    IF p_organization_id IS NULL THEN
+        RAISE EXCEPTION 'match_cashier_customer: p_organization_id is required';
+    END IF;
+
+    -- Best match only: the name as typed with the full phone outranks everything
+    -- (exact tier, similarity 1), so one index probe settles a returning customer
+    IF v_limit = 1 AND length(normalize_phone(p_telefono)) >= 6 THEN
+        RETURN QUERY
+        SELECT c, 'exact'::text, 1::real
+        FROM cashier_customers c
+        WHERE c.organization_id = p_organization_id
+          AND c.nome_normalized = v_nome
+          AND c.telefono_normalized = normalize_phone(p_telefono)
+        ORDER BY c.ordini_count DESC NULLS LAST, c.ultimo_ordine_at DESC NULLS LAST
+        LIMIT 1;
+        IF FOUND THEN
+            RETURN;
+        END IF;
+    END IF;
+
+    -- exact/name/fuzzy: every candidate has the name (or a swap) or the phone suffix
+    FOR v_match IN
+        WITH input AS (
+            SELECT v_nome AS nome,
+                   regexp_split_to_array(v_nome, '\s+') AS parts,
+                   normalize_phone(p_telefono) AS phone
+        ),
+        probe AS (
+            SELECT nome,
+                   -- name, first/last swapped, first two swapped (3+ words)
+                   array_remove(ARRAY[
+                       nome,
+                       CASE WHEN cardinality(parts) >= 2 THEN array_to_string(
+                           parts[cardinality(parts):cardinality(parts)]
+                           || parts[2:cardinality(parts) - 1]
+                           || parts[1:1], ' ') END,
+                       CASE WHEN cardinality(parts) > 2 THEN array_to_string(
+                           ARRAY[parts[2], parts[1]] || parts[3:cardinality(parts)], ' ') END
+                   ], NULL) AS variants,
+                   ARRAY(SELECT DISTINCT v || '%'
+                         FROM unnest(ARRAY[parts[1], parts[cardinality(parts)], parts[2]]) AS v
+                         WHERE length(v) >= 3) AS prefixes,
+                   phone,
+                   CASE WHEN length(phone) >= 6 THEN right(phone, 6) END AS suffix
+            FROM input
+        ),
+        candidates AS (
+            SELECT c,
+                   c.nome_normalized = ANY (p.variants) AS same_name,
+                   -- A customer without a phone never conflicts (NULL would drop the name tier)
+                   p.suffix IS NOT NULL AND c.telefono_normalized IS NOT NULL
+                       AND length(c.telefono_normalized) >= 6 AS both_phones,
+                   coalesce(right(c.telefono_normalized, 6) = p.suffix, false) AS same_suffix,
+                   coalesce(c.telefono_normalized = p.phone, false) AS same_phone,
+                   c.nome_normalized LIKE ANY (p.prefixes) AS prefix_match,
+                   c.nome_normalized % p.nome AS similar_name,
+                   similarity(c.nome_normalized, p.nome) AS score
+            FROM probe p
+            JOIN cashier_customers c
+              ON c.organization_id = p_organization_id
+             AND (c.nome_normalized = ANY (p.variants)
+                  OR right(c.telefono_normalized, 6) = p.suffix)
+        ),
+        ranked AS (
+            SELECT c, score,
+                   CASE
+                       WHEN same_name AND same_phone AND both_phones THEN 'exact'
+                       WHEN same_name AND NOT (both_phones AND NOT same_suffix) THEN 'name'
+                       WHEN same_suffix AND both_phones AND (prefix_match OR similar_name) THEN 'fuzzy'
+                   END AS match_kind
+            FROM candidates
+        )
+        SELECT r.c, r.match_kind, r.score
+        FROM ranked r
+        WHERE r.match_kind IS NOT NULL
+        ORDER BY array_position(ARRAY['exact', 'name', 'fuzzy'], r.match_kind),
+                 r.score DESC,
+                 (r.c).ordini_count DESC NULLS LAST,
+                 (r.c).ultimo_ordine_at DESC NULLS LAST
+        LIMIT v_limit
+    LOOP
+        customer := v_match.c;
+        match_kind := v_match.match_kind;
+        score := v_match.score;
+        v_seen := v_seen || (customer).id;
+        RETURN NEXT;
+    END LOOP;
+
+    IF NOT p_suggest OR cardinality(v_seen) >= v_limit THEN
+        RETURN;
+    END IF;
+
+    -- similar: trigram suggestions fill what the stronger tiers left; a common
+    -- first name alone can be similar to thousands of customers
+    RETURN QUERY
+    SELECT c, 'similar'::text, similarity(c.nome_normalized, v_nome)
+    FROM cashier_customers c
+    WHERE c.organization_id = p_organization_id
+      AND c.nome_normalized % v_nome
+      AND c.id <> ALL (v_seen)
+    ORDER BY similarity(c.nome_normalized, v_nome) DESC,
+             c.ordini_count DESC NULLS LAST,
+             c.ultimo_ordine_at DESC NULLS LAST
+    LIMIT v_limit - cardinality(v_seen);
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION match_cashier_customer(UUID, TEXT, TEXT, INTEGER, BOOLEAN) TO authenticated;
+
+COMMIT;
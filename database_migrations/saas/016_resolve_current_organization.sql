@@ -0,0 +1,64 @@
+-- ===========================================================================
+-- MIGRATION 016: RESOLVE CURRENT ORGANIZATION
+-- Generated by migrate_to_saas_phase2.py: org context in one round trip
+-- ===========================================================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION resolve_current_organization()
+RETURNS UUID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_user_id UUID := auth.uid();
+    v_current UUID;
+    v_org_id UUID;
+BEGIN
+    IF v_user_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT current_organization_id INTO v_current
+    FROM profiles
+    WHERE id = v_user_id;
+
+    -- Saved context, if the org is live and the membership still active
+    SELECT o.id INTO v_org_id
+    FROM organizations o
+    JOIN organization_members m
+      ON m.organization_id = o.id AND m.user_id = v_user_id AND m.is_active = true
+    WHERE o.id = v_current
+      AND o.is_active = true
+      AND o.deleted_at IS NULL;
+
+    IF v_org_id IS NOT NULL THEN
+        RETURN v_org_id;
+    END IF;
+
+    -- Fallback: first active membership in a live organization
+    SELECT m.organization_id INTO v_org_id
+    FROM organization_members m
+    JOIN organizations o ON o.id = m.organization_id
+    WHERE m.user_id = v_user_id
+      AND m.is_active = true
+      AND o.is_active = true
+      AND o.deleted_at IS NULL
+    ORDER BY m.accepted_at NULLS LAST, m.created_at
+    LIMIT 1;
+
+    -- Persist the new context (or clear a stale one)
+    UPDATE profiles
+    SET current_organization_id = v_org_id
+    WHERE id = v_user_id
+      AND current_organization_id IS DISTINCT FROM v_org_id;
+
+    RETURN v_org_id;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION resolve_current_organization() FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION resolve_current_organization() TO authenticated;
+
+COMMIT;
@@ -0,0 +1,741 @@
+#!/usr/bin/env python3
+"""
+Edge Function Index
+===================
+Lightweight, regex-and-bracket based index of the Deno/TypeScript edge
+functions under supabase/functions/, built on the same helpers as
+dart_index.py: functions and the branches around each statement, and every
+awaited round trip (PostgREST .from()/.rpc() chains, auth calls,
+functions.invoke, fetch) with the names it binds and the names it reads.
+
+fetch() calls against `/rest/v1/<table>` are indexed as PostgREST reads, so
+hand-rolled REST queries show up next to the supabase-js ones.
+
+Usage:
+    python edge_index.py                  # Round trips of every edge function
+    python edge_index.py place-order      # One edge function
+"""
+
+import re
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from dart_index import (
+    Block, Call, DartFile, SelectSpec, CLOSERS, OPENERS, FILTER_METHODS, READ_METHODS, WRITE_METHODS,
+    first_string, split_commas,
+)
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent
+FUNCTIONS_DIR = PROJECT_ROOT / "supabase" / "functions"
+
+HANDLER_NAME = 'serve'
+
+TS_MASK_START = re.compile(r"[/'\"`]")
+# A `/` after one of these (or at the start) opens a regex literal, not a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'in', 'of'}
+
+FUNCTION_DECLARATION = re.compile(r'\b(?:async\s+)?function\s+(\w+)\s*(?:<[^<>]*>)?\s*\(')
+ARROW_DECLARATION = re.compile(r'\b(?:const|let)\s+(\w+)\s*(?::[^=\n]+)?=\s*(?:async\s*)?\(')
+HANDLER_DECLARATION = re.compile(r'\b(?:Deno\s*\.\s*)?%s\s*\(\s*(?:async\s*)?\(' % HANDLER_NAME)
+
+AWAIT = re.compile(r'\bawait\s+')
+SEGMENT = re.compile(r'\s*(\?\.|\.)?\s*(\w+)\s*(?:<[^<>()]*>)?(\s*\()?')
+DECLARATION = re.compile(r'\b(?:const|let|var)\s+(\{.*\}|\[.*\]|\w+)\s*(?::[^={}]+)?=\s*$')
+ASSIGNMENT = re.compile(r'(?<![\w.])(\w+)\s*=\s*$')
+ASSIGNED = re.compile(
+    r'\b(?:const|let|var)\s+(\{[^=]*?\}|\[[^=]*?\]|\w+)\s*(?::[^=\n]+)?=(?![=>])'
+    r'|(?<![\w.$])(\w+)\s*(?:\?\?|\|\||&&|[-+*/])?=(?![=>])'
+)
+MUTATION = re.compile(r'(?<![\w.$])(\w+)\s*\.\s*(?:add|push|set|unshift)\s*\(')
+FOR_OF = re.compile(r'\bfor\s*\(\s*(?:const|let|var)\s+(\{[^}]*\}|\[[^\]]*\]|\w+)\s+(?:of|in)\s+')
+IF_STATEMENT = re.compile(r'\bif\s*\(')
+EXIT = re.compile(r'\b(?:throw|return)\b')
+QUERY_BUILDER = re.compile(r'\b(?:const|let|var)\s+(\w+)\s*(?::[^=\n]+)?=\s*(\w+)\s*\.\s*from\s*\(')
+REST_PATH = re.compile(r'/rest/v1/(\w+)(?:\?([^`\'"]*))?')
+URL_HOST = re.compile(r'https?://([\w.-]+)')
+IDENTIFIER = re.compile(r'(?<![\w.$])[A-Za-z_]\w*')
+
+TS_KEYWORDS = {
+    'await', 'async', 'const', 'let', 'var', 'new', 'true', 'false', 'null', 'undefined', 'typeof',
+    'if', 'else', 'return', 'throw', 'function', 'as', 'in', 'of', 'this', 'void',
+}
+# supabase-js spells the Dart client's inFilter/is_ as in/is
+TS_FILTER_METHODS = FILTER_METHODS | {'in', 'is'}
+REST_OPERATORS = {'eq', 'neq', 'gt', 'gte', 'lt', 'lte', 'like', 'ilike', 'is', 'in'}
+HTTP_OPERATIONS = {'GET': 'select', 'POST': 'insert', 'PATCH': 'update', 'PUT': 'upsert', 'DELETE': 'delete'}
+
+
+# ---------------------------------------------------------------------------
+# Masking
+# ---------------------------------------------------------------------------
+
+def regex_allowed(text: str, index: int) -> bool:
+    """True when a `/` at `index` starts a regex literal"""
+    before = text[:index].rstrip()
+    if not before:
+        return True
+    if before[-1] in REGEX_PRECEDERS:
+        return True
+    word = re.search(r'\w+$', before)
+    return bool(word and word.group(0) in REGEX_KEYWORDS)
+
+
+def regex_end(text: str, index: int) -> int:
+    """Index of the `/` closing the regex literal opened at `index`"""
+    j = index + 1
+    in_class = False
+    while j < len(text) and text[j] != '\n':
+        ch = text[j]
+        if ch == '\\':
+            j += 2
+            continue
+        if ch == '[':
+            in_class = True
+        elif ch == ']':
+            in_class = False
+        elif ch == '/' and not in_class:
+            return j
+        j += 1
+    return j
+
+
+def quote_end(text: str, index: int) -> int:
+    """Index of the quote closing the '...' or "..." string opened at `index`"""
+    quote = text[index]
+    j = index + 1
+    while j < len(text):
+        if text[j] == '\\':
+            j += 2
+            continue
+        if text[j] == quote or text[j] == '\n':
+            return j
+        j += 1
+    return j
+
+
+def template_end(text: str, index: int) -> int:
+    """Index of the backtick closing the template literal opened at `index`"""
+    j = index + 1
+    while j < len(text):
+        if text[j] == '\\':
+            j += 2
+            continue
+        if text[j] == '`':
+            return j
+        if text.startswith('${', j):
+            depth = 1
+            j += 2
+            while j < len(text) and depth:
+                ch = text[j]
+                if ch == '{':
+                    depth += 1
+                elif ch == '}':
+                    depth -= 1
+                elif ch in ("'", '"'):
+                    j = quote_end(text, j)
+                elif ch == '`':
+                    j = template_end(text, j)
+                j += 1
+            continue
+        j += 1
+    return j
+
+
+def mask_ts(text: str) -> str:
+    """Same-length copy with comments, strings, templates and regex literals blanked
+
+    Like mask_dart, delimiters are kept and `${}` interpolations are blanked
+    with the rest of the template, so brackets in the mask always balance.
+    """
+    out = list(text)
+    i = 0
+    length = len(text)
+
+    def blank(start: int, end: int):
+        for k in range(start, min(end, length)):
+            if out[k] != '\n':
+                out[k] = ' '
+
+    while i < length:
+        interesting = TS_MASK_START.search(text, i)
+        if not interesting:
+            break
+        i = interesting.start()
+        ch = text[i]
+
+        if ch == '/':
+            if text.startswith('//', i):
+                end = text.find('\n', i)
+                end = length if end == -1 else end
+                blank(i, end)
+                i = end
+            elif text.startswith('/*', i):
+                end = text.find('*/', i + 2)
+                end = length if end == -1 else end + 2
+                blank(i, end)
+                i = end
+            elif regex_allowed(text, i):
+                end = regex_end(text, i)
+                blank(i + 1, end)
+                i = end + 1
+            else:
+                i += 1
+            continue
+
+        end = template_end(text, i) if ch == '`' else quote_end(text, i)
+        blank(i + 1, end)
+        i = end + 1
+
+    return ''.join(out)
+
+
+# ---------------------------------------------------------------------------
+# Files, functions and branches
+# ---------------------------------------------------------------------------
+
+class TsFile(DartFile):
+    """A TypeScript source with the DartFile bracket, line and block helpers"""
+
+    def __init__(self, path: Path, text: Optional[str] = None):
+        self.path = path
+        self.text = text if text is not None else path.read_text(encoding='utf-8')
+        self.masked = mask_ts(self.text)
+        self.line_starts = [0] + [m.end() for m in re.finditer('\n', self.text)]
+        self._blocks: Optional[List[Block]] = None
+        self._pairs: Optional[Dict[int, int]] = None
+
+    @property
+    def blocks(self) -> List[Block]:
+        if self._blocks is None:
+            self._blocks = find_functions(self)
+        return self._blocks
+
+    @property
+    def function_name(self) -> str:
+        """Edge function (directory) name"""
+        return self.path.parent.name
+
+    def function(self, name: str) -> Optional[Block]:
+        for block in self.blocks:
+            if block.name == name:
+                return block
+        return None
+
+
+def body_open(source: TsFile, params_close: int, arrow: bool) -> Optional[int]:
+    """Offset of the `{` opening a function body, after its params and return type"""
+    masked = source.masked
+    i = params_close + 1
+    angle = 0
+    while i < len(masked):
+        ch = masked[i]
+        if ch == '=' and masked[i + 1:i + 2] == '>':
+            rest = masked[i + 2:].lstrip()
+            if not rest.startswith('{'):
+                return None
+            return len(masked) - len(rest)
+        if ch == '<':
+            angle += 1
+        elif ch == '>':
+            angle -= 1
+        elif ch in '([':
+            i = source.close_of(i) + 1
+            continue
+        elif ch == '{':
+            if angle > 0:
+                i = source.close_of(i) + 1
+                continue
+            return None if arrow else i
+        elif ch == ';':
+            return None
+        i += 1
+    return None
+
+
+def find_functions(source: TsFile) -> List[Block]:
+    """Named functions, `const f = (...) => {}` and the serve() handler"""
+    blocks = []
+    patterns = ((FUNCTION_DECLARATION, False), (ARROW_DECLARATION, True), (HANDLER_DECLARATION, True))
+    for pattern, arrow in patterns:
+        for match in pattern.finditer(source.masked):
+            open_index = match.end() - 1
+            brace = body_open(source, source.close_of(open_index), arrow)
+            if brace is None:
+                continue
+            name = match.group(1) if match.groups() else HANDLER_NAME
+            blocks.append(Block(name, 'function', match.start(), brace, source.close_of(brace)))
+    return sorted(blocks, key=lambda b: b.body_start)
+
+
+def params_of(source: TsFile, block: Block) -> List[str]:
+    """Parameter names of a function block, in order"""
+    header = source.masked[block.header_start:block.body_start]
+    open_index = block.header_start + header.index('(')
+    params = source.masked[open_index + 1:source.close_of(open_index)]
+    names = []
+    for part in split_commas(params, '(){}[]'):
+        name = re.match(r'\s*(?:\.\.\.)?(\w+)', part)
+        if name:
+            names.append(name.group(1))
+    return names
+
+
+def identifiers(text: str) -> List[str]:
+    """Variable names read in masked code (property names and keywords excluded)"""
+    return [name for name in IDENTIFIER.findall(text) if name not in TS_KEYWORDS]
+
+
+class Branch:
+    """A `{` block around a statement: if/else arms, loops, try/catch, closures"""
+
+    def __init__(self, kind: str, brace: int, condition: Optional[str] = None,
+                 names: Optional[List[str]] = None, previous: Optional['Branch'] = None):
+        self.kind = kind            # 'if' | 'else' | 'loop' | 'try' | 'catch' | 'finally' | 'closure' | 'block'
+        self.brace = brace
+        self.condition = condition  # raw condition text of an `if` arm
+        self.own_names = names or []
+        # Arms of one if/else chain share `chain`; an arm runs only after the earlier conditions failed
+        self.chain = previous.chain if previous else brace
+        self.arm = previous.arm + 1 if previous else 0
+        self.first = previous.first if previous else condition
+        self.names = (previous.names if previous else []) + self.own_names
+
+    @property
+    def conditional(self) -> bool:
+        return self.kind in ('if', 'else')
+
+    @property
+    def label(self) -> str:
+        if self.kind == 'if':
+            return f"if ({self.condition})" if not self.arm else f"else if ({self.condition})"
+        if self.kind == 'else':
+            return f"else of if ({self.first})"
+        return self.kind
+
+
+def previous_arm(source: TsFile, keyword: int) -> Optional[Branch]:
+    """Arm of the if/else chain whose `}` precedes the `else` at `keyword`"""
+    before = source.masked[:keyword].rstrip()
+    if not before.endswith('}'):
+        return None
+    return branch_of(source, source.open_of(len(before) - 1))
+
+
+def branch_of(source: TsFile, brace: int) -> Branch:
+    """Classify the block opened by the `{` at `brace`"""
+    masked = source.masked
+    head = masked[:brace].rstrip()
+
+    if head.endswith('=>'):
+        return Branch('closure', brace)
+
+    if head.endswith(')'):
+        open_index = source.open_of(len(head) - 1)
+        before = masked[:open_index].rstrip()
+        word = re.search(r'\w*$', before).group(0)
+        if word == 'if':
+            condition = ' '.join(source.text[open_index + 1:len(head) - 1].split())
+            names = identifiers(masked[open_index + 1:len(head) - 1])
+            keyword = before[:-2].rstrip()
+            if keyword.endswith('else'):
+                previous = previous_arm(source, len(keyword) - 4)
+                if previous is not None and previous.conditional:
+                    return Branch('if', brace, condition, names, previous)
+            return Branch('if', brace, condition, names)
+        if word in ('for', 'while'):
+            return Branch('loop', brace)
+        if word == 'catch':
+            return Branch('catch', brace)
+        if word == 'switch':
+            return Branch('block', brace)
+        return Branch('closure', brace)
+
+    word = re.search(r'\w*$', head).group(0)
+    if word == 'else':
+        previous = previous_arm(source, len(head) - 4)
+        if previous is not None and previous.conditional:
+            return Branch('else', brace, previous=previous)
+    if word in ('try', 'finally'):
+        return Branch(word, brace)
+    if word == 'do':
+        return Branch('loop', brace)
+    return Branch('block', brace)
+
+
+def branches_at(source: TsFile, block: Block, offset: int) -> List[Branch]:
+    """Blocks between the function body and `offset`, outermost first"""
+    masked = source.masked
+    braces = []
+    i = offset - 1
+    while i > block.body_start:
+        ch = masked[i]
+        if ch in CLOSERS:
+            i = source.open_of(i) - 1
+            continue
+        if ch == '{':
+            braces.append(i)
+        i -= 1
+    return [branch_of(source, brace) for brace in reversed(braces)]
+
+
+def statement_end(source: TsFile, start: int) -> int:
+    """End (exclusive) of a semicolon-less statement starting at `start`"""
+    masked = source.masked
+    i = start
+    while i < len(masked):
+        ch = masked[i]
+        if ch in OPENERS:
+            i = source.close_of(i) + 1
+            continue
+        if ch in CLOSERS or ch == ';':
+            return i
+        if ch == '\n':
+            before = masked[start:i].rstrip()
+            after = masked[i:].lstrip()
+            continued = before[-1:] in ('=', '+', '-', '*', '/', '&', '|', '?', ':', ',', '.') or (
+                after[:1] in ('.', '?', ':') or after[:2] in ('&&', '||'))
+            if not continued:
+                return i
+        i += 1
+    return len(masked)
+
+
+def assignments(source: TsFile, block: Block) -> List[Tuple[int, List[str], List[str], bool]]:
+    """(offset, names, names read, merge) for every local binding in a function body
+
+    `merge` marks in-place mutations (`ids.add(x)`, `list.push(x)`) that add
+    to what the name already holds instead of replacing it.
+    """
+    masked = source.masked
+    result = []
+    for match in ASSIGNED.finditer(masked, block.body_start, block.body_end):
+        if source.enclosing(match.start()) is not block:
+            continue
+        names = binding_names(match.group(1))[0] if match.group(1) else [match.group(2)]
+        end = statement_end(source, match.end())
+        result.append((match.start(), names, identifiers(masked[match.end():end]), False))
+    for match in MUTATION.finditer(masked, block.body_start, block.body_end):
+        if source.enclosing(match.start()) is not block:
+            continue
+        close_index = source.close_of(match.end() - 1)
+        result.append((match.start(), [match.group(1)], identifiers(masked[match.end():close_index]), True))
+    for match in FOR_OF.finditer(masked, block.body_start, block.body_end):
+        if source.enclosing(match.start()) is not block:
+            continue
+        close_index = source.close_of(masked.index('(', match.start()))
+        names = binding_names(match.group(1))[0]
+        result.append((match.start(), names, identifiers(masked[match.end():close_index]), False))
+    return sorted(result, key=lambda a: a[0])
+
+
+def guards(source: TsFile, block: Block) -> List[Tuple[int, int, List[str]]]:
+    """(start, end, condition names) of every `if` whose body throws or returns"""
+    masked = source.masked
+    result = []
+    for match in IF_STATEMENT.finditer(masked, block.body_start, block.body_end):
+        if source.enclosing(match.start()) is not block:
+            continue
+        open_index = match.end() - 1
+        close_index = source.close_of(open_index)
+        body = close_index + 1 + len(masked[close_index + 1:]) - len(masked[close_index + 1:].lstrip())
+        if masked[body:body + 1] == '{':
+            end = source.close_of(body)
+            names = branch_of(source, body).names
+        else:
+            end = statement_end(source, body)
+            names = identifiers(masked[open_index + 1:close_index])
+        if EXIT.search(masked, body, end):
+            result.append((match.start(), end, names))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Round trips
+# ---------------------------------------------------------------------------
+
+class Segment:
+    """`name` or `name(args)` in an awaited member chain"""
+
+    def __init__(self, name: str, offset: int, open_index: Optional[int] = None,
+                 close_index: Optional[int] = None):
+        self.name = name
+        self.offset = offset
+        self.open_index = open_index
+        self.close_index = close_index
+
+    @property
+    def is_call(self) -> bool:
+        return self.open_index is not None
+
+
+def member_chain(source: TsFile, start: int) -> Tuple[List[Segment], int]:
+    """Parse `head.name(args).name...` from `start`; returns the segments and the end"""
+    masked = source.masked
+    segments = []
+    i = start
+    while i < len(masked):
+        match = SEGMENT.match(masked, i)
+        if not match or bool(match.group(1)) != bool(segments):
+            break
+        if match.group(3):
+            open_index = match.end() - 1
+            close_index = source.close_of(open_index)
+            segments.append(Segment(match.group(2), match.start(2), open_index, close_index))
+            i = close_index + 1
+        else:
+            segments.append(Segment(match.group(2), match.start(2)))
+            i = match.end()
+    return segments, i
+
+
+def binding_names(pattern: str) -> Tuple[List[str], List[str]]:
+    """Names bound by a declaration target, and the ones bound to an `error` key"""
+    pattern = pattern.strip()
+    if pattern[:1] not in '{[':
+        name = re.match(r'\w+', pattern)
+        return ([name.group(0)] if name else []), []
+
+    names, errors = [], []
+    for part in split_commas(pattern[1:-1], '{}[]'):
+        part = part.strip().lstrip('.')
+        if not part:
+            continue
+        key, _, value = part.partition(':')
+        target = (value if value.strip() else key).split('=')[0]
+        bound, bound_errors = binding_names(target)
+        names.extend(bound)
+        errors.extend(bound_errors)
+        if key.strip() == 'error':
+            errors.extend(bound)
+    return names, errors
+
+
+class RoundTrip:
+    """One awaited network call of an edge function"""
+
+    def __init__(self, source: TsFile, function: Block, offset: int, end: int, kind: str,
+                 target: Optional[str], client: str, calls: List[Call]):
+        self.source = source
+        self.function = function
+        self.offset = offset           # `await` keyword
+        self.end = end
+        self.kind = kind               # 'from' | 'rpc' | 'auth' | 'invoke' | 'fetch' | 'call'
+        self.target = target           # table, RPC, auth method, host or local function
+        self.client = client
+        self.calls = calls
+        self.binds: List[str] = []
+        self.error_binds: List[str] = []
+        self.method = 'GET'            # fetch only
+
+    @property
+    def line(self) -> int:
+        return self.source.line_of(self.calls[0].offset if self.calls else self.offset)
+
+    @property
+    def is_db(self) -> bool:
+        return self.kind in ('from', 'rpc')
+
+    @property
+    def operation(self) -> str:
+        if self.kind == 'from':
+            for call in self.calls[1:]:
+                if call.name in WRITE_METHODS or call.name in READ_METHODS:
+                    return call.name
+            return 'select'
+        if self.kind == 'fetch':
+            return self.method
+        if self.kind == 'auth':
+            return self.target or 'auth'
+        return self.kind
+
+    @property
+    def is_write(self) -> bool:
+        """True when the call has side effects (RPCs and invoked functions count as writes)"""
+        if self.kind == 'from':
+            return self.operation in WRITE_METHODS
+        if self.kind == 'fetch':
+            return self.method != 'GET'
+        return self.kind in ('rpc', 'invoke')
+
+    @property
+    def select(self) -> Optional[SelectSpec]:
+        selects = [c for c in self.calls if c.name == 'select']
+        if not selects or self.kind != 'from':
+            return None
+        return SelectSpec(first_string(selects[0].args))
+
+    @property
+    def filters(self) -> List[Tuple[str, Optional[str], str]]:
+        """(method, column, raw args) for every filter call"""
+        return [(c.name, c.first_string, c.args) for c in self.calls if c.name in TS_FILTER_METHODS]
+
+    @property
+    def uses(self) -> List[str]:
+        """Names the call reads (the client itself excluded)"""
+        return [n for n in identifiers(self.source.masked[self.offset:self.end]) if n != self.client]
+
+    @property
+    def label(self) -> str:
+        if self.kind == 'from':
+            return f"{self.target}.{self.operation}"
+        if self.kind == 'rpc':
+            return f"rpc {self.target}"
+        if self.kind == 'fetch':
+            return f"{self.method} {self.target}"
+        return f"{self.kind} {self.target}"
+
+
+def call_of(source: TsFile, segment: Segment) -> Call:
+    return Call(segment.name, source.text[segment.open_index + 1:segment.close_index], segment.offset)
+
+
+def rest_calls(query: str, offset: int) -> List[Call]:
+    """Synthetic PostgREST calls for the query string of a /rest/v1 URL"""
+    calls = []
+    for part in query.split('&'):
+        key, _, value = part.partition('=')
+        if key == 'select':
+            calls.append(Call('select', f"'{value}'", offset))
+            continue
+        operator = value.split('.', 1)[0]
+        if key and operator in REST_OPERATORS:
+            argument = value.split('.', 1)[1] if '.' in value else ''
+            literal = argument if re.fullmatch(r'true|false|null|-?\d+(?:\.\d+)?', argument) else 'value'
+            calls.append(Call(operator, f"'{key}', {literal}", offset))
+    return calls
+
+
+def classify_fetch(source: TsFile, trip: RoundTrip, head: Segment):
+    """PostgREST reads for /rest/v1 URLs, otherwise the host being called"""
+    args = source.text[head.open_index + 1:head.close_index]
+    method = re.search(r"method\s*:\s*['\"](\w+)['\"]", args)
+    trip.method = method.group(1).upper() if method else 'GET'
+    url = split_commas(args, '(){}[]')[0]
+    rest = REST_PATH.search(url)
+    if rest:
+        trip.kind = 'from'
+        trip.target = rest.group(1)
+        operation = HTTP_OPERATIONS.get(trip.method, 'select')
+        trip.calls = [Call('from', f"'{rest.group(1)}'", head.offset)]
+        if operation != 'select':
+            trip.calls.append(Call(operation, '', head.offset))
+        trip.calls.extend(rest_calls(rest.group(2) or '', head.offset))
+        return
+    host = URL_HOST.search(url)
+    trip.target = host.group(1) if host else ' '.join(url.split())[:40]
+
+
+def query_builders(source: TsFile, block: Block) -> Dict[str, List[Segment]]:
+    """`let q = client.from(...)...` builders awaited later as `await q.single()`"""
+    builders = {}
+    masked = source.masked
+    for match in QUERY_BUILDER.finditer(masked, block.body_start, block.body_end):
+        if AWAIT.search(masked[match.start():match.end()]):
+            continue
+        segments, _ = member_chain(source, match.start(2))
+        builders[match.group(1)] = segments
+    return builders
+
+
+def round_trip_at(source: TsFile, block: Block, offset: int, start: int,
+                  builders: Dict[str, List[Segment]], local_functions: Dict[str, Block]) -> Optional[RoundTrip]:
+    """Classify the expression awaited at `start`; None for local awaits (req.json(), crypto, ...)"""
+    segments, end = member_chain(source, start)
+    if not segments:
+        return None
+    head = segments[0]
+    if head.name in builders and len(segments) > 1:
+        segments = builders[head.name] + segments[1:]
+        head = segments[0]
+    names = [s.name for s in segments]
+    calls = [call_of(source, s) for s in segments if s.is_call]
+    trip = RoundTrip(source, block, offset, end, 'call', None, head.name, calls)
+
+    from_calls = [s for s in segments[1:] if s.name in ('from', 'rpc') and s.is_call]
+    if from_calls and not head.name[:1].isupper():
+        root = from_calls[0]
+        trip.kind = root.name
+        trip.target = first_string(source.text[root.open_index + 1:root.close_index])
+        trip.calls = [call_of(source, s) for s in segments[segments.index(root):] if s.is_call]
+    elif 'auth' in names[1:2]:
+        trip.kind = 'auth'
+        trip.target = calls[-1].name if calls else None
+    elif names[1:3] == ['functions', 'invoke']:
+        trip.kind = 'invoke'
+        trip.target = calls[-1].first_string if calls else None
+    elif head.name == 'fetch' and head.is_call:
+        trip.kind = 'fetch'
+        classify_fetch(source, trip, head)
+    elif head.name in local_functions and head.is_call and len(segments) == 1:
+        trip.target = head.name
+    else:
+        return None
+
+    line_start = source.masked.rfind('\n', 0, offset) + 1
+    prefix = source.masked[line_start:offset]
+    declaration = DECLARATION.search(prefix)
+    assignment = ASSIGNMENT.search(prefix)
+    if declaration:
+        trip.binds, trip.error_binds = binding_names(declaration.group(1))
+    elif assignment:
+        trip.binds = [assignment.group(1)]
+    return trip
+
+
+def find_round_trips(source: TsFile) -> Dict[str, List[RoundTrip]]:
+    """Awaited round trips per function name, in source order"""
+    local_functions = {b.name: b for b in source.blocks}
+    result: Dict[str, List[RoundTrip]] = {}
+    for block in source.blocks:
+        builders = query_builders(source, block)
+        trips = []
+        for match in AWAIT.finditer(source.masked, block.body_start, block.body_end):
+            if source.enclosing(match.start()) is not block:
+                continue
+            trip = round_trip_at(source, block, match.start(), match.end(), builders, local_functions)
+            if trip:
+                trips.append(trip)
+        result[block.name] = trips
+    return result
+
+
+def edge_function_files(names: Optional[List[str]] = None) -> List[Path]:
+    """index.ts of every edge function (or the named ones)"""
+    files = sorted(FUNCTIONS_DIR.glob('*/index.ts'))
+    if names:
+        files = [f for f in files if f.parent.name in names]
+    return files
+
+
+def print_round_trips(source: TsFile):
+    print(f"\n📦 {source.function_name} ({source.rel})")
+    for name, trips in find_round_trips(source).items():
+        if not trips:
+            continue
+        print(f"  {name}:")
+        for trip in trips:
+            binds = f" -> {', '.join(trip.binds)}" if trip.binds else ''
+            print(f"    L{trip.line:<4} {trip.label}{binds}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Edge Function Index')
+    parser.add_argument('functions', nargs='*', help='Edge function names (default: all)')
+
+    args = parser.parse_args()
+
+    files = edge_function_files(args.functions)
+    print(f"📋 {len(files)} edge functions")
+    for path in files:
+        print_round_trips(TsFile(path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+"""
+Organization Export / Clone
+===========================
+Copies one organization's rows out of a database, so a slow tenant can be
+debugged against a local copy. It covers the organizations row, its
+organization_members and every ORG_TABLES table, plus the profiles and
+auth.users rows that those tables reference.
+
+Tables are visited in foreign-key dependency order. The order comes from
+the FK graph in database_migrations/saas/. Each table is streamed with
+`COPY (SELECT ... WHERE organization_id = ...) TO STDOUT`, and all tables
+are read from one REPEATABLE READ snapshot. Rows pass straight through to
+a file or to `COPY ... FROM STDIN` on the target, so memory use stays
+constant whatever the size of the tenant.
+
+  --out DIR        One <NN>_<table>.copy file per table plus manifest.json
+  --target DSN     Stream straight into an existing database with the schema
+  --scratch NAME   Same, into a fresh local database (see local_postgres.py)
+  --import DIR     Load an --out directory into --target / --scratch
+
+--remap gives every tenant row a new UUID on the way in:
+uuid5(namespace, old id), applied to primary keys and to foreign keys that
+point at tenant tables. No id map is kept, so memory still does not grow.
+The namespace is printed, so the same clone can be produced again. With
+--remap the clone can sit next to the original. organizations.slug gets a
+suffix to keep it unique. Ids inside JSONB values are not rewritten.
+
+The import runs in one transaction with session_replication_role = replica.
+This stops triggers from renumbering orders or creating profiles, and it
+needs a superuser. Rows whose references did not come along, such as
+another tenant's menu item or a missing profile, are counted per foreign
+key after the load. Shared rows (profiles, auth.users) go in through a
+staging table with ON CONFLICT DO NOTHING.
+
+Usage:
+    python export_organization.py --plan                                  # Dependency order, no database
+    python export_organization.py --export pizzeria-rotante --source $PROD_DSN --out export/rotante
+    python export_organization.py --export <org-uuid> --source $PROD_DSN --scratch rotante_clone
+    python export_organization.py --export pizzeria-rotante --source $LOCAL_DSN --target $LOCAL_DSN --remap
+    python export_organization.py --import export/rotante --scratch rotante_clone
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from analyze_queries import ORG_TABLES
+from local_postgres import psycopg, DEFAULT_DSN, require_psycopg, connect, prepare_bench_database
+from saas_schema import SchemaModel, load_schema
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent
+SOURCE_DSN = os.environ.get('SOURCE_DATABASE_URL')
+MANIFEST = 'manifest.json'
+
+ROOT_TABLE = 'organizations'
+TENANT_COLUMN = 'organization_id'
+AUTH_USERS = 'auth.users'
+PROFILES = 'profiles'
+# Tenant tables exported besides ORG_TABLES (RLS needs the memberships)
+EXTRA_TENANT_TABLES = ['organization_members']
+# Carry organization_id but are logs or short-lived; never exported
+SKIPPED_TABLES = {'audit_logs', 'request_nonces', 'function_versions'}
+# Columns of auth.users that exist both in Supabase and in the local shim
+AUTH_USER_COLUMNS = ['id', 'email']
+# Foreign keys the schema model does not see (added inside a DO block in 001)
+EXTRA_REFERENCES = {(PROFILES, 'current_organization_id'): ROOT_TABLE}
+# Unique text columns that get a suffix when ids are remapped
+REMAP_SUFFIX_COLUMNS = {(ROOT_TABLE, 'slug')}
+
+CHUNK_BYTES = 1 << 20
+
+
+def quote_ident(name: str) -> str:
+    return '.'.join('"' + part.replace('"', '""') + '"' for part in name.split('.'))
+
+
+# ---------------------------------------------------------------------------
+# Export plan
+# ---------------------------------------------------------------------------
+
+class ExportTable:
+    """One table of the export: which rows belong to the tenant and what they reference"""
+
+    def __init__(self, name: str, where: str, shared: bool = False):
+        self.name = name
+        self.where = where                           # SQL with %(org)s
+        self.shared = shared                         # rows other tenants may use too
+        self.references: Dict[str, str] = {}         # column -> referenced table
+        self.primary_key: List[str] = []
+
+    @property
+    def depends_on(self) -> Set[str]:
+        return set(self.references.values()) - {self.name}
+
+    def remapped_columns(self, tenant_tables: Set[str]) -> List[str]:
+        """Columns whose values are tenant ids: the primary key and references to tenant tables"""
+        columns = [c for c in self.primary_key if not self.shared and c not in self.references]
+        columns += [c for c, table in self.references.items() if table in tenant_tables]
+        return columns
+
+    def select_expression(self, column: str) -> str:
+        """Shared rows keep a reference to a tenant table only when it points at this tenant"""
+        if self.shared and self.references.get(column) == ROOT_TABLE:
+            return f"CASE WHEN {quote_ident(column)} = %(org)s THEN {quote_ident(column)} END"
+        return quote_ident(column)
+
+
+def referenced_table(schema: SchemaModel, name: str) -> str:
+    # REFERENCES auth.users(id) is parsed as `users`, which has no public table
+    return AUTH_USERS if name == 'users' and schema.table('users') is None else name
+
+
+def build_plan(schema: SchemaModel) -> List[ExportTable]:
+    """Export tables in dependency order (referenced tables first)"""
+    tenant_names = [ROOT_TABLE] + EXTRA_TENANT_TABLES + sorted(ORG_TABLES)
+    tables: Dict[str, ExportTable] = {}
+    for name in tenant_names:
+        where = "id = %(org)s" if name == ROOT_TABLE else f"{TENANT_COLUMN} = %(org)s"
+        tables[name] = ExportTable(name, where)
+
+    # Users and profiles referenced from any tenant row
+    user_refs = []
+    for name in tenant_names:
+        for fk in schema.table(name).foreign_keys:
+            target = referenced_table(schema, fk.ref_table)
+            if target in (PROFILES, AUTH_USERS) and len(fk.columns) == 1:
+                user_refs.append(f"SELECT {quote_ident(fk.columns[0])} FROM {quote_ident(name)} "
+                                 f"WHERE {tables[name].where}")
+    users_where = f"id IN ({' UNION '.join(user_refs)})"
+    tables[PROFILES] = ExportTable(PROFILES, users_where, shared=True)
+    tables[AUTH_USERS] = ExportTable(AUTH_USERS, users_where, shared=True)
+    tables[AUTH_USERS].primary_key = ['id']
+
+    for name, table in tables.items():
+        model = schema.table(name)
+        if model is None:
+            continue
+        table.primary_key = list(model.primary_key)
+        for fk in model.foreign_keys:
+            target = referenced_table(schema, fk.ref_table)
+            if len(fk.columns) == 1 and target in tables:
+                table.references[fk.columns[0]] = target
+    for (name, column), target in EXTRA_REFERENCES.items():
+        tables[name].references[column] = target
+
+    # Kahn's algorithm, alphabetical among the tables that are ready
+    ordered: List[ExportTable] = []
+    done: Set[str] = set()
+    while len(ordered) < len(tables):
+        ready = sorted(n for n, t in tables.items() if n not in done and t.depends_on <= done)
+        if not ready:
+            cycle = sorted(n for n in tables if n not in done)
+            raise ValueError(f"foreign key cycle between: {', '.join(cycle)}")
+        for name in ready:
+            ordered.append(tables[name])
+            done.add(name)
+    return ordered
+
+
+def unexported_tenant_tables(schema: SchemaModel, plan: List[ExportTable]) -> List[str]:
+    names = {t.name for t in plan}
+    return sorted(n for n, t in schema.tables.items() if t.has_column(TENANT_COLUMN) and n not in names)
+
+
+# ---------------------------------------------------------------------------
+# Streaming
+# ---------------------------------------------------------------------------
+
+class Remapper:
+    """Rewrites tenant ids in COPY text rows to uuid5(namespace, old id), keeping no id map"""
+
+    def __init__(self, namespace: uuid.UUID, columns: List[str], remapped: List[str], suffixed: List[str]):
+        self.namespace = namespace
+        self.positions = [columns.index(c) for c in remapped if c in columns]
+        self.suffix_positions = [columns.index(c) for c in suffixed if c in columns]
+        self.suffix = ('-' + namespace.hex[:8]).encode()
+        self.partial = b''
+
+    def new_id(self, old: bytes) -> bytes:
+        return str(uuid.uuid5(self.namespace, old.decode('ascii'))).encode('ascii')
+
+    def row(self, line: bytes) -> bytes:
+        fields = line.split(b'\t')                  # tabs inside values are escaped as \t
+        for i in self.positions:
+            if fields[i] != b'\\N':
+                fields[i] = self.new_id(fields[i])
+        for i in self.suffix_positions:
+            if fields[i] != b'\\N':
+                fields[i] += self.suffix
+        return b'\t'.join(fields)
+
+    def feed(self, chunk: bytes) -> bytes:
+        lines = (self.partial + chunk).split(b'\n')
+        self.partial = lines.pop()
+        return b''.join(self.row(line) + b'\n' for line in lines)
+
+    def flush(self) -> bytes:
+        tail, self.partial = self.partial, b''
+        return self.row(tail) if tail else b''
+
+
+class TableStats:
+    def __init__(self, table: str, file: Optional[str] = None):
+        self.table = table
+        self.file = file
+        self.columns: List[str] = []
+        self.rows = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'table': self.table,
+            'file': self.file,
+            'columns': self.columns,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'seconds': round(self.seconds, 3),
+            'rows_per_sec': round(self.rows_per_sec, 1),
+        }
+
+
+def pump(chunks: Iterable, write: Callable[[bytes], object], stats: TableStats,
+         remapper: Optional[Remapper] = None):
+    """Move COPY text data from `chunks` to `write`, one chunk in memory at a time"""
+    started = time.perf_counter()
+    for chunk in chunks:
+        data = bytes(chunk)
+        if remapper:
+            data = remapper.feed(data)
+        stats.rows += data.count(b'\n')
+        stats.bytes += len(data)
+        write(data)
+    if remapper:
+        tail = remapper.flush()
+        if tail:
+            stats.rows += 1
+            stats.bytes += len(tail)
+            write(tail)
+    stats.seconds += time.perf_counter() - started
+
+
+def file_chunks(path: Path) -> Iterable[bytes]:
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
+
+
+def live_columns(conn, name: str) -> List[str]:
+    """Writable columns of a table in the connected database, in table order ([] when missing)"""
+    schema, _, table = name.rpartition('.')
+    rows = conn.execute(
+        """SELECT column_name FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = %s AND is_generated = 'NEVER'
+        ORDER BY ordinal_position""",
+        (schema or 'public', table),
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def export_columns(conn, table: ExportTable) -> List[str]:
+    columns = live_columns(conn, table.name)
+    if table.name == AUTH_USERS:
+        return [c for c in columns if c in AUTH_USER_COLUMNS]
+    return columns
+
+
+def copy_out_sql(table: ExportTable, columns: List[str]) -> str:
+    select = ', '.join(table.select_expression(c) for c in columns)
+    return f"COPY (SELECT {select} FROM {quote_ident(table.name)} WHERE {table.where}) TO STDOUT"
+
+
+def resolve_organization(conn, key: str) -> Tuple[str, str]:
+    row = conn.execute(
+        "SELECT id::text, slug FROM organizations WHERE id::text = %s OR slug = %s", (key, key)
+    ).fetchone()
+    if not row:
+        print(f"❌ No organization with id or slug '{key}'")
+        sys.exit(1)
+    return row[0], row[1]
+
+
+def open_source(dsn: str):
+    """Read-only REPEATABLE READ connection, so every table comes from one snapshot"""
+    conn = connect(dsn, autocommit=False)
+    conn.isolation_level = psycopg.IsolationLevel.REPEATABLE_READ
+    conn.read_only = True
+    return conn
+
+
+# ---------------------------------------------------------------------------
+# Import side
+# ---------------------------------------------------------------------------
+
+class Importer:
+    """Loads tables into the target inside one transaction"""
+
+    def __init__(self, conn, plan: List[ExportTable], namespace: Optional[uuid.UUID], keep_triggers: bool):
+        self.conn = conn
+        self.plan = {t.name: t for t in plan}
+        self.tenant_tables = {t.name for t in plan if not t.shared}
+        self.namespace = namespace
+        if not keep_triggers:
+            conn.execute("SET LOCAL session_replication_role = replica")
+
+    def columns(self, table: str) -> List[str]:
+        return live_columns(self.conn, table)
+
+    def remapper(self, table: ExportTable, columns: List[str]) -> Optional[Remapper]:
+        if self.namespace is None:
+            return None
+        suffixed = [c for t, c in REMAP_SUFFIX_COLUMNS if t == table.name]
+        return Remapper(self.namespace, columns, table.remapped_columns(self.tenant_tables), suffixed)
+
+    def load(self, table: ExportTable, columns: List[str], chunks: Iterable, stats: TableStats):
+        column_list = ', '.join(quote_ident(c) for c in columns)
+        cur = self.conn.cursor()
+        target = quote_ident(table.name)
+        if table.shared:
+            stage = f"export_stage_{table.name.replace('.', '_')}"
+            cur.execute(f"CREATE TEMP TABLE {stage} (LIKE {target}) ON COMMIT DROP")
+            target = stage
+        with cur.copy(f"COPY {target} ({column_list}) FROM STDIN") as copy:
+            pump(chunks, copy.write, stats, self.remapper(table, columns))
+        if table.shared:
+            cur.execute(f"INSERT INTO {quote_ident(table.name)} ({column_list}) "
+                        f"SELECT {column_list} FROM {target} ON CONFLICT DO NOTHING")
+
+    def dangling_references(self, org_id: str) -> Dict[str, int]:
+        """Loaded tenant rows whose reference has no row in the target, per foreign key"""
+        found = {}
+        for name in self.tenant_tables:
+            table = self.plan[name]
+            scope = "id = %s" if name == ROOT_TABLE else f"{TENANT_COLUMN} = %s"
+            for column, parent in table.references.items():
+                if column == TENANT_COLUMN or not self.columns(name):
+                    continue
+                row = self.conn.execute(
+                    f"SELECT count(*) FROM {quote_ident(name)} c WHERE c.{quote_ident(column)} IS NOT NULL "
+                    f"AND {scope} AND NOT EXISTS (SELECT 1 FROM {quote_ident(parent)} p "
+                    f"WHERE p.id = c.{quote_ident(column)})",
+                    (org_id,),
+                ).fetchone()
+                if row[0]:
+                    found[f"{name}.{column} -> {parent}"] = row[0]
+        return found
+
+    def finish(self, org_id: str) -> Dict[str, int]:
+        dangling = self.dangling_references(org_id)
+        for name in self.plan:
+            if self.columns(name):
+                self.conn.execute(f"ANALYZE {quote_ident(name)}")
+        self.conn.commit()
+        return dangling
+
+
+def target_dsn(args) -> str:
+    if args.scratch:
+        return prepare_bench_database(args.dsn, args.scratch)
+    return args.target
+
+
+def namespace_of(args) -> Optional[uuid.UUID]:
+    if args.remap is None:
+        return None
+    return uuid.UUID(args.remap) if args.remap else uuid.uuid4()
+
+
+# ---------------------------------------------------------------------------
+# Modes
+# ---------------------------------------------------------------------------
+
+def print_plan(schema: SchemaModel, plan: List[ExportTable]):
+    tenant_tables = {t.name for t in plan if not t.shared}
+    print(f"\n📋 Export order ({len(plan)} tables)")
+    for i, table in enumerate(plan, 1):
+        shared = ' [shared, ON CONFLICT DO NOTHING]' if table.shared else ''
+        depends = f" after {', '.join(sorted(table.depends_on))}" if table.depends_on else ''
+        print(f"  {i:>2}. {table.name}{shared}{depends}")
+        remapped = table.remapped_columns(tenant_tables)
+        if remapped:
+            print(f"      remap: {', '.join(remapped)}")
+    unexported = unexported_tenant_tables(schema, plan)
+    skipped = [n for n in unexported if n in SKIPPED_TABLES]
+    unknown = [n for n in unexported if n not in SKIPPED_TABLES]
+    if skipped:
+        print(f"\n  Not exported (logs/short-lived): {', '.join(skipped)}")
+    if unknown:
+        print(f"  ⚠️ Have {TENANT_COLUMN} but are not in ORG_TABLES: {', '.join(unknown)}")
+
+
+def export_to_dir(plan: List[ExportTable], args) -> List[TableStats]:
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    results = []
+    with open_source(args.source) as src:
+        org_id, slug = resolve_organization(src, args.export)
+        print(f"🏢 {slug} ({org_id}) -> {out}")
+        for i, table in enumerate(plan, 1):
+            stats = TableStats(table.name, f"{i:02d}_{table.name.replace('.', '_')}.copy")
+            stats.columns = export_columns(src, table)
+            if not stats.columns:
+                print(f"  ⚠️ {table.name}: not in the source database, skipped")
+                continue
+            with open(out / stats.file, 'wb') as f, src.cursor().copy(
+                    copy_out_sql(table, stats.columns), {'org': org_id}) as copy:
+                pump(copy, f.write, stats)
+            print_table(stats)
+            results.append(stats)
+
+    manifest = {
+        'organization_id': org_id,
+        'slug': slug,
+        'exported_at': datetime.now(timezone.utc).isoformat(),
+        'tables': [s.to_dict() for s in results],
+    }
+    (out / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    return results
+
+
+def clone(plan: List[ExportTable], args) -> Tuple[List[TableStats], Dict[str, int], str]:
+    dsn = target_dsn(args)
+    namespace = namespace_of(args)
+    results = []
+    with open_source(args.source) as src, connect(dsn, autocommit=False) as dst:
+        org_id, slug = resolve_organization(src, args.export)
+        importer = Importer(dst, plan, namespace, args.keep_triggers)
+        new_org = str(uuid.uuid5(namespace, org_id)) if namespace else org_id
+        print(f"🏢 {slug} ({org_id}) -> {new_org}")
+        for table in plan:
+            stats = TableStats(table.name)
+            source_columns = export_columns(src, table)
+            target_columns = set(importer.columns(table.name))
+            stats.columns = [c for c in source_columns if c in target_columns]
+            if not stats.columns:
+                print(f"  ⚠️ {table.name}: missing in the source or target database, skipped")
+                continue
+            dropped = [c for c in source_columns if c not in target_columns]
+            if dropped:
+                print(f"  ⚠️ {table.name}: not in the target, left out: {', '.join(dropped)}")
+            with src.cursor().copy(copy_out_sql(table, stats.columns), {'org': org_id}) as copy:
+                importer.load(table, stats.columns, copy, stats)
+            print_table(stats)
+            results.append(stats)
+        dangling = importer.finish(new_org)
+    if namespace:
+        print(f"🔑 Remap namespace: {namespace} (pass --remap {namespace} to reproduce)")
+    return results, dangling, dsn
+
+
+def import_dir(plan: List[ExportTable], args) -> Tuple[List[TableStats], Dict[str, int], str]:
+    source = Path(args.import_dir)
+    manifest = json.loads((source / MANIFEST).read_text(encoding='utf-8'))
+    by_name = {t.name: t for t in plan}
+    dsn = target_dsn(args)
+    namespace = namespace_of(args)
+    org_id = manifest['organization_id']
+    new_org = str(uuid.uuid5(namespace, org_id)) if namespace else org_id
+    print(f"🏢 {manifest['slug']} ({org_id}, exported {manifest['exported_at']}) -> {new_org}")
+
+    results = []
+    with connect(dsn, autocommit=False) as dst:
+        importer = Importer(dst, plan, namespace, args.keep_triggers)
+        for entry in manifest['tables']:
+            table = by_name.get(entry['table'])
+            if table is None:
+                print(f"  ⚠️ {entry['table']}: not part of the export plan, skipped")
+                continue
+            missing = [c for c in entry['columns'] if c not in set(importer.columns(table.name))]
+            if missing:
+                print(f"❌ {table.name}: columns missing in the target: {', '.join(missing)}")
+                sys.exit(1)
+            stats = TableStats(table.name, entry['file'])
+            stats.columns = entry['columns']
+            importer.load(table, stats.columns, file_chunks(source / entry['file']), stats)
+            print_table(stats)
+            results.append(stats)
+        dangling = importer.finish(new_org)
+    if namespace:
+        print(f"🔑 Remap namespace: {namespace}")
+    return results, dangling, dsn
+
+
+def print_table(stats: TableStats):
+    print(f"  📦 {stats.table:<32} {stats.rows:>10,} rows {stats.bytes / 1e6:>9.2f} MB "
+          f"{stats.rows_per_sec:>12,.0f} rows/s")
+
+
+def print_summary(results: List[TableStats], dangling: Optional[Dict[str, int]], wall: float):
+    rows = sum(s.rows for s in results)
+    size = sum(s.bytes for s in results)
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"  Tables: {len(results)}  Rows: {rows:,}  Data: {size / 1e6:.2f} MB")
+    print(f"  Wall time: {wall:.1f}s  Throughput: {rows / wall if wall else 0:,.0f} rows/s "
+          f"({size / 1e6 / wall if wall else 0:.1f} MB/s)")
+    if dangling:
+        print(f"\n  ⚠️ References with no row in the target (other tenant or not exported):")
+        for key, count in sorted(dangling.items(), key=lambda kv: -kv[1]):
+            print(f"     {key}: {count:,} row(s)")
+    elif dangling is not None:
+        print(f"  ✅ Every reference of the loaded rows resolves")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Organization Export / Clone')
+    parser.add_argument('--plan', action='store_true', help='Print the export order and exit')
+    parser.add_argument('--export', metavar='ORG', help='Organization id or slug to export')
+    parser.add_argument('--import', dest='import_dir', metavar='DIR', help='Load an --out directory')
+    parser.add_argument('--source', default=SOURCE_DSN, help='Source DSN (default: $SOURCE_DATABASE_URL)')
+    parser.add_argument('--out', metavar='DIR', help='Write COPY files + manifest here')
+    parser.add_argument('--target', metavar='DSN', help='Load into this database (schema already applied)')
+    parser.add_argument('--scratch', metavar='NAME', help='Load into a fresh local database with the SaaS schema')
+    parser.add_argument('--dsn', default=DEFAULT_DSN, help='Admin DSN for --scratch (default: $LOCAL_DATABASE_URL)')
+    parser.add_argument('--remap', nargs='?', const='', metavar='NAMESPACE',
+                        help='Give tenant rows new UUIDs (uuid5 in NAMESPACE, random if omitted)')
+    parser.add_argument('--keep-triggers', action='store_true',
+                        help='Load with triggers enabled (no superuser needed; triggers may rewrite rows)')
+    parser.add_argument('--json', metavar='PATH', help='Write per-table stats as JSON')
+
+    args = parser.parse_args()
+
+    if not any([args.plan, args.export, args.import_dir]):
+        parser.print_help()
+        print("\n⚠️  Please specify --plan, --export or --import")
+        sys.exit(1)
+
+    print("🏢 Organization Export / Clone")
+    print("="*60)
+
+    schema = load_schema()
+    try:
+        plan = build_plan(schema)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if args.plan:
+        print_plan(schema, plan)
+        return
+
+    if args.export and not args.source:
+        print("❌ --export needs --source (or $SOURCE_DATABASE_URL)")
+        sys.exit(1)
+    if args.export and not (args.out or args.target or args.scratch):
+        print("❌ --export needs --out, --target or --scratch")
+        sys.exit(1)
+    if args.import_dir and not (args.target or args.scratch):
+        print("❌ --import needs --target or --scratch")
+        sys.exit(1)
+    if args.remap and args.out and not (args.target or args.scratch):
+        print("⚠️  --remap applies when loading; the files keep the original ids")
+    if args.remap:
+        try:
+            uuid.UUID(args.remap)
+        except ValueError:
+            print(f"❌ --remap namespace must be a UUID: {args.remap}")
+            sys.exit(1)
+    require_psycopg()
+
+    started = time.perf_counter()
+    dangling = None
+    dsn = None
+    if args.import_dir:
+        results, dangling, dsn = import_dir(plan, args)
+    elif args.out:
+        results = export_to_dir(plan, args)
+    else:
+        results, dangling, dsn = clone(plan, args)
+    wall = time.perf_counter() - started
+
+    print_summary(results, dangling, wall)
+    if args.scratch:
+        print(f"\n✅ Clone ready: {dsn}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'wall_seconds': round(wall, 3),
+                'tables': [s.to_dict() for s in results],
+                'dangling_references': dangling,
+            }, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+File Watcher
+============
+Change notifications for the --watch modes: inotify through ctypes on Linux,
+mtime polling everywhere else (or when inotify is unavailable). Bursts of
+events, such as an editor's write-and-rename or build_runner rewriting every
+.g.dart file, are debounced into one batch of changed paths.
+"""
+
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT = struct.Struct('iIII')   # wd, mask, cookie, len (name follows)
+POLL_INTERVAL = 0.5
+
+
+def walk(roots: Iterable[Path]) -> Iterator[Path]:
+    """Directories under the roots, skipping hidden ones (.dart_tool, .git)"""
+    for root in roots:
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            yield Path(dirpath)
+
+
+class PollingWatcher:
+    """Compares file mtimes every POLL_INTERVAL seconds"""
+
+    name = 'polling'
+
+    def __init__(self, roots: Iterable[Path], suffixes: Iterable[str]):
+        self.roots = list(roots)
+        self.suffixes = tuple(suffixes)
+        self.mtimes = self._snapshot()
+
+    def _snapshot(self) -> Dict[Path, float]:
+        mtimes = {}
+        for directory in walk(self.roots):
+            for entry in os.scandir(directory):
+                if entry.name.endswith(self.suffixes) and entry.is_file():
+                    mtimes[Path(entry.path)] = entry.stat().st_mtime
+        return mtimes
+
+    def wait(self, timeout: Optional[float]) -> Set[Path]:
+        """Paths changed before the timeout (None = until something changes)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = POLL_INTERVAL if deadline is None else min(POLL_INTERVAL, deadline - time.monotonic())
+            if remaining > 0:
+                time.sleep(remaining)
+            mtimes = self._snapshot()
+            changed = {p for p in mtimes.keys() | self.mtimes.keys() if mtimes.get(p) != self.mtimes.get(p)}
+            self.mtimes = mtimes
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """inotify watches on every directory under the roots, added as directories appear"""
+
+    name = 'inotify'
+
+    def __init__(self, roots: Iterable[Path], suffixes: Iterable[str]):
+        self.roots = list(roots)
+        self.suffixes = tuple(suffixes)
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.dirs: Dict[int, Path] = {}
+        for directory in walk(self.roots):
+            self._watch(directory)
+
+    def _watch(self, directory: Path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self.dirs[wd] = directory
+
+    def _files(self, roots: Iterable[Path]) -> Set[Path]:
+        return {d / name for d in walk(roots) for name in os.listdir(d) if name.endswith(self.suffixes)}
+
+    def _read(self) -> bytes:
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return b''.join(chunks)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+
+    def wait(self, timeout: Optional[float]) -> Set[Path]:
+        """Paths changed before the timeout (None = until an event arrives)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = self._read()
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b'\0')
+            offset += EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                # The kernel dropped events: anything may have changed
+                changed |= self._files(self.roots)
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not path.name.startswith('.'):
+                    for new_directory in walk([path]):
+                        self._watch(new_directory)
+                    changed |= self._files([path])
+                continue
+            if path.name.endswith(self.suffixes):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def file_watcher(roots: Iterable[Path], suffixes: Iterable[str]):
+    """inotify where the platform has it, polling otherwise"""
+    roots, suffixes = list(roots), list(suffixes)
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(roots, suffixes)
+        except (OSError, AttributeError):   # AttributeError: libc without inotify symbols
+            pass
+    return PollingWatcher(roots, suffixes)
+
+
+def batches(watcher, debounce: float) -> Iterator[Set[Path]]:
+    """Changed paths, one set per burst that has been quiet for `debounce` seconds"""
+    while True:
+        changed = watcher.wait(None)
+        while changed:
+            more = watcher.wait(debounce)
+            if not more:
+                break
+            changed |= more
+        if changed:
+            yield changed
@@ -4,10 +4,19 @@ SaaS Migration Script for Vittoria Ristorazione
 ================================================
 Automates the addition of organization_id support to the Flutter codebase.
 
+--apply finishes by running build_runner for the generated parts of the
+models it changed and of the organization provider it creates only (see
+build_filter.py).
+
+--profile records per-phase and per-file wall time, bytes read and written,
+regex calls and matches and peak RSS, and writes a Chrome trace plus a text
+summary (see profiling.py).
+
 Usage:
     python migrate_to_saas.py --dry-run     # Preview changes
     python migrate_to_saas.py --apply       # Apply changes
     python migrate_to_saas.py --report      # Generate report only
+    python migrate_to_saas.py --dry-run --profile   # ... and write migrate_to_saas.trace.json
 """
 
 import os
@@ -17,7 +26,11 @@ import shutil
 import argparse
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Tuple, Set
+from typing import List, Dict, Optional, Tuple, Set
+
+from build_filter import GeneratedParts
+from profiling import Profiler, default_trace_path
+from source_edits import SourceEdits
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -165,25 +178,19 @@ def add_organization_id_to_model(file_path: Path, report: MigrationReport, dry_r
         report.add_warning(f"{file_path.name}: Could not find factory constructor")
         return False
     
-    before = match.group(1)
-    fields = match.group(2)
-    after = match.group(3)
-    
-    # Add organizationId as first optional field (after required fields)
-    # Find a good insertion point - after the last required field or at the start
+    # Add organizationId as the first field
     new_field = "\n    @JsonKey(name: 'organization_id') String? organizationId,"
     
     # Insert after the opening brace, before existing fields
-    new_fields = new_field + fields
-    new_content = content[:match.start()] + before + new_fields + after + content[match.end():]
+    edits = SourceEdits(content, file_path)
+    edits.insert(match.end(1), new_field, 'organizationId field')
+    edits.write(dry_run)
     
     if dry_run:
-        report.add_model_update(file_path.name, "Would add organizationId field")
+        report.add_model_update(file_path.name, f"Would add organizationId field ({edits.stats()})")
         return True
     
-    # Write the updated content
-    file_path.write_text(new_content, encoding='utf-8')
-    report.add_model_update(file_path.name, "Added organizationId field")
+    report.add_model_update(file_path.name, f"Added organizationId field ({edits.stats()})")
     return True
 
 
@@ -259,14 +266,16 @@ def update_database_service(report: MigrationReport, dry_run: bool) -> int:
             # Find the first import statement and add header before class definition
             class_match = re.search(r'^class DatabaseService', content, re.MULTILINE)
             if class_match:
-                content = content[:class_match.start()] + todo_header + content[class_match.start():]
-                DATABASE_SERVICE.write_text(content, encoding='utf-8')
-                report.add_service_update("DatabaseService", "Added migration TODO header")
+                edits = SourceEdits(content, DATABASE_SERVICE)
+                edits.insert(class_match.start(), todo_header, 'migration TODO header')
+                edits.write()
+                report.add_service_update("DatabaseService", f"Added migration TODO header ({edits.stats()})")
     
     return updates_count
 
 
-def create_organization_provider(report: MigrationReport, dry_run: bool) -> bool:
+def create_organization_provider(report: MigrationReport, dry_run: bool,
+                                 parts: Optional[GeneratedParts] = None) -> bool:
     """Create a new organization provider file"""
     
     provider_path = LIB_DIR / "providers" / "organization_provider.dart"
@@ -359,6 +368,9 @@ Future<List<Map<String, dynamic>>> userOrganizations(UserOrganizationsRef ref) a
     
     provider_path.write_text(provider_content, encoding='utf-8')
     report.add_model_update("organization_provider.dart", "Created new organization provider")
+    if parts is not None:
+        # Declares part 'organization_provider.g.dart', which only build_runner writes
+        parts.record(provider_path)
     return True
 
 
@@ -371,11 +383,12 @@ MANUAL TASKS REQUIRED AFTER RUNNING THIS SCRIPT
 ================================================================================
 
 1. RUN BUILD_RUNNER (Required)
-   cd to project root and run:
+   --apply regenerates the .freezed.dart and .g.dart parts of the models it
+   changed. If that step was skipped or failed, run the command it printed,
+   or rebuild everything from the project root:
    ```
    dart run build_runner build --delete-conflicting-outputs
    ```
-   This regenerates all .freezed.dart and .g.dart files.
 
 2. UPDATE DATABASE_SERVICE.DART (High Priority)
    Open lib/core/services/database_service.dart and:
@@ -449,6 +462,8 @@ def main():
     parser.add_argument('--apply', action='store_true', help='Apply changes to codebase')
     parser.add_argument('--report', action='store_true', help='Generate report only')
     parser.add_argument('--skip-backup', action='store_true', help='Skip backup creation')
+    parser.add_argument('--profile', nargs='?', type=Path, const=default_trace_path(__file__),
+                        metavar='TRACE', help='Write a Chrome trace and timing summary (default: %(const)s)')
     
     args = parser.parse_args()
     
@@ -468,21 +483,30 @@ def main():
     
     report = MigrationReport()
     dry_run = args.dry_run or args.report
+    profiler = Profiler(enabled=args.profile is not None)
+    profiler.install()
     
     # Create backup if applying changes
     if args.apply and not args.skip_backup:
-        create_backup()
+        with profiler.phase("Backup"):
+            create_backup()
     
+    parts = GeneratedParts()
     print("\n📝 Phase 1: Updating Models...")
-    for model_file in MODEL_FILES_TO_UPDATE:
-        model_path = MODELS_DIR / model_file
-        add_organization_id_to_model(model_path, report, dry_run)
+    with profiler.phase("Phase 1: Models"):
+        for model_file in MODEL_FILES_TO_UPDATE:
+            model_path = MODELS_DIR / model_file
+            with profiler.phase(model_file, 'file'):
+                if add_organization_id_to_model(model_path, report, dry_run):
+                    parts.record(model_path)
     
     print("\n🔧 Phase 2: Analyzing DatabaseService...")
-    update_database_service(report, dry_run)
+    with profiler.phase("Phase 2: DatabaseService"):
+        update_database_service(report, dry_run)
     
     print("\n🆕 Phase 3: Creating Organization Provider...")
-    create_organization_provider(report, dry_run)
+    with profiler.phase("Phase 3: Organization provider"):
+        create_organization_provider(report, dry_run, parts)
     
     # Print report
     report.print_summary()
@@ -490,12 +514,18 @@ def main():
     # Print manual tasks
     print(generate_manual_tasks_report())
     
+    print("🏗️  Regenerating Freezed/JSON/Riverpod parts of the changed files...")
+    with profiler.phase("build_runner"):
+        parts.build(dry_run)
+    
     if dry_run:
         print("\n⚠️  DRY RUN MODE - No files were modified")
         print("   Run with --apply to make changes")
     else:
         print("\n✅ Migration script completed!")
-        print("   Run 'dart run build_runner build --delete-conflicting-outputs'")
+    
+    if args.profile:
+        profiler.write(args.profile, f"migrate_to_saas.py {'--apply' if args.apply else '--dry-run'}")
 
 
 if __name__ == '__main__':
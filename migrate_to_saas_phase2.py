@@ -4,9 +4,21 @@ Multi-Tenant Migration Script - Phase 2
 ========================================
 Updates DatabaseService, providers, and settings models with organization support.
 
+The generated CurrentOrganization provider resolves the org context with one
+resolve_current_organization() RPC (SECURITY DEFINER, written as a migration)
+instead of sequential profile/membership/update calls.
+
+--apply finishes by running build_runner for the generated parts of the
+settings models and provider it changed only (see build_filter.py).
+
+--profile writes a Chrome trace and a timing summary of the steps, per-file
+I/O and regex scans (see profiling.py).
+
 Usage:
     python migrate_to_saas_phase2.py --dry-run     # Preview changes
     python migrate_to_saas_phase2.py --apply       # Apply changes
+    python migrate_to_saas_phase2.py --verify-sql  # Test the RPC on local Postgres
+    python migrate_to_saas_phase2.py --dry-run --profile
 """
 
 import os
@@ -16,7 +28,16 @@ import shutil
 import argparse
 from datetime import datetime
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Tuple, Optional
+
+from build_filter import GeneratedParts
+from profiling import Profiler, default_trace_path
+from saas_schema import existing_migration, migration_header, migration_target
+from source_edits import SourceEdits
+from local_postgres import (
+    DEFAULT_DSN, require_psycopg, connect, prepare_bench_database, drop_scratch_database,
+    seed_organizations,
+)
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -69,6 +90,177 @@ def create_backup():
     return backup_path
 
 
+# Replaces the profile lookup, membership validation, fallback lookup and
+# profile update of CurrentOrganization.build() with one call. Runs as the
+# owner so the stale-context cleanup works whatever the profiles policies allow.
+RESOLVE_ORGANIZATION_SQL = """
+CREATE OR REPLACE FUNCTION resolve_current_organization()
+RETURNS UUID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_user_id UUID := auth.uid();
+    v_current UUID;
+    v_org_id UUID;
+BEGIN
+    IF v_user_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT current_organization_id INTO v_current
+    FROM profiles
+    WHERE id = v_user_id;
+
+    -- Saved context, if the org is live and the membership still active
+    SELECT o.id INTO v_org_id
+    FROM organizations o
+    JOIN organization_members m
+      ON m.organization_id = o.id AND m.user_id = v_user_id AND m.is_active = true
+    WHERE o.id = v_current
+      AND o.is_active = true
+      AND o.deleted_at IS NULL;
+
+    IF v_org_id IS NOT NULL THEN
+        RETURN v_org_id;
+    END IF;
+
+    -- Fallback: first active membership in a live organization
+    SELECT m.organization_id INTO v_org_id
+    FROM organization_members m
+    JOIN organizations o ON o.id = m.organization_id
+    WHERE m.user_id = v_user_id
+      AND m.is_active = true
+      AND o.is_active = true
+      AND o.deleted_at IS NULL
+    ORDER BY m.accepted_at NULLS LAST, m.created_at
+    LIMIT 1;
+
+    -- Persist the new context (or clear a stale one)
+    UPDATE profiles
+    SET current_organization_id = v_org_id
+    WHERE id = v_user_id
+      AND current_organization_id IS DISTINCT FROM v_org_id;
+
+    RETURN v_org_id;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION resolve_current_organization() FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION resolve_current_organization() TO authenticated;
+"""
+
+
+def resolve_organization_sql(migration: Path) -> str:
+    return '\n'.join([
+        migration_header(
+            f"{migration.name.split('_')[0]}: RESOLVE CURRENT ORGANIZATION",
+            'Generated by migrate_to_saas_phase2.py: org context in one round trip',
+        ),
+        "BEGIN;",
+        RESOLVE_ORGANIZATION_SQL,
+        "COMMIT;",
+        "",
+    ])
+
+
+def write_resolve_organization_migration(dry_run: bool) -> Path:
+    """Write the resolve_current_organization() migration"""
+    
+    migration, sql = migration_target('resolve_current_organization', resolve_organization_sql)
+    if migration.exists():
+        print(f"  ✅ {migration.relative_to(PROJECT_ROOT)} is up to date")
+        return migration
+    if dry_run:
+        print(f"  ✅ Would write {migration.relative_to(PROJECT_ROOT)}")
+        return migration
+    
+    migration.write_text(sql, encoding='utf-8')
+    print(f"  ✅ Wrote {migration.relative_to(PROJECT_ROOT)}")
+    return migration
+
+
+def resolve_as(conn, user_id: Optional[str]) -> Optional[str]:
+    """Call resolve_current_organization() with auth.uid() = user_id"""
+    conn.execute("SELECT set_config('request.jwt.claim.sub', %s, false)", (user_id or '',))
+    row = conn.execute("SELECT resolve_current_organization()").fetchone()
+    return str(row[0]) if row[0] else None
+
+
+def verify_resolve_organization(admin_dsn: str, database: str, keep_database: bool) -> bool:
+    """Replay the migrations on a scratch database and check each resolution path"""
+    
+    require_psycopg()
+    migration = existing_migration('resolve_current_organization')
+    if migration is None:
+        print("  ❌ resolve_current_organization migration not found, run with --apply first")
+        return False
+    
+    dsn = prepare_bench_database(admin_dsn, database, verbose=False)
+    failures = 0
+    try:
+        with connect(dsn) as conn:
+            org_a, org_b = seed_organizations(conn, 2, prefix='resolve')
+            user = str(conn.execute(
+                "INSERT INTO auth.users (email) VALUES ('resolve-user@example.com') RETURNING id"
+            ).fetchone()[0])
+            # handle_new_user() joins new users to the first active organization
+            conn.execute("DELETE FROM organization_members WHERE user_id = %s", (user,))
+            conn.execute("UPDATE profiles SET current_organization_id = NULL WHERE id = %s", (user,))
+            
+            def member(org_id: str, accepted: str, active: bool = True):
+                conn.execute(
+                    """INSERT INTO organization_members (organization_id, user_id, role, accepted_at, is_active)
+                    VALUES (%s, %s, 'customer', now() - %s::interval, %s)
+                    ON CONFLICT (organization_id, user_id) DO UPDATE SET is_active = EXCLUDED.is_active""",
+                    (org_id, user, accepted, active),
+                )
+            
+            def set_current(org_id: Optional[str]):
+                conn.execute("UPDATE profiles SET current_organization_id = %s WHERE id = %s", (org_id, user))
+            
+            def saved() -> Optional[str]:
+                row = conn.execute("SELECT current_organization_id FROM profiles WHERE id = %s", (user,)).fetchone()
+                return str(row[0]) if row[0] else None
+            
+            def check(name: str, expected: Optional[str], expected_saved: Optional[str]):
+                nonlocal failures
+                got = resolve_as(conn, user)
+                ok = got == expected and saved() == expected_saved
+                failures += 0 if ok else 1
+                print(f"  {'✅' if ok else '❌'} {name}: {got} (saved {saved()})")
+            
+            anonymous = resolve_as(conn, None)
+            failures += 0 if anonymous is None else 1
+            print(f"  {'✅' if anonymous is None else '❌'} anonymous: {anonymous}")
+            
+            check("no memberships", None, None)
+            
+            member(org_a, '2 days')
+            member(org_b, '1 day')
+            check("no saved context -> first membership, persisted", org_a, org_a)
+            
+            set_current(org_b)
+            check("valid saved context kept", org_b, org_b)
+            
+            member(org_b, '1 day', active=False)
+            check("inactive membership -> fallback", org_a, org_a)
+            
+            set_current(org_b)
+            member(org_b, '1 day')
+            conn.execute("UPDATE organizations SET deleted_at = now() WHERE id = %s", (org_b,))
+            check("deleted organization -> fallback", org_a, org_a)
+            
+            conn.execute("UPDATE organizations SET is_active = false WHERE id = %s", (org_a,))
+            check("no live organization left -> context cleared", None, None)
+    finally:
+        if not keep_database:
+            drop_scratch_database(admin_dsn, database)
+    
+    return failures == 0
+
+
 def update_organization_provider(dry_run: bool) -> bool:
     """Enhance organization_provider.dart with more features"""
     
@@ -88,62 +280,14 @@ class CurrentOrganization extends _$CurrentOrganization {
   @override
   Future<String?> build() async {
     final client = Supabase.instance.client;
-    final userId = client.auth.currentUser?.id;
-    if (userId == null) return null;
+    if (client.auth.currentUser == null) return null;
     
     try {
-      // Get user's current organization from profile
-      final response = await client
-          .from('profiles')
-          .select('current_organization_id')
-          .eq('id', userId)
-          .maybeSingle();
-      
-      final orgId = response?['current_organization_id'] as String?;
-      if (orgId != null) return orgId;
-      
-      // Fallback: get first organization user belongs to
-      final orgs = await client
-          .from('organization_members')
-          .select('organization_id')
-          .eq('user_id', userId)
-          .eq('is_active', true)
-          .limit(1);
-      
-      if (orgs.isNotEmpty) {
-        final firstOrgId = orgs.first['organization_id'] as String;
-        // Set as current
-        await client
-            .from('profiles')
-            .update({'current_organization_id': firstOrgId})
-            .eq('id', userId);
-        return firstOrgId;
-      }
-      
-      // Fallback: get any active organization (for single-tenant compatibility)
-      final anyOrg = await client
-          .from('organizations')
-          .select('id')
-          .eq('is_active', true)
-          .limit(1);
-      
-      if (anyOrg.isNotEmpty) {
-        return anyOrg.first['id'] as String;
-      }
-      
-      return null;
+      // One round trip: validates the saved context (org live, membership
+      // active), falls back to the first active membership and persists it
+      final orgId = await client.rpc('resolve_current_organization');
+      return orgId as String?;
     } catch (e) {
-      // Fallback for compatibility
-      try {
-        final orgs = await client
-            .from('organizations')
-            .select('id')
-            .eq('is_active', true)
-            .limit(1);
-        if (orgs.isNotEmpty) {
-          return orgs.first['id'] as String;
-        }
-      } catch (_) {}
       return null;
     }
   }
@@ -253,8 +397,7 @@ def update_provider_file(file_path: Path, dry_run: bool) -> Tuple[bool, int]:
     """Update a provider file to use organization context"""
     
     content = file_path.read_text(encoding='utf-8')
-    original = content
-    changes = 0
+    edits = SourceEdits(content, file_path)
     
     # Check if file has direct Supabase calls
     if 'Supabase.instance.client' not in content:
@@ -270,8 +413,7 @@ def update_provider_file(file_path: Path, dry_run: bool) -> Tuple[bool, int]:
         # Find first import line
         import_match = re.search(r'^import ', content, re.MULTILINE)
         if import_match:
-            content = content[:import_match.start()] + org_import + '\n' + content[import_match.start():]
-            changes += 1
+            edits.insert(import_match.start(), org_import + '\n', 'organization_provider import')
     
     # Add organization context to @riverpod functions
     # Pattern: Find functions that use Supabase.instance.client and add org context
@@ -279,19 +421,19 @@ def update_provider_file(file_path: Path, dry_run: bool) -> Tuple[bool, int]:
     # For now, just add a TODO comment at the top of functions using Supabase
     # This is safer than trying to auto-modify complex logic
     
-    if changes > 0 or 'Supabase.instance.client' in content:
+    if edits or 'Supabase.instance.client' in content:
+        edits.write(dry_run)
         if dry_run:
-            print(f"  ✅ {file_path.name}: Would add org import")
+            print(f"  ✅ {file_path.name}: Would add org import ({edits.stats()})")
             return True, 1
         
-        file_path.write_text(content, encoding='utf-8')
-        print(f"  ✅ {file_path.name}: Added org import")
-        return True, changes
+        print(f"  ✅ {file_path.name}: Added org import ({edits.stats()})")
+        return True, len(edits)
     
     return False, 0
 
 
-def update_settings_models(dry_run: bool) -> int:
+def update_settings_models(dry_run: bool, parts: Optional[GeneratedParts] = None) -> int:
     """Add organizationId to settings models"""
     
     settings_dir = LIB_DIR / "core" / "models" / "settings"
@@ -325,18 +467,17 @@ def update_settings_models(dry_run: bool) -> int:
             print(f"  ⚠️ {filename}: Could not find factory constructor")
             continue
         
-        before = match.group(1)
-        fields = match.group(2)
-        after = match.group(3)
-        
         new_field = "\n    @JsonKey(name: 'organization_id') String? organizationId,"
-        new_content = content[:match.start()] + before + new_field + fields + after + content[match.end():]
+        edits = SourceEdits(content, file_path)
+        edits.insert(match.end(1), new_field, 'organizationId field')
+        edits.write(dry_run)
         
         if dry_run:
-            print(f"  ✅ {filename}: Would add organizationId field")
+            print(f"  ✅ {filename}: Would add organizationId field ({edits.stats()})")
         else:
-            file_path.write_text(new_content, encoding='utf-8')
-            print(f"  ✅ {filename}: Added organizationId field")
+            print(f"  ✅ {filename}: Added organizationId field ({edits.stats()})")
+        if parts is not None:
+            parts.record(file_path)
         
         updates += 1
     
@@ -382,14 +523,31 @@ def main():
     parser.add_argument('--dry-run', action='store_true', help='Preview changes')
     parser.add_argument('--apply', action='store_true', help='Apply changes')
     parser.add_argument('--skip-backup', action='store_true', help='Skip backup')
+    parser.add_argument('--verify-sql', action='store_true',
+                        help='Test resolve_current_organization() against a local Postgres')
+    parser.add_argument('--dsn', default=DEFAULT_DSN, help='Admin DSN for --verify-sql')
+    parser.add_argument('--database', default='rotante_verify_phase2', help='Scratch database for --verify-sql')
+    parser.add_argument('--keep-database', action='store_true', help='Do not drop the scratch database')
+    parser.add_argument('--profile', nargs='?', type=Path, const=default_trace_path(__file__),
+                        metavar='TRACE', help='Write a Chrome trace and timing summary (default: %(const)s)')
     
     args = parser.parse_args()
     
-    if not any([args.dry_run, args.apply]):
+    if not any([args.dry_run, args.apply, args.verify_sql]):
         parser.print_help()
-        print("\n⚠️  Please specify --dry-run or --apply")
+        print("\n⚠️  Please specify --dry-run, --apply or --verify-sql")
         sys.exit(1)
     
+    if args.verify_sql:
+        print("🧪 Verifying resolve_current_organization() on local Postgres")
+        print("="*60)
+        if not verify_resolve_organization(args.dsn, args.database, args.keep_database):
+            print("\n❌ resolve_current_organization() verification failed")
+            sys.exit(1)
+        print("\n✅ resolve_current_organization() verified")
+        if not (args.dry_run or args.apply):
+            return
+    
     print("🚀 Multi-Tenant Migration - Phase 2")
     print("="*60)
     
@@ -398,24 +556,34 @@ def main():
         sys.exit(1)
     
     dry_run = args.dry_run
+    profiler = Profiler(enabled=args.profile is not None)
+    profiler.install()
     
     if args.apply and not args.skip_backup:
-        create_backup()
+        with profiler.phase("Backup"):
+            create_backup()
     
+    parts = GeneratedParts()
     print("\n📝 Step 1: Updating organization_provider.dart...")
-    update_organization_provider(dry_run)
+    with profiler.phase("Step 1: Organization provider"):
+        if update_organization_provider(dry_run):
+            parts.record(LIB_DIR / "providers" / "organization_provider.dart")
+        write_resolve_organization_migration(dry_run)
     
     print("\n📝 Step 2: Updating settings models...")
-    settings_updates = update_settings_models(dry_run)
+    with profiler.phase("Step 2: Settings models"):
+        settings_updates = update_settings_models(dry_run, parts)
     print(f"   Updated {settings_updates} settings models")
     
     print("\n📝 Step 3: Adding org import to providers...")
-    provider_files = get_provider_files()
     provider_updates = 0
-    for f in provider_files:
-        updated, _ = update_provider_file(f, dry_run)
-        if updated:
-            provider_updates += 1
+    with profiler.phase("Step 3: Provider imports"):
+        provider_files = get_provider_files()
+        for f in provider_files:
+            with profiler.phase(f.name, 'file'):
+                updated, _ = update_provider_file(f, dry_run)
+            if updated:
+                provider_updates += 1
     print(f"   Updated {provider_updates} provider files")
     
     print("\n📝 Step 4: Creating org-aware helper utilities...")
@@ -427,10 +595,14 @@ def main():
         helper_path.write_text(helper_content, encoding='utf-8')
         print(f"  ✅ Created: {helper_path.name}")
     
+    print("\n📝 Step 5: Regenerating Freezed/Riverpod parts of the changed files...")
+    with profiler.phase("Step 5: build_runner"):
+        parts.build(dry_run)
+    
     print("\n" + "="*60)
     print("SUMMARY")
     print("="*60)
-    print(f"  Organization provider: Enhanced")
+    print(f"  Organization provider: Enhanced (one resolve_current_organization round trip)")
     print(f"  Settings models: {settings_updates} updated")
     print(f"  Provider files: {provider_updates} updated")
     print(f"  Helper utilities: Created")
@@ -441,10 +613,13 @@ def main():
     else:
         print("\n✅ Phase 2 complete!")
         print("\n📋 Next steps:")
-        print("   1. Run: dart run build_runner build --delete-conflicting-outputs")
+        print("   1. Apply the resolve_current_organization migration")
         print("   2. Update DatabaseService methods to accept organizationId")
         print("   3. Create a test organization in database")
         print("   4. Test the app")
+    
+    if args.profile:
+        profiler.write(args.profile, f"migrate_to_saas_phase2.py {'--apply' if args.apply else '--dry-run'}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,889 @@
+#!/usr/bin/env python3
+"""
+Printer Load Model
+==================
+Models the database load of the print bridge (printer/server.js) as tenants
+are added, and benchmarks the alternatives against a local Postgres.
+
+The poll interval and the poll queries are read from server.js (through
+edge_index). Each poll is matched against the ordini indexes in the schema
+model. The model reports DB queries/min, ordini rows visited/min and the
+expected print latency for each design:
+
+  poll      The current design. Three polls per interval (new, cancelled and
+            paid orders), then an items fetch and a flag update for each
+            job found. "as written" is the single unscoped bridge in
+            server.js. "per tenant" is one bridge per organization with an
+            organization_id filter added.
+  claim     One claim_print_jobs(p_organization_id) RPC per interval. It
+            marks the due jobs and returns them with their items
+            (FOR UPDATE SKIP LOCKED, so overlapping ticks never print an
+            order twice).
+  notify    An ordini trigger sends pg_notify on a per-tenant channel. The
+            bridge claims on each notification, plus a slow safety poll for
+            notifications lost while it was disconnected.
+
+idx_ordini_printed is a partial index on printed = false and has no tenant
+column. Every order that is never marked printed stays in it. That covers
+cancelled-before-confirm orders and orders from any day the bridge was off,
+because the polls only look at today. So each unscoped poll walks that
+backlog for every tenant. The model prints per-tenant queue indexes that
+bound the walk to one tenant's day.
+
+--bench runs the poll/claim/notify designs on a scratch database (see
+local_postgres.py). It seeds one bridge per tenant and some order history,
+then inserts live orders at a steady rate. It measures bridge queries/min,
+ordini rows read/min (pg_stat_user_tables) and print latency, from the
+order commit to the moment the job is claimed or marked printed.
+
+Usage:
+    python printer_load_model.py                                   # Model at 1/10/100/1000 tenants
+    python printer_load_model.py --tenants 250 --orders-per-day 300
+    python printer_load_model.py --interval-ms 5000                # What-if: slower polling
+    python printer_load_model.py --json printer_model.json
+    python printer_load_model.py --bench --tenants 20 --duration 60
+    python printer_load_model.py --bench --design poll claim --json printer_bench.json
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from analysis_daemon import TENANT_COLUMN, index_candidates
+from edge_index import RoundTrip, TsFile, find_round_trips
+from local_postgres import (
+    DEFAULT_DSN, require_psycopg, connect, connect_async, prepare_bench_database, drop_scratch_database,
+    seed_organizations, latency_summary,
+)
+from saas_schema import Index, SchemaModel, load_schema
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent
+SERVER_JS = PROJECT_ROOT / "printer" / "server.js"
+
+TABLE = 'ordini'
+TENANT_STEPS = [1, 10, 100, 1000]
+BENCH_TENANTS = 20
+DESIGNS = ['poll', 'claim', 'notify']
+
+POLL_LOOP = re.compile(r'setInterval\(\s*([A-Za-z_$][\w$]*)\s*,\s*(\d+)\s*\)')
+JS_EQUALITY = {'eq', 'in', 'is', 'match'}
+JS_RANGES = {'gt', 'gte', 'lt', 'lte'}
+# Polls bound these to startOfDay..endOfDay, i.e. one day of history
+DAY_COLUMNS = {'slot_prenotato_start', 'created_at'}
+# Share of orders still in one of the active states at any moment
+ACTIVE_STATES = {'pending', 'confirmed', 'preparing', 'ready', 'delivering'}
+UNKNOWN_SELECTIVITY = 0.1
+
+
+# ---------------------------------------------------------------------------
+# Bridge polls, as written in server.js
+# ---------------------------------------------------------------------------
+
+def literal(raw: str):
+    """Value of a supabase-js filter argument: bool, string, list of strings or None (an expression)"""
+    raw = raw.strip()
+    if raw in ('true', 'false'):
+        return raw == 'true'
+    if raw.startswith('['):
+        return re.findall(r"'([^']*)'", raw)
+    match = re.fullmatch(r"'([^']*)'", raw)
+    return match.group(1) if match else None
+
+
+class Poll:
+    """One poll of the bridge loop and the queries it makes for each job it returns"""
+
+    def __init__(self, function: str, trip: RoundTrip, per_job: List[Tuple[str, RoundTrip]]):
+        self.function = function
+        self.trip = trip
+        self.per_job = per_job            # (function, round trip)
+        self.filters: List[Tuple[str, str, object]] = []     # (column, method, value)
+        for method, column, args in trip.filters:
+            if column:
+                self.filters.append((column, method, literal(args.split(',', 1)[1]) if ',' in args else None))
+        orders = [c for c in trip.calls if c.name == 'order']
+        self.order = orders[0].first_string if orders else None
+        limits = [c for c in trip.calls if c.name == 'limit']
+        self.limit = int(limits[0].args) if limits and limits[0].args.strip().isdigit() else None
+
+    @property
+    def eq(self) -> List[str]:
+        return list(dict.fromkeys(c for c, m, _ in self.filters if m in JS_EQUALITY))
+
+    @property
+    def ranges(self) -> List[str]:
+        return list(dict.fromkeys(c for c, m, _ in self.filters if m in JS_RANGES))
+
+    @property
+    def flag(self) -> Optional[str]:
+        """The `<flag> = false` column the poll drains (printed, is_cancelled_printed, ...)"""
+        for column, method, value in self.filters:
+            if method == 'eq' and value is False:
+                return column
+        return None
+
+    @property
+    def tenant_scoped(self) -> bool:
+        return TENANT_COLUMN in self.eq
+
+    def describe(self) -> str:
+        parts = []
+        for column, method, value in self.filters:
+            if method in JS_RANGES:
+                if f"{column} <>" not in parts:
+                    parts.append(f"{column} <>")
+            elif isinstance(value, list):
+                parts.append(f"{column} in ({', '.join(value)})")
+            else:
+                parts.append(f"{column} = {json.dumps(value) if value is not None else '?'}")
+        order = f", order {self.order}" if self.order else ''
+        limit = f", limit {self.limit}" if self.limit else ''
+        return f"{', '.join(parts)}{order}{limit}"
+
+
+class Bridge:
+    """The polling loop of server.js"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        source = TsFile(path)
+        match = POLL_LOOP.search(source.masked)
+        if not match:
+            raise ValueError(f"no setInterval(<loop>, <ms>) in {path}")
+        self.loop = match.group(1)
+        self.interval_ms = int(match.group(2))
+
+        trips = find_round_trips(source)
+        self.polls: List[Poll] = []
+        for trip in trips.get(self.loop, []):
+            if trip.kind != 'call':
+                continue
+            callee = [t for t in trips.get(trip.target, []) if t.is_db]
+            if len(callee) == 1 and callee[0].target == TABLE and not callee[0].is_write:
+                self.polls.append(Poll(trip.target, callee[0], []))
+            elif self.polls:
+                self.polls[-1].per_job.extend((trip.target, t) for t in callee)
+
+
+# ---------------------------------------------------------------------------
+# Model
+# ---------------------------------------------------------------------------
+
+class Workload:
+    """Tenant count and order mix the model is evaluated at"""
+
+    def __init__(self, tenants: int, args):
+        self.tenants = tenants
+        self.orders_per_day = args.orders_per_day
+        self.service_hours = args.service_hours
+        self.history_days = args.history_days
+        self.stuck_share = args.stuck_share
+        self.cancel_share = args.cancel_share
+        self.paid_share = args.paid_share
+
+    @property
+    def rows(self) -> float:
+        return self.tenants * self.orders_per_day * self.history_days
+
+    @property
+    def orders_per_min(self) -> float:
+        """Across all tenants, during service hours"""
+        return self.tenants * self.orders_per_day / (self.service_hours * 60)
+
+    def state_share(self, state: str) -> float:
+        active = 1 / (self.history_days * self.service_hours * 2)      # ~30 minutes of orders
+        if state == 'cancelled':
+            return self.cancel_share
+        if state == 'completed':
+            return max(0.0, 1 - self.cancel_share - active)
+        return active / len(ACTIVE_STATES) if state in ACTIVE_STATES else 0.0
+
+    def job_share(self, flag: Optional[str]) -> float:
+        """Share of orders that produce a job for the poll draining `flag`"""
+        return {
+            'printed': 1 - self.stuck_share,
+            'is_cancelled_printed': self.cancel_share,
+            'is_pagato_printed': self.paid_share,
+        }.get(flag, 0.0)
+
+    def selectivity(self, column: str, value) -> float:
+        if column == TENANT_COLUMN:
+            return 1 / self.tenants
+        if column in DAY_COLUMNS:
+            return 1 / self.history_days
+        if column == 'stato':
+            states = value if isinstance(value, list) else [value]
+            return sum(self.state_share(s) for s in states)
+        if column == 'printed':
+            return self.stuck_share if value is False else 1 - self.stuck_share
+        if column in ('is_cancelled_printed', 'is_pagato_printed', 'pagato'):
+            share = self.cancel_share if column == 'is_cancelled_printed' else self.paid_share
+            return 1 - share if value is False else share
+        return UNKNOWN_SELECTIVITY
+
+
+def predicate_columns(index: Index, filters: List[Tuple[str, str, object]]) -> Optional[List[str]]:
+    """Columns of a partial index predicate the query implies, or None when it does not imply it"""
+    if not index.predicate:
+        return []
+    columns = []
+    for column, value in re.findall(r'(\w+)\s*=\s*(\w+)', index.predicate):
+        wanted = {'true': True, 'false': False}.get(value.lower(), value.strip("'"))
+        if not any(c == column and m == 'eq' and v == wanted for c, m, v in filters):
+            return None
+        columns.append(column)
+    return columns
+
+
+def plan(schema: SchemaModel, poll: Poll, workload: Workload, scoped: bool,
+         extra: Optional[Index] = None) -> List[Tuple[str, float]]:
+    """Access paths for one poll with the ordini rows each visits, cheapest (the planner's pick) first"""
+    filters = poll.filters + ([(TENANT_COLUMN, 'eq', None)] if scoped and not poll.tenant_scoped else [])
+    eq = list(dict.fromkeys(c for c, m, _ in filters if m in JS_EQUALITY))
+    selectivity = {c: workload.selectivity(c, v) for c, m, v in filters}
+
+    indexes = {i.name: i for i in schema.indexes_on(TABLE)}
+    candidates = index_candidates(schema, TABLE, eq, poll.ranges, poll.order)
+    if extra is not None:
+        indexes[extra.name] = extra
+        columns = [c.split()[0] for c in extra.columns]
+        matched = len([c for c in columns[:len(eq)] if c in eq])
+        candidates.append({'name': extra.name, 'equality_columns': matched,
+                           'serves_range': matched < len(columns) and columns[matched] in poll.ranges})
+
+    paths = [('seq scan', float(workload.rows))]
+    for candidate in candidates:
+        index = indexes[candidate['name']]
+        implied = predicate_columns(index, filters)
+        if implied is None:
+            continue
+        columns = [c.split()[0] for c in index.columns]
+        used = columns[:candidate['equality_columns']]
+        if candidate['serves_range']:
+            used.append(columns[candidate['equality_columns']])
+        rows = float(workload.rows)
+        for column in set(used) | set(implied):
+            rows *= selectivity.get(column, 1.0)
+        paths.append((index.name, rows))
+    return sorted(paths, key=lambda p: p[1])
+
+
+def queue_index(poll: Poll) -> Optional[Index]:
+    """Per-tenant partial index that bounds the poll to one tenant's pending jobs"""
+    flag = poll.flag
+    key = poll.ranges[0] if poll.ranges else poll.order
+    if not flag or not key:
+        return None
+    return Index(f"idx_{TABLE}_org_{flag}_queue", TABLE, [TENANT_COLUMN, key], predicate=f"{flag} = false",
+                 source='(suggested)')
+
+
+def model_scenario(bridge: Bridge, schema: SchemaModel, workload: Workload, args) -> Dict:
+    """Queries/min, rows visited/min and print latency of each design at one tenant count"""
+    interval_ms = args.interval_ms or bridge.interval_ms
+    ticks_per_min = 60000 / interval_ms
+    orders_per_min = workload.orders_per_min
+    jobs = {p.function: orders_per_min * workload.job_share(p.flag) for p in bridge.polls}
+    per_job_queries = sum(jobs[p.function] * len(p.per_job) for p in bridge.polls)
+    first = bridge.polls[0] if bridge.polls else None
+    first_job_queries = len(first.per_job) if first else 0
+
+    partial = {i.name for i in schema.indexes_on(TABLE) if i.predicate}
+    polls = []
+    for poll in bridge.polls:
+        unscoped = plan(schema, poll, workload, scoped=False)
+        scoped = plan(schema, poll, workload, scoped=True)
+        queue = queue_index(poll)
+        suggested = plan(schema, poll, workload, scoped=True, extra=queue) if queue else scoped
+        polls.append({
+            'function': poll.function,
+            'jobs_per_min': round(jobs[poll.function], 2),
+            'as_written': {'index': unscoped[0][0], 'rows': round(unscoped[0][1], 1)},
+            'per_tenant': {'index': scoped[0][0], 'rows': round(scoped[0][1], 1)},
+            'with_queue_index': {'index': suggested[0][0], 'rows': round(suggested[0][1], 1)},
+            'partial_indexes': {name: round(rows, 1) for name, rows in unscoped if name in partial},
+            'capacity_per_tenant_min': round(poll.limit * ticks_per_min, 1) if poll.limit else None,
+        })
+
+    rtt = args.rtt_ms
+    as_written_rows = sum(p['as_written']['rows'] for p in polls)
+    per_tenant_rows = sum(p['per_tenant']['rows'] for p in polls)
+    queue_rows = sum(p['with_queue_index']['rows'] for p in polls)
+    # Claims per minute under notify: one per job (no coalescing) plus the safety polls
+    notify_claims = sum(jobs.values()) + workload.tenants * 60 / args.safety_poll_s
+    designs = {
+        'poll (as written)': {
+            'queries_per_min': ticks_per_min * len(bridge.polls) + per_job_queries,
+            'rows_per_min': ticks_per_min * as_written_rows,
+            'latency_mean_ms': interval_ms / 2 + (1 + first_job_queries) * rtt,
+            'latency_max_ms': interval_ms + (1 + first_job_queries) * rtt,
+        },
+        'poll (per tenant)': {
+            'queries_per_min': workload.tenants * ticks_per_min * len(bridge.polls) + per_job_queries,
+            'rows_per_min': workload.tenants * ticks_per_min * per_tenant_rows,
+            'latency_mean_ms': interval_ms / 2 + (1 + first_job_queries) * rtt,
+            'latency_max_ms': interval_ms + (1 + first_job_queries) * rtt,
+        },
+        'claim': {
+            'queries_per_min': workload.tenants * ticks_per_min,
+            'rows_per_min': workload.tenants * ticks_per_min * queue_rows,
+            'latency_mean_ms': interval_ms / 2 + rtt,
+            'latency_max_ms': interval_ms + rtt,
+        },
+        'notify': {
+            'queries_per_min': notify_claims,
+            'rows_per_min': notify_claims * queue_rows,
+            'latency_mean_ms': 1.5 * rtt,          # notification delivery + one claim
+            'latency_max_ms': 2 * rtt,
+        },
+    }
+    for data in designs.values():
+        for key in data:
+            data[key] = round(data[key], 1)
+
+    return {
+        'tenants': workload.tenants,
+        'ordini_rows': int(workload.rows),
+        'orders_per_min': round(orders_per_min, 2),
+        'interval_ms': interval_ms,
+        'polls': polls,
+        'designs': designs,
+    }
+
+
+def print_bridge(bridge: Bridge, schema: SchemaModel, interval_ms: int):
+    print(f"\n📄 {bridge.path.relative_to(PROJECT_ROOT)}: {bridge.loop}() every {interval_ms} ms"
+          + (f" (server.js: {bridge.interval_ms} ms)" if interval_ms != bridge.interval_ms else ''))
+    partial = [i for i in schema.indexes_on(TABLE) if i.predicate]
+    for poll in bridge.polls:
+        print(f"  🔁 {poll.function}: {TABLE} {poll.describe()}")
+        if poll.per_job:
+            print(f"     per job: {', '.join(f'{name} ({t.label})' for name, t in poll.per_job)}")
+        for index in partial:
+            if predicate_columns(index, poll.filters) is not None:
+                print(f"     partial index: {index.name} WHERE {index.predicate} [{index.source}]")
+    if any(not p.tenant_scoped for p in bridge.polls):
+        print(f"  ⚠️ No {TENANT_COLUMN} filter: one bridge claims every tenant's orders "
+              f"(and prints them on one printer)")
+    print(f"  ⚠️ setInterval does not wait for the previous tick: a print slower than the interval "
+          f"is picked up again before it is marked")
+
+
+def print_scenario(data: Dict):
+    print(f"\n📊 {data['tenants']} tenant(s): {data['orders_per_min']} orders/min at peak, "
+          f"{data['ordini_rows']:,} {TABLE} rows")
+    print(f"  {'poll':<30} {'jobs/min':>9} {'as written':>24} {'per tenant':>24}")
+    for poll in data['polls']:
+        written = f"{poll['as_written']['rows']:,.0f} ({poll['as_written']['index']})"
+        scoped = f"{poll['per_tenant']['rows']:,.0f} ({poll['per_tenant']['index']})"
+        print(f"  {poll['function']:<30} {poll['jobs_per_min']:>9} {written:>24} {scoped:>24}")
+        for name, rows in poll['partial_indexes'].items():
+            if name != poll['as_written']['index']:
+                print(f"     {name} would visit {rows:,.0f} (every tenant's unprinted backlog)")
+        capacity = poll['capacity_per_tenant_min']
+        if capacity and poll['jobs_per_min'] / data['tenants'] > capacity:
+            print(f"     ⚠️ {poll['jobs_per_min'] / data['tenants']:.1f} jobs/min per tenant exceeds "
+                  f"the {capacity} jobs/min the limit allows: the queue grows")
+    print(f"  {'design':<20} {'queries/min':>12} {'rows/min':>14} {'latency mean':>13} {'max':>9}")
+    for name, design in data['designs'].items():
+        print(f"  {name:<20} {design['queries_per_min']:>12,.1f} {design['rows_per_min']:>14,.0f} "
+              f"{design['latency_mean_ms']:>11,.0f}ms {design['latency_max_ms']:>7,.0f}ms")
+
+
+def run_model(args) -> Dict:
+    bridge = Bridge(SERVER_JS)
+    if not bridge.polls:
+        print(f"❌ No {TABLE} polls found in {bridge.loop}()")
+        sys.exit(1)
+    schema = load_schema()
+    interval_ms = args.interval_ms or bridge.interval_ms
+    print_bridge(bridge, schema, interval_ms)
+
+    scenarios = []
+    for tenants in args.tenants or TENANT_STEPS:
+        data = model_scenario(bridge, schema, Workload(tenants, args), args)
+        print_scenario(data)
+        scenarios.append(data)
+
+    print("\n" + "="*60)
+    print("SUGGESTED QUEUE INDEXES")
+    print("="*60)
+    for poll in bridge.polls:
+        index = queue_index(poll)
+        if index:
+            print(f"  {index.definition.replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS')};")
+    print(f"\n  claim and notify rows assume these indexes. Latency assumes {args.rtt_ms:g} ms per round trip;")
+    print(f"  notify claims once per job and safety-polls every {args.safety_poll_s:g}s per tenant.")
+
+    return {
+        'server': {
+            'path': str(bridge.path.relative_to(PROJECT_ROOT)),
+            'loop': bridge.loop,
+            'interval_ms': bridge.interval_ms,
+            'polls': [{'function': p.function, 'filters': p.describe(), 'tenant_scoped': p.tenant_scoped,
+                       'per_job': [name for name, _ in p.per_job]} for p in bridge.polls],
+        },
+        'scenarios': scenarios,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+# Order history for one tenant: days before today, so it is outside the day
+# the polls look at but still in idx_ordini_printed when never printed
+SEED_HISTORY_SQL = """
+INSERT INTO ordini (
+    organization_id, numero_ordine, nome_cliente, telefono_cliente, tipo, stato,
+    slot_prenotato_start, subtotale, totale, metodo_pagamento, pagato, is_pagato_printed,
+    printed, is_cancelled_printed, created_at
+)
+SELECT %(org)s, 'H' || n, 'Cliente ' || n, '0000000000', 'takeaway', h.stato,
+       h.at, 20, 20, 'cash', h.paid, h.paid, h.printed, h.stato = 'cancelled', h.at
+FROM generate_series(1, %(rows)s) AS n,
+LATERAL (SELECT
+    date_trunc('day', now()) - (1 + n %% %(days)s) * interval '1 day' + interval '19 hours' AS at,
+    CASE WHEN random() < %(cancel)s THEN 'cancelled' ELSE 'completed' END AS stato,
+    random() < %(paid)s AS paid,
+    random() >= %(stuck)s AS printed
+) h
+"""
+
+INSERT_ORDER_SQL = """
+INSERT INTO ordini (
+    organization_id, numero_ordine, nome_cliente, telefono_cliente, tipo, stato,
+    slot_prenotato_start, subtotale, totale, metodo_pagamento, pagato, source
+) VALUES (%s, %s, %s, '0000000000', 'takeaway', 'confirmed',
+          date_trunc('day', now()) + interval '20 hours', %s, %s, 'cash', %s, 'app')
+RETURNING id
+"""
+
+INSERT_ITEM_SQL = """
+INSERT INTO ordini_items (organization_id, ordine_id, nome_prodotto, prezzo_unitario, quantita, subtotale)
+VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+CANCEL_ORDER_SQL = "UPDATE ordini SET stato = 'cancelled', cancellato_at = now() WHERE id = %s"
+
+# Live orders of the previous design, dropped before the next one starts
+RESET_LIVE_SQL = "DELETE FROM ordini WHERE numero_ordine LIKE 'L%'"
+
+# server.js polls with the organization_id filter a per-tenant bridge needs
+POLL_SQL = {
+    'order': """SELECT * FROM ordini
+        WHERE organization_id = %s AND stato IN ('ready', 'confirmed') AND printed = false
+          AND slot_prenotato_start >= current_date AND slot_prenotato_start < current_date + 1
+        ORDER BY slot_prenotato_start LIMIT 5""",
+    'cancelled': """SELECT * FROM ordini
+        WHERE organization_id = %s AND stato = 'cancelled' AND is_cancelled_printed = false
+          AND slot_prenotato_start >= current_date AND slot_prenotato_start < current_date + 1
+        ORDER BY slot_prenotato_start LIMIT 5""",
+    'paid': """SELECT * FROM ordini
+        WHERE organization_id = %s AND pagato = true AND is_pagato_printed = false
+          AND created_at >= current_date AND created_at < current_date + 1
+        ORDER BY created_at LIMIT 5""",
+}
+FETCH_ITEMS_SQL = "SELECT * FROM ordini_items WHERE ordine_id = %s ORDER BY created_at"
+MARK_SQL = {
+    'order': """UPDATE ordini SET printed = true, printed_at = now() WHERE id = %s
+        RETURNING extract(epoch FROM clock_timestamp() - created_at) * 1000""",
+    'cancelled': """UPDATE ordini SET is_cancelled_printed = true WHERE id = %s
+        RETURNING extract(epoch FROM clock_timestamp() - cancellato_at) * 1000""",
+    'paid': """UPDATE ordini SET is_pagato_printed = true WHERE id = %s
+        RETURNING extract(epoch FROM clock_timestamp() - created_at) * 1000""",
+}
+JOBS_WITH_ITEMS = {'order', 'paid'}
+
+# Claim-and-mark: the three polls, their flag updates and the item fetches in
+# one statement. One statement cannot update a row twice, so an order printed
+# in this call also gets its paid slip here rather than from the paid queue
+# (otherwise a notify bridge would hold it until the tenant's next order).
+# Custom plans keep the tenant filter in each index choice: a cached generic
+# plan walks every tenant's orders of the day for the paid queue.
+CLAIM_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION claim_print_jobs(p_organization_id UUID, p_limit INTEGER DEFAULT 5)
+RETURNS TABLE (ordine_id UUID, job TEXT, waited_ms DOUBLE PRECISION, items JSONB)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+SET plan_cache_mode = force_custom_plan
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH printed AS (
+        UPDATE ordini o SET printed = true, printed_at = now(),
+                            is_pagato_printed = o.is_pagato_printed OR o.pagato
+        FROM (
+            SELECT id, pagato AND NOT is_pagato_printed AS paid_slip FROM ordini
+            WHERE organization_id = p_organization_id AND stato IN ('ready', 'confirmed') AND printed = false
+              AND slot_prenotato_start >= current_date AND slot_prenotato_start < current_date + 1
+            ORDER BY slot_prenotato_start
+            LIMIT p_limit
+            FOR UPDATE SKIP LOCKED
+        ) due
+        WHERE o.id = due.id
+        RETURNING o.id, o.created_at AS since, due.paid_slip
+    ),
+    cancelled AS (
+        UPDATE ordini o SET is_cancelled_printed = true
+        WHERE o.id IN (
+            SELECT id FROM ordini
+            WHERE organization_id = p_organization_id AND stato = 'cancelled' AND is_cancelled_printed = false
+              AND slot_prenotato_start >= current_date AND slot_prenotato_start < current_date + 1
+            ORDER BY slot_prenotato_start
+            LIMIT p_limit
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING o.id, 'cancelled'::TEXT AS job, o.cancellato_at AS since
+    ),
+    paid AS (
+        UPDATE ordini o SET is_pagato_printed = true
+        WHERE o.id IN (
+            SELECT id FROM ordini
+            WHERE organization_id = p_organization_id AND pagato = true AND is_pagato_printed = false
+              AND created_at >= current_date AND created_at < current_date + 1
+              AND id NOT IN (SELECT id FROM printed)
+            ORDER BY created_at
+            LIMIT p_limit
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING o.id, 'paid'::TEXT AS job, o.created_at AS since
+    ),
+    jobs AS (
+        SELECT id, 'order'::TEXT AS job, since FROM printed
+        UNION ALL SELECT id, 'paid', since FROM printed WHERE paid_slip
+        UNION ALL SELECT * FROM cancelled
+        UNION ALL SELECT * FROM paid
+    )
+    SELECT j.id, j.job, (extract(epoch FROM clock_timestamp() - j.since) * 1000)::DOUBLE PRECISION,
+           CASE WHEN j.job = 'cancelled' THEN '[]'::jsonb ELSE coalesce((
+               SELECT jsonb_agg(jsonb_build_object('nome', i.nome_prodotto, 'quantita', i.quantita,
+                                                   'note', i.note) ORDER BY i.created_at)
+               FROM ordini_items i WHERE i.ordine_id = j.id
+           ), '[]'::jsonb) END
+    FROM jobs j;
+END;
+$$
+"""
+
+NOTIFY_TRIGGER_SQL = [
+    """CREATE OR REPLACE FUNCTION notify_print_queue()
+    RETURNS TRIGGER
+    LANGUAGE plpgsql
+    AS $$
+    BEGIN
+        IF (NEW.printed = false AND NEW.stato IN ('ready', 'confirmed'))
+           OR (NEW.stato = 'cancelled' AND NEW.is_cancelled_printed = false)
+           OR (NEW.pagato AND NEW.is_pagato_printed = false) THEN
+            PERFORM pg_notify('print_' || replace(NEW.organization_id::text, '-', ''), NEW.id::text);
+        END IF;
+        RETURN NEW;
+    END;
+    $$""",
+    "DROP TRIGGER IF EXISTS print_queue_notify ON ordini",
+    """CREATE TRIGGER print_queue_notify
+    AFTER INSERT OR UPDATE OF stato, pagato ON ordini
+    FOR EACH ROW EXECUTE FUNCTION notify_print_queue()""",
+]
+
+ROWS_READ_SQL = """
+SELECT coalesce(seq_tup_read, 0) + coalesce(idx_tup_fetch, 0)
+FROM pg_stat_user_tables WHERE relname = 'ordini'
+"""
+
+
+def channel(org_id: str) -> str:
+    return 'print_' + org_id.replace('-', '')
+
+
+class BenchResult:
+    def __init__(self, design: str):
+        self.design = design
+        self.queries: Counter = Counter()
+        self.latencies_ms: Dict[str, List[float]] = {}
+        self.placed = 0
+        self.cancelled = 0
+        self.empty_claims = 0
+        self.wakeups = 0
+        self.safety_polls = 0
+        self.rows_read = 0
+        self.wall_seconds = 0.0
+
+    def add_job(self, job: str, waited_ms: Optional[float]):
+        if waited_ms is not None:
+            self.latencies_ms.setdefault(job, []).append(float(waited_ms))
+
+    def to_dict(self) -> Dict:
+        minutes = self.wall_seconds / 60 if self.wall_seconds else 1
+        queries = sum(self.queries.values())
+        return {
+            'design': self.design,
+            'placed': self.placed,
+            'cancelled': self.cancelled,
+            'queries': dict(self.queries),
+            'queries_per_min': round(queries / minutes, 1),
+            'rows_read_per_min': round(self.rows_read / minutes, 1),
+            'latency': {job: latency_summary(v) for job, v in sorted(self.latencies_ms.items())},
+            'empty_claims': self.empty_claims,
+            'wakeups': self.wakeups,
+            'safety_polls': self.safety_polls,
+        }
+
+
+def seed_history(conn, org_ids: List[str], args):
+    rows = args.orders_per_day * args.history_days
+    for org_id in org_ids:
+        conn.execute(SEED_HISTORY_SQL, {
+            'org': org_id, 'rows': rows, 'days': args.history_days, 'cancel': args.cancel_share,
+            'paid': args.paid_share, 'stuck': args.stuck_share,
+        })
+    conn.execute("VACUUM ANALYZE ordini")
+
+
+def install_design(conn, design: str):
+    """Claim function for every design; the notify trigger only for notify"""
+    conn.execute(RESET_LIVE_SQL)
+    conn.execute(CLAIM_FUNCTION_SQL)
+    if design == 'notify':
+        for statement in NOTIFY_TRIGGER_SQL:
+            conn.execute(statement)
+    else:
+        conn.execute("DROP TRIGGER IF EXISTS print_queue_notify ON ordini")
+    conn.execute("VACUUM ANALYZE ordini")
+
+
+def rows_read(conn) -> int:
+    # Table statistics are flushed by each backend at most once a second
+    time.sleep(1.5)
+    row = conn.execute(ROWS_READ_SQL).fetchone()
+    return int(row[0]) if row else 0
+
+
+async def poll_once(conn, org_id: str, result: BenchResult):
+    """One server.js tick: three polls, then items + flag update per job"""
+    for job, sql in POLL_SQL.items():
+        cur = await conn.execute(sql, (org_id,))
+        result.queries['poll'] += 1
+        for order in await cur.fetchall():
+            if job in JOBS_WITH_ITEMS:
+                await conn.execute(FETCH_ITEMS_SQL, (order[0],))
+                result.queries['items'] += 1
+            cur = await conn.execute(MARK_SQL[job], (order[0],))
+            result.queries['mark'] += 1
+            row = await cur.fetchone()
+            result.add_job(job, row[0] if row else None)
+
+
+async def claim_all(conn, org_id: str, args, result: BenchResult):
+    """Claim until a call comes back short of the limit"""
+    while True:
+        cur = await conn.execute("SELECT * FROM claim_print_jobs(%s, %s)", (org_id, args.limit))
+        result.queries['claim'] += 1
+        rows = await cur.fetchall()
+        for _, job, waited_ms, _ in rows:
+            result.add_job(job, waited_ms)
+        if not rows:
+            result.empty_claims += 1
+        if len(rows) < args.limit:
+            return
+
+
+async def polling_bridge(dsn: str, org_id: str, design: str, deadline: float, args, result: BenchResult):
+    conn = await connect_async(dsn)
+    async with conn:
+        interval = args.interval_ms / 1000
+        await asyncio.sleep(random.uniform(0, interval))          # bridges do not tick in step
+        next_tick = time.perf_counter()
+        while time.perf_counter() < deadline:
+            if design == 'poll':
+                await poll_once(conn, org_id, result)
+            else:
+                await claim_all(conn, org_id, args, result)
+            next_tick += interval
+            await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+
+
+async def notify_bridge(dsn: str, org_id: str, deadline: float, args, result: BenchResult):
+    """LISTEN on the tenant channel, claim on each wakeup; needs psycopg >= 3.2 for notifies(timeout=)"""
+    listener = await connect_async(dsn)
+    worker = await connect_async(dsn)
+    async with listener, worker:
+        await listener.execute(f"LISTEN {channel(org_id)}")
+        await claim_all(worker, org_id, args, result)              # start-up sweep
+        while time.perf_counter() < deadline:
+            timeout = max(0.0, min(args.safety_poll_s, deadline - time.perf_counter()))
+            woke = False
+            async for _ in listener.notifies(timeout=timeout, stop_after=1):
+                woke = True
+            if time.perf_counter() >= deadline and not woke:
+                break
+            # Coalesce the notifications that queued up behind this one
+            async for _ in listener.notifies(timeout=0):
+                pass
+            if woke:
+                result.wakeups += 1
+            else:
+                result.safety_polls += 1
+            await claim_all(worker, org_id, args, result)
+
+
+async def producer(dsn: str, org_ids: List[str], deadline: float, args, result: BenchResult):
+    """Live orders at --orders-per-min across tenants; some cancelled later"""
+    rate = args.orders_per_min / 60
+    placed: List[str] = []
+    conn = await connect_async(dsn)
+    async with conn:
+        while True:
+            await asyncio.sleep(random.expovariate(rate))
+            if time.perf_counter() >= deadline:
+                return
+            org_id = random.choice(org_ids)
+            total = round(random.uniform(10, 60), 2)
+            async with conn.transaction():
+                cur = await conn.execute(INSERT_ORDER_SQL, (
+                    org_id, f"L{result.placed:06d}", f"Cliente {result.placed}", total, total,
+                    random.random() < args.paid_share,
+                ))
+                order_id = (await cur.fetchone())[0]
+                for i in range(args.items):
+                    price = round(total / args.items, 2)
+                    await conn.execute(INSERT_ITEM_SQL, (org_id, order_id, f"Pizza {i + 1}", price, 1, price))
+            result.placed += 1
+            placed.append(order_id)
+            if len(placed) > 1 and random.random() < args.cancel_share:
+                await conn.execute(CANCEL_ORDER_SQL, (random.choice(placed[:-1]),))
+                result.cancelled += 1
+
+
+async def run_design(dsn: str, design: str, org_ids: List[str], args) -> BenchResult:
+    with connect(dsn) as conn:
+        install_design(conn, design)
+        read_before = rows_read(conn)
+
+    result = BenchResult(design)
+    started = time.perf_counter()
+    deadline = started + args.duration
+    if design == 'notify':
+        bridges = [notify_bridge(dsn, org_id, deadline, args, result) for org_id in org_ids]
+    else:
+        bridges = [polling_bridge(dsn, org_id, design, deadline, args, result) for org_id in org_ids]
+    await asyncio.gather(producer(dsn, org_ids, deadline, args, result), *bridges)
+    result.wall_seconds = time.perf_counter() - started
+
+    with connect(dsn) as conn:
+        result.rows_read = rows_read(conn) - read_before
+    return result
+
+
+def print_bench_result(data: Dict):
+    print(f"\n📊 {data['design']}")
+    print(f"  Placed: {data['placed']} orders ({data['cancelled']} cancelled)")
+    print(f"  Bridge queries: {data['queries_per_min']}/min {data['queries']}")
+    print(f"  {TABLE} rows read: {data['rows_read_per_min']:,.0f}/min")
+    for job, summary in data['latency'].items():
+        print(f"  Print latency ({job:<9}) p50 {summary['p50_ms']:>8}ms  p99 {summary['p99_ms']:>8}ms  "
+              f"max {summary['max_ms']:>8}ms  ({summary['count']} jobs)")
+    if data['design'] != 'poll':
+        print(f"  Empty claims: {data['empty_claims']}")
+    if data['design'] == 'notify':
+        print(f"  Wakeups: {data['wakeups']}  Safety polls: {data['safety_polls']}")
+
+
+def print_bench_comparison(results: List[Dict]):
+    print("\n" + "="*60)
+    print("COMPARISON")
+    print("="*60)
+    print(f"  {'design':<8} {'queries/min':>12} {'rows/min':>12} {'p50 ms':>9} {'p99 ms':>9}")
+    for data in results:
+        latency = data['latency'].get('order', latency_summary([]))
+        print(f"  {data['design']:<8} {data['queries_per_min']:>12} {data['rows_read_per_min']:>12,.0f} "
+              f"{latency['p50_ms']:>9} {latency['p99_ms']:>9}")
+
+
+async def run_bench(args) -> List[Dict]:
+    tenants = max(args.tenants) if args.tenants else BENCH_TENANTS
+    dsn = prepare_bench_database(args.dsn, args.database)
+    with connect(dsn) as conn:
+        org_ids = seed_organizations(conn, tenants, prefix='printer')
+        print(f"🌱 Seeding {args.history_days} days x {args.orders_per_day} orders of history per tenant...")
+        seed_history(conn, org_ids, args)
+
+    print(f"🚀 {tenants} bridge(s), {args.orders_per_min} orders/min, {args.duration}s per design, "
+          f"poll every {args.interval_ms} ms")
+
+    results = []
+    for design in args.design:
+        print(f"\n📝 Running design: {design}...")
+        data = (await run_design(dsn, design, org_ids, args)).to_dict()
+        print_bench_result(data)
+        results.append(data)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Printer Load Model')
+    parser.add_argument('--tenants', type=int, nargs='+',
+                        help=f'Tenant counts to model (default: {TENANT_STEPS}); --bench uses the largest '
+                             f'(default: {BENCH_TENANTS})')
+    parser.add_argument('--interval-ms', type=int, help='Poll interval (default: the one in server.js)')
+    parser.add_argument('--orders-per-day', type=int, default=150, help='Orders per tenant per day')
+    parser.add_argument('--service-hours', type=float, default=5.0, help='Hours a day orders come in')
+    parser.add_argument('--history-days', type=int, default=365, help='Days of orders kept in ordini')
+    parser.add_argument('--stuck-share', type=float, default=0.02,
+                        help='Share of orders never marked printed (never confirmed, bridge offline that day)')
+    parser.add_argument('--cancel-share', type=float, default=0.03, help='Share of orders cancelled')
+    parser.add_argument('--paid-share', type=float, default=0.5, help='Share of orders paid (pagato slip)')
+    parser.add_argument('--rtt-ms', type=float, default=30.0, help='Bridge -> database round trip (model)')
+    parser.add_argument('--safety-poll-s', type=float, default=30.0, help='Notify design: poll when idle this long')
+    parser.add_argument('--json', metavar='PATH', help='Write results as JSON')
+
+    bench = parser.add_argument_group('benchmark')
+    bench.add_argument('--bench', action='store_true', help='Benchmark the designs on a local Postgres')
+    bench.add_argument('--design', nargs='+', choices=DESIGNS, default=DESIGNS, help='Designs to benchmark')
+    bench.add_argument('--duration', type=float, default=60.0, help='Seconds per design')
+    bench.add_argument('--orders-per-min', type=float, default=120.0, help='Live orders across all tenants')
+    bench.add_argument('--items', type=int, default=3, help='Line items per order')
+    bench.add_argument('--limit', type=int, default=5, help='Jobs per claim (server.js polls use 5)')
+    bench.add_argument('--dsn', default=DEFAULT_DSN, help='Admin DSN (default: $LOCAL_DATABASE_URL)')
+    bench.add_argument('--database', default='rotante_bench_printer', help='Scratch database name')
+    bench.add_argument('--keep-database', action='store_true', help='Do not drop the scratch database')
+
+    args = parser.parse_args()
+
+    print("🖨️  Printer Load Model")
+    print("="*60)
+
+    if not args.bench:
+        output = {'args': vars(args), **run_model(args)}
+    else:
+        require_psycopg()
+        if args.interval_ms is None:
+            args.interval_ms = Bridge(SERVER_JS).interval_ms
+        try:
+            results = asyncio.run(run_bench(args))
+        finally:
+            if not args.keep_database:
+                drop_scratch_database(args.dsn, args.database)
+        print_bench_comparison(results)
+        output = {'args': vars(args), 'results': results}
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
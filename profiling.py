@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Migration Profiler
+==================
+Backs the --profile flag of the migration scripts. Scripts wrap their steps
+(and per-file work) in `profiler.phase(...)`. While the profiler runs it
+also hooks file reads and writes (Path.read_text/write_text/read_bytes/
+write_bytes, shutil.copy2) and regex scans, so the scripts need no other
+changes. Regex scans are counted for the module-level `re` functions and for
+compiled patterns: re.compile returns a counting proxy, and the patterns the
+project's modules and classes compiled at import time are swapped for
+proxies until uninstall(). Patterns held only in containers or default
+arguments are not counted. Each phase records:
+
+  - wall time (nested phases are included in their parents)
+  - bytes read and written, and which files took the I/O time
+  - regex calls, matches and time, by calling function
+  - peak RSS when the phase ends
+
+Results go to a Chrome trace-event JSON (open it in chrome://tracing or
+https://ui.perfetto.dev) and a text summary sorted by time.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROJECT_ROOT = Path(__file__).parent
+
+REGEX_FUNCTIONS = ('search', 'match', 'fullmatch', 'findall', 'finditer', 'sub', 'subn')
+TOP = 15
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def human_bytes(count: int) -> str:
+    if count < 1024:
+        return f"{count} B"
+    if count < 1024 * 1024:
+        return f"{count / 1024:.1f} KB"
+    return f"{count / (1024 * 1024):.1f} MB"
+
+
+def display_path(path) -> str:
+    path = Path(path)
+    try:
+        return path.resolve().relative_to(PROJECT_ROOT.resolve()).as_posix()
+    except ValueError:
+        return str(path)
+
+
+class PhaseStats:
+    def __init__(self, name: str, depth: int):
+        self.name = name
+        self.depth = depth
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.regex_calls = 0
+        self.regex_matches = 0
+        self.peak_rss_mb: Optional[float] = None
+
+
+class FileStats:
+    def __init__(self):
+        self.seconds = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+
+class RegexStats:
+    def __init__(self):
+        self.calls = 0
+        self.matches = 0
+        self.seconds = 0.0
+
+
+class ProfiledPattern:
+    """A compiled pattern whose scans are counted by the profiler"""
+
+    def __init__(self, pattern: 're.Pattern', profiler: 'Profiler'):
+        self.pattern_object = pattern
+        self._profiler = profiler
+        self._hooks: Dict[str, object] = {}
+
+    def __getattr__(self, name: str):
+        if name not in REGEX_FUNCTIONS:
+            return getattr(self.pattern_object, name)
+        hook = self._hooks.get(name)
+        if hook is None:
+            hook = self._hooks[name] = self._profiler._regex_hook(
+                name, getattr(self.pattern_object, name), self.pattern_object.subn, f"Pattern.{name}",
+            )
+        return hook
+
+    def __repr__(self) -> str:
+        return repr(self.pattern_object)
+
+
+def unwrap_pattern(pattern):
+    return pattern.pattern_object if isinstance(pattern, ProfiledPattern) else pattern
+
+
+class Profiler:
+    """Phase timings, I/O and regex counters for one script run"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.events: List[dict] = []
+        self.stack: List[PhaseStats] = []
+        self.phases: Dict[str, PhaseStats] = {}
+        self.files: Dict[str, FileStats] = {}
+        self.regex: Dict[Tuple[str, str], RegexStats] = {}
+        self._originals: Dict[Tuple[object, str], object] = {}
+
+    # -- recording -------------------------------------------------------------
+
+    def _us(self, moment: float) -> float:
+        return (moment - self.origin) * 1e6
+
+    @contextmanager
+    def phase(self, name: str, category: str = 'phase') -> Iterator[None]:
+        """Time a step; phases nest, and the same name accumulates across calls"""
+        if not self.enabled:
+            yield
+            return
+        key = ' › '.join([p.name for p in self.stack] + [name])
+        stats = self.phases.get(key)
+        if stats is None:
+            stats = self.phases[key] = PhaseStats(key, len(self.stack))
+        self.stack.append(stats)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.stack.pop()
+            stats.calls += 1
+            stats.seconds += end - start
+            stats.peak_rss_mb = peak_rss_mb()
+            self.events.append({
+                'name': name, 'cat': category, 'ph': 'X', 'pid': os.getpid(), 'tid': 1,
+                'ts': self._us(start), 'dur': (end - start) * 1e6,
+            })
+            if stats.peak_rss_mb is not None:
+                self.events.append({
+                    'name': 'peak RSS', 'ph': 'C', 'pid': os.getpid(), 'tid': 1,
+                    'ts': self._us(end), 'args': {'MB': round(stats.peak_rss_mb, 1)},
+                })
+
+    def _io(self, kind: str, path, start: float, read: int = 0, written: int = 0):
+        end = time.perf_counter()
+        name = display_path(path)
+        stats = self.files.setdefault(name, FileStats())
+        stats.seconds += end - start
+        stats.bytes_read += read
+        stats.bytes_written += written
+        for phase in self.stack:
+            phase.bytes_read += read
+            phase.bytes_written += written
+        self.events.append({
+            'name': f"{kind} {Path(name).name}", 'cat': 'io', 'ph': 'X', 'pid': os.getpid(), 'tid': 1,
+            'ts': self._us(start), 'dur': (end - start) * 1e6,
+            'args': {'path': name, 'bytes': read or written},
+        })
+
+    def _regex(self, function: str, caller: str, start: float, matches: int):
+        stats = self.regex.setdefault((caller, function), RegexStats())
+        stats.calls += 1
+        stats.matches += matches
+        stats.seconds += time.perf_counter() - start
+        for phase in self.stack:
+            phase.regex_calls += 1
+            phase.regex_matches += matches
+
+    # -- hooks -----------------------------------------------------------------
+
+    def _patch(self, owner, name: str, replacement):
+        self._originals[(owner, name)] = getattr(owner, name)
+        setattr(owner, name, replacement)
+
+    def install(self):
+        """Hook file I/O and the re module until uninstall()"""
+        if not self.enabled or self._originals:
+            return
+        profiler = self
+        read_text, write_text = Path.read_text, Path.write_text
+        read_bytes, write_bytes = Path.read_bytes, Path.write_bytes
+        copy2 = shutil.copy2
+
+        def profiled_read_text(path, *args, **kwargs):
+            start = time.perf_counter()
+            text = read_text(path, *args, **kwargs)
+            profiler._io('read', path, start, read=len(text.encode('utf-8', 'surrogatepass')))
+            return text
+
+        def profiled_write_text(path, data, *args, **kwargs):
+            start = time.perf_counter()
+            result = write_text(path, data, *args, **kwargs)
+            profiler._io('write', path, start, written=len(data.encode('utf-8', 'surrogatepass')))
+            return result
+
+        def profiled_read_bytes(path):
+            start = time.perf_counter()
+            data = read_bytes(path)
+            profiler._io('read', path, start, read=len(data))
+            return data
+
+        def profiled_write_bytes(path, data):
+            start = time.perf_counter()
+            result = write_bytes(path, data)
+            profiler._io('write', path, start, written=len(data))
+            return result
+
+        def profiled_copy2(src, dst, *args, **kwargs):
+            start = time.perf_counter()
+            result = copy2(src, dst, *args, **kwargs)
+            size = os.path.getsize(result)
+            profiler._io('copy', src, start, read=size, written=size)
+            return result
+
+        self._patch(Path, 'read_text', profiled_read_text)
+        self._patch(Path, 'write_text', profiled_write_text)
+        self._patch(Path, 'read_bytes', profiled_read_bytes)
+        self._patch(Path, 'write_bytes', profiled_write_bytes)
+        self._patch(shutil, 'copy2', profiled_copy2)
+        subn, compile_, split = re.subn, re.compile, re.split
+        for function in REGEX_FUNCTIONS:
+            self._patch(re, function, self._regex_hook(function, getattr(re, function), subn, f"re.{function}"))
+
+        def profiled_compile(pattern, *args, **kwargs):
+            return ProfiledPattern(compile_(unwrap_pattern(pattern), *args, **kwargs), profiler)
+
+        def profiled_split(pattern, *args, **kwargs):
+            return split(unwrap_pattern(pattern), *args, **kwargs)
+
+        self._patch(re, 'compile', profiled_compile)
+        self._patch(re, 'split', profiled_split)
+        self._proxy_compiled_patterns()
+
+    def _proxy_compiled_patterns(self):
+        """Swap the patterns project modules and their classes compiled at import time for proxies"""
+        root = PROJECT_ROOT.resolve()
+        for module in list(sys.modules.values()):
+            path = getattr(module, '__file__', None)
+            if not path or module.__name__ == __name__ or not Path(path).resolve().is_relative_to(root):
+                continue
+            owners = [module] + [value for value in vars(module).values()
+                                 if isinstance(value, type) and value.__module__ == module.__name__]
+            for owner in owners:
+                for name, value in list(vars(owner).items()):
+                    if isinstance(value, re.Pattern):
+                        self._patch(owner, name, ProfiledPattern(value, self))
+
+    def _regex_hook(self, function: str, original, subn, label: str):
+        profiler = self
+
+        def hook(*args, **kwargs):
+            frame = sys._getframe(1)
+            caller = f"{Path(frame.f_code.co_filename).stem}.{frame.f_code.co_name}"
+            start = time.perf_counter()
+            if label.startswith('re.') and args:
+                args = (unwrap_pattern(args[0]),) + args[1:]
+            if function == 'sub':
+                result, matches = subn(*args, **kwargs)
+                profiler._regex(label, caller, start, matches)
+                return result
+            result = original(*args, **kwargs)
+            if function == 'finditer':
+                result = list(result)
+                matches = len(result)
+                profiler._regex(label, caller, start, matches)
+                return iter(result)
+            if function == 'findall':
+                matches = len(result)
+            elif function == 'subn':
+                matches = result[1]
+            else:
+                matches = int(result is not None)
+            profiler._regex(label, caller, start, matches)
+            return result
+
+        return hook
+
+    def uninstall(self):
+        for (owner, name), original in self._originals.items():
+            setattr(owner, name, original)
+        self._originals = {}
+
+    # -- output ----------------------------------------------------------------
+
+    def summary(self, title: str) -> str:
+        total = time.perf_counter() - self.origin
+        rss = peak_rss_mb()
+        lines = [f"{title}: {total * 1000:.1f} ms wall" + (f", peak RSS {rss:.1f} MB" if rss else '')]
+
+        lines.append("\nPhases (by wall time, nested phases included in their parents)")
+        for stats in sorted(self.phases.values(), key=lambda s: -s.seconds)[:TOP * 2]:
+            calls = f" ×{stats.calls}" if stats.calls > 1 else ''
+            lines.append(
+                f"  {stats.seconds * 1000:9.1f} ms {stats.seconds / total * 100:5.1f}%  {stats.name}{calls}"
+                f"  [read {human_bytes(stats.bytes_read)}, wrote {human_bytes(stats.bytes_written)}, "
+                f"regex {stats.regex_calls} calls / {stats.regex_matches} matches"
+                + (f", RSS {stats.peak_rss_mb:.1f} MB" if stats.peak_rss_mb else '') + "]"
+            )
+
+        lines.append(f"\nFiles (top {TOP} by I/O time)")
+        for name, stats in sorted(self.files.items(), key=lambda f: -f[1].seconds)[:TOP]:
+            lines.append(f"  {stats.seconds * 1000:9.2f} ms  read {human_bytes(stats.bytes_read):>9}  "
+                         f"wrote {human_bytes(stats.bytes_written):>9}  {name}")
+        lines.append(f"  {len(self.files)} files, read {human_bytes(sum(f.bytes_read for f in self.files.values()))}, "
+                     f"wrote {human_bytes(sum(f.bytes_written for f in self.files.values()))}")
+
+        lines.append(f"\nRegex (top {TOP} by time)")
+        for (caller, function), stats in sorted(self.regex.items(), key=lambda r: -r[1].seconds)[:TOP]:
+            lines.append(f"  {stats.seconds * 1000:9.2f} ms  {stats.calls:6} calls  {stats.matches:6} matches  "
+                         f"{function} in {caller}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, trace_path: Path, title: str):
+        """Write the Chrome trace and the text summary next to it, and print the summary"""
+        self.uninstall()
+        trace_path.parent.mkdir(parents=True, exist_ok=True)
+        trace = {'traceEvents': sorted(self.events, key=lambda e: e['ts']), 'displayTimeUnit': 'ms',
+                 'otherData': {'title': title}}
+        trace_path.write_text(json.dumps(trace), encoding='utf-8')
+        summary_path = trace_path.with_name(trace_path.name.replace('.trace.json', '') + '.profile.txt')
+        summary = self.summary(title)
+        summary_path.write_text(summary, encoding='utf-8')
+
+        print("\n" + "="*60)
+        print("PROFILE")
+        print("="*60)
+        print(summary)
+        print(f"📈 Trace: {display_path(trace_path)} (chrome://tracing or ui.perfetto.dev)")
+        print(f"📄 Summary: {display_path(summary_path)}")
+
+
+def default_trace_path(script: str) -> Path:
+    return PROJECT_ROOT / f"{Path(script).stem}.trace.json"
@@ -0,0 +1,713 @@
+#!/usr/bin/env python3
+"""
+SaaS Schema Helpers
+===================
+Reads the SQL migrations in database_migrations/saas/ so the tooling can
+replay them against a local Postgres, and folds them into a schema model
+(tables, columns, foreign keys, indexes, triggers, functions) for the
+analyzers.
+
+Usage:
+    python saas_schema.py --statements     # List statements per migration
+    python saas_schema.py --tables         # Print the schema model
+"""
+
+import re
+import sys
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent
+MIGRATIONS_DIR = PROJECT_ROOT / "database_migrations" / "saas"
+
+# Transaction control is handled by the caller when replaying migrations
+TRANSACTION_STATEMENTS = {'BEGIN', 'COMMIT', 'ROLLBACK', 'END'}
+
+DOLLAR_TAG = re.compile(r'\$[A-Za-z_0-9]*\$')
+
+# Words that end the type part of a column definition
+COLUMN_CONSTRAINT_WORDS = (
+    'NOT', 'NULL', 'DEFAULT', 'PRIMARY', 'REFERENCES', 'UNIQUE', 'CHECK',
+    'CONSTRAINT', 'GENERATED', 'COLLATE',
+)
+
+TABLE_CONSTRAINT_WORDS = ('CONSTRAINT', 'PRIMARY', 'UNIQUE', 'FOREIGN', 'CHECK', 'EXCLUDE')
+
+# Approximate JSON-encoded size of one value, as PostgREST sends it
+JSON_VALUE_BYTES = {
+    'uuid': 38,
+    'text': 24,
+    'varchar': 24,
+    'integer': 4,
+    'int': 4,
+    'bigint': 6,
+    'smallint': 2,
+    'numeric': 7,
+    'double precision': 8,
+    'real': 8,
+    'boolean': 5,
+    'timestamptz': 34,
+    'timestamp': 28,
+    'date': 12,
+    'time': 10,
+    'jsonb': 96,
+    'json': 96,
+}
+DEFAULT_JSON_VALUE_BYTES = 24
+
+CREATE_TABLE = re.compile(
+    r'^CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?:public\.)?(\w+)\s*\((.*)\)\s*$',
+    re.IGNORECASE | re.DOTALL,
+)
+ALTER_TABLE = re.compile(
+    r'^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?(?:public\.)?(\w+)\s+(.*)$',
+    re.IGNORECASE | re.DOTALL,
+)
+CREATE_INDEX = re.compile(
+    r'^CREATE\s+(UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+'
+    r'ON\s+(?:ONLY\s+)?(?:public\.)?(\w+)\s*(?:USING\s+(\w+)\s*)?\(',
+    re.IGNORECASE,
+)
+DROP_INDEX = re.compile(
+    r'^DROP\s+INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+EXISTS\s+)?([\w\s,.]+?)\s*(?:CASCADE|RESTRICT)?\s*$',
+    re.IGNORECASE,
+)
+CREATE_FUNCTION = re.compile(
+    r'^CREATE\s+(?:OR\s+REPLACE\s+)?FUNCTION\s+(?:public\.)?(\w+)\s*\(',
+    re.IGNORECASE,
+)
+CREATE_TRIGGER = re.compile(
+    r'^CREATE\s+(?:OR\s+REPLACE\s+)?TRIGGER\s+(\w+)\s+(BEFORE|AFTER|INSTEAD\s+OF)\s+(.+?)\s+'
+    r'ON\s+(?:public\.)?(\w+)\s+(.*?)EXECUTE\s+(?:FUNCTION|PROCEDURE)\s+(?:public\.)?(\w+)',
+    re.IGNORECASE | re.DOTALL,
+)
+DROP_TRIGGER = re.compile(
+    r'^DROP\s+TRIGGER\s+(?:IF\s+EXISTS\s+)?(\w+)\s+ON\s+(?:public\.)?(\w+)',
+    re.IGNORECASE,
+)
+SET_NOT_NULL = re.compile(
+    r'ALTER\s+TABLE\s+(?:public\.)?(\w+)\s+ALTER\s+COLUMN\s+(\w+)\s+SET\s+NOT\s+NULL',
+    re.IGNORECASE,
+)
+REFERENCES = re.compile(
+    r'REFERENCES\s+(?:public\.|auth\.)?(\w+)\s*(?:\(\s*(\w+)\s*\))?(?:.*?ON\s+DELETE\s+(CASCADE|SET\s+NULL|RESTRICT|NO\s+ACTION|SET\s+DEFAULT))?',
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+class Column:
+    def __init__(self, name: str, data_type: str, not_null: bool = False,
+                 default: Optional[str] = None, primary_key: bool = False):
+        self.name = name
+        self.data_type = data_type
+        self.not_null = not_null or primary_key
+        self.default = default
+        self.primary_key = primary_key
+
+    @property
+    def base_type(self) -> str:
+        """Type without modifiers: NUMERIC(10,2) -> numeric"""
+        base = re.sub(r'\(.*\)', '', self.data_type).strip().lower()
+        if base.endswith('[]'):
+            return 'array'
+        if base in ('timestamp with time zone',):
+            return 'timestamptz'
+        if base in ('character varying',):
+            return 'varchar'
+        return base
+
+    @property
+    def json_bytes(self) -> int:
+        """Estimated bytes of `"name":value,` in a PostgREST response"""
+        value = JSON_VALUE_BYTES.get(self.base_type, DEFAULT_JSON_VALUE_BYTES)
+        return len(self.name) + 4 + value
+
+
+class ForeignKey:
+    def __init__(self, table: str, columns: List[str], ref_table: str,
+                 ref_columns: List[str], on_delete: Optional[str]):
+        self.table = table
+        self.columns = columns
+        self.ref_table = ref_table
+        self.ref_columns = ref_columns
+        self.on_delete = (on_delete or 'NO ACTION').upper()
+
+
+class Index:
+    def __init__(self, name: str, table: str, columns: List[str], unique: bool = False,
+                 method: str = 'btree', predicate: Optional[str] = None,
+                 include: Optional[List[str]] = None, source: str = '',
+                 constraint: bool = False):
+        self.name = name
+        self.table = table
+        self.columns = columns
+        self.unique = unique
+        self.method = method.lower()
+        self.predicate = predicate
+        self.include = include or []
+        self.source = source
+        self.constraint = constraint
+
+    @property
+    def definition(self) -> str:
+        unique = 'UNIQUE ' if self.unique else ''
+        using = f' USING {self.method}' if self.method != 'btree' else ''
+        sql = f"CREATE {unique}INDEX {self.name} ON {self.table}{using} ({', '.join(self.columns)})"
+        if self.include:
+            sql += f" INCLUDE ({', '.join(self.include)})"
+        if self.predicate:
+            sql += f" WHERE {self.predicate}"
+        return sql
+
+
+class Trigger:
+    def __init__(self, name: str, table: str, timing: str, events: List[str],
+                 function: str, for_each_row: bool, source: str = ''):
+        self.name = name
+        self.table = table
+        self.timing = timing.upper()
+        self.events = events
+        self.function = function
+        self.for_each_row = for_each_row
+        self.source = source
+
+
+class Function:
+    def __init__(self, name: str, arguments: str, returns: str, language: str,
+                 security_definer: bool, body: str, source: str = ''):
+        self.name = name
+        self.arguments = arguments
+        self.returns = returns
+        self.language = language
+        self.security_definer = security_definer
+        self.body = body
+        self.source = source
+
+
+class Table:
+    def __init__(self, name: str, source: str = ''):
+        self.name = name
+        self.source = source
+        self.columns: Dict[str, Column] = {}
+        self.primary_key: List[str] = []
+        self.foreign_keys: List[ForeignKey] = []
+
+    def has_column(self, name: str) -> bool:
+        return name in self.columns
+
+    def row_json_bytes(self, columns: Optional[List[str]] = None) -> int:
+        """Estimated JSON bytes of one row restricted to `columns` (all if None)"""
+        names = self.columns.keys() if columns is None else columns
+        return 2 + sum(self.columns[c].json_bytes for c in names if c in self.columns)
+
+
+class SchemaModel:
+    def __init__(self):
+        self.tables: Dict[str, Table] = {}
+        self.indexes: Dict[str, Index] = {}
+        self.triggers: Dict[str, Trigger] = {}
+        self.functions: Dict[str, Function] = {}
+
+    def table(self, name: str) -> Optional[Table]:
+        return self.tables.get(name)
+
+    def indexes_on(self, table: str) -> List[Index]:
+        return [i for i in self.indexes.values() if i.table == table]
+
+    def triggers_on(self, table: str) -> List[Trigger]:
+        return [t for t in self.triggers.values() if t.table == table]
+
+    def references_to(self, table: str) -> List[ForeignKey]:
+        """Foreign keys in other tables that point at `table`"""
+        return [fk for t in self.tables.values() for fk in t.foreign_keys if fk.ref_table == table]
+
+
+def migration_files() -> List[Path]:
+    """Get the SaaS migration files in apply order"""
+    return sorted(MIGRATIONS_DIR.glob("*.sql"))
+
+
+def existing_migration(slug: str) -> Optional[Path]:
+    """The latest migration written for this slug, if any"""
+    existing = [p for p in migration_files() if re.match(r'^\d+_%s\.sql$' % re.escape(slug), p.name)]
+    return existing[-1] if existing else None
+
+
+def next_migration_path(slug: str) -> Path:
+    """Path for a new migration numbered after the last one"""
+    numbers = [int(m.group(1)) for m in (re.match(r'^(\d+)_', p.name) for p in migration_files()) if m]
+    return MIGRATIONS_DIR / f"{(max(numbers) if numbers else 0) + 1:03d}_{slug}.sql"
+
+
+def migration_target(slug: str, render: Callable[[Path], str]) -> Tuple[Path, str]:
+    """Path and SQL for a generated migration: the existing one if unchanged, else a new number"""
+    # A written migration may already be applied: never rewrite it in place
+    existing = existing_migration(slug)
+    if existing and existing.read_text(encoding='utf-8') == render(existing):
+        return existing, render(existing)
+    migration = next_migration_path(slug)
+    return migration, render(migration)
+
+
+def migration_header(number_and_title: str, purpose: str) -> str:
+    """Banner comment in the style of the existing migrations"""
+    rule = '-- ' + '=' * 75
+    return '\n'.join([
+        rule,
+        f"-- MIGRATION {number_and_title.upper()}",
+        f"-- {purpose}",
+        rule,
+        '',
+    ])
+
+
+def split_sql_statements(sql: str) -> List[str]:
+    """Split a SQL script into statements, respecting quotes, comments and $$ bodies"""
+    statements = []
+    start = 0
+    i = 0
+    length = len(sql)
+
+    while i < length:
+        ch = sql[i]
+
+        if ch == '-' and sql.startswith('--', i):
+            end = sql.find('\n', i)
+            i = length if end == -1 else end + 1
+            continue
+
+        if ch == '/' and sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            continue
+
+        if ch in ("'", '"'):
+            # '' and "" are escapes inside their own quote type
+            i += 1
+            while i < length:
+                if sql[i] == ch:
+                    if i + 1 < length and sql[i + 1] == ch:
+                        i += 2
+                        continue
+                    break
+                i += 1
+            i += 1
+            continue
+
+        if ch == '$':
+            tag = DOLLAR_TAG.match(sql, i)
+            if tag:
+                end = sql.find(tag.group(0), tag.end())
+                i = length if end == -1 else end + len(tag.group(0))
+                continue
+
+        if ch == ';':
+            statement = sql[start:i].strip()
+            if statement:
+                statements.append(statement)
+            start = i + 1
+
+        i += 1
+
+    tail = sql[start:].strip()
+    if strip_sql_comments(tail):
+        statements.append(tail)
+
+    return statements
+
+
+def strip_sql_comments(statement: str) -> str:
+    """Remove leading/trailing comment lines so only executable SQL remains"""
+    lines = []
+    for line in statement.splitlines():
+        if line.strip().startswith('--'):
+            continue
+        lines.append(line)
+    return '\n'.join(lines).strip()
+
+
+def is_transaction_control(statement: str) -> bool:
+    """True for BEGIN/COMMIT and friends"""
+    return strip_sql_comments(statement).upper() in TRANSACTION_STATEMENTS
+
+
+def migration_statements(path: Path) -> List[str]:
+    """Executable statements of one migration, without its transaction wrapper"""
+    statements = []
+    for statement in split_sql_statements(path.read_text(encoding='utf-8')):
+        executable = strip_sql_comments(statement)
+        if not executable or is_transaction_control(executable):
+            continue
+        statements.append(executable)
+    return statements
+
+
+def strip_inline_comments(sql: str) -> str:
+    """Remove -- and /* */ comments anywhere outside quotes and $$ bodies"""
+    out = []
+    i = 0
+    length = len(sql)
+
+    while i < length:
+        ch = sql[i]
+
+        if ch == '-' and sql.startswith('--', i):
+            end = sql.find('\n', i)
+            i = length if end == -1 else end
+            continue
+
+        if ch == '/' and sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            out.append(' ')
+            continue
+
+        if ch in ("'", '"'):
+            j = i + 1
+            while j < length:
+                if sql[j] == ch:
+                    if j + 1 < length and sql[j + 1] == ch:
+                        j += 2
+                        continue
+                    break
+                j += 1
+            out.append(sql[i:j + 1])
+            i = j + 1
+            continue
+
+        if ch == '$':
+            tag = DOLLAR_TAG.match(sql, i)
+            if tag:
+                end = sql.find(tag.group(0), tag.end())
+                stop = length if end == -1 else end + len(tag.group(0))
+                out.append(sql[i:stop])
+                i = stop
+                continue
+
+        out.append(ch)
+        i += 1
+
+    return ''.join(out)
+
+
+def split_top_level(text: str, separator: str = ',') -> List[str]:
+    """Split on `separator` outside parentheses and quotes"""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = None
+            continue
+        if ch in ("'", '"'):
+            quote = ch
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == separator and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+
+    tail = text[start:].strip()
+    if tail:
+        parts.append(tail)
+    return parts
+
+
+def balanced_parens(text: str, open_index: int) -> int:
+    """Index of the parenthesis closing the one at `open_index`"""
+    depth = 0
+    quote = None
+    for i in range(open_index, len(text)):
+        ch = text[i]
+        if quote:
+            if ch == quote:
+                quote = None
+            continue
+        if ch in ("'", '"'):
+            quote = ch
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(text) - 1
+
+
+def parse_column(definition: str) -> Optional[Column]:
+    """Parse `name TYPE [constraints]`"""
+    match = re.match(r'^"?(\w+)"?\s+(.*)$', definition, re.DOTALL)
+    if not match:
+        return None
+    name, rest = match.groups()
+    stop = re.search(r'\s(?:%s)\b' % '|'.join(COLUMN_CONSTRAINT_WORDS), ' ' + rest, re.IGNORECASE)
+    data_type = (rest if not stop else rest[:stop.start()]).strip()
+    constraints = '' if not stop else rest[stop.start():]
+
+    default = None
+    default_match = re.search(
+        r'\bDEFAULT\s+(.+?)(?=\s+(?:NOT|NULL|PRIMARY|REFERENCES|UNIQUE|CHECK|CONSTRAINT)\b|$)',
+        constraints, re.IGNORECASE | re.DOTALL,
+    )
+    if default_match:
+        default = default_match.group(1).strip()
+
+    return Column(
+        name,
+        ' '.join(data_type.split()),
+        not_null=bool(re.search(r'\bNOT\s+NULL\b', constraints, re.IGNORECASE)),
+        default=default,
+        primary_key=bool(re.search(r'\bPRIMARY\s+KEY\b', constraints, re.IGNORECASE)),
+    )
+
+
+def column_list(text: str) -> List[str]:
+    return [c.strip().strip('"') for c in text.split(',') if c.strip()]
+
+
+def apply_table_constraint(table: Table, definition: str, schema: SchemaModel, source: str):
+    """PRIMARY KEY / UNIQUE / FOREIGN KEY clauses of CREATE or ALTER TABLE"""
+    body = re.sub(r'^CONSTRAINT\s+\w+\s+', '', definition, flags=re.IGNORECASE)
+    name_match = re.match(r'^CONSTRAINT\s+(\w+)', definition, re.IGNORECASE)
+
+    pk = re.match(r'^PRIMARY\s+KEY\s*\(([^)]*)\)', body, re.IGNORECASE)
+    if pk:
+        table.primary_key = column_list(pk.group(1))
+        for c in table.primary_key:
+            if c in table.columns:
+                table.columns[c].not_null = True
+        return
+
+    unique = re.match(r'^UNIQUE\s*\(([^)]*)\)', body, re.IGNORECASE)
+    if unique:
+        columns = column_list(unique.group(1))
+        name = name_match.group(1) if name_match else f"{table.name}_{'_'.join(columns)}_key"
+        schema.indexes[name] = Index(name, table.name, columns, unique=True, source=source, constraint=True)
+        return
+
+    fk = re.match(r'^FOREIGN\s+KEY\s*\(([^)]*)\)\s*(REFERENCES.*)$', body, re.IGNORECASE | re.DOTALL)
+    if fk:
+        ref = REFERENCES.search(fk.group(2))
+        if ref:
+            table.foreign_keys.append(ForeignKey(
+                table.name, column_list(fk.group(1)), ref.group(1),
+                [ref.group(2) or 'id'], ref.group(3),
+            ))
+
+
+def add_column(table: Table, definition: str, schema: SchemaModel, source: str):
+    column = parse_column(definition)
+    if not column:
+        return
+    table.columns[column.name] = column
+    if column.primary_key:
+        table.primary_key = [column.name]
+    if re.search(r'\bUNIQUE\b', definition, re.IGNORECASE) and not column.primary_key:
+        name = f"{table.name}_{column.name}_key"
+        schema.indexes[name] = Index(name, table.name, [column.name], unique=True, source=source, constraint=True)
+    ref = REFERENCES.search(definition)
+    if ref:
+        table.foreign_keys.append(ForeignKey(
+            table.name, [column.name], ref.group(1), [ref.group(2) or 'id'], ref.group(3),
+        ))
+
+
+def apply_create_table(schema: SchemaModel, match, source: str):
+    name, body = match.groups()
+    table = Table(name, source)
+    for definition in split_top_level(body):
+        first_word = re.match(r'^\w*', definition).group(0).upper()
+        if first_word in TABLE_CONSTRAINT_WORDS:
+            apply_table_constraint(table, definition, schema, source)
+        else:
+            add_column(table, definition, schema, source)
+    schema.tables[name] = table
+
+
+def apply_alter_table(schema: SchemaModel, match, source: str):
+    name, actions = match.groups()
+    table = schema.tables.get(name)
+    if not table:
+        return
+
+    for action in split_top_level(actions):
+        add = re.match(r'^ADD\s+COLUMN\s+(IF\s+NOT\s+EXISTS\s+)?(.*)$', action, re.IGNORECASE | re.DOTALL)
+        if add:
+            column_name = add.group(2).split(None, 1)[0].strip('"')
+            if not (add.group(1) and column_name in table.columns):
+                add_column(table, add.group(2), schema, source)
+            continue
+        drop = re.match(r'^DROP\s+COLUMN\s+(?:IF\s+EXISTS\s+)?"?(\w+)"?', action, re.IGNORECASE)
+        if drop:
+            table.columns.pop(drop.group(1), None)
+            continue
+        not_null = re.match(r'^ALTER\s+COLUMN\s+(\w+)\s+(SET|DROP)\s+NOT\s+NULL', action, re.IGNORECASE)
+        if not_null and not_null.group(1) in table.columns:
+            table.columns[not_null.group(1)].not_null = not_null.group(2).upper() == 'SET'
+            continue
+        constraint = re.match(r'^ADD\s+(.*)$', action, re.IGNORECASE | re.DOTALL)
+        if constraint:
+            apply_table_constraint(table, constraint.group(1), schema, source)
+
+
+def apply_create_index(schema: SchemaModel, statement: str, match, source: str):
+    unique, name, table, method = match.groups()
+    open_index = match.end() - 1
+    close_index = balanced_parens(statement, open_index)
+    columns = split_top_level(statement[open_index + 1:close_index])
+    rest = statement[close_index + 1:]
+
+    include = None
+    include_match = re.match(r'\s*INCLUDE\s*\(([^)]*)\)', rest, re.IGNORECASE)
+    if include_match:
+        include = column_list(include_match.group(1))
+    predicate = None
+    where = re.search(r'\bWHERE\s+(.*)$', rest, re.IGNORECASE | re.DOTALL)
+    if where:
+        predicate = ' '.join(where.group(1).split())
+
+    schema.indexes[name] = Index(
+        name, table, [' '.join(c.split()) for c in columns], unique=bool(unique),
+        method=method or 'btree', predicate=predicate, include=include, source=source,
+    )
+
+
+def apply_create_function(schema: SchemaModel, statement: str, match, source: str):
+    name = match.group(1)
+    open_index = match.end() - 1
+    close_index = balanced_parens(statement, open_index)
+    arguments = ' '.join(statement[open_index + 1:close_index].split())
+    rest = statement[close_index + 1:]
+
+    returns = re.search(r'RETURNS\s+(.*?)(?=\s+(?:LANGUAGE|AS|STABLE|IMMUTABLE|VOLATILE|SECURITY|SET)\b)',
+                        rest, re.IGNORECASE | re.DOTALL)
+    language = re.search(r'LANGUAGE\s+(\w+)', rest, re.IGNORECASE)
+    body = ''
+    tag = DOLLAR_TAG.search(rest)
+    if tag:
+        end = rest.find(tag.group(0), tag.end())
+        body = rest[tag.end():end if end != -1 else len(rest)]
+
+    schema.functions[name] = Function(
+        name, arguments,
+        ' '.join(returns.group(1).split()) if returns else '',
+        language.group(1).lower() if language else '',
+        bool(re.search(r'SECURITY\s+DEFINER', rest.replace(body, ''), re.IGNORECASE)),
+        body, source,
+    )
+
+
+def apply_statement(schema: SchemaModel, statement: str, source: str):
+    """Fold one migration statement into the schema model"""
+    statement = strip_inline_comments(statement).strip()
+
+    match = CREATE_TABLE.match(statement)
+    if match:
+        apply_create_table(schema, match, source)
+        return
+
+    match = ALTER_TABLE.match(statement)
+    if match:
+        apply_alter_table(schema, match, source)
+        return
+
+    match = CREATE_INDEX.match(statement)
+    if match:
+        apply_create_index(schema, statement, match, source)
+        return
+
+    match = DROP_INDEX.match(statement)
+    if match:
+        for name in match.group(1).split(','):
+            schema.indexes.pop(name.strip().split('.')[-1], None)
+        return
+
+    match = CREATE_FUNCTION.match(statement)
+    if match:
+        apply_create_function(schema, statement, match, source)
+        return
+
+    match = CREATE_TRIGGER.match(statement)
+    if match:
+        name, timing, events, table, options, function = match.groups()
+        schema.triggers[f"{table}.{name}"] = Trigger(
+            name, table, ' '.join(timing.split()),
+            [e.strip().split()[0].upper() for e in re.split(r'\s+OR\s+', events, flags=re.IGNORECASE)],
+            function, bool(re.search(r'FOR\s+EACH\s+ROW', options, re.IGNORECASE)), source,
+        )
+        return
+
+    match = DROP_TRIGGER.match(statement)
+    if match:
+        schema.triggers.pop(f"{match.group(2)}.{match.group(1)}", None)
+        return
+
+    # NOT NULL backfills in 008 live inside DO $$ blocks
+    if statement.upper().startswith('DO'):
+        for table_name, column in SET_NOT_NULL.findall(statement):
+            table = schema.tables.get(table_name)
+            if table and column in table.columns:
+                table.columns[column].not_null = True
+
+
+def load_schema() -> SchemaModel:
+    """Fold every SaaS migration into a schema model, in apply order"""
+    schema = SchemaModel()
+    for path in migration_files():
+        for statement in migration_statements(path):
+            apply_statement(schema, statement, path.name)
+    return schema
+
+
+def print_schema(schema: SchemaModel):
+    for table in sorted(schema.tables.values(), key=lambda t: t.name):
+        print(f"\n📋 {table.name} ({len(table.columns)} columns, ~{table.row_json_bytes()} B/row as JSON) [{table.source}]")
+        for column in table.columns.values():
+            flags = ' NOT NULL' if column.not_null else ''
+            print(f"  {column.name:<28} {column.data_type}{flags}")
+        for fk in table.foreign_keys:
+            print(f"  🔗 {', '.join(fk.columns)} -> {fk.ref_table}({', '.join(fk.ref_columns)}) ON DELETE {fk.on_delete}")
+        for index in schema.indexes_on(table.name):
+            print(f"  📇 {index.definition}")
+        for trigger in schema.triggers_on(table.name):
+            print(f"  ⚡ {trigger.name}: {trigger.timing} {'/'.join(trigger.events)} -> {trigger.function}()")
+
+    print(f"\n🔧 {len(schema.functions)} functions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SaaS Schema Helpers')
+    parser.add_argument('--statements', action='store_true', help='List statements per migration')
+    parser.add_argument('--tables', action='store_true', help='Print the schema model')
+
+    args = parser.parse_args()
+
+    if not any([args.statements, args.tables]):
+        parser.print_help()
+        print("\n⚠️  Please specify --statements or --tables")
+        sys.exit(1)
+
+    if args.tables:
+        print_schema(load_schema())
+        return
+
+    for path in migration_files():
+        statements = migration_statements(path)
+        print(f"\n📄 {path.name}: {len(statements)} statements")
+        for statement in statements:
+            first_line = statement.splitlines()[0]
+            print(f"  {first_line[:100]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Source Edits
+============
+Collects the edits a rewrite wants to make to one file as offset ranges into
+the text as it was read, checks that they do not overlap, and splices them
+in a single pass. Rewrites compute every offset against the original text,
+so the order they are found in does not matter and earlier edits never
+shift later ones.
+
+  - replace(start, end, text) / delete(start, end) cover [start, end)
+  - insert(offset, text) adds text before `offset`; insertions at the same
+    offset come out in the order they were added, before a replacement
+    starting there and after one ending there
+  - two ranges that overlap, or an insertion strictly inside a replaced
+    range, raise EditConflict naming both edits; an identical edit added
+    twice is kept once
+"""
+
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+
+class EditConflict(ValueError):
+    def __init__(self, path: Optional[Path], first: 'Edit', second: 'Edit'):
+        where = f"{path.name}: " if path else ''
+        super().__init__(f"{where}{first.describe()} overlaps {second.describe()}")
+        self.first = first
+        self.second = second
+
+
+class Edit:
+    def __init__(self, start: int, end: int, text: str, label: str, order: int):
+        self.start = start
+        self.end = end
+        self.text = text
+        self.label = label
+        self.order = order
+
+    @property
+    def is_insert(self) -> bool:
+        return self.start == self.end
+
+    def key(self) -> Tuple[int, int, int]:
+        return (self.start, 0 if self.is_insert else 1, self.order)
+
+    def describe(self) -> str:
+        span = f"insert at {self.start}" if self.is_insert else f"[{self.start}, {self.end})"
+        return f"{self.label} ({span})" if self.label else span
+
+
+class EditStats:
+    def __init__(self, edits: int = 0, inserted: int = 0, deleted: int = 0, lines_added: int = 0,
+                 lines_removed: int = 0):
+        self.edits = edits
+        self.inserted = inserted          # characters
+        self.deleted = deleted
+        self.lines_added = lines_added
+        self.lines_removed = lines_removed
+
+    def __str__(self) -> str:
+        edits = f"{self.edits} edit" + ('s' if self.edits != 1 else '')
+        return f"{edits}, +{self.lines_added}/-{self.lines_removed} lines, +{self.inserted}/-{self.deleted} chars"
+
+
+class SourceEdits:
+    """Non-overlapping edits to one text, applied in one pass"""
+
+    def __init__(self, text: str, path: Optional[Path] = None):
+        self.text = text
+        self.path = path
+        self.edits: List[Edit] = []
+        self._seen: Set[Tuple[int, int, str]] = set()
+
+    @classmethod
+    def read(cls, path: Path) -> 'SourceEdits':
+        return cls(path.read_text(encoding='utf-8'), path)
+
+    def replace(self, start: int, end: int, text: str, label: str = ''):
+        if not 0 <= start <= end <= len(self.text):
+            raise ValueError(f"edit [{start}, {end}) outside the text (0-{len(self.text)})")
+        if (start, end, text) not in self._seen:
+            self._seen.add((start, end, text))
+            self.edits.append(Edit(start, end, text, label, len(self.edits)))
+
+    def insert(self, offset: int, text: str, label: str = ''):
+        self.replace(offset, offset, text, label)
+
+    def delete(self, start: int, end: int, label: str = ''):
+        self.replace(start, end, '', label)
+
+    def __bool__(self) -> bool:
+        return bool(self.edits)
+
+    def __len__(self) -> int:
+        return len(self.edits)
+
+    def ordered(self) -> List[Edit]:
+        """Edits in output order; raises EditConflict if two of them overlap"""
+        edits = sorted(self.edits, key=Edit.key)
+        reach = None                      # replaced range ending furthest so far
+        for edit in edits:
+            if reach is not None and edit.start < reach.end:
+                raise EditConflict(self.path, reach, edit)
+            if not edit.is_insert and (reach is None or edit.end > reach.end):
+                reach = edit
+        return edits
+
+    def apply(self) -> str:
+        """The edited text"""
+        parts = []
+        position = 0
+        for edit in self.ordered():
+            parts.append(self.text[position:edit.start])
+            parts.append(edit.text)
+            position = edit.end
+        parts.append(self.text[position:])
+        return ''.join(parts)
+
+    def stats(self) -> EditStats:
+        stats = EditStats(edits=len(self.edits))
+        for edit in self.edits:
+            removed = self.text[edit.start:edit.end]
+            stats.inserted += len(edit.text)
+            stats.deleted += len(removed)
+            stats.lines_added += edit.text.count('\n')
+            stats.lines_removed += removed.count('\n')
+        return stats
+
+    def write(self, dry_run: bool = False) -> bool:
+        """Write the edited text back to `path` (validated even in a dry run); whether it changes"""
+        content = self.apply()
+        if content == self.text:
+            return False
+        if not dry_run:
+            self.path.write_text(content, encoding='utf-8')
+        return True
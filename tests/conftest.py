@@ -0,0 +1,54 @@
+"""
+Shared fixtures for the tooling tests.
+
+Tests that need a database run against the local Postgres described in
+local_postgres.py ($LOCAL_DATABASE_URL) and are skipped when psycopg is not
+installed or the server is not reachable.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import local_postgres  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def admin_dsn():
+    """Admin DSN of a reachable local Postgres, or skip"""
+    if local_postgres.psycopg is None:
+        pytest.skip('psycopg is not installed')
+    try:
+        with local_postgres.connect(local_postgres.DEFAULT_DSN):
+            pass
+    except local_postgres.psycopg.OperationalError as e:
+        pytest.skip(f"local Postgres is not reachable: {str(e).splitlines()[0]}")
+    return local_postgres.DEFAULT_DSN
+
+
+@pytest.fixture(scope='module')
+def saas_dsn(admin_dsn, request):
+    """Scratch database with every SaaS migration applied, one per test module
+
+    Fails when a migration statement outside local_postgres.KNOWN_FAILURES
+    does not apply: the function or index under test could be missing.
+    """
+    name = f"rotante_test_{request.module.__name__.split('.')[-1]}"
+    try:
+        dsn = local_postgres.prepare_bench_database(admin_dsn, name, verbose=False, strict=True)
+    except local_postgres.SchemaError as e:
+        local_postgres.drop_scratch_database(admin_dsn, name)
+        pytest.fail(f"migration statement failed: {e}", pytrace=False)
+    yield dsn
+    local_postgres.drop_scratch_database(admin_dsn, name)
+
+
+@pytest.fixture
+def conn(saas_dsn):
+    """Autocommit connection to the module's scratch database"""
+    with local_postgres.connect(saas_dsn) as connection:
+        yield connection
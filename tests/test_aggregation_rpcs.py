@@ -0,0 +1,461 @@
+"""Aggregation RPCs of 014 against the Dart loops they replace (analyze_queries.py --aggregations)
+
+Each `dart_*` reference restates a provider's loop in Python over the rows its
+query returns; the RPC must produce the same figures from the same fixture
+rows. A second organization holds a copy of every row, so a missing
+organization filter shows up as doubled figures.
+"""
+
+import json
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from local_postgres import connect, seed_organizations
+
+ROME = ZoneInfo('Europe/Rome')
+DAY = datetime(2026, 10, 14, tzinfo=timezone.utc)
+START, END = DAY, DAY + timedelta(hours=23, minutes=59, seconds=59)
+PREVIOUS_START, PREVIOUS_END = START - timedelta(days=7), END - timedelta(days=7)
+
+
+def at(hour: int, minute: int = 0, second: int = 0, days: int = 0) -> datetime:
+    return DAY + timedelta(days=days, hours=hour, minutes=minute, seconds=second)
+
+
+def size(name=None) -> dict:
+    return {'size': {'name': name} if name else {}}
+
+
+# (tipo, stato, slot, created, in_consegna, completato, totale, driver?, (lat, lng, zone, citta), items)
+# items: (nome, quantita, subtotale, varianti, menu item index)
+ORDERS = [
+    ('delivery', 'completed', at(17), at(16, 10), at(17, 5), at(17, 10), 20, True, (45.1, 9.1, 'Centro', 'Pavia'),
+     [('Margherita', 2, 14, size('Maxi'), 0), ('Coca', 1, 3, None, 1)]),
+    ('delivery', 'completed', at(17, 30), at(16, 20), at(17, 50), at(18, 5), 30, True, (45.2, 9.2, None, 'Pavia'),
+     [('Margherita', 1, 7, size(), 0)]),
+    ('delivery', 'completed', at(18, 15), at(18), at(18, 20, 30), at(18, 29, 59), 15, True, (45.3, 9.3, None, None),
+     [('Diavola', 1, 9, {'category': 'Pizze'}, 2)]),
+    ('delivery', 'completed', None, at(16, 30), None, at(17), 12, True, (45.4, 9.4, 'Nord', 'Pavia'),
+     [('Coca', 2, 6, None, 1)]),
+    ('delivery', 'completed', at(19), at(18, 30), at(19, 2), at(19, 20), 18, False, (None, None, None, None),
+     [('Margherita', 1, 7, None, 0)]),
+    ('takeaway', 'cancelled', at(17), at(16), None, None, 50, False, (None, None, None, None),
+     [('Margherita', 5, 35, size('Maxi'), 0)]),
+    ('takeaway', 'confirmed', at(20), at(15), None, None, 25, False, (None, None, None, None),
+     [('Diavola', 3, 27, size('Maxi'), 2), ('Acqua', 0, 0, None, 3)]),
+    ('takeaway', 'completed', None, at(21, 45), None, at(22), 8, False, (None, None, None, None),
+     [('Margherita', 1, 8, size('Baby'), 0)]),
+    # Previous period, a week earlier
+    ('delivery', 'completed', at(17, days=-7), at(16, days=-7), at(17, 10, days=-7), at(17, 25, days=-7), 22, True,
+     (45.5, 9.5, 'Centro', 'Pavia'), [('Margherita', 2, 14, None, 0)]),
+    ('takeaway', 'completed', None, at(19, days=-7), None, at(19, 30, days=-7), 11, False, (None, None, None, None),
+     [('Coca', 1, 3, None, 1)]),
+    ('takeaway', 'cancelled', at(18, days=-7), at(17, days=-7), None, None, 40, False, (None, None, None, None), []),
+]
+
+# (attivo, track_stock, stock_quantity, low_stock_threshold)
+INGREDIENTS = [
+    (True, False, 5, 10),
+    (True, True, 1, 10),
+    (True, True, 5, 10),
+    (True, True, 50, 10),
+    (True, True, 3, 0),
+    (True, True, None, None),
+    (False, True, 1, 10),
+]
+
+
+def insert_fixture(conn, org_id: str, driver_id: str):
+    menu_items = [
+        conn.execute("INSERT INTO menu_items (organization_id, nome) VALUES (%s, %s) RETURNING id",
+                     (org_id, name)).fetchone()[0]
+        for name in ('Margherita', 'Coca', 'Diavola', 'Acqua')
+    ]
+    for tipo, stato, slot, created, delivering, completed, totale, assigned, place, items in ORDERS:
+        order_id = conn.execute(
+            """INSERT INTO ordini (organization_id, nome_cliente, telefono_cliente, tipo, stato, totale,
+                   slot_prenotato_start, created_at, in_consegna_at, completato_at, assegnato_delivery_id,
+                   latitude_consegna, longitude_consegna, zone, citta_consegna)
+               VALUES (%s, 'Cliente', '3330000000', %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+               RETURNING id""",
+            (org_id, tipo, stato, totale, slot, created, delivering, completed,
+             driver_id if assigned else None, *place),
+        ).fetchone()[0]
+        for name, quantity, subtotal, variants, menu_item in items:
+            conn.execute(
+                """INSERT INTO ordini_items (organization_id, ordine_id, nome_prodotto, prezzo_unitario,
+                       quantita, subtotale, varianti, menu_item_id)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s::jsonb, %s)""",
+                (org_id, order_id, name, subtotal, quantity, subtotal,
+                 json.dumps(variants) if variants is not None else None, menu_items[menu_item]),
+            )
+    for active, tracked, quantity, threshold in INGREDIENTS:
+        conn.execute(
+            """INSERT INTO ingredients (organization_id, nome, attivo, track_stock, stock_quantity, low_stock_threshold)
+               VALUES (%s, 'Farina', %s, %s, %s, %s)""",
+            (org_id, active, tracked, quantity, threshold),
+        )
+
+
+@pytest.fixture(scope='module')
+def orgs(saas_dsn):
+    """(organization under test, driver id); a second organization holds the same rows"""
+    with connect(saas_dsn) as conn:
+        org_id, other_org_id = seed_organizations(conn, 2, prefix='aggregates')
+        driver_id = str(uuid.uuid4())
+        conn.execute("INSERT INTO auth.users (id, email) VALUES (%s, %s)", (driver_id, 'driver@example.com'))
+        for org in (org_id, other_org_id):
+            insert_fixture(conn, org, driver_id)
+    return org_id, driver_id
+
+
+def fetch(conn, sql: str, params) -> list:
+    cursor = conn.execute(sql, params)
+    columns = [c.name for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def with_items(conn, orders: list) -> list:
+    """`select('*, ordini_items(*)')`"""
+    for order in orders:
+        order['items'] = fetch(conn, "SELECT * FROM ordini_items WHERE ordine_id = %s", (order['id'],))
+    return orders
+
+
+def fetch_period(conn, org_id: str, start: datetime, end: datetime, extra: str = '') -> list:
+    """Scheduled orders in range plus unscheduled orders created in range"""
+    return with_items(conn, fetch(conn, f"""
+        SELECT * FROM ordini WHERE organization_id = %(org)s {extra}
+          AND slot_prenotato_start >= %(start)s AND slot_prenotato_start <= %(end)s
+        UNION ALL
+        SELECT * FROM ordini WHERE organization_id = %(org)s {extra}
+          AND slot_prenotato_start IS NULL AND created_at >= %(start)s AND created_at <= %(end)s
+    """, {'org': org_id, 'start': start, 'end': end}))
+
+
+def rpc(conn, function: str, *args) -> dict:
+    placeholders = ', '.join(['%s'] * len(args))
+    return conn.execute(f"SELECT {function}({placeholders})", args).fetchone()[0]
+
+
+def in_minutes(later: datetime, earlier: datetime) -> int:
+    """Duration.inMinutes truncates toward zero"""
+    return int((later - earlier).total_seconds() / 60)
+
+
+def normalize(value):
+    """JSON-shaped numbers and string keys, as the RPC returns them
+
+    A group no row reaches is absent from the RPC's map and 0 in Dart's.
+    """
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in value.items() if v}
+    return pytest.approx(float(value))
+
+
+def assert_matches(result: dict, expected: dict):
+    assert set(result) == set(expected)
+    for key, value in expected.items():
+        assert normalize(result[key]) == normalize(value), key
+
+
+# ---------------------------------------------------------------------------
+# Dart references
+# ---------------------------------------------------------------------------
+
+def dart_delivery_analytics(orders: list) -> dict:
+    """delivery_analytics_screen.dart deliveryAnalyticsProvider"""
+    orders_by_hour = defaultdict(int)
+    for order in orders:
+        if order['completato_at'] is not None:
+            # DateTime.parse of a UTC timestamp stays UTC: .hour is the UTC hour
+            orders_by_hour[order['completato_at'].astimezone(timezone.utc).hour] += 1
+    return {'orders_by_hour': orders_by_hour, 'orders_completed': len(orders)}
+
+
+def dart_dashboard_analytics(orders: list, previous: list) -> dict:
+    """dashboard_analytics_provider.dart _fetchAnalytics (translated keys only)"""
+    result = defaultdict(int)
+    hourly_revenue, item_count, item_revenue = defaultdict(float), defaultdict(int), defaultdict(float)
+    for order in (o for o in orders if o['stato'] != 'cancelled'):
+        result['total_revenue'] += order['totale']
+        result['total_orders'] += 1
+        if order['tipo'] == 'delivery' and order['stato'] == 'completed' and order['completato_at'] is not None:
+            result['total_delivery_minutes'] += in_minutes(order['completato_at'], order['created_at'])
+            result['delivery_count'] += 1
+        hourly_revenue[order['created_at'].astimezone(ROME).hour] += float(order['totale'])
+        for item in order['items']:
+            result['total_items_sold'] += item['quantita']
+            item_count[item['nome_prodotto']] += item['quantita']
+            item_revenue[item['nome_prodotto']] += float(item['subtotale'])
+
+    previous_hourly_revenue = defaultdict(float)
+    for order in (o for o in previous if o['stato'] != 'cancelled'):
+        previous_hourly_revenue[order['created_at'].astimezone(ROME).hour] += float(order['totale'])
+
+    return {**result, 'hourly_revenue': hourly_revenue, 'item_sales_map_sales_count': item_count,
+            'item_sales_map_revenue': item_revenue, 'previous_hourly_revenue': previous_hourly_revenue}
+
+
+def dart_delivery_revenue(orders: list) -> dict:
+    """delivery_revenue_provider.dart _fetchDataForDate, per delivery person"""
+    by_person = defaultdict(list)
+    for order in orders:
+        if order['assegnato_delivery_id'] is not None and str(order['assegnato_delivery_id']):
+            by_person[str(order['assegnato_delivery_id'])].append(order)
+
+    result = {key: {} for key in ('on_time', 'late', 'total_delivery_time_minutes', 'valid_delivery_times')}
+    for person, person_orders in by_person.items():
+        on_time = late = minutes = valid = 0
+        for order in person_orders:
+            if order['slot_prenotato_start'] is not None and order['completato_at'] is not None:
+                deadline = order['slot_prenotato_start'] + timedelta(minutes=15)
+                if order['completato_at'] <= deadline:
+                    on_time += 1
+                else:
+                    late += 1
+            else:
+                on_time += 1
+            if order['in_consegna_at'] is not None and order['completato_at'] is not None:
+                minutes += in_minutes(order['completato_at'], order['in_consegna_at'])
+                valid += 1
+        result['on_time'][person] = on_time
+        result['late'][person] = late
+        result['total_delivery_time_minutes'][person] = minutes
+        result['valid_delivery_times'][person] = valid
+    return result
+
+
+def dart_heatmap(orders: list) -> dict:
+    """heatmap_data_provider.dart deliveryHeatmapData"""
+    result = defaultdict(float)
+    by_zone, by_hour = defaultdict(int), defaultdict(int)
+    for order in orders:
+        if order['latitude_consegna'] is not None and order['longitude_consegna'] is not None:
+            result['lat_sum'] += float(order['latitude_consegna'])
+            result['lng_sum'] += float(order['longitude_consegna'])
+            by_zone[order['zone'] or order['citta_consegna'] or 'Sconosciuta'] += 1
+            when = order['slot_prenotato_start'] or order['created_at']
+            if when is not None:
+                by_hour[when.astimezone(ROME).hour] += 1
+    return {**result, 'orders_by_zone': by_zone, 'orders_by_hour': by_hour}
+
+
+def dart_stock_summary(ingredients: list) -> dict:
+    """inventory_ui_providers.dart stockSummary"""
+    result = dict.fromkeys(('total', 'tracked', 'total_value', 'critical', 'low_stock'), 0)
+    for item in ingredients:
+        result['total'] += 1
+        if not (item['track_stock'] or False):
+            continue
+        result['tracked'] += 1
+        qty = float(item['stock_quantity'] or 0)
+        threshold = float(item['low_stock_threshold'] or 0)
+        result['total_value'] += qty
+        if threshold > 0:
+            if qty <= threshold * 0.2:
+                result['critical'] += 1
+            elif qty <= threshold:
+                result['low_stock'] += 1
+    return result
+
+
+def dart_product_analytics(orders: list) -> dict:
+    """product_analytics_provider.dart productAnalyticsProvider (translated keys only)"""
+    result = defaultdict(float)
+    sales_count, revenue, by_size = defaultdict(int), defaultdict(float), defaultdict(int)
+    for order in orders:
+        for item in order['items']:
+            name = item['nome_prodotto'] or 'Sconosciuto'
+            quantity = item['quantita'] if item['quantita'] is not None else 1
+            subtotal = float(item['subtotale'] or 0)
+            variants = item['varianti'] or {}
+            result['total_products_sold'] += quantity
+            result['total_revenue'] += subtotal
+            sales_count[name] += quantity
+            revenue[name] += subtotal
+            size_data = variants.get('size')
+            if size_data is not None:
+                by_size[size_data.get('name') or 'Standard'] += quantity
+            else:
+                by_size['Standard'] += quantity
+    return {**result, 'product_map_sales_count': sales_count, 'product_map_revenue': revenue,
+            'sales_by_size_map': by_size}
+
+
+def dart_monthly_sales(rows: list) -> dict:
+    """product_monthly_sales_provider.dart productMonthlySalesProvider"""
+    sales = defaultdict(int)
+    for row in rows:
+        quantity = row['quantita'] or 0
+        if row['menu_item_id'] is not None and quantity > 0:
+            sales[str(row['menu_item_id'])] += quantity
+    return {'sales_map': sales}
+
+
+# ---------------------------------------------------------------------------
+# RPC vs Dart
+# ---------------------------------------------------------------------------
+
+def test_delivery_analytics(conn, orgs):
+    org_id, driver_id = orgs
+    # The Dart query relies on RLS for the organization; the RPC filters on it
+    orders = fetch(conn, """
+        SELECT * FROM ordini
+        WHERE organization_id = %s AND tipo = 'delivery' AND stato = 'completed' AND assegnato_delivery_id = %s
+          AND completato_at >= %s AND completato_at <= %s
+        ORDER BY completato_at DESC""", (org_id, driver_id, START, END))
+
+    result = rpc(conn, 'delivery_analytics_aggregates', org_id, driver_id, START, END)
+
+    assert_matches(result, dart_delivery_analytics(orders))
+    assert result['orders_completed'] == 4
+
+
+def test_dashboard_analytics(conn, orgs):
+    org_id, _ = orgs
+    orders = fetch_period(conn, org_id, START, END)
+    previous = fetch_period(conn, org_id, PREVIOUS_START, PREVIOUS_END)
+
+    result = rpc(conn, 'dashboard_analytics_aggregates', org_id, START, END, PREVIOUS_START, PREVIOUS_END)
+
+    assert_matches(result, dart_dashboard_analytics(orders, previous))
+    # 18:29:59 - 18:00:00 counts 29 minutes, as Duration.inMinutes does
+    assert result['total_delivery_minutes'] == 60 + 105 + 29 + 30 + 50
+    # Reassigned under a date-range branch, so never folded in SQL
+    for refused in ('previous_revenue', 'previous_order_count', 'total_prev_minutes',
+                    'category_sales_map_revenue', 'category_sales_map_item_count'):
+        assert refused not in result
+
+
+def test_delivery_revenue(conn, orgs):
+    org_id, driver_id = orgs
+    orders = fetch(conn, """
+        SELECT * FROM ordini
+        WHERE organization_id = %s AND tipo = 'delivery' AND stato = 'completed'
+          AND slot_prenotato_start >= %s AND slot_prenotato_start <= %s
+        ORDER BY slot_prenotato_start DESC""", (org_id, START, END))
+
+    result = rpc(conn, 'delivery_revenue_aggregates', org_id, START, END)
+
+    assert_matches(result, dart_delivery_revenue(orders))
+    assert result['on_time'] == {driver_id: 2}
+    assert result['late'] == {driver_id: 1}
+
+
+def test_delivery_heatmap(conn, orgs):
+    org_id, _ = orgs
+    since = START - timedelta(days=60)
+    orders = fetch(conn, """
+        SELECT * FROM ordini
+        WHERE organization_id = %s AND tipo = 'delivery'
+          AND latitude_consegna IS NOT NULL AND longitude_consegna IS NOT NULL AND created_at >= %s
+        ORDER BY created_at DESC LIMIT 2000""", (org_id, since))
+
+    result = rpc(conn, 'delivery_heatmap_data_aggregates', org_id, since)
+
+    assert_matches(result, dart_heatmap(orders))
+
+
+def test_stock_summary(conn, orgs):
+    org_id, _ = orgs
+    ingredients = fetch(conn, "SELECT * FROM ingredients WHERE organization_id = %s AND attivo = true", (org_id,))
+
+    result = rpc(conn, 'stock_summary_aggregates', org_id)
+
+    assert_matches(result, dart_stock_summary(ingredients))
+
+
+def test_product_analytics(conn, orgs):
+    org_id, _ = orgs
+    orders = fetch_period(conn, org_id, START, END, extra="AND stato <> 'cancelled'")
+
+    result = rpc(conn, 'product_analytics_aggregates', org_id, START, END)
+
+    assert_matches(result, dart_product_analytics(orders))
+    # `salesBySizeMap['Standard']` and `salesBySizeMap[sizeName]` fill one map
+    assert result['sales_by_size_map'] == {'Maxi': 5, 'Standard': 6, 'Baby': 1}
+
+
+def test_product_monthly_sales(conn, orgs):
+    org_id, _ = orgs
+    since = START - timedelta(days=30)
+    rows = fetch(conn, """
+        SELECT i.menu_item_id, i.quantita FROM ordini_items i JOIN ordini o ON o.id = i.ordine_id
+        WHERE o.created_at >= %s AND o.organization_id = %s AND o.stato <> 'cancelled'""", (since, org_id))
+
+    result = rpc(conn, 'product_monthly_sales_aggregates', org_id, since)
+
+    assert_matches(result, dart_monthly_sales(rows))
+
+
+# ---------------------------------------------------------------------------
+# Daily rollup
+# ---------------------------------------------------------------------------
+
+def rollup(conn, org_id: str) -> dict:
+    """statistiche_giornaliere rows by day: (ordini_totali, fatturato_totale, prodotti_top quantities)"""
+    return {
+        row['data']: (row['ordini_totali'], float(row['fatturato_totale']),
+                      {p['nome']: p['quantita'] for p in row['prodotti_top']})
+        for row in fetch(conn, "SELECT * FROM statistiche_giornaliere WHERE organization_id = %s", (org_id,))
+    }
+
+
+def pending(conn, org_id: str) -> list:
+    return [row[0] for row in conn.execute(
+        "SELECT data FROM statistiche_giornaliere_pending WHERE organization_id = %s ORDER BY data", (org_id,))]
+
+
+def test_daily_rollup_follows_moved_deleted_and_item_only_changes(conn):
+    org_id, = seed_organizations(conn, 1, prefix='rollup')
+    day, next_day, last_day = (at(18, days=d).astimezone(ROME).date() for d in (0, 1, 2))
+
+    def order(slot: datetime, totale: int, items) -> str:
+        order_id = conn.execute(
+            """INSERT INTO ordini (organization_id, nome_cliente, telefono_cliente, tipo, stato, totale,
+                   slot_prenotato_start, created_at)
+               VALUES (%s, 'Cliente', '3330000000', 'takeaway', 'confirmed', %s, %s, %s) RETURNING id""",
+            (org_id, totale, slot, slot - timedelta(hours=1)),
+        ).fetchone()[0]
+        for name, quantity in items:
+            conn.execute(
+                """INSERT INTO ordini_items (organization_id, ordine_id, nome_prodotto, prezzo_unitario,
+                       quantita, subtotale)
+                   VALUES (%s, %s, %s, 7, %s, %s)""",
+                (org_id, order_id, name, quantity, 7 * quantity),
+            )
+        return order_id
+
+    moved = order(at(18), 10, [('Margherita', 1)])
+    kept = order(at(19), 20, [('Diavola', 2)])
+    deleted = order(at(18, days=2), 30, [('Coca', 3)])
+
+    assert rpc(conn, 'refresh_statistiche_giornaliere', org_id) == 2
+    assert rollup(conn, org_id) == {
+        day: (2, 30.0, {'Margherita': 1, 'Diavola': 2}),
+        last_day: (1, 30.0, {'Coca': 3}),
+    }
+    assert rpc(conn, 'refresh_statistiche_giornaliere', org_id) == 0
+
+    # The printer bridge's flag flips touch no rollup column
+    conn.execute("UPDATE ordini SET printed = true, printed_at = now() WHERE organization_id = %s", (org_id,))
+    assert pending(conn, org_id) == []
+
+    conn.execute("UPDATE ordini SET slot_prenotato_start = %s WHERE id = %s", (at(18, days=1), moved))
+    conn.execute("DELETE FROM ordini WHERE id = %s", (deleted,))
+    conn.execute("UPDATE ordini_items SET quantita = 5 WHERE ordine_id = %s", (kept,))
+    conn.execute("UPDATE ordini SET stato = 'preparing' WHERE id = %s", (kept,))
+    conn.execute("UPDATE ordini SET stato = 'confirmed' WHERE id = %s", (kept,))
+    assert pending(conn, org_id) == [day, next_day, last_day]
+
+    assert rpc(conn, 'refresh_statistiche_giornaliere', org_id) == 3
+    assert rollup(conn, org_id) == {
+        day: (1, 20.0, {'Diavola': 5}),
+        next_day: (1, 10.0, {'Margherita': 1}),
+    }
+    assert pending(conn, org_id) == []
@@ -0,0 +1,16 @@
+"""Generated parts the migration scripts hand to a --build-filter build"""
+
+import migrate_to_saas
+from build_filter import GeneratedParts
+
+
+def test_created_organization_provider_is_built(tmp_path, monkeypatch):
+    monkeypatch.setattr(migrate_to_saas, 'LIB_DIR', tmp_path)
+    (tmp_path / 'providers').mkdir()
+    parts = GeneratedParts()
+
+    assert migrate_to_saas.create_organization_provider(migrate_to_saas.MigrationReport(), False, parts)
+
+    provider = tmp_path / 'providers' / 'organization_provider.dart'
+    assert parts.outputs() == [(tmp_path / 'providers' / 'organization_provider.g.dart').resolve()]
+    assert parts.sources == [provider.resolve()]
@@ -0,0 +1,74 @@
+"""match_cashier_customer (015, generated by wire_org_context.py) against a local Postgres"""
+
+import pytest
+
+from local_postgres import connect, psycopg, seed_organizations
+
+
+@pytest.fixture(scope='module')
+def orgs(saas_dsn):
+    with connect(saas_dsn) as conn:
+        return seed_organizations(conn, 2, prefix='matching')
+
+
+def add_customer(conn, org_id: str, nome: str, telefono=None) -> str:
+    return str(conn.execute(
+        "INSERT INTO cashier_customers (organization_id, nome, telefono) VALUES (%s, %s, %s) RETURNING id",
+        (org_id, nome, telefono),
+    ).fetchone()[0])
+
+
+def best_match(conn, org_id, nome: str, telefono=None):
+    row = conn.execute(
+        "SELECT (customer).id, match_kind FROM match_cashier_customer(%s, %s, %s, 1)",
+        (org_id, nome, telefono),
+    ).fetchone()
+    return (str(row[0]), row[1]) if row else None
+
+
+def test_same_name_without_stored_phone_matches(conn, orgs):
+    org_id, _ = orgs
+    customer = add_customer(conn, org_id, 'Mario Nophone')
+
+    assert best_match(conn, org_id, 'mario nophone', '+39 333 1234567') == (customer, 'name')
+    assert best_match(conn, org_id, 'Nophone Mario') == (customer, 'name')
+
+
+def test_tiers(conn, orgs):
+    org_id, _ = orgs
+    customer = add_customer(conn, org_id, 'Giulia Tiers', '+39 333 7654321')
+
+    assert best_match(conn, org_id, 'Giulia Tiers', '+39 333 765 4321') == (customer, 'exact')
+    assert best_match(conn, org_id, 'tiers giulia') == (customer, 'name')
+    assert best_match(conn, org_id, 'Giulia Tirs', '0000 654321') == (customer, 'fuzzy')
+    # Same name, conflicting phone: only ever a suggestion
+    assert best_match(conn, org_id, 'Giulia Tiers', '3330000000') == (customer, 'similar')
+
+
+def test_suggestions_follow_stronger_tiers(conn, orgs):
+    org_id, _ = orgs
+    customer = add_customer(conn, org_id, 'Paolo Ordine', '+39 333 2222222')
+    lookalike = add_customer(conn, org_id, 'Paolo Ordina', '+39 333 3333333')
+
+    rows = conn.execute(
+        "SELECT (customer).id, match_kind FROM match_cashier_customer(%s, %s, %s, 5)",
+        (org_id, 'Paolo Ordine', '+39 333 2222222'),
+    ).fetchall()
+
+    assert [(str(i), kind) for i, kind in rows] == [(customer, 'exact'), (lookalike, 'similar')]
+    # findMatchingCustomer's call skips suggestions when nothing stronger matches
+    suggestions = "SELECT count(*) FROM match_cashier_customer(%s, 'Paolo Ordinx', NULL, 5, %s)"
+    assert conn.execute(suggestions, (org_id, True)).fetchone()[0] == 2
+    assert conn.execute(suggestions, (org_id, False)).fetchone()[0] == 0
+
+
+def test_never_crosses_organizations(conn, orgs):
+    org_id, other_org_id = orgs
+    add_customer(conn, other_org_id, 'Elsewhere Only', '+39 333 1111111')
+
+    assert best_match(conn, org_id, 'Elsewhere Only', '3331111111') is None
+
+
+def test_organization_is_required(conn, orgs):
+    with pytest.raises(psycopg.errors.RaiseException, match='p_organization_id is required'):
+        best_match(conn, None, 'Mario Nophone')
@@ -0,0 +1,37 @@
+"""Batched cleanup against a local Postgres (cleanup_expired_rows.py)"""
+
+from cleanup_expired_rows import count_expired, generate_rows, run_batched_cleanup
+from local_postgres import connect
+
+
+def test_deletes_backlog_and_keeps_live_rows(conn):
+    conn.execute("TRUNCATE request_nonces")
+    generate_rows(conn, 'nonces', expired=230, live=40)
+
+    run = run_batched_cleanup(conn, 'nonces', batch_size=50, max_seconds=30)
+
+    assert run.deleted == 230
+    assert run.batches == 5
+    assert run.remaining == 0
+    assert conn.execute("SELECT count(*) FROM request_nonces").fetchone()[0] == 40
+
+
+def test_locked_batch_does_not_stop_the_run(conn, saas_dsn):
+    conn.execute("TRUNCATE request_nonces")
+    generate_rows(conn, 'nonces', expired=300, live=0)
+
+    # Another session holds the oldest 100 rows: the first two batches are fully locked
+    with connect(saas_dsn, autocommit=False) as other:
+        other.execute("SELECT 1 FROM request_nonces ORDER BY expires_at LIMIT 100 FOR UPDATE")
+
+        run = run_batched_cleanup(conn, 'nonces', batch_size=50, max_seconds=30)
+
+        assert run.deleted == 200
+        assert run.skipped_locked == 100
+        assert run.remaining == 100
+        other.rollback()
+
+    assert count_expired(conn, 'nonces') == 100
+    run = run_batched_cleanup(conn, 'nonces', batch_size=50, max_seconds=30)
+    assert run.deleted == 100
+    assert run.remaining == 0
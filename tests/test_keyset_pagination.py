@@ -0,0 +1,163 @@
+"""Keyset pages and indexes from analyze_queries.py --unbounded against a local Postgres"""
+
+import pytest
+
+from analyze_queries import PROJECT_ROOT, GrowthModel, load_schema, unbounded_reads
+from bench_queries import SEED_PEOPLE_SQL, SEEDED_TABLES, keyset_filter, scope_value, seed_slice
+from local_postgres import connect, seed_organizations
+
+PAGE_SIZE = 50
+# More orders per day than minutes in the seeded opening hours: created_at ties
+ORDERS_PER_DAY = 900
+
+
+@pytest.fixture(scope='module')
+def reads():
+    schema = load_schema()
+    found, _ = unbounded_reads(schema, GrowthModel(schema, ORDERS_PER_DAY, 365), None, PAGE_SIZE)
+    return [r for r in found if r.chain.table in SEEDED_TABLES]
+
+
+@pytest.fixture(scope='module')
+def paged(reads):
+    """Reads whose rewrite takes a cursor (a stream keeps only its newest window)"""
+    return [r for r in reads if r.chain.operation != 'stream']
+
+
+@pytest.fixture(scope='module')
+def org_id(saas_dsn):
+    with connect(saas_dsn) as conn:
+        org_id = seed_organizations(conn, 1, prefix='keyset')[0]
+        people = {
+            'customers': [str(r[0]) for r in conn.execute(SEED_PEOPLE_SQL, {'role': 'c', 'count': 20})],
+            'drivers': [str(r[0]) for r in conn.execute(SEED_PEOPLE_SQL, {'role': 'd', 'count': 10})],
+            'cashier': [],
+        }
+        seed_slice(conn, org_id, people, 0, 9, ORDERS_PER_DAY)
+        return org_id
+
+
+def scope_filter(read, conn, org_id):
+    value = scope_value(conn, read, org_id)
+    if read.scope == 'organization_id':
+        return f"{read.scope} = %s", (value,)
+    return f"{read.scope} = %s AND organization_id = %s", (value, org_id)
+
+
+def order_by(read) -> str:
+    direction = 'DESC' if read.descending else 'ASC'
+    return f"{read.sort_column} {direction}, id {direction}"
+
+
+def walk_pages(conn, read, where: str, params: tuple) -> list:
+    """Every row id, one keyset page at a time"""
+    ids, keyset, cursor_params = [], '', ()
+    while True:
+        page = conn.execute(
+            f"SELECT {read.sort_column}, id FROM {read.chain.table} WHERE {where}{keyset} "
+            f"ORDER BY {order_by(read)} LIMIT {PAGE_SIZE}",
+            params + cursor_params,
+        ).fetchall()
+        ids.extend(row[1] for row in page)
+        if len(page) < PAGE_SIZE:
+            return ids
+        keyset, cursor_params = keyset_filter(read, page[-1])
+        keyset = f" AND {keyset}"
+
+
+def scanned_rows(plan: dict) -> int:
+    """Rows every table scan read, kept or filtered out (a bitmap's rows are counted at its heap scan)"""
+    table_scan = 'Scan' in plan['Node Type'] and plan['Node Type'] != 'Bitmap Index Scan'
+    own = plan.get('Actual Rows', 0) + plan.get('Rows Removed by Filter', 0) if table_scan else 0
+    return own + sum(scanned_rows(child) for child in plan.get('Plans', []))
+
+
+def test_reads_on_seeded_tables_are_found(reads):
+    assert {r.chain.table for r in reads} >= {'ordini', 'order_reminders'}
+
+
+STREAM_BRANCHES = """
+class OrdersFeed {
+  Stream<List<Map<String, dynamic>>> watch(String? organizationId, int? limit) {
+    final querySteps = _client
+        .from('ordini')
+        .stream(primaryKey: const ['id']);
+
+    if (organizationId != null) {
+      streamToListen = querySteps
+          .eq('organization_id', organizationId)
+          .order('created_at', ascending: false)
+          .limit(limit ?? 50);
+    } else {
+      streamToListen = querySteps
+          .order('created_at', ascending: false)%s;
+    }
+    return streamToListen;
+  }
+}
+"""
+
+
+def test_stream_limited_in_every_branch_is_bounded(tmp_path):
+    schema = load_schema()
+    growth = GrowthModel(schema, ORDERS_PER_DAY, 365)
+    realtime = PROJECT_ROOT / 'lib' / 'core' / 'services' / 'realtime_service.dart'
+    assert not [r for r in unbounded_reads(schema, growth, [realtime], PAGE_SIZE)[0]
+                if r.chain.operation == 'stream']
+
+    bounded, unbounded = tmp_path / 'bounded.dart', tmp_path / 'unbounded.dart'
+    bounded.write_text(STREAM_BRANCHES % '\n          .limit(limit ?? 50)')
+    unbounded.write_text(STREAM_BRANCHES % '')
+    found, _ = unbounded_reads(schema, growth, [bounded, unbounded], PAGE_SIZE)
+    assert [r.chain.source.path for r in found] == [unbounded]
+
+
+def test_keyset_indexes_apply(conn, reads):
+    for read in reads:
+        conn.execute(read.index_sql)
+        assert conn.execute("SELECT to_regclass(%s)", (read.index_name,)).fetchone()[0] is not None
+
+
+def test_sort_column_has_ties(conn, org_id):
+    ties = conn.execute(
+        "SELECT count(*) - count(DISTINCT created_at) FROM ordini WHERE organization_id = %s", (org_id,),
+    ).fetchone()[0]
+    assert ties > 0
+
+
+def test_pages_cover_the_full_read(conn, paged, org_id):
+    for read in paged:
+        where, params = scope_filter(read, conn, org_id)
+        full = [row[0] for row in conn.execute(
+            f"SELECT id FROM {read.chain.table} WHERE {where} ORDER BY {order_by(read)}", params,
+        )]
+        assert len(full) > PAGE_SIZE, read.chain.table
+        assert walk_pages(conn, read, where, params) == full, f"{read.chain.source.rel}:{read.chain.line}"
+
+
+def test_deep_page_starts_at_the_cursor(conn, paged, org_id):
+    # On a seed this small the planner may prefer a sort over an older index;
+    # without sorts only the keyset index yields the page order
+    conn.execute("SET enable_sort = off")
+    conn.execute("SET enable_incremental_sort = off")
+    for read in paged:
+        conn.execute(read.index_sql)
+        conn.execute(f"ANALYZE {read.chain.table}")
+        where, params = scope_filter(read, conn, org_id)
+        last = conn.execute(
+            f"SELECT count(*) FROM {read.chain.table} WHERE {where}", params,
+        ).fetchone()[0] - PAGE_SIZE - 1
+        cursor = conn.execute(
+            f"SELECT {read.sort_column}, id FROM {read.chain.table} WHERE {where} "
+            f"ORDER BY {order_by(read)} OFFSET %s LIMIT 1",
+            params + (last,),
+        ).fetchone()
+        keyset, cursor_params = keyset_filter(read, cursor)
+        plan = conn.execute(
+            f"EXPLAIN (ANALYZE, FORMAT JSON) SELECT id FROM {read.chain.table} WHERE {where} AND {keyset} "
+            f"ORDER BY {order_by(read)} LIMIT {PAGE_SIZE}",
+            params + cursor_params,
+        ).fetchone()[0][0]['Plan']
+        # Only the page and the rows tied with the cursor, not everything before it
+        assert read.index_name in str(plan), f"{read.chain.source.rel}:{read.chain.line}"
+        assert scanned_rows(plan) <= 2 * PAGE_SIZE, f"{read.chain.source.rel}:{read.chain.line}"
@@ -0,0 +1,37 @@
+"""Generated migrations never reuse the number of one already written"""
+
+import pytest
+
+import saas_schema
+from saas_schema import existing_migration, migration_target, next_migration_path
+
+
+@pytest.fixture
+def migrations(tmp_path, monkeypatch):
+    monkeypatch.setattr(saas_schema, 'MIGRATIONS_DIR', tmp_path)
+    (tmp_path / '001_foundation_tables.sql').write_text('-- 001\n')
+    (tmp_path / '002_cashier_customer_matching.sql').write_text('-- 002: v1\n')
+    return tmp_path
+
+
+def render(body: str):
+    return lambda migration: f"-- {migration.name.split('_')[0]}: {body}\n"
+
+
+def test_next_migration_path_allocates_a_new_number(migrations):
+    assert next_migration_path('cashier_customer_matching') == migrations / '003_cashier_customer_matching.sql'
+    assert existing_migration('cashier_customer_matching') == migrations / '002_cashier_customer_matching.sql'
+    assert existing_migration('keyset_pagination_indexes') is None
+
+
+def test_unchanged_migration_is_reused(migrations):
+    path, sql = migration_target('cashier_customer_matching', render('v1'))
+    assert path == migrations / '002_cashier_customer_matching.sql'
+    assert path.read_text() == sql
+
+
+def test_changed_migration_gets_a_new_number(migrations):
+    path, sql = migration_target('cashier_customer_matching', render('v2'))
+    assert path == migrations / '003_cashier_customer_matching.sql'
+    assert sql == '-- 003: v2\n'
+    assert (migrations / '002_cashier_customer_matching.sql').read_text() == '-- 002: v1\n'
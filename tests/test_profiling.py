@@ -0,0 +1,27 @@
+"""Regex counters of profiling.py for module-level calls and compiled patterns"""
+
+import re
+
+import dart_index
+from profiling import ProfiledPattern, Profiler
+
+
+def test_compiled_pattern_scans_are_counted():
+    profiler = Profiler()
+    profiler.install()
+    try:
+        # Compiled at import time, swapped for a proxy while profiling
+        assert isinstance(dart_index.RIVERPOD_ANNOTATION, ProfiledPattern)
+        words = re.compile(r'\w+')
+        with profiler.phase('scan'):
+            assert [m.group(0) for m in words.finditer('a b c')] == ['a', 'b', 'c']
+            assert re.search(words, 'x') is not None
+            assert dart_index.RIVERPOD_ANNOTATION.search('@riverpod') is not None
+            assert re.split(words, 'a,b') == ['', ',', '']
+    finally:
+        profiler.uninstall()
+
+    stats = profiler.phases['scan']
+    assert (stats.regex_calls, stats.regex_matches) == (3, 5)
+    assert {function for _, function in profiler.regex} == {'Pattern.finditer', 'Pattern.search', 're.search'}
+    assert isinstance(dart_index.RIVERPOD_ANNOTATION, re.Pattern)
@@ -0,0 +1,30 @@
+"""Per-edge savings in analyze_providers.py --invalidation match dropping each edge and re-walking"""
+
+import pytest
+
+from analyze_providers import SERVICES_DIR, Cascade, FunctionIndex, ProviderGraph, provider_files, rebuild_cost
+from dart_index import DartFile, find_providers
+
+
+@pytest.fixture(scope='module')
+def graph_and_costs():
+    provider_sources = [DartFile(p) for p in provider_files(None)]
+    service_sources = [DartFile(p) for p in provider_files([SERVICES_DIR])]
+    providers = {p.name: p for source in provider_sources for p in find_providers(source)}
+    index = FunctionIndex(provider_sources, service_sources)
+    costs = {name: rebuild_cost(provider, index) for name, provider in providers.items()}
+    return ProviderGraph(providers), costs
+
+
+def test_edge_savings_match_a_walk_without_the_edge(graph_and_costs):
+    graph, costs = graph_and_costs
+    checked = 0
+    for root in graph.providers:
+        cascade = Cascade(graph, costs, root)
+        savings = cascade.edge_savings()
+        for edge in cascade.edges():
+            key = (edge.watcher.name, edge.offset)
+            walked = cascade.total_calls - cascade.calls(graph.cascade(root, {key}))
+            assert savings.get(key, 0) == walked, f"{root}: {edge.watcher.name} -> {edge.target}"
+            checked += 1
+    assert checked
@@ -0,0 +1,57 @@
+"""Drop candidates of analyze_indexes.py and the idx_scan guard of its migration"""
+
+import re
+
+import pytest
+
+from analyze_indexes import INDEX_SCAN_GUARD, build_catalogue, find_redundant, generated_migrations, migration_sql
+from local_postgres import psycopg
+from saas_schema import load_schema
+
+
+@pytest.fixture(scope='module')
+def findings():
+    schema = load_schema()
+    queries, _ = build_catalogue(schema)
+    return find_redundant(schema, queries)[0]
+
+
+def test_indexes_added_by_generated_migrations_are_left_alone(findings):
+    fresh = generated_migrations()
+    assert '015_cashier_customer_matching.sql' in fresh
+    assert all(f.index.source not in fresh for f in findings)
+    assert all(f.covered_by is None or f.covered_by.source not in fresh for f in findings)
+    # Covered only by 015's (organization_id, ...) indexes
+    assert 'idx_cashier_customers_org' not in {f.index.name for f in findings}
+
+
+def test_guard_stops_the_drop_of_a_scanned_index(conn, findings):
+    names = {f.index.name for f in findings}
+    assert {'idx_ingredients_nome', 'idx_categorie_menu_ordine'} <= names
+
+    conn.execute("SET enable_seqscan = off")
+    conn.execute("SELECT count(*) FROM ingredients WHERE nome = 'basilico'")
+    conn.execute("RESET enable_seqscan")
+    conn.execute("SELECT pg_stat_force_next_flush()")
+
+    with pytest.raises(psycopg.errors.RaiseException, match='idx_ingredients_nome was scanned'):
+        conn.execute(INDEX_SCAN_GUARD.format(name='idx_ingredients_nome'))
+    conn.execute(INDEX_SCAN_GUARD.format(name='idx_categorie_menu_ordine'))
+
+
+def test_narrower_and_identical_indexes_are_reported(findings):
+    by_name = {f.index.name: f for f in findings}
+    assert by_name['idx_ordini_org'].kind == 'prefix'
+    assert by_name['idx_ordini_org'].covered_by.name == 'idx_ordini_org_customer'
+    assert by_name['idx_ordini_items_org'].kind == 'prefix'
+    assert by_name['idx_ordini_items_org'].covered_by.name == 'idx_ordini_items_org_order'
+    assert by_name['idx_dashboard_security_org_id'].kind == 'duplicate'
+    assert by_name['idx_dashboard_security_org_id'].covered_by.name == 'idx_dashboard_security_org'
+
+
+def test_guard_is_emitted_only_for_unused_drops(tmp_path, findings):
+    sql = migration_sql(tmp_path / '017_drop_redundant_indexes.sql', findings)
+    guarded = set(re.findall(r"WHERE indexrelname = '(\w+)'", sql))
+    assert guarded == {f.index.name for f in findings if f.kind == 'unused'}
+    assert 'idx_ordini_org' not in guarded
+    assert "-- No idx_scan guard: idx_ordini_org_customer takes over the scans of this index" in sql
@@ -0,0 +1,104 @@
+"""resolve_current_organization (016, generated by migrate_to_saas_phase2.py) against a local Postgres"""
+
+import pytest
+
+from local_postgres import connect, seed_organizations
+from migrate_to_saas_phase2 import resolve_as
+
+
+@pytest.fixture(scope='module')
+def orgs(saas_dsn):
+    with connect(saas_dsn) as conn:
+        return seed_organizations(conn, 3, prefix='resolve')
+
+
+@pytest.fixture
+def user(conn, orgs):
+    """A user with no memberships and no saved context"""
+    user_id = str(conn.execute(
+        "INSERT INTO auth.users (email) VALUES ('resolve-' || gen_random_uuid() || '@example.com') RETURNING id"
+    ).fetchone()[0])
+    # handle_new_user() joins new users to the first active organization
+    conn.execute("DELETE FROM organization_members WHERE user_id = %s", (user_id,))
+    conn.execute("UPDATE profiles SET current_organization_id = NULL WHERE id = %s", (user_id,))
+    return user_id
+
+
+def join(conn, user_id: str, org_id: str, accepted: str, active: bool = True):
+    conn.execute(
+        """INSERT INTO organization_members (organization_id, user_id, role, accepted_at, is_active)
+        VALUES (%s, %s, 'customer', now() - %s::interval, %s)
+        ON CONFLICT (organization_id, user_id) DO UPDATE SET is_active = EXCLUDED.is_active""",
+        (org_id, user_id, accepted, active),
+    )
+
+
+def set_saved(conn, user_id: str, org_id):
+    conn.execute("UPDATE profiles SET current_organization_id = %s WHERE id = %s", (org_id, user_id))
+
+
+def saved(conn, user_id: str):
+    row = conn.execute("SELECT current_organization_id FROM profiles WHERE id = %s", (user_id,)).fetchone()
+    return str(row[0]) if row[0] else None
+
+
+def test_anonymous(conn):
+    assert resolve_as(conn, None) is None
+
+
+def test_no_memberships(conn, user):
+    assert resolve_as(conn, user) is None
+    assert saved(conn, user) is None
+
+
+def test_first_membership_is_persisted(conn, user, orgs):
+    join(conn, user, orgs[1], '1 day')
+    join(conn, user, orgs[0], '2 days')
+
+    assert resolve_as(conn, user) == orgs[0]
+    assert saved(conn, user) == orgs[0]
+
+
+def test_valid_saved_context_is_kept(conn, user, orgs):
+    join(conn, user, orgs[0], '2 days')
+    join(conn, user, orgs[1], '1 day')
+    set_saved(conn, user, orgs[1])
+
+    assert resolve_as(conn, user) == orgs[1]
+    assert saved(conn, user) == orgs[1]
+
+
+def test_inactive_membership_falls_back(conn, user, orgs):
+    join(conn, user, orgs[0], '2 days')
+    join(conn, user, orgs[1], '1 day', active=False)
+    set_saved(conn, user, orgs[1])
+
+    assert resolve_as(conn, user) == orgs[0]
+    assert saved(conn, user) == orgs[0]
+
+
+def test_saved_context_without_membership_falls_back(conn, user, orgs):
+    join(conn, user, orgs[0], '2 days')
+    set_saved(conn, user, orgs[2])
+
+    assert resolve_as(conn, user) == orgs[0]
+
+
+def test_deleted_or_inactive_organizations(conn, orgs):
+    # Own organizations: the shared ones stay live for the other tests
+    deleted, inactive = seed_organizations(conn, 2, prefix='resolve-gone')
+    user_id = str(conn.execute(
+        "INSERT INTO auth.users (email) VALUES ('resolve-gone@example.com') RETURNING id"
+    ).fetchone()[0])
+    conn.execute("DELETE FROM organization_members WHERE user_id = %s", (user_id,))
+    join(conn, user_id, deleted, '2 days')
+    join(conn, user_id, inactive, '1 day')
+    set_saved(conn, user_id, deleted)
+    conn.execute("UPDATE organizations SET deleted_at = now() WHERE id = %s", (deleted,))
+
+    assert resolve_as(conn, user_id) == inactive
+    assert saved(conn, user_id) == inactive
+
+    conn.execute("UPDATE organizations SET is_active = false WHERE id = %s", (inactive,))
+    assert resolve_as(conn, user_id) is None
+    assert saved(conn, user_id) is None
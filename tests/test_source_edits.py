@@ -0,0 +1,64 @@
+"""Offsets, ordering and conflicts of the single-pass splice engine in source_edits.py"""
+
+import pytest
+
+from source_edits import EditConflict, SourceEdits
+
+TEXT = 'abcdefghij'
+
+
+def test_overlapping_replacements_conflict():
+    edits = SourceEdits(TEXT)
+    edits.replace(2, 6, 'X', 'first')
+    edits.replace(5, 8, 'Y', 'second')
+    with pytest.raises(EditConflict, match=r'first \(\[2, 6\)\) overlaps second \(\[5, 8\)\)'):
+        edits.apply()
+
+
+def test_insert_strictly_inside_a_replaced_range_conflicts():
+    edits = SourceEdits(TEXT)
+    edits.replace(2, 6, 'X', 'replace')
+    edits.insert(4, '+', 'insert')
+    with pytest.raises(EditConflict) as conflict:
+        edits.apply()
+    assert (conflict.value.first.label, conflict.value.second.label) == ('replace', 'insert')
+
+
+def test_inserts_at_one_offset_keep_their_order_around_replacements():
+    edits = SourceEdits(TEXT)
+    # Found out of order: every offset is against the original text
+    edits.insert(6, '>1', 'after the replacement, first')
+    edits.replace(2, 6, 'X')
+    edits.insert(2, '<1')
+    edits.insert(6, '>2')
+    edits.insert(2, '<2')
+    edits.insert(0, '^')
+    assert edits.apply() == '^ab<1<2X>1>2ghij'
+
+
+def test_identical_edits_are_kept_once():
+    edits = SourceEdits(TEXT)
+    edits.insert(3, '+')
+    edits.insert(3, '+')
+    edits.replace(5, 7, 'Z')
+    edits.replace(5, 7, 'Z')
+    assert len(edits) == 2
+    assert edits.apply() == 'abc+deZhij'
+    assert str(edits.stats()) == '2 edits, +0/-0 lines, +2/-2 chars'
+
+
+def test_write_reports_whether_the_file_changes(tmp_path):
+    path = tmp_path / 'service.dart'
+    path.write_text(TEXT, encoding='utf-8')
+
+    assert SourceEdits.read(path).write() is False
+    same = SourceEdits.read(path)
+    same.replace(0, 3, 'abc')
+    assert same.write() is False
+
+    edits = SourceEdits.read(path)
+    edits.delete(0, 3)
+    assert edits.write(dry_run=True) is True
+    assert path.read_text(encoding='utf-8') == TEXT
+    assert edits.write() is True
+    assert path.read_text(encoding='utf-8') == 'defghij'
@@ -4,17 +4,45 @@ Multi-Tenant Wiring Script - Phase 3
 =====================================
 Updates all DatabaseService methods and providers with organization context.
 
+Cashier customer matching is rewritten rather than wired: findMatchingCustomer
+becomes one call to a generated pg_trgm-backed match_cashier_customer RPC
+(ranked candidates in one round trip instead of one query per name pattern).
+
+--since REF (see change_scope.py) only looks at DatabaseService methods
+changed since REF and the key providers in the change scope (changed, or
+watching a changed provider).
+
+--watch keeps the findings of a dry run in memory and follows edits under
+lib/ and database_migrations/ (inotify, or polling where unavailable). After
+each burst of writes settles it re-analyzes only the changed files that
+feed a finding and prints what appeared and what was resolved. It never
+writes files.
+
+--profile writes a Chrome trace and a timing summary of the steps, per-file
+I/O and regex scans (see profiling.py).
+
 Usage:
-    python wire_org_context.py --dry-run     # Preview changes
-    python wire_org_context.py --apply       # Apply changes
+    python wire_org_context.py --dry-run                      # Preview changes
+    python wire_org_context.py --apply                        # Apply changes
+    python wire_org_context.py --dry-run --since origin/main  # Only what a PR touches
+    python wire_org_context.py --watch                        # Live findings while editing
+    python wire_org_context.py --dry-run --profile            # Where a run spends its time
 """
 
 import os
 import re
 import sys
+import time
 import argparse
 from pathlib import Path
-from typing import List, Tuple, Set
+from typing import Dict, List, Tuple, Set, Optional
+
+from change_scope import ChangeScope
+from dart_index import DartFile
+from file_watch import batches, file_watcher
+from profiling import Profiler, default_trace_path
+from saas_schema import migration_header, migration_target
+from source_edits import SourceEdits
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -22,6 +50,9 @@ if sys.platform == 'win32':
 
 PROJECT_ROOT = Path(__file__).parent
 LIB_DIR = PROJECT_ROOT / "lib"
+MIGRATIONS_ROOT = PROJECT_ROOT / "database_migrations"
+DATABASE_SERVICE = LIB_DIR / "core" / "services" / "database_service.dart"
+DEFAULT_DEBOUNCE_MS = 150
 
 # Tables that need org filtering
 ORG_TABLES = {
@@ -50,7 +81,353 @@ SKIP_METHODS = {
     'updateMenuItem', 'deleteMenuItem',  # Update/delete by ID
 }
 
-def update_database_service(dry_run: bool) -> int:
+# DatabaseService methods that query org tables, with their table
+METHODS_TO_UPDATE = [
+    ('searchCashierCustomers', 'cashier_customers'),
+    ('findMatchingCustomer', 'cashier_customers'),
+    ('createCashierCustomer', 'cashier_customers'),
+    ('updateCashierCustomer', 'cashier_customers'),
+    ('incrementCustomerOrders', 'cashier_customers'),
+    ('getCashierCustomerById', 'cashier_customers'),
+    ('countItemsInSlot', 'ordini'),
+    ('countOrdersInSlot', 'ordini'),
+    ('getItemCountsBySlotRange', 'ordini'),
+    ('getPizzeria', 'business_rules'),
+    ('getPizzeriaSettings', 'business_rules'),
+    ('updateBusinessRules', 'business_rules'),
+    ('saveOrderManagementSettings', 'order_management'),
+    ('saveOrderManagementSettingsRaw', 'order_management'),
+    ('saveDeliveryConfigurationSettings', 'delivery_configuration'),
+    ('saveDisplayBrandingSettings', 'display_branding'),
+    ('saveKitchenManagementSettings', 'kitchen_management'),
+    ('saveBusinessRulesSettings', 'business_rules'),
+    ('getOrderManagementSettingsRaw', 'order_management'),
+]
+
+# Providers with direct Supabase calls that need org context
+KEY_PROVIDERS = [
+    'categories_provider.dart',
+    'ingredients_provider.dart',
+    'sizes_master_provider.dart',
+    'sizes_provider.dart',
+    'product_sizes_provider.dart',
+    'product_extra_ingredients_provider.dart',
+    'product_included_ingredients_provider.dart',
+    'recommended_ingredients_provider.dart',
+    'filtered_menu_provider.dart',
+    'manager_orders_provider.dart',
+    'dashboard_analytics_provider.dart',
+    'delivery_zones_provider.dart',
+    'promotional_banners_provider.dart',
+    'inventory_ui_providers.dart',
+    'product_analytics_provider.dart',
+    'product_monthly_sales_provider.dart',
+    'top_products_per_category_provider.dart',
+    'order_price_calculator_provider.dart',
+]
+
+# DatabaseService methods replaced by a single RPC round trip, and the
+# private helpers they leave unused
+RPC_REWRITES = {
+    'findMatchingCustomer': 'match_cashier_customer',
+}
+RPC_REWRITE_HELPERS = ['_buildNameSearchPatterns']
+
+# Same tiers as the Dart loop it replaces, ranked in one round trip:
+#   exact    name (or swapped name/surname) and full phone
+#   name     name (or swapped) and no conflicting phone suffix
+#   fuzzy    first-word prefix or trigram-similar name, same phone suffix
+#   similar  trigram-similar name only (a suggestion, never auto-selected)
+CASHIER_MATCHING_SQL = r"""
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+-- organization_id (uuid) next to a gin_trgm_ops column in one GIN index
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
+-- Exact name lookups (idx_cashier_customers_search was dropped in 013)
+CREATE INDEX IF NOT EXISTS idx_cashier_customers_org_nome
+    ON cashier_customers (organization_id, nome_normalized);
+
+-- Prefix/contains/similarity on names within one organization, also used by
+-- searchCashierCustomers' ilike
+CREATE INDEX IF NOT EXISTS idx_cashier_customers_org_nome_trgm
+    ON cashier_customers USING gin (organization_id, nome_normalized gin_trgm_ops);
+
+-- Phone validation compares the last 6 digits
+CREATE INDEX IF NOT EXISTS idx_cashier_customers_org_phone_suffix
+    ON cashier_customers (organization_id, right(telefono_normalized, 6));
+
+CREATE OR REPLACE FUNCTION match_cashier_customer(
+    p_organization_id UUID,
+    p_nome TEXT,
+    p_telefono TEXT DEFAULT NULL,
+    p_limit INTEGER DEFAULT 5,
+    p_suggest BOOLEAN DEFAULT true
+)
+RETURNS TABLE (customer cashier_customers, match_kind TEXT, score REAL)
+LANGUAGE plpgsql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_nome TEXT := lower(btrim(p_nome));
+    v_limit INTEGER := greatest(p_limit, 1);
+    v_seen UUID[] := '{}';
+    v_match RECORD;
+BEGIN
+    -- Matching is always within one organization
+    IF p_organization_id IS NULL THEN
+        RAISE EXCEPTION 'match_cashier_customer: p_organization_id is required';
+    END IF;
+
+    -- Best match only: the name as typed with the full phone outranks everything
+    -- (exact tier, similarity 1), so one index probe settles a returning customer
+    IF v_limit = 1 AND length(normalize_phone(p_telefono)) >= 6 THEN
+        RETURN QUERY
+        SELECT c, 'exact'::text, 1::real
+        FROM cashier_customers c
+        WHERE c.organization_id = p_organization_id
+          AND c.nome_normalized = v_nome
+          AND c.telefono_normalized = normalize_phone(p_telefono)
+        ORDER BY c.ordini_count DESC NULLS LAST, c.ultimo_ordine_at DESC NULLS LAST
+        LIMIT 1;
+        IF FOUND THEN
+            RETURN;
+        END IF;
+    END IF;
+
+    -- exact/name/fuzzy: every candidate has the name (or a swap) or the phone suffix
+    FOR v_match IN
+        WITH input AS (
+            SELECT v_nome AS nome,
+                   regexp_split_to_array(v_nome, '\s+') AS parts,
+                   normalize_phone(p_telefono) AS phone
+        ),
+        probe AS (
+            SELECT nome,
+                   -- name, first/last swapped, first two swapped (3+ words)
+                   array_remove(ARRAY[
+                       nome,
+                       CASE WHEN cardinality(parts) >= 2 THEN array_to_string(
+                           parts[cardinality(parts):cardinality(parts)]
+                           || parts[2:cardinality(parts) - 1]
+                           || parts[1:1], ' ') END,
+                       CASE WHEN cardinality(parts) > 2 THEN array_to_string(
+                           ARRAY[parts[2], parts[1]] || parts[3:cardinality(parts)], ' ') END
+                   ], NULL) AS variants,
+                   ARRAY(SELECT DISTINCT v || '%'
+                         FROM unnest(ARRAY[parts[1], parts[cardinality(parts)], parts[2]]) AS v
+                         WHERE length(v) >= 3) AS prefixes,
+                   phone,
+                   CASE WHEN length(phone) >= 6 THEN right(phone, 6) END AS suffix
+            FROM input
+        ),
+        candidates AS (
+            SELECT c,
+                   c.nome_normalized = ANY (p.variants) AS same_name,
+                   -- A customer without a phone never conflicts (NULL would drop the name tier)
+                   p.suffix IS NOT NULL AND c.telefono_normalized IS NOT NULL
+                       AND length(c.telefono_normalized) >= 6 AS both_phones,
+                   coalesce(right(c.telefono_normalized, 6) = p.suffix, false) AS same_suffix,
+                   coalesce(c.telefono_normalized = p.phone, false) AS same_phone,
+                   c.nome_normalized LIKE ANY (p.prefixes) AS prefix_match,
+                   c.nome_normalized % p.nome AS similar_name,
+                   similarity(c.nome_normalized, p.nome) AS score
+            FROM probe p
+            JOIN cashier_customers c
+              ON c.organization_id = p_organization_id
+             AND (c.nome_normalized = ANY (p.variants)
+                  OR right(c.telefono_normalized, 6) = p.suffix)
+        ),
+        ranked AS (
+            SELECT c, score,
+                   CASE
+                       WHEN same_name AND same_phone AND both_phones THEN 'exact'
+                       WHEN same_name AND NOT (both_phones AND NOT same_suffix) THEN 'name'
+                       WHEN same_suffix AND both_phones AND (prefix_match OR similar_name) THEN 'fuzzy'
+                   END AS match_kind
+            FROM candidates
+        )
+        SELECT r.c, r.match_kind, r.score
+        FROM ranked r
+        WHERE r.match_kind IS NOT NULL
+        ORDER BY array_position(ARRAY['exact', 'name', 'fuzzy'], r.match_kind),
+                 r.score DESC,
+                 (r.c).ordini_count DESC NULLS LAST,
+                 (r.c).ultimo_ordine_at DESC NULLS LAST
+        LIMIT v_limit
+    LOOP
+        customer := v_match.c;
+        match_kind := v_match.match_kind;
+        score := v_match.score;
+        v_seen := v_seen || (customer).id;
+        RETURN NEXT;
+    END LOOP;
+
+    IF NOT p_suggest OR cardinality(v_seen) >= v_limit THEN
+        RETURN;
+    END IF;
+
+    -- similar: trigram suggestions fill what the stronger tiers left; a common
+    -- first name alone can be similar to thousands of customers
+    RETURN QUERY
+    SELECT c, 'similar'::text, similarity(c.nome_normalized, v_nome)
+    FROM cashier_customers c
+    WHERE c.organization_id = p_organization_id
+      AND c.nome_normalized % v_nome
+      AND c.id <> ALL (v_seen)
+    ORDER BY similarity(c.nome_normalized, v_nome) DESC,
+             c.ordini_count DESC NULLS LAST,
+             c.ultimo_ordine_at DESC NULLS LAST
+    LIMIT v_limit - cardinality(v_seen);
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION match_cashier_customer(UUID, TEXT, TEXT, INTEGER, BOOLEAN) TO authenticated;
+"""
+
+FIND_MATCHING_CUSTOMER_DART = """  /// Find a customer by exact or fuzzy match
+  /// One match_cashier_customer round trip ranks: name + phone, name (also
+  /// swapped name/surname) without a conflicting phone, then a fuzzy name with
+  /// the same phone suffix. 'similar' candidates are never auto-selected.
+  /// Returns the best matching customer or null
+  Future<CashierCustomerModel?> findMatchingCustomer({
+    required String nome,
+    String? telefono,
+    String? organizationId,
+  }) async {
+    // Matching never crosses organizations
+    if (nome.trim().isEmpty || organizationId == null) return null;
+
+    try {
+      final data = await _client.rpc(
+        'match_cashier_customer',
+        params: {
+          'p_organization_id': organizationId,
+          'p_nome': nome,
+          'p_telefono': telefono,
+          'p_limit': 1,
+          // 'similar' suggestions are never auto-selected: skip the trigram pass
+          'p_suggest': false,
+        },
+      );
+
+      final candidates = data as List;
+      if (candidates.isEmpty) return null;
+      return CashierCustomerModel.fromJson(
+        candidates.first['customer'] as Map<String, dynamic>,
+      );
+    } on PostgrestException catch (e) {
+      throw DatabaseException('Errore ricerca cliente: ${e.message}');
+    }
+  }
+"""
+
+RPC_REWRITE_BODIES = {
+    'findMatchingCustomer': FIND_MATCHING_CUSTOMER_DART,
+}
+
+
+def method_span(source: DartFile, name: str) -> Optional[Tuple[int, int]]:
+    """Start (including /// docs) and end (after the closing brace) of a method"""
+    block = next((b for b in source.blocks if b.kind == 'function' and b.name == name), None)
+    if not block:
+        return None
+    start = source.text.rfind('\n', 0, block.header_start) + 1
+    while True:
+        previous = source.text.rfind('\n', 0, start - 1) + 1
+        if start == 0 or not source.text[previous:start].strip().startswith('///'):
+            break
+        start = previous
+    end = source.text.find('\n', block.body_end) + 1
+    return start, end
+
+
+def pending_rpc_rewrites(source: DartFile) -> List[str]:
+    """RPC_REWRITES methods that do not call their RPC yet"""
+    pending = []
+    for method_name, rpc in RPC_REWRITES.items():
+        span = method_span(source, method_name)
+        if span and f"'{rpc}'" not in source.text[span[0]:span[1]]:
+            pending.append(method_name)
+    return pending
+
+
+def cashier_matching_sql(migration: Path) -> str:
+    return '\n'.join([
+        migration_header(
+            f"{migration.name.split('_')[0]}: CASHIER CUSTOMER MATCHING",
+            'Generated by wire_org_context.py: ranked pg_trgm matching in one round trip',
+        ),
+        "BEGIN;",
+        CASHIER_MATCHING_SQL,
+        "COMMIT;",
+        "",
+    ])
+
+
+def rewrite_cashier_matching(dry_run: bool, scope: Optional[ChangeScope] = None) -> int:
+    """Replace findMatchingCustomer's per-pattern loop with match_cashier_customer"""
+
+    if scope is not None and not scope.methods & (set(RPC_REWRITES) | set(RPC_REWRITE_HELPERS)):
+        print("  ⏭️  Cashier matching unchanged")
+        return 0
+
+    db_service_path = LIB_DIR / "core" / "services" / "database_service.dart"
+    source = DartFile(db_service_path)
+    migration, sql = migration_target('cashier_customer_matching', cashier_matching_sql)
+
+    rewritten = pending_rpc_rewrites(source)
+    spans = []
+    for method_name in rewritten:
+        spans.append((method_span(source, method_name), RPC_REWRITE_BODIES[method_name]))
+        print(f"  ✅ {method_name}() -> {RPC_REWRITES[method_name]}() RPC")
+    if spans:
+        for helper in RPC_REWRITE_HELPERS:
+            span = method_span(source, helper)
+            if span:
+                spans.append((span, ''))
+                print(f"  🗑️  {helper}() no longer used")
+
+    if migration.exists():
+        print(f"  ✅ {migration.relative_to(PROJECT_ROOT)} is up to date")
+    elif dry_run:
+        print(f"  Would write {migration.relative_to(PROJECT_ROOT)}")
+    else:
+        migration.write_text(sql, encoding='utf-8')
+        print(f"  ✅ Wrote {migration.relative_to(PROJECT_ROOT)}")
+    if dry_run:
+        return len(rewritten)
+
+    edits = SourceEdits(source.text, db_service_path)
+    for (start, end), replacement in spans:
+        # Drop the blank line left behind by a removed helper
+        if not replacement and source.text[end:end + 1] == '\n':
+            end += 1
+        edits.replace(start, end, replacement)
+    if edits.write():
+        print(f"  ✅ {db_service_path.name}: {edits.stats()}")
+    return len(rewritten)
+
+
+def methods_missing_org(content: str, methods: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """(method, table) pairs whose signature lacks an organizationId parameter"""
+    missing = []
+    for method_name, table in methods:
+        if method_name in SKIP_METHODS or method_name in RPC_REWRITES:
+            continue
+        # Check if method already has organizationId
+        if f'{method_name}' in content:
+            # Find the method and check if it has organizationId
+            pattern = rf'(Future<[^>]+>\s+{method_name}\s*\([^)]*)'
+            match = re.search(pattern, content)
+            if match and 'organizationId' not in match.group(1):
+                missing.append((method_name, table))
+    return missing
+
+
+def update_database_service(dry_run: bool, scope: Optional[ChangeScope] = None) -> int:
     """Add organizationId to remaining DatabaseService methods"""
     
     db_service_path = LIB_DIR / "core" / "services" / "database_service.dart"
@@ -63,66 +440,38 @@ def update_database_service(dry_run: bool) -> int:
     # 1. Don't already have it
     # 2. Query org tables
     
-    # Methods to update with their table references
-    methods_to_update = [
-        ('searchCashierCustomers', 'cashier_customers'),
-        ('findMatchingCustomer', 'cashier_customers'),
-        ('createCashierCustomer', 'cashier_customers'),
-        ('updateCashierCustomer', 'cashier_customers'),
-        ('incrementCustomerOrders', 'cashier_customers'),
-        ('getCashierCustomerById', 'cashier_customers'),
-        ('countItemsInSlot', 'ordini'),
-        ('countOrdersInSlot', 'ordini'),
-        ('getItemCountsBySlotRange', 'ordini'),
-        ('getPizzeria', 'business_rules'),
-        ('getPizzeriaSettings', 'business_rules'),
-        ('updateBusinessRules', 'business_rules'),
-        ('saveOrderManagementSettings', 'order_management'),
-        ('saveOrderManagementSettingsRaw', 'order_management'),
-        ('saveDeliveryConfigurationSettings', 'delivery_configuration'),
-        ('saveDisplayBrandingSettings', 'display_branding'),
-        ('saveKitchenManagementSettings', 'kitchen_management'),
-        ('saveBusinessRulesSettings', 'business_rules'),
-        ('getOrderManagementSettingsRaw', 'order_management'),
-    ]
-    
-    for method_name, table in methods_to_update:
-        if method_name in SKIP_METHODS:
-            continue
-            
-        # Check if method already has organizationId
-        if f'{method_name}' in content:
-            # Find the method and check if it has organizationId
-            pattern = rf'(Future<[^>]+>\s+{method_name}\s*\([^)]*)'
-            match = re.search(pattern, content)
-            if match:
-                method_sig = match.group(1)
-                if 'organizationId' in method_sig:
-                    continue  # Already has it
-                    
-                # Print what would be updated
-                if dry_run:
-                    print(f"  [TODO] {method_name}() needs organizationId for {table}")
-                    changes += 1
-                else:
-                    print(f"  [MANUAL] {method_name}() - add organizationId for {table}")
-                    changes += 1
+    methods_to_update = METHODS_TO_UPDATE
+    if scope is not None:
+        methods_to_update = [(m, t) for m, t in methods_to_update if m in scope.methods]
+
+    for method_name, table in methods_missing_org(content, methods_to_update):
+        # Print what would be updated
+        if dry_run:
+            print(f"  [TODO] {method_name}() needs organizationId for {table}")
+            changes += 1
+        else:
+            print(f"  [MANUAL] {method_name}() - add organizationId for {table}")
+            changes += 1
     
     print(f"\n  Total methods needing update: {changes}")
     return changes
 
 
+def provider_needs_org_context(content: str) -> bool:
+    """Direct Supabase calls without watching currentOrganizationProvider"""
+    # Skip if doesn't have Supabase calls
+    if 'Supabase.instance.client' not in content:
+        return False
+    # Skip if already properly using org context
+    return 'currentOrganizationProvider.future' not in content
+
+
 def update_provider_org_context(provider_path: Path, dry_run: bool) -> bool:
     """Update a provider to use currentOrganizationProvider"""
     
     content = provider_path.read_text(encoding='utf-8')
     
-    # Skip if doesn't have Supabase calls
-    if 'Supabase.instance.client' not in content:
-        return False
-    
-    # Skip if already properly using org context
-    if 'currentOrganizationProvider.future' in content:
+    if not provider_needs_org_context(content):
         return False
     
     # Check if already has the import
@@ -135,17 +484,13 @@ def update_provider_org_context(provider_path: Path, dry_run: bool) -> bool:
     # Add the watching pattern at the start of provider functions
     # This is complex so we'll just add a TODO comment for manual work
     
-    if not has_import:
-        # Add import at top
+    edits = SourceEdits(content, provider_path)
+    imports = list(re.finditer(r"^import\s+['\"][^;]*;[^\n]*\n?", content, re.MULTILINE))
+    
+    if not has_import and imports:
+        # Add after first import
         import_line = "import 'organization_provider.dart';\n"
-        if "import '" in content:
-            # Add after first import
-            content = re.sub(
-                r"(import '[^']+';)",
-                lambda m: m.group(0) + '\n' + import_line if content.index(m.group(0)) == content.find("import '") else m.group(0),
-                content,
-                count=1
-            )
+        edits.insert(imports[0].end(), import_line, 'organization_provider import')
     
     # Add TODO comment for org context
     todo_comment = """
@@ -154,48 +499,27 @@ def update_provider_org_context(provider_path: Path, dry_run: bool) -> bool:
 //   Add .eq('organization_id', orgId) to queries
 """
     
-    if 'TODO: Multi-tenant' not in content:
+    if 'TODO: Multi-tenant' not in content and imports:
         # Add after imports
-        import_end = content.rfind("import ")
-        if import_end != -1:
-            line_end = content.find('\n', import_end)
-            content = content[:line_end+1] + todo_comment + content[line_end+1:]
+        edits.insert(imports[-1].end(), todo_comment, 'org context TODO')
     
-    provider_path.write_text(content, encoding='utf-8')
-    print(f"  ✅ {provider_path.name}: Added org context TODO")
+    if not edits.write():
+        print(f"  ⏭️  {provider_path.name}: org context TODO already present")
+        return False
+    print(f"  ✅ {provider_path.name}: Added org context TODO ({edits.stats()})")
     return True
 
 
-def update_providers(dry_run: bool) -> int:
+def update_providers(dry_run: bool, scope: Optional[ChangeScope] = None) -> int:
     """Update all providers with direct Supabase calls"""
     
     providers_dir = LIB_DIR / "providers"
     updates = 0
     
-    # Key providers that need org context
-    key_providers = [
-        'categories_provider.dart',
-        'ingredients_provider.dart', 
-        'sizes_master_provider.dart',
-        'sizes_provider.dart',
-        'product_sizes_provider.dart',
-        'product_extra_ingredients_provider.dart',
-        'product_included_ingredients_provider.dart',
-        'recommended_ingredients_provider.dart',
-        'filtered_menu_provider.dart',
-        'manager_orders_provider.dart',
-        'dashboard_analytics_provider.dart',
-        'delivery_zones_provider.dart',
-        'promotional_banners_provider.dart',
-        'inventory_ui_providers.dart',
-        'product_analytics_provider.dart',
-        'product_monthly_sales_provider.dart',
-        'top_products_per_category_provider.dart',
-        'order_price_calculator_provider.dart',
-    ]
-    
-    for provider_name in key_providers:
+    for provider_name in KEY_PROVIDERS:
         provider_path = providers_dir / provider_name
+        if scope is not None and not scope.includes(provider_path):
+            continue
         if provider_path.exists():
             if update_provider_org_context(provider_path, dry_run):
                 updates += 1
@@ -203,35 +527,153 @@ def update_providers(dry_run: bool) -> int:
     return updates
 
 
+# ---------------------------------------------------------------------------
+# Watch mode
+# ---------------------------------------------------------------------------
+
+SQL_FUNCTION = re.compile(r'\bFUNCTION\s+(?:public\.)?(\w+)\s*\(', re.IGNORECASE)
+
+
+class WiringIndex:
+    """Dry-run findings per file, refreshed one changed file at a time"""
+
+    def __init__(self):
+        self.service = DATABASE_SERVICE.resolve()
+        self.providers = {(LIB_DIR / "providers" / name).resolve() for name in KEY_PROVIDERS}
+        self.migrations = MIGRATIONS_ROOT.resolve()
+        self.findings: Dict[Path, Set[str]] = {}
+        self.rpcs_defined: Dict[Path, Set[str]] = {}
+        self.rpcs_called: Set[str] = set()
+
+    def files(self) -> List[Path]:
+        return [self.service, *sorted(self.providers), *sorted(p.resolve() for p in self.migrations.rglob('*.sql'))]
+
+    def tracked(self, path: Path) -> bool:
+        path = path.resolve()
+        return path == self.service or path in self.providers or \
+            (path.suffix == '.sql' and self.migrations in path.parents)
+
+    def refresh(self, path: Path):
+        path = path.resolve()
+        if not path.exists():
+            self.findings.pop(path, None)
+            self.rpcs_defined.pop(path, None)
+            if path == self.service:
+                self.rpcs_called = set()
+            return
+        text = path.read_text(encoding='utf-8', errors='replace')
+        if path.suffix == '.sql':
+            self.rpcs_defined[path] = {name.lower() for name in SQL_FUNCTION.findall(text)}
+        elif path in self.providers:
+            self.findings[path] = {f"{path.name}: needs org context wiring"} if provider_needs_org_context(text) else set()
+        else:
+            found = {f"{m}() needs organizationId for {t}" for m, t in methods_missing_org(text, METHODS_TO_UPDATE)}
+            found |= {f"{m}() should call the {RPC_REWRITES[m]}() RPC" for m in pending_rpc_rewrites(DartFile(path, text))}
+            self.findings[path] = found
+            self.rpcs_called = {rpc for rpc in RPC_REWRITES.values() if f"'{rpc}'" in text}
+
+    def current(self) -> Set[str]:
+        found = set().union(*self.findings.values())
+        defined = set().union(*self.rpcs_defined.values())
+        found |= {f"{rpc}() is called but no migration defines it" for rpc in self.rpcs_called - defined}
+        return found
+
+
+def run_watch(debounce_ms: float):
+    """Print the findings, then their delta after every burst of edits"""
+    index = WiringIndex()
+    start = time.perf_counter()
+    for path in index.files():
+        index.refresh(path)
+    findings = index.current()
+    print(f"\n📇 Indexed {len(index.files())} files in {(time.perf_counter() - start) * 1000:.0f} ms: "
+          f"{len(findings)} findings")
+    for finding in sorted(findings):
+        print(f"  [TODO] {finding}")
+
+    watcher = file_watcher([LIB_DIR, MIGRATIONS_ROOT], ('.dart', '.sql'))
+    print(f"\n👀 Watching lib/ and database_migrations/ ({watcher.name}, {debounce_ms:g} ms debounce), "
+          f"Ctrl+C to stop")
+    try:
+        for changed in batches(watcher, debounce_ms / 1000):
+            relevant = sorted(p for p in changed if index.tracked(p))
+            if not relevant:
+                continue
+            start = time.perf_counter()
+            for path in relevant:
+                index.refresh(path)
+            updated = index.current()
+            elapsed = (time.perf_counter() - start) * 1000
+
+            names = ', '.join(p.name for p in relevant[:3]) + (f" +{len(relevant) - 3}" if len(relevant) > 3 else '')
+            print(f"\n🔄 {names}: {len(changed)} changed, {len(relevant)} re-analyzed in {elapsed:.1f} ms")
+            for finding in sorted(updated - findings):
+                print(f"  ➕ {finding}")
+            for finding in sorted(findings - updated):
+                print(f"  ➖ {finding}")
+            if updated == findings:
+                print("  = No change in findings")
+            print(f"  {len(updated)} findings")
+            findings = updated
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+
+
 def main():
     parser = argparse.ArgumentParser(description='Wire Organization Context')
     parser.add_argument('--dry-run', action='store_true', help='Preview changes')
     parser.add_argument('--apply', action='store_true', help='Apply changes')
+    parser.add_argument('--since', metavar='REF',
+                        help='Only check methods and providers changed since a git ref')
+    parser.add_argument('--watch', action='store_true', help='Re-check changed files as they are saved')
+    parser.add_argument('--debounce-ms', type=float, default=DEFAULT_DEBOUNCE_MS,
+                        help=f'Quiet time that ends a burst of writes in --watch (default: {DEFAULT_DEBOUNCE_MS})')
+    parser.add_argument('--profile', nargs='?', type=Path, const=default_trace_path(__file__),
+                        metavar='TRACE', help='Write a Chrome trace and timing summary (default: %(const)s)')
     
     args = parser.parse_args()
     
-    if not any([args.dry_run, args.apply]):
+    if not any([args.dry_run, args.apply, args.watch]):
         parser.print_help()
-        print("\n⚠️  Please specify --dry-run or --apply")
+        print("\n⚠️  Please specify --dry-run, --apply or --watch")
         sys.exit(1)
     
     print("🔌 Wire Organization Context - Phase 3")
     print("="*60)
+
+    if args.watch:
+        run_watch(args.debounce_ms)
+        return
     
     dry_run = args.dry_run
+    profiler = Profiler(enabled=args.profile is not None)
+    profiler.install()
+    with profiler.phase("Change scope"):
+        scope = ChangeScope(args.since) if args.since else None
+    if scope:
+        print(f"🔎 {scope.describe()}")
     
     print("\n📝 Step 1: Analyzing DatabaseService methods...")
-    db_updates = update_database_service(dry_run)
+    with profiler.phase("Step 1: DatabaseService"):
+        db_updates = update_database_service(dry_run, scope)
     
     print("\n📝 Step 2: Updating providers with org context...")
-    provider_updates = update_providers(dry_run)
+    with profiler.phase("Step 2: Providers"):
+        provider_updates = update_providers(dry_run, scope)
     print(f"   Updated {provider_updates} providers")
+
+    print("\n📝 Step 3: Rewriting cashier customer matching as one RPC...")
+    with profiler.phase("Step 3: Cashier matching RPC"):
+        rpc_rewrites = rewrite_cashier_matching(dry_run, scope)
     
     print("\n" + "="*60)
     print("SUMMARY")
     print("="*60)
     print(f"  DatabaseService methods to update: {db_updates}")
     print(f"  Providers updated: {provider_updates}")
+    print(f"  RPC rewrites: {rpc_rewrites}")
     
     if dry_run:
         print("\n⚠️  DRY RUN - No files were modified")
@@ -242,6 +684,9 @@ def main():
         print("   1. Review TODO comments in providers")
         print("   2. Manually wire org context in complex methods")
         print("   3. Run flutter analyze")
+    
+    if args.profile:
+        profiler.write(args.profile, f"wire_org_context.py {'--apply' if args.apply else '--dry-run'}")
 
 
 if __name__ == '__main__':